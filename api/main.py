@@ -4,28 +4,45 @@ FastAPI server for the prediction-market sim. Run from repo root:
   pip install fastapi uvicorn numpy pydantic
   uvicorn api.main:app --reload --host 127.0.0.1 --port 8000
 
-Endpoints fall into four groups:
+Endpoints fall into five groups:
   * Stateless: ``POST /api/simulate`` runs ``n_rounds`` and returns metrics + settlement.
-  * Streaming: ``POST /api/simulate/stream`` emits one NDJSON line per round (UI live charts).
-  * Session: ``/api/session/*`` keeps a ``SimulationEngine`` in memory for pause/step/shift/finish.
+  * Jobs: ``POST /api/simulate/jobs`` runs the same simulation in a worker process; poll
+    ``GET /api/simulate/jobs/{id}``, then ``GET .../result`` or ``.../stream``; ``DELETE`` cancels.
+  * Streaming: ``POST /api/simulate/stream`` emits NDJSON for live charts: one line per round,
+    or columnar batches every k rounds / t ms, downsampled to ``max_points``.
+  * Session: ``/api/session/*`` keeps a ``SimulationEngine`` in memory for pause/step/shift/finish
+    (bounded by ``api/session_store.py``: TTL and LRU eviction, optional spill to disk).
   * Persistent market: ``/api/market/*`` SQLite LMSR/CDA, trades, belief updates, autonomous threads.
 
 Optional: Ollama at http://127.0.0.1:11434 for LLM trader lines (``ollama pull <model>``).
 Env: COMMENT_USE_LLM, OLLAMA_*, COMMENT_LLM_MAX, COMMENT_MAX_TOTAL (cap comments per run).
+Jobs: SIMULATE_JOB_WORKERS (worker processes, default 2), SIMULATE_JOB_QUEUE (jobs that may
+wait beyond those before submit returns 429, default 8), SIMULATE_JOB_RESULTS (finished jobs
+kept, least recently read evicted first, default 32), SIMULATE_JOB_NICE (worker priority
+offset, default 5).
+Sessions: SESSION_MAX_MB (memory budget for live sessions, default 256), SESSION_TTL_S (idle
+seconds before a session is evicted, default 1800), SESSION_SPILL_DIR (when set, evicted
+sessions are pickled here and restored on their next request; keep it private to the server),
+SESSION_SPILL_TTL_S (idle seconds before a spilled session is deleted, default 86400).
+Workers: with ``uvicorn --workers N`` set API_WORKERS=N. Sessions are then written through to
+SESSION_SPILL_DIR (default ``data/sessions``), market runtime state is shared (see
+``api/market_routes.py``) and ETags / the discovery cache are bypassed. Market push streams
+answer 503, since each worker's event bus only sees its own writes, and the page polls instead.
+Simulation jobs stay in the worker that serves them, so their clients need sticky routing.
 """
 
 from __future__ import annotations
 
-import json
 import os
 import random
 import sys
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Literal, Optional, TypedDict
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, TypedDict
 
-import numpy as np
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator, model_validator
@@ -41,12 +58,45 @@ from settlement import compute_settlement  # noqa: E402
 from simulation_engine import SimulationEngine  # noqa: E402
 
 from .llm_comments import generate_comment_text, llm_budget_initial
+from .serialization import (
+    StreamCompressor,
+    json_bytes_response,
+    json_response,
+    negotiate_encoding,
+    render_json,
+)
+from .session_store import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_SPILL_TTL_S,
+    DEFAULT_TTL_S,
+    SessionNotFound,
+    SessionStore,
+)
+from .simulation_jobs import (
+    DEFAULT_MAX_PENDING,
+    DEFAULT_MAX_RESULTS,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_NICE,
+    DONE,
+    FAILED,
+    JobQueueFull,
+    SimulationJob,
+    SimulationJobQueue,
+)
 from .market_routes import (
+    _env_int,
     agents_router,
+    get_discovery_cache,
     get_market_service,
+    market_etag,
+    multi_worker,
+    not_modified,
     router as market_router,
 )
 
+# How often a job stream re-checks progress while the job runs.
+_JOB_STREAM_INTERVAL_S = 0.25
+
 # Sparse synthetic chat: each (agent, round) gets a comment only with this probability.
 COMMENT_PROB_PER_AGENT_ROUND = 0.01
 
@@ -62,25 +112,6 @@ def _comment_max_total() -> Optional[int]:
     return v
 
 
-def _jsonable(obj: Any) -> Any:
-    if obj is None:
-        return None
-    if isinstance(obj, dict):
-        return {str(k): _jsonable(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple)):
-        return [_jsonable(x) for x in obj]
-    if isinstance(obj, (float, int, str, bool)):
-        return obj
-    if isinstance(obj, np.generic):
-        return obj.item()
-    if hasattr(obj, "item") and callable(obj.item):
-        try:
-            return _jsonable(obj.item())
-        except Exception:
-            pass
-    return str(obj)
-
-
 class SimulateRequest(BaseModel):
     mechanism: Literal["lmsr", "cda"] = "lmsr"
     event_name: str = Field("Untitled event", max_length=200)
@@ -120,29 +151,37 @@ app.include_router(agents_router, prefix="/api")
 
 @app.get("/api/markets")
 def list_open_markets(
+    request: Request,
+    response: Response,
     limit: int = 100,
     offset: int = 0,
     status: str = "open",
-) -> Dict[str, Any]:
-    """Top-level market discovery endpoint used by autonomous agents and UI."""
+    cursor: Optional[str] = None,
+) -> Response:
+    """
+    Top-level market discovery endpoint used by autonomous agents and UI.
+
+    Pages are served pre-encoded from ``get_discovery_cache()``, which patches
+    or rebuilds them as trades and status changes commit.
+    """
+    svc = get_market_service()
+    etag = market_etag(svc)
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        return cached
+    status_filter: Optional[str]
+    status_filter = None if status in ("", "all", "*") else status
     try:
-        status_filter: Optional[str]
-        status_filter = None if status in ("", "all", "*") else status
-        result = get_market_service().list_markets_with_summary(
-            status=status_filter,
-            limit=limit,
-            offset=offset,
+        body = get_discovery_cache().get(
+            svc, status_filter, limit=limit, offset=offset, cursor=cursor,
         )
-        markets = []
-        for m in result["markets"]:
-            row = dict(m)
-            row["market_id"] = row["id"]
-            row["trade_count_24h"] = row.get("trade_count", 0)
-            row["active_agents_24h"] = row.get("active_agents", 0)
-            markets.append(row)
-        return _jsonable({"markets": markets, "total": result["total"]})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"} if "etag" in response.headers else None,
+    )
 
 
 def _belief_spec(body: SimulateRequest) -> BeliefSpec:
@@ -236,18 +275,79 @@ class _SessionData(TypedDict):
     comments: List[Dict[str, Any]]
     llm_budget: List[int]
     llm_budget_initial: int
+    # What the client was last sent, for delta responses: agent rows by id and the round.
+    agents_sent: Dict[int, Dict[str, Any]]
+    agents_sent_round: int
+
 
+# Approximate resident bytes per session, measured with tracemalloc on LMSR and CDA runs.
+_SESSION_BASE_BYTES = 16 * 1024
+_SESSION_AGENT_BYTES = 1024  # agent object, initial belief, last row sent to the client
+_SESSION_ROUND_BYTES = 320  # series points (and CDA resting orders) per round
+_SESSION_COMMENT_BYTES = 1024
 
-# In-memory sessions (dev/demo); restart the server clears state.
-_sessions: Dict[str, _SessionData] = {}
 
+def _session_bytes(data: _SessionData) -> int:
+    engine = data["engine"]
+    return (
+        _SESSION_BASE_BYTES
+        + _SESSION_AGENT_BYTES * engine.n_agents
+        + _SESSION_ROUND_BYTES * engine.round
+        + _SESSION_COMMENT_BYTES * len(data["comments"])
+    )
+
+
+# Sessions live in memory under a budget; idle and least recently used ones are
+# evicted, or spilled to SESSION_SPILL_DIR and restored on their next request.
+# With several workers every session is written through to that directory.
+_session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    global _session_store
+    if _session_store is None:
+        shared = multi_worker()
+        spill_dir = os.environ.get("SESSION_SPILL_DIR") or None
+        if shared and spill_dir is None:
+            spill_dir = str(_ROOT / "data" / "sessions")
+        _session_store = SessionStore(
+            _session_bytes,
+            max_bytes=max(1, _env_int("SESSION_MAX_MB", DEFAULT_MAX_BYTES >> 20)) << 20,
+            ttl_s=max(1, _env_int("SESSION_TTL_S", int(DEFAULT_TTL_S))),
+            spill_dir=spill_dir,
+            spill_ttl_s=max(1, _env_int("SESSION_SPILL_TTL_S", int(DEFAULT_SPILL_TTL_S))),
+            shared=shared,
+        )
+    return _session_store
 
-class SessionStepRequest(BaseModel):
+
+def reset_session_store() -> None:
+    """Forget in-memory sessions and re-read the settings (used by tests only)."""
+    global _session_store
+    if _session_store is not None:
+        _session_store.clear()
+        _session_store = None
+
+
+class SessionDeltaRequest(BaseModel):
+    """
+    Opt-in delta responses: pass the round and comment count the client
+    already has (``since_round`` / ``since_comment``) to get only new series
+    points, new comments, and agents that moved by more than
+    ``agent_tolerance``.  Omit ``since_round`` for a full snapshot.
+    """
+
+    since_round: Optional[int] = Field(None, ge=0)
+    since_comment: int = Field(0, ge=0)
+    agent_tolerance: float = Field(1e-6, ge=0.0)
+
+
+class SessionStepRequest(SessionDeltaRequest):
     session_id: str
     rounds: int = Field(1, ge=1, le=500)
 
 
-class SessionShiftRequest(BaseModel):
+class SessionShiftRequest(SessionDeltaRequest):
     session_id: str
     new_belief: Optional[float] = None
     delta: Optional[float] = None
@@ -269,31 +369,108 @@ class SessionIdBody(BaseModel):
     session_id: str
 
 
-def _get_session(session_id: str) -> _SessionData:
-    s = _sessions.get(session_id)
-    if s is None:
-        raise HTTPException(status_code=404, detail="Unknown or expired session_id")
-    return s
+@contextmanager
+def _session(session_id: str) -> Iterator[_SessionData]:
+    """Pin a session for one request (404 when unknown or expired)."""
+    try:
+        with get_session_store().use(session_id) as data:
+            yield data
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Unknown or expired session_id") from None
 
 
 def _session_snapshot(data: _SessionData, *, target_rounds: int, session_id: str) -> Dict[str, Any]:
     engine = data["engine"]
+    agents = engine.get_agents()
+    data["agents_sent"] = {int(a["agent_id"]): a for a in agents}
+    data["agents_sent_round"] = engine.round
     return {
         "session_id": session_id,
+        "mode": "full",
         "target_rounds": target_rounds,
         "round": engine.round,
         "done": engine.round >= target_rounds,
         "state": engine.get_state(),
         "metrics": engine.get_metrics(),
         "comments": data["comments"],
-        "agents": engine.get_agents(),
-        "comment_sampling": {
-            "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
-            "max_comments_per_event": _comment_max_total(),
-            "comments_so_far": len(data["comments"]),
-            "llm_budget_initial": data["llm_budget_initial"],
-            "llm_budget_remaining": data["llm_budget"][0],
-        },
+        "agents": agents,
+        "comment_sampling": _session_comment_sampling(data),
+    }
+
+
+def _session_comment_sampling(data: _SessionData) -> Dict[str, Any]:
+    return {
+        "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
+        "max_comments_per_event": _comment_max_total(),
+        "comments_so_far": len(data["comments"]),
+        "llm_budget_initial": data["llm_budget_initial"],
+        "llm_budget_remaining": data["llm_budget"][0],
+    }
+
+
+# ``get_metrics`` series with one point per round (sliced in delta responses).
+_SESSION_ROUND_SERIES = (
+    "price_series", "error_series", "trade_volume", "mean_belief_series",
+    "signal_series", "best_bid_series", "best_ask_series",
+)
+
+
+def _agent_moved(prev: Optional[Dict[str, Any]], row: Dict[str, Any], tolerance: float) -> bool:
+    if prev is None:
+        return True
+    for key, value in row.items():
+        old = prev.get(key)
+        if isinstance(value, (int, float)) and isinstance(old, (int, float)):
+            if abs(float(value) - float(old)) > tolerance:
+                return True
+        elif value != old:
+            return True
+    return False
+
+
+def _session_delta(
+    data: _SessionData, *, target_rounds: int, session_id: str, opts: SessionDeltaRequest,
+) -> Dict[str, Any]:
+    """
+    :func:`_session_snapshot` reduced to what a client at ``opts.since_round``
+    does not have yet.  Falls back to a full snapshot when the client's
+    position does not line up with what this session last sent it.
+    """
+    engine = data["engine"]
+    since_round = opts.since_round
+    comments = data["comments"]
+    if since_round is None or since_round > engine.round or opts.since_comment > len(comments):
+        return _session_snapshot(data, target_rounds=target_rounds, session_id=session_id)
+
+    metrics = engine.get_metrics()
+    for key in _SESSION_ROUND_SERIES:
+        if key in metrics:
+            metrics[key] = metrics[key][since_round:]
+
+    # Agents are diffed against the rows last sent; if the client missed that
+    # response (its round differs), it gets every agent again.
+    baseline = data["agents_sent"] if since_round == data["agents_sent_round"] else {}
+    changed: List[Dict[str, Any]] = []
+    for row in engine.get_agents():
+        aid = int(row["agent_id"])
+        if _agent_moved(baseline.get(aid), row, opts.agent_tolerance):
+            changed.append(row)
+            data["agents_sent"][aid] = row
+    data["agents_sent_round"] = engine.round
+
+    return {
+        "session_id": session_id,
+        "mode": "delta",
+        "since_round": since_round,
+        "since_comment": opts.since_comment,
+        "target_rounds": target_rounds,
+        "round": engine.round,
+        "done": engine.round >= target_rounds,
+        "state": engine.get_state(),
+        "metrics": metrics,
+        "comments": comments[opts.since_comment:],
+        "agents": changed,
+        "comment_sampling": _session_comment_sampling(data),
     }
 
 
@@ -305,8 +482,46 @@ def health() -> Dict[str, str]:
 # --- Stateless full run: build engine, run all rounds, optional LLM comments, settle ---
 
 
-@app.post("/api/simulate")
-def simulate(body: SimulateRequest) -> Dict[str, Any]:
+def _final_payload(
+    body: SimulateRequest,
+    engine: SimulationEngine,
+    comments: List[Dict[str, Any]],
+    llm_cap: int,
+    llm_budget: List[int],
+) -> Dict[str, Any]:
+    """Metrics, agents and settlement after the last round (the ``/api/simulate`` body)."""
+    metrics = engine.get_metrics()
+    agents_final = engine.get_agents()
+    state = engine.get_state()
+    settlement = compute_settlement(
+        agents_final,
+        initial_cash=body.initial_cash,
+        ground_truth=body.ground_truth,
+        seed=body.seed,
+    )
+
+    return {
+        "event_name": body.event_name,
+        "metrics": metrics,
+        "agents_final": agents_final,
+        "state": state,
+        "settlement": settlement,
+        "comments": comments,
+        "comment_sampling": {
+            "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
+            "max_comments_per_event": _comment_max_total(),
+            "comments_returned": len(comments),
+            "llm_budget_initial": llm_cap,
+            "llm_budget_remaining": llm_budget[0],
+        },
+        "config": body.model_dump(),
+    }
+
+
+def _simulation_result(
+    body: SimulateRequest, on_round: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """Run all rounds and settle; ``on_round(rounds_done)`` is called after each round."""
     engine = _make_engine(body)
 
     comment_rng = random.Random(body.seed + 17)
@@ -314,7 +529,7 @@ def simulate(body: SimulateRequest) -> Dict[str, Any]:
     llm_cap = llm_budget_initial()
     llm_budget = [llm_cap]
 
-    for _ in range(body.n_rounds):
+    for i in range(body.n_rounds):
         prev_shares = _snapshot_yes_shares(engine)
         engine.run(1)
         _append_round_comments(
@@ -326,40 +541,138 @@ def simulate(body: SimulateRequest) -> Dict[str, Any]:
             llm_budget=llm_budget,
             prev_shares=prev_shares,
         )
+        if on_round is not None:
+            on_round(i + 1)
 
-    metrics = engine.get_metrics()
-    agents_final = engine.get_agents()
-    state = engine.get_state()
-    settlement = compute_settlement(
-        agents_final,
-        initial_cash=body.initial_cash,
-        ground_truth=body.ground_truth,
-        seed=body.seed,
-    )
+    return _final_payload(body, engine, comments, llm_cap, llm_budget)
 
-    return _jsonable(
-        {
-            "event_name": body.event_name,
-            "metrics": metrics,
-            "agents_final": agents_final,
-            "state": state,
-            "settlement": settlement,
-            "comments": comments,
-            "comment_sampling": {
-                "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
-                "max_comments_per_event": _comment_max_total(),
-                "comments_returned": len(comments),
-                "llm_budget_initial": llm_cap,
-                "llm_budget_remaining": llm_budget[0],
-            },
-            "config": body.model_dump(),
-        }
+
+@app.post("/api/simulate")
+def simulate(body: SimulateRequest, request: Request) -> Response:
+    return json_response(_simulation_result(body), request)
+
+
+# --- Background jobs: the same run in a worker process, polled or streamed by id ---
+
+
+def run_simulation_job(config: Dict[str, Any], report: Callable[[int], None]) -> bytes:
+    """Job function for :class:`SimulationJobQueue` (runs in a worker process)."""
+    return render_json(_simulation_result(SimulateRequest(**config), on_round=report))
+
+
+_simulation_jobs: Optional[SimulationJobQueue] = None
+
+
+def get_simulation_jobs() -> SimulationJobQueue:
+    global _simulation_jobs
+    if _simulation_jobs is None:
+        _simulation_jobs = SimulationJobQueue(
+            max_workers=max(1, _env_int("SIMULATE_JOB_WORKERS", DEFAULT_MAX_WORKERS)),
+            max_pending=max(0, _env_int("SIMULATE_JOB_QUEUE", DEFAULT_MAX_PENDING)),
+            max_results=max(1, _env_int("SIMULATE_JOB_RESULTS", DEFAULT_MAX_RESULTS)),
+            nice=max(0, _env_int("SIMULATE_JOB_NICE", DEFAULT_NICE)),
+        )
+    return _simulation_jobs
+
+
+def reset_simulation_jobs() -> None:
+    """Stop the worker pool and forget all jobs (used by tests only)."""
+    global _simulation_jobs
+    if _simulation_jobs is not None:
+        _simulation_jobs.shutdown()
+        _simulation_jobs = None
+
+
+def _get_job(job_id: str) -> SimulationJob:
+    job = get_simulation_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return job
+
+
+@app.post("/api/simulate/jobs", status_code=202)
+def simulate_job_submit(body: SimulateRequest) -> Dict[str, Any]:
+    """Queue a simulation; poll ``GET /api/simulate/jobs/{id}`` then fetch ``.../result``."""
+    jobs = get_simulation_jobs()
+    try:
+        job = jobs.submit(run_simulation_job, body.model_dump(), n_rounds=body.n_rounds)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return jobs.describe(job)
+
+
+@app.get("/api/simulate/jobs/{job_id}")
+def simulate_job_status(job_id: str) -> Dict[str, Any]:
+    return get_simulation_jobs().describe(_get_job(job_id))
+
+
+@app.get("/api/simulate/jobs/{job_id}/result")
+def simulate_job_result(job_id: str, request: Request) -> Response:
+    """Same body as ``POST /api/simulate`` (409 until the job is done)."""
+    job = _get_job(job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=job.error or "Simulation failed")
+    if job.status != DONE or job.body is None:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return json_bytes_response(job.body, request)
+
+
+@app.get("/api/simulate/jobs/{job_id}/stream")
+def simulate_job_stream(job_id: str):
+    """NDJSON: ``{type:progress,...}`` as rounds complete, then ``{type:done,...}`` like the live stream."""
+    jobs = get_simulation_jobs()
+    job = _get_job(job_id)
+
+    def ndjson_bytes() -> Iterator[bytes]:
+        last = None
+        while True:
+            finished = jobs.wait(job, timeout=_JOB_STREAM_INTERVAL_S)
+            jobs.get(job.id)
+            status = jobs.describe(job)
+            if (status["status"], status["rounds_done"]) != last:
+                last = (status["status"], status["rounds_done"])
+                yield render_json({"type": "progress", **status}) + b"\n"
+            if finished:
+                break
+        if job.status == DONE and job.body is not None:
+            # The stored body is one JSON object; splice the tag in rather than re-encode it.
+            yield b'{"type":"done",' + job.body[1:] + b"\n"
+
+    return StreamingResponse(
+        ndjson_bytes(),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
     )
 
 
+@app.delete("/api/simulate/jobs/{job_id}")
+def simulate_job_cancel(job_id: str) -> Dict[str, Any]:
+    """Cancel a queued job, or stop a running one within a progress interval."""
+    jobs = get_simulation_jobs()
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return jobs.describe(job)
+
+
 # --- NDJSON stream: same economics as /simulate, one tick payload per round for the UI ---
 
 
+def _stream_comment_sampling(
+    comments: List[Dict[str, Any]], llm_cap: int, llm_budget: List[int],
+) -> Dict[str, Any]:
+    return {
+        "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
+        "max_comments_per_event": _comment_max_total(),
+        "comments_so_far": len(comments),
+        "llm_budget_initial": llm_cap,
+        "llm_budget_remaining": llm_budget[0],
+    }
+
+
 def _simulate_ndjson_chunks(body: SimulateRequest) -> Iterator[Dict[str, Any]]:
     """Yields tick dicts per round, then one done dict (same shape as /api/simulate plus type)."""
     engine = _make_engine(body)
@@ -393,71 +706,159 @@ def _simulate_ndjson_chunks(body: SimulateRequest) -> Iterator[Dict[str, Any]]:
                 "trade_volume": float(engine.trade_volume[-1]),
             },
             "new_comments": new_comments,
-            "comment_sampling": {
-                "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
-                "max_comments_per_event": _comment_max_total(),
-                "comments_so_far": len(comments),
-                "llm_budget_initial": llm_cap,
-                "llm_budget_remaining": llm_budget[0],
-            },
+            "comment_sampling": _stream_comment_sampling(comments, llm_cap, llm_budget),
         }
         if engine.mechanism == "cda":
             tick["append_best_bid"] = engine.best_bid_series[-1] if engine.best_bid_series else None
             tick["append_best_ask"] = engine.best_ask_series[-1] if engine.best_ask_series else None
         yield tick
 
-    agents_final = engine.get_agents()
-    metrics = engine.get_metrics()
-    state = engine.get_state()
-    settlement = compute_settlement(
-        agents_final,
-        initial_cash=body.initial_cash,
-        ground_truth=body.ground_truth,
-        seed=body.seed,
-    )
-    yield {
-        "type": "done",
-        "event_name": body.event_name,
-        "metrics": metrics,
-        "agents_final": agents_final,
-        "state": state,
-        "settlement": settlement,
-        "comments": comments,
-        "comment_sampling": {
-            "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
-            "max_comments_per_event": _comment_max_total(),
-            "comments_returned": len(comments),
-            "llm_budget_initial": llm_cap,
-            "llm_budget_remaining": llm_budget[0],
-        },
-        "config": body.model_dump(),
-    }
+    yield {"type": "done", **_final_payload(body, engine, comments, llm_cap, llm_budget)}
+
+
+def _batch_columns(cda: bool) -> Dict[str, List[Any]]:
+    names = ("round", "price", "mean_belief", "error", "trade_volume")
+    if cda:
+        names += ("best_bid", "best_ask")
+    return {name: [] for name in names}
+
+
+def _simulate_batch_chunks(
+    body: SimulateRequest,
+    *,
+    every: Optional[int] = None,
+    interval_ms: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields columnar batch dicts, then the same done dict as ``_simulate_ndjson_chunks``.
+
+    Rounds are folded into points of ``ceil(n_rounds / max_points)`` rounds (one
+    round without ``max_points``); a point carries the last price, mean belief,
+    error and quotes of its rounds and their summed trade volume.  A batch of
+    points goes out once ``every`` rounds or ``interval_ms`` have passed since
+    the previous one (neither given: one batch per point), and after the last round.
+    """
+    stride = -(-body.n_rounds // max_points) if max_points else 1
+    if every is None and interval_ms is None:
+        every = stride
+    engine = _make_engine(body)
+    cda = engine.mechanism == "cda"
+    comment_rng = random.Random(body.seed + 17)
+    comments: List[Dict[str, Any]] = []
+    llm_cap = llm_budget_initial()
+    llm_budget = [llm_cap]
+
+    columns = _batch_columns(cda)
+    volume = 0.0
+    comments_sent = 0
+    emitted_round = 0
+    emitted_at = time.monotonic()
+    for rnd in range(1, body.n_rounds + 1):
+        prev_shares = _snapshot_yes_shares(engine)
+        engine.run(1)
+        _append_round_comments(
+            engine,
+            comment_rng,
+            comments,
+            event_name=body.event_name,
+            mechanism=body.mechanism,
+            llm_budget=llm_budget,
+            prev_shares=prev_shares,
+        )
+        volume += float(engine.trade_volume[-1])
+        last = rnd == body.n_rounds
+        if rnd % stride and not last:
+            continue
+        columns["round"].append(rnd)
+        columns["price"].append(float(engine.price_series[-1]))
+        columns["mean_belief"].append(float(engine.mean_belief_series[-1]))
+        columns["error"].append(float(engine.error_series[-1]))
+        columns["trade_volume"].append(volume)
+        volume = 0.0
+        if cda:
+            columns["best_bid"].append(engine.best_bid_series[-1] if engine.best_bid_series else None)
+            columns["best_ask"].append(engine.best_ask_series[-1] if engine.best_ask_series else None)
+
+        now = time.monotonic()
+        due = last or (every is not None and rnd - emitted_round >= every) or (
+            interval_ms is not None and (now - emitted_at) * 1000.0 >= interval_ms
+        )
+        if not due:
+            continue
+        yield {
+            "type": "batch",
+            "state": engine.get_state(),
+            "mean_initial_belief": float(engine.mean_initial_belief),
+            "columns": columns,
+            "new_comments": comments[comments_sent:],
+            "comment_sampling": _stream_comment_sampling(comments, llm_cap, llm_budget),
+        }
+        columns = _batch_columns(cda)
+        comments_sent = len(comments)
+        emitted_round = rnd
+        emitted_at = now
+
+    yield {"type": "done", **_final_payload(body, engine, comments, llm_cap, llm_budget)}
 
 
 @app.post("/api/simulate/stream")
-def simulate_stream(body: SimulateRequest):
-    """NDJSON stream: one {type:tick,...} per round, then {type:done,...} matching /api/simulate."""
+def simulate_stream(
+    body: SimulateRequest,
+    request: Request,
+    every: Optional[int] = Query(None, ge=1, description="Emit a batch every k rounds"),
+    interval_ms: Optional[int] = Query(None, ge=1, description="Emit a batch every t milliseconds"),
+    max_points: Optional[int] = Query(None, ge=1, description="Fold rounds into at most this many chart points"),
+    stream_format: Optional[Literal["tick", "columnar"]] = Query(None, alias="format"),
+    compress: bool = False,
+):
+    """
+    NDJSON stream ending in {type:done,...} matching /api/simulate.
+
+    Without options: one {type:tick,...} per round.  With ``every``,
+    ``interval_ms`` or ``max_points`` (or ``format=columnar``): {type:batch,...}
+    lines whose ``columns`` hold parallel arrays of the points since the
+    previous batch, so lines and points scale with the chart, not with
+    ``n_rounds``.  ``compress=true`` gzip/br-encodes the stream when the client
+    accepts it, flushed after every line.
+    """
+    batched = every is not None or interval_ms is not None or max_points is not None
+    if stream_format == "tick" and batched:
+        raise HTTPException(
+            status_code=400,
+            detail="format=tick is one line per round; use format=columnar with every/interval_ms/max_points",
+        )
+    if batched or stream_format == "columnar":
+        chunks = _simulate_batch_chunks(body, every=every, interval_ms=interval_ms, max_points=max_points)
+    else:
+        chunks = _simulate_ndjson_chunks(body)
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    }
+    coding = negotiate_encoding(request.headers.get("accept-encoding", "")) if compress else None
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+        headers["Vary"] = "Accept-Encoding"
 
     def ndjson_bytes() -> Iterator[bytes]:
-        for chunk in _simulate_ndjson_chunks(body):
-            line = json.dumps(_jsonable(chunk), separators=(",", ":")) + "\n"
-            yield line.encode("utf-8")
+        if coding is None:
+            for chunk in chunks:
+                yield render_json(chunk) + b"\n"
+            return
+        encoder = StreamCompressor(coding)
+        for chunk in chunks:
+            yield encoder.compress(render_json(chunk) + b"\n")
+        yield encoder.finish()
 
-    return StreamingResponse(
-        ndjson_bytes(),
-        media_type="application/x-ndjson",
-        headers={
-            "Cache-Control": "no-cache",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    return StreamingResponse(ndjson_bytes(), media_type="application/x-ndjson", headers=headers)
 
 
 # --- Interactive session: step rounds, inject belief shocks, finish with settlement ---
 
 
 @app.post("/api/session/start")
-def session_start(body: SimulateRequest) -> Dict[str, Any]:
+def session_start(body: SimulateRequest, request: Request) -> Response:
     session_id = str(uuid.uuid4())
     engine = _make_engine(body)
     llm_cap = llm_budget_initial()
@@ -468,21 +869,31 @@ def session_start(body: SimulateRequest) -> Dict[str, Any]:
         "comments": [],
         "llm_budget": [llm_cap],
         "llm_budget_initial": llm_cap,
+        "agents_sent": {},
+        "agents_sent_round": 0,
     }
-    _sessions[session_id] = data
-    return _jsonable(_session_snapshot(data, target_rounds=body.n_rounds, session_id=session_id))
+    get_session_store().put(session_id, data)
+    return json_response(
+        _session_snapshot(data, target_rounds=body.n_rounds, session_id=session_id), request,
+    )
 
 
 @app.post("/api/session/step")
-def session_step(body: SessionStepRequest) -> Dict[str, Any]:
-    data = _get_session(body.session_id)
+def session_step(body: SessionStepRequest, request: Request) -> Response:
+    with _session(body.session_id) as data:
+        return _session_step(data, body, request)
+
+
+def _session_step(data: _SessionData, body: SessionStepRequest, request: Request) -> Response:
     engine = data["engine"]
     cfg = data["config"]
     remaining = max(0, cfg.n_rounds - engine.round)
     if remaining == 0:
-        snap = _session_snapshot(data, target_rounds=cfg.n_rounds, session_id=body.session_id)
+        snap = _session_delta(
+            data, target_rounds=cfg.n_rounds, session_id=body.session_id, opts=body,
+        )
         snap["rounds_advanced"] = 0
-        return _jsonable(snap)
+        return json_response(snap, request)
 
     to_run = min(body.rounds, remaining)
     for _ in range(to_run):
@@ -498,14 +909,18 @@ def session_step(body: SessionStepRequest) -> Dict[str, Any]:
             prev_shares=prev_shares,
         )
 
-    snap = _session_snapshot(data, target_rounds=cfg.n_rounds, session_id=body.session_id)
+    snap = _session_delta(data, target_rounds=cfg.n_rounds, session_id=body.session_id, opts=body)
     snap["rounds_advanced"] = to_run
-    return _jsonable(snap)
+    return json_response(snap, request)
 
 
 @app.post("/api/session/shift")
-def session_shift(body: SessionShiftRequest) -> Dict[str, Any]:
-    data = _get_session(body.session_id)
+def session_shift(body: SessionShiftRequest, request: Request) -> Response:
+    with _session(body.session_id) as data:
+        return _session_shift(data, body, request)
+
+
+def _session_shift(data: _SessionData, body: SessionShiftRequest, request: Request) -> Response:
     engine = data["engine"]
     cfg = data["config"]
     kw: Dict[str, Any] = {}
@@ -518,14 +933,20 @@ def session_shift(body: SessionShiftRequest) -> Dict[str, Any]:
     if body.rho_filter is not None:
         kw["rho_filter"] = body.rho_filter
     event = engine.shift_beliefs(**kw)
-    snap = _session_snapshot(data, target_rounds=cfg.n_rounds, session_id=body.session_id)
+    snap = _session_delta(data, target_rounds=cfg.n_rounds, session_id=body.session_id, opts=body)
     snap["shift_event"] = event
-    return _jsonable(snap)
+    return json_response(snap, request)
 
 
 @app.post("/api/session/finish")
-def session_finish(body: SessionIdBody) -> Dict[str, Any]:
-    data = _get_session(body.session_id)
+def session_finish(body: SessionIdBody, request: Request) -> Response:
+    with _session(body.session_id) as data:
+        payload = _session_final_payload(data)
+    get_session_store().discard(body.session_id)
+    return json_response(payload, request)
+
+
+def _session_final_payload(data: _SessionData) -> Dict[str, Any]:
     cfg = data["config"]
     engine = data["engine"]
     agents_final = engine.get_agents()
@@ -537,30 +958,27 @@ def session_finish(body: SessionIdBody) -> Dict[str, Any]:
         ground_truth=cfg.ground_truth,
         seed=cfg.seed,
     )
-    del _sessions[body.session_id]
-    return _jsonable(
-        {
-            "event_name": cfg.event_name,
-            "metrics": metrics,
-            "agents_final": agents_final,
-            "state": state,
-            "settlement": settlement,
-            "comments": data["comments"],
-            "comment_sampling": {
-                "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
-                "max_comments_per_event": _comment_max_total(),
-                "comments_returned": len(data["comments"]),
-                "llm_budget_initial": data["llm_budget_initial"],
-                "llm_budget_remaining": data["llm_budget"][0],
-            },
-            "config": cfg.model_dump(),
-        }
-    )
+    return {
+        "event_name": cfg.event_name,
+        "metrics": metrics,
+        "agents_final": agents_final,
+        "state": state,
+        "settlement": settlement,
+        "comments": data["comments"],
+        "comment_sampling": {
+            "probability_per_agent_per_round": COMMENT_PROB_PER_AGENT_ROUND,
+            "max_comments_per_event": _comment_max_total(),
+            "comments_returned": len(data["comments"]),
+            "llm_budget_initial": data["llm_budget_initial"],
+            "llm_budget_remaining": data["llm_budget"][0],
+        },
+        "config": cfg.model_dump(),
+    }
 
 
 @app.delete("/api/session/{session_id}")
 def session_delete(session_id: str) -> Dict[str, str]:
-    _sessions.pop(session_id, None)
+    get_session_store().discard(session_id)
     return {"status": "ok"}
 
 
@@ -0,0 +1,154 @@
+"""
+Cached market-discovery pages for ``GET /api/markets``.
+
+Every autonomous agent polls discovery once per cycle, and building a page
+costs a price and a trades aggregate per market plus a JSON encode.
+:class:`DiscoveryCache` keeps each page it has built -- keyed by status filter
+and paging arguments -- as the encoded response bytes, together with the
+service versions the rows were read at.  On the next request for that page:
+
+* nothing committed since (``catalog_version`` unchanged): serve the bytes;
+* a market was created, deleted, or changed status (``listing_version``
+  moved): membership may have changed, so rebuild the page;
+* otherwise (trades, belief updates, ...): re-summarise only the markets on
+  the page whose ``market_version`` moved, patch those rows and re-encode.
+
+The versions are bumped by the service on commit, so writes from agent
+threads or any other caller invalidate the cache the same way route handlers
+do.  One thread at a time rebuilds or patches a given page; concurrent
+requests for it wait and then share the result.
+
+The versions only see this process's commits, so with several server
+processes on one database the cache is built with ``enabled=False`` and
+every request builds its page.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .serialization import render_json
+
+DEFAULT_MAX_PAGES = 64
+
+_PageKey = Tuple[Optional[str], int, int, Optional[str]]
+
+
+def _discovery_row(market: Dict[str, Any]) -> Dict[str, Any]:
+    row = dict(market)
+    row["market_id"] = row["id"]
+    row["trade_count_24h"] = row.get("trade_count", 0)
+    row["active_agents_24h"] = row.get("active_agents", 0)
+    return row
+
+
+class _Page:
+    __slots__ = ("lock", "catalog", "listing", "rows", "index", "versions",
+                 "total", "next_cursor", "body")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.catalog = -1
+        self.listing = -1
+        self.rows: List[Dict[str, Any]] = []
+        self.index: Dict[int, int] = {}
+        self.versions: Dict[int, int] = {}
+        self.total = 0
+        self.next_cursor: Optional[str] = None
+        self.body: Optional[bytes] = None
+
+    def encode(self) -> None:
+        self.body = render_json(
+            {"markets": self.rows, "total": self.total, "next_cursor": self.next_cursor}
+        )
+
+
+class DiscoveryCache:
+    """Pre-encoded ``/api/markets`` pages, kept current from the service's change versions."""
+
+    def __init__(self, max_pages: int = DEFAULT_MAX_PAGES, *, enabled: bool = True):
+        if max_pages < 1:
+            raise ValueError("max_pages must be >= 1")
+        self.max_pages = max_pages
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pages: "OrderedDict[_PageKey, _Page]" = OrderedDict()
+
+    def get(
+        self,
+        svc: Any,
+        status: Optional[str] = None,
+        *,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> bytes:
+        """JSON body for one discovery page (``ValueError`` on bad paging args)."""
+        key: _PageKey = (status, int(limit), int(offset), cursor)
+        if not self.enabled:
+            page = _Page()
+            self._rebuild(svc, page, key)
+            return page.body
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                page = self._pages[key] = _Page()
+                # Paging args come from clients; keep only the most recently used pages.
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+            else:
+                self._pages.move_to_end(key)
+        with page.lock:
+            # Versions are read before the rows, so a write racing the read
+            # leaves the page looking stale rather than current.
+            catalog = svc.catalog_version()
+            if page.body is not None and page.catalog == catalog:
+                return page.body
+            listing = svc.listing_version()
+            if page.body is None or page.listing != listing or not self._patch(svc, page, status):
+                self._rebuild(svc, page, key)
+                if svc.catalog_version() != catalog:
+                    # Written while rebuilding: per-row versions are unknown,
+                    # so the next request re-summarises every row.
+                    page.versions = dict.fromkeys(page.versions, -1)
+            page.catalog = catalog
+            page.listing = listing
+            return page.body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    @staticmethod
+    def _rebuild(svc: Any, page: _Page, key: _PageKey) -> None:
+        status, limit, offset, cursor = key
+        result = svc.list_markets_with_summary(
+            status=status, limit=limit, offset=offset, cursor=cursor,
+        )
+        page.rows = [_discovery_row(m) for m in result["markets"]]
+        page.index = {int(r["id"]): i for i, r in enumerate(page.rows)}
+        page.versions = {mid: svc.market_version(mid) for mid in page.index}
+        page.total = result["total"]
+        page.next_cursor = result["next_cursor"]
+        page.encode()
+
+    @staticmethod
+    def _patch(svc: Any, page: _Page, status: Optional[str]) -> bool:
+        """Refresh rows whose market moved; ``False`` when the page must be rebuilt."""
+        moved = {
+            mid: v for mid, v in ((m, svc.market_version(m)) for m in page.versions)
+            if v != page.versions[mid]
+        }
+        if not moved:
+            return True
+        fresh = svc.market_summaries(list(moved))
+        for mid, version in moved.items():
+            row = fresh.get(mid)
+            if row is None or (status is not None and row["status"] != status):
+                return False
+            page.rows[page.index[mid]] = _discovery_row(row)
+            page.versions[mid] = version
+        page.encode()
+        return True
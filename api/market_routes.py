@@ -6,7 +6,36 @@ background threads run :class:`autonomous_agent.AutonomousAgent` clients that po
 the same API (loopback) when ``POST .../start`` is called.
 
 Environment:
-  MARKET_DB_PATH — SQLite file for market state (default: ``data/markets.sqlite``).
+  MARKET_DB_PATH — SQLite file for market state (default: ``data/markets.sqlite``);
+    ``:memory:`` selects the in-process in-memory backend (state dies with the process).
+  MARKET_SHARD_DIR — When set, use the sharded layout: ``MARKET_DB_PATH`` becomes the
+    catalog (agents + market registry) and each market gets its own file in this directory.
+  MARKET_SHARD_ALLOCATION — Sharded layout only: wallet cash moved into a market
+    sub-account when an agent first joins it (default: the whole wallet).
+  MARKET_ARCHIVE_DIR — Where ``POST /market/archive`` moves resolved markets' trades and
+    orders as compressed ``.npz`` files (default: ``archive/`` next to ``MARKET_DB_PATH``;
+    unset means archiving is off for the in-memory backend).
+  MARKET_DB_PROFILE — SQLite tuning profile for file databases: ``durable`` (default,
+    fsync per commit), ``balanced`` (synchronous=NORMAL) or ``fast`` (no fsync).
+  MARKET_READ_POOL_SIZE — Max read-only connections GET handlers share (default: 8).
+  MARKET_ANALYTICS_REPLICA — When set, analytics endpoints (``/agents/{id}/markets``,
+    ``/agents/{id}/trades``, ``/agents/leaderboard``) read a snapshot copy at this path, refreshed with SQLite's
+    online backup API, instead of the live database (unset: read the live database;
+    ignored for the sharded layout).
+  MARKET_ANALYTICS_MAX_AGE_S — Freshness bound for that copy in seconds (default: 30);
+    a request refreshes it first when it is older.
+  MARKET_STREAM_QUEUE — Events a push subscriber (``/market/{id}/stream`` SSE,
+    ``/market/{id}/ws`` WebSocket) may fall behind before it is dropped (default: 256).
+  MARKET_DISCOVERY_PAGES — Distinct ``GET /api/markets`` pages (status filter + paging
+    args) kept pre-encoded in memory (default: 64).
+  MARKET_RUNTIME_DB — SQLite file for state the market tables do not hold: starting cash,
+    trader chat, mean-belief samples and autonomous-runner requests (default: ``runtime.sqlite``
+    next to ``MARKET_DB_PATH``; ``:memory:`` with the in-memory backend).
+  API_WORKERS — Number of server processes sharing these databases (``uvicorn --workers``;
+    default 1).  Above 1, agent threads run only in the worker holding the runner lease
+    (``src/runner_coordinator.py``), and ETags and the discovery cache, which only see this
+    process's writes, are bypassed.  Events are only published to the bus of the worker
+    that committed the write, so the push streams answer 503 and clients keep polling.
   AUTONOMOUS_API_BASE — Base URL autonomous threads use (default: ``http://127.0.0.1:8000/api``).
 """
 
@@ -17,13 +46,16 @@ import logging
 import os
 import random
 import sys
+import threading
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
 import numpy as np
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, model_validator
 
 # ``app/`` (market_service) and ``src/`` (beliefs, agents)
@@ -33,10 +65,17 @@ for _p in (_ROOT / "app", _ROOT / "src"):
         sys.path.insert(0, str(_p))
 
 from agent_runner import AgentRunner  # noqa: E402
+from analytics_replica import SnapshotReplica  # noqa: E402
 from market_service import MarketService  # noqa: E402
+from market_store import decode_cursor, encode_cursor, now_us, us_to_iso  # noqa: E402
+from sharded_market_service import ShardedMarketService  # noqa: E402
 from personality import DEFAULT_POPULATION_DIST, sample_personality  # noqa: E402
+from runner_coordinator import RunnerCoordinator  # noqa: E402
+from runtime_state import RuntimeState  # noqa: E402
 
 from .llm_comments import generate_comment_text, llm_budget_initial  # noqa: E402
+from .market_discovery import DEFAULT_MAX_PAGES, DiscoveryCache  # noqa: E402
+from .market_stream import DEFAULT_MAX_QUEUE, MarketEvent, MarketEventBus  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -47,60 +86,251 @@ _DEFAULT_STUBBURNNESS = 0.30
 
 # --- Singleton service (reset in tests via ``reset_market_runtime``) ---
 _market_service: Optional[MarketService] = None
-_agent_runner: Optional[AgentRunner] = None
-# market_id -> metadata from create()
-_market_initial_cash: Dict[int, float] = {}
-# In-memory trader chat keyed by market (dev / UI; cleared on ``reset_market_runtime``).
-_market_comment_rows: Dict[int, List[Dict[str, Any]]] = {}
-_market_comment_llm_budget: Dict[int, List[int]] = {}
-_trade_cursor_for_comments: Dict[int, int] = {}
-_comment_id_seq: Dict[int, int] = {}
-_market_mean_belief_series: Dict[int, List[Dict[str, Any]]] = {}
+_analytics_replica: Optional[SnapshotReplica] = None
+_analytics_replica_lock = threading.Lock()
+_agent_runner: Optional[RunnerCoordinator] = None
+_event_bus: Optional[MarketEventBus] = None
+_discovery_cache: Optional[DiscoveryCache] = None
+# Starting cash, trader chat, mean-belief samples and runner requests, shared by workers.
+_runtime_state: Optional[RuntimeState] = None
+# market id -> (comment version, window seconds, crowd belief, valid until epoch us).
+_crowd_cache: Dict[int, Tuple[int, int, Dict[str, Any], int]] = {}
 _MAX_MEAN_BELIEF_SAMPLES = 20_000
+_MAX_BULK_AGENTS = 50_000
+_SINCE_TS_HELP = "Window start (inclusive): ISO-8601 or epoch seconds"
+_UNTIL_TS_HELP = "Window end (exclusive): ISO-8601 or epoch seconds"
+# Idle push connections get a keep-alive this often (also how fast a closed
+# WebSocket is noticed).
+_STREAM_HEARTBEAT_S = 15.0
+# Each worker only sees its own writes on the event bus, so with several workers
+# a stream would silently miss the rest; clients poll instead.
+_STREAMS_SINGLE_WORKER = "Push streams need a single worker (API_WORKERS=1); poll the REST endpoints"
 
 
 def reset_market_runtime() -> None:
     """Clear singleton and runners (used by tests only)."""
-    global _market_service, _agent_runner
+    global _market_service, _analytics_replica, _agent_runner, _event_bus, _discovery_cache
+    global _runtime_state
     if _agent_runner is not None:
         _agent_runner.shutdown()
         _agent_runner = None
+    if _event_bus is not None:
+        _event_bus.close()
+        _event_bus = None
+    _discovery_cache = None
+    _crowd_cache.clear()
+    if _analytics_replica is not None:
+        _analytics_replica.close()
+        _analytics_replica = None
     if _market_service is not None:
         _market_service.close()
         _market_service = None
-    _market_initial_cash.clear()
-    _market_comment_rows.clear()
-    _market_comment_llm_budget.clear()
-    _trade_cursor_for_comments.clear()
-    _comment_id_seq.clear()
-    _market_mean_belief_series.clear()
+    if _runtime_state is not None:
+        _runtime_state.close()
+        _runtime_state = None
 
 
 def _db_path() -> str:
     default = _ROOT / "data" / "markets.sqlite"
     p = os.environ.get("MARKET_DB_PATH", str(default))
-    Path(p).parent.mkdir(parents=True, exist_ok=True)
+    if p != ":memory:":
+        Path(p).parent.mkdir(parents=True, exist_ok=True)
     return p
 
 
+def _shard_allocation() -> Optional[float]:
+    raw = os.environ.get("MARKET_SHARD_ALLOCATION", "").strip()
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return None
+
+
+def _archive_dir(db_path: str) -> Optional[str]:
+    raw = os.environ.get("MARKET_ARCHIVE_DIR", "").strip()
+    if raw or db_path == ":memory:":
+        return raw or None
+    return str(Path(db_path).parent / "archive")
+
+
+def _storage_options() -> Dict[str, Any]:
+    raw = os.environ.get("MARKET_READ_POOL_SIZE", "").strip()
+    try:
+        pool_size = max(1, int(raw)) if raw else 8
+    except ValueError:
+        pool_size = 8
+    return {
+        "profile": os.environ.get("MARKET_DB_PROFILE", "").strip() or None,
+        "read_pool_size": pool_size,
+    }
+
+
 def get_market_service() -> MarketService:
     global _market_service
     if _market_service is None:
-        _market_service = MarketService(_db_path())
+        db_path = _db_path()
+        shard_dir = os.environ.get("MARKET_SHARD_DIR", "").strip()
+        if shard_dir:
+            _market_service = ShardedMarketService(
+                db_path, shard_dir, market_allocation=_shard_allocation(),
+                archive_dir=_archive_dir(db_path), **_storage_options(),
+            )
+        else:
+            _market_service = MarketService(
+                db_path, archive_dir=_archive_dir(db_path), **_storage_options(),
+            )
     return _market_service
 
 
+def _analytics_max_age() -> float:
+    raw = os.environ.get("MARKET_ANALYTICS_MAX_AGE_S", "").strip()
+    try:
+        return max(0.0, float(raw)) if raw else 30.0
+    except ValueError:
+        return 30.0
+
+
+def get_analytics_service() -> MarketService:
+    """
+    Service for heavy read-only reports: the snapshot replica when
+    ``MARKET_ANALYTICS_REPLICA`` is set, else the live service.
+    """
+    global _analytics_replica
+    svc = get_market_service()
+    replica_path = os.environ.get("MARKET_ANALYTICS_REPLICA", "").strip()
+    if not replica_path or isinstance(svc, ShardedMarketService):
+        return svc
+    if _analytics_replica is None:
+        with _analytics_replica_lock:
+            # Two first requests must not both back up into the same file.
+            if _analytics_replica is None:
+                Path(replica_path).parent.mkdir(parents=True, exist_ok=True)
+                replica = SnapshotReplica(
+                    svc, replica_path, max_age_s=_analytics_max_age(),
+                    archive_dir=_archive_dir(_db_path()),
+                )
+                replica.start()
+                _analytics_replica = replica
+    return _analytics_replica.service()
+
+
+_T = TypeVar("_T")
+
+
+def _analytics_read(read: Callable[[MarketService], _T]) -> _T:
+    """
+    Run the report *read* on the analytics service; when the snapshot predates
+    an agent or market it names (``ValueError``), run it on the live service.
+    Handlers check existence on the live service first.
+    """
+    svc = get_analytics_service()
+    live = get_market_service()
+    try:
+        return read(svc)
+    except ValueError:
+        if svc is live:
+            raise
+        return read(live)
+
+
+def get_event_bus() -> MarketEventBus:
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = MarketEventBus(
+            max_queue=max(1, _env_int("MARKET_STREAM_QUEUE", DEFAULT_MAX_QUEUE)),
+        )
+    return _event_bus
+
+
+def get_discovery_cache() -> DiscoveryCache:
+    """Process-wide cache of encoded ``GET /api/markets`` pages (pass-through with several workers)."""
+    global _discovery_cache
+    if _discovery_cache is None:
+        _discovery_cache = DiscoveryCache(
+            max_pages=max(1, _env_int("MARKET_DISCOVERY_PAGES", DEFAULT_MAX_PAGES)),
+            enabled=not multi_worker(),
+        )
+    return _discovery_cache
+
+
+def _streaming(market_id: int) -> bool:
+    """Whether anyone is subscribed to *market_id* (publishers skip work otherwise)."""
+    return _event_bus is not None and _event_bus.has_subscribers(market_id)
+
+
+def _publish(market_id: int, kind: str, data: Any) -> None:
+    if _streaming(market_id):
+        _event_bus.publish(market_id, kind, data)
+
+
+def _publish_quote(svc: MarketService, market_id: int, last_trade_price: Optional[float] = None) -> None:
+    """Push the post-write price (and CDA quotes) the ``/price`` endpoint would return."""
+    if not _streaming(market_id):
+        return
+    snap = svc.get_price_snapshot(market_id)
+    _publish(market_id, "quote", {
+        "price": float(snap["price"]),
+        "best_bid": snap.get("best_bid"),
+        "best_ask": snap.get("best_ask"),
+        "last_trade_price": (
+            last_trade_price if last_trade_price is not None else snap.get("last_trade_price")
+        ),
+        "mean_belief": svc.mean_belief_for_market(market_id),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    })
+
+
+def _publish_status(svc: MarketService, market_id: int) -> None:
+    if _streaming(market_id):
+        m = svc.get_market(market_id)
+        _publish(market_id, "status", {
+            "status": str(m.get("status") or ""),
+            "resolution": m.get("resolution"),
+            "resolved_at": m.get("resolved_at"),
+        })
+
+
 def _autonomous_api_base() -> str:
     return os.environ.get("AUTONOMOUS_API_BASE", "http://127.0.0.1:8000/api").rstrip("/")
 
 
-def get_agent_runner() -> AgentRunner:
+def multi_worker() -> bool:
+    """Whether several server processes share the databases (``API_WORKERS`` > 1)."""
+    return _env_int("API_WORKERS", 1) > 1
+
+
+def _runtime_db_path() -> str:
+    raw = os.environ.get("MARKET_RUNTIME_DB", "").strip()
+    if not raw:
+        db_path = _db_path()
+        if db_path == ":memory:":
+            return db_path
+        raw = str(Path(db_path).parent / "runtime.sqlite")
+    if raw != ":memory:":
+        Path(raw).parent.mkdir(parents=True, exist_ok=True)
+    return raw
+
+
+def get_runtime_state() -> RuntimeState:
+    global _runtime_state
+    if _runtime_state is None:
+        _runtime_state = RuntimeState(_runtime_db_path(), profile=_storage_options()["profile"])
+    return _runtime_state
+
+
+def get_agent_runner() -> RunnerCoordinator:
+    """The autonomous runner; agent threads run only in the worker holding the runner lease."""
     global _agent_runner
     if _agent_runner is None:
-        _agent_runner = AgentRunner(
-            api_base_url=_autonomous_api_base(),
-            market_service=get_market_service(),
+        svc = get_market_service()
+        _agent_runner = RunnerCoordinator(
+            AgentRunner(api_base_url=_autonomous_api_base(), market_service=svc),
+            get_runtime_state(),
+            svc,
         )
+        _agent_runner.start()
     return _agent_runner
 
 
@@ -111,7 +341,7 @@ def _append_mean_belief_sample(
     at_timestamp: Optional[str] = None,
 ) -> None:
     """
-    Append an in-memory time-series point for mean market belief.
+    Append a time-series point for mean market belief (kept in the runtime state).
 
     This series is API-authoritative for chart restoration across page navigations
     (analogous to how trade history is sourced from the backend).
@@ -123,11 +353,10 @@ def _append_mean_belief_sample(
             return
         mean_belief = float(mean)
     ts = str(at_timestamp) if at_timestamp is not None else datetime.now(timezone.utc).isoformat()
-    row = {"t": ts, "mean_belief": float(mean_belief)}
-    series = _market_mean_belief_series.setdefault(mid, [])
-    series.append(row)
-    if len(series) > _MAX_MEAN_BELIEF_SAMPLES:
-        del series[:-_MAX_MEAN_BELIEF_SAMPLES]
+    row = get_runtime_state().append_belief_sample(
+        mid, ts, float(mean_belief), max_samples=_MAX_MEAN_BELIEF_SAMPLES,
+    )
+    _publish(mid, "mean_belief", row)
 
 
 # --- Pydantic request bodies (match FINAL_PHASE_TASKS contracts) ---
@@ -153,6 +382,12 @@ class AgentCreateRequest(BaseModel):
     personality: Optional[Dict[str, Any]] = None
 
 
+class AgentBulkCreateRequest(BaseModel):
+    agents: List[AgentCreateRequest] = Field(..., min_length=1, max_length=_MAX_BULK_AGENTS)
+    # Optional market to join every new agent to (positions created in bulk).
+    market_id: Optional[int] = None
+
+
 class AgentPatchRequest(BaseModel):
     name: Optional[str] = None
     cash: Optional[float] = Field(default=None, gt=0)
@@ -242,6 +477,84 @@ def _http_from_value(err: ValueError, *, not_found: bool = False) -> None:
     raise HTTPException(status_code=400, detail=msg)
 
 
+def market_etag(svc: MarketService, market_id: Optional[int] = None, extra: str = "") -> str:
+    """
+    Weak ETag from the service's change version (one market, or every market
+    when ``None``); *extra* folds in state the version does not cover.
+    """
+    version = svc.catalog_version() if market_id is None else svc.market_version(market_id)
+    return f'W/"{svc.instance_id}-{version}{extra}"'
+
+
+def agent_etag(
+    svc: MarketService, market_id: int, agent_id: Optional[int] = None, extra: str = "",
+) -> str:
+    """
+    :func:`market_etag` for bodies showing agent cash, which trades and
+    settlements in other markets move too (*agent_id*'s, or any agent's when ``None``).
+    """
+    return market_etag(svc, market_id, f"-a{svc.agent_version(agent_id)}{extra}")
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Stamp *etag* on *response*; return a bare 304 when ``If-None-Match`` already
+    names it, so the handler can skip the database entirely.
+
+    Versions only count this process's writes, so with several workers
+    nothing is stamped and every request is served fresh.
+    """
+    if multi_worker():
+        return None
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+    raw = request.headers.get("if-none-match")
+    if raw is None:
+        return None
+    tags = {t.strip().removeprefix("W/") for t in raw.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _cursor_id(cursor: Optional[str]) -> Optional[int]:
+    """Decode an opaque ``cursor`` query param (400 on garbage)."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        _http_from_value(e)
+
+
+def _trade_page(
+    svc: MarketService,
+    *,
+    market_id: Optional[int] = None,
+    agent_id: Optional[int] = None,
+    since: Optional[int],
+    cursor: Optional[str],
+    limit: int,
+    since_ts: Optional[str] = None,
+    until_ts: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Newest-first trade page plus the cursor for the next (older) page."""
+    try:
+        rows = svc.get_trades(
+            market_id=market_id,
+            agent_id=agent_id,
+            since_trade_id=since,
+            limit=limit + 1,
+            before_trade_id=_cursor_id(cursor),
+            since_ts=since_ts,
+            until_ts=until_ts,
+        )
+    except ValueError as e:
+        _http_from_value(e)
+    next_cursor = encode_cursor(rows[limit - 1]["id"]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
 def _parse_personality(raw: Any) -> Dict[str, Any]:
     if isinstance(raw, dict):
         return raw
@@ -291,28 +604,42 @@ def _trade_response_row(t: Dict[str, Any], market_titles: Optional[Dict[int, str
 # --- Routes ---
 
 
-@agents_router.post("/agents", status_code=201)
-def create_agent(body: AgentCreateRequest) -> Dict[str, Any]:
-    svc = get_market_service()
+def _agent_insert_fields(
+    body: AgentCreateRequest, rng: Optional[random.Random] = None,
+) -> Dict[str, Any]:
+    """Resolve defaults (sampled personality, jittered belief) for one new agent."""
     # Sample a personality at agent creation time so every agent has a
     # fully-specified, market-independent personality from birth.
     if body.personality is not None:
         personality_dict = body.personality
     else:
-        personality_dict = sample_personality(DEFAULT_POPULATION_DIST).to_dict()
-    personality_json = json.dumps(personality_dict)
+        personality_dict = sample_personality(DEFAULT_POPULATION_DIST, rng).to_dict()
     # Keep default belief market-independent but non-degenerate so autonomous
     # agents can still discover edges and start trading without manual seeding.
     initial_belief = body.belief
     if initial_belief is None:
-        initial_belief = float(np.clip(0.5 + random.uniform(-0.2, 0.2), 0.01, 0.99))
+        jitter = (rng or random).uniform(-0.2, 0.2)
+        initial_belief = min(0.99, max(0.01, 0.5 + jitter))
+    return {
+        "name": body.name,
+        "cash": body.cash,
+        "belief": initial_belief,
+        "rho": body.rho,
+        "personality": personality_dict,
+    }
+
+
+@agents_router.post("/agents", status_code=201)
+def create_agent(body: AgentCreateRequest) -> Dict[str, Any]:
+    svc = get_market_service()
+    fields = _agent_insert_fields(body)
     try:
         agent = svc.create_agent(
-            body.name,
-            body.cash,
-            belief=initial_belief,
-            rho=body.rho,
-            personality=personality_json,
+            fields["name"],
+            fields["cash"],
+            belief=fields["belief"],
+            rho=fields["rho"],
+            personality=json.dumps(fields["personality"]),
         )
     except ValueError as e:
         _http_from_value(e)
@@ -320,6 +647,37 @@ def create_agent(body: AgentCreateRequest) -> Dict[str, Any]:
     return _agent_response_row(agent)
 
 
+@agents_router.post("/agents/bulk", status_code=201)
+def create_agents_bulk(body: AgentBulkCreateRequest) -> Dict[str, Any]:
+    """
+    Create many agents in one transaction, optionally joining them to a market.
+
+    All rows are inserted (or none are) and the runner registers the batch in
+    a single pass, so seeding thousands of agents is one request.
+    """
+    svc = get_market_service()
+    rng = random.Random()
+    rows = [_agent_insert_fields(a, rng) for a in body.agents]
+    try:
+        agents = svc.create_agents_bulk(
+            [{**r, "personality": json.dumps(r["personality"])} for r in rows],
+            market_id=body.market_id,
+        )
+    except ValueError as e:
+        _http_from_value(e)
+    # Hand the runner and the response the dicts instead of re-parsing JSON.
+    for agent, r in zip(agents, rows):
+        agent["personality"] = r["personality"]
+    get_agent_runner().register_agents(agents)
+    # Ids only (in request order): echoing 10k full profiles would cost more
+    # than inserting them.
+    return {
+        "agent_ids": [int(a["id"]) for a in agents],
+        "total": len(agents),
+        "market_id": body.market_id,
+    }
+
+
 @agents_router.post("/agents/create", status_code=201)
 def create_agent_alias(body: AgentCreateRequest) -> Dict[str, Any]:
     """Backward-compatible alias for clients using /agents/create."""
@@ -330,9 +688,13 @@ def create_agent_alias(body: AgentCreateRequest) -> Dict[str, Any]:
 def list_global_agents(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ) -> Dict[str, Any]:
     svc = get_market_service()
-    data = svc.list_agents(limit=limit, offset=offset)
+    try:
+        data = svc.list_agents(limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        _http_from_value(e)
     rows = [_agent_response_row(a) for a in data["agents"]]
     means = svc.mean_belief_joined_markets_by_agent([int(a["agent_id"]) for a in rows])
     for row in rows:
@@ -340,9 +702,26 @@ def list_global_agents(
     return {
         "agents": rows,
         "total": int(data["total"]),
+        "next_cursor": data["next_cursor"],
     }
 
 
+@agents_router.get("/agents/leaderboard")
+def get_agent_leaderboard(
+    market_id: Optional[int] = Query(None, description="Rank within one market only"),
+    by: str = Query("cash_flow", description="cash_flow, volume or trade_count"),
+    limit: int = Query(20, ge=1, le=500),
+) -> Dict[str, Any]:
+    """Rank agents by realized cash flow, share volume or trade count."""
+    try:
+        if market_id is not None:
+            get_market_service().get_market(market_id)
+        rows = _analytics_read(lambda src: src.agent_leaderboard(market_id, by=by, limit=limit))
+    except ValueError as e:
+        _http_from_value(e)
+    return {"agents": rows, "by": by, "market_id": market_id, "total": len(rows)}
+
+
 @agents_router.get("/agents/{agent_id}")
 def get_global_agent(agent_id: int) -> Dict[str, Any]:
     """Return one global agent profile row."""
@@ -362,7 +741,7 @@ def list_agent_markets(agent_id: int) -> Dict[str, Any]:
     svc = get_market_service()
     try:
         agent = svc.get_agent(agent_id)
-        rows = svc.list_markets_for_agent(agent_id)
+        rows = _analytics_read(lambda src: src.list_markets_for_agent(agent_id))
     except ValueError as e:
         _http_from_value(e, not_found=True)
 
@@ -373,7 +752,7 @@ def list_agent_markets(agent_id: int) -> Dict[str, Any]:
         mid = int(row["id"])
         shares = float(row.get("yes_shares") or 0.0)
         price = float(svc.get_price(mid))
-        ic = _market_initial_cash.get(mid, 100.0)
+        ic = get_runtime_state().initial_cash(mid)
         pnl = cash + shares * price - ic
         total_pnl += pnl
         markets.append(
@@ -386,6 +765,8 @@ def list_agent_markets(agent_id: int) -> Dict[str, Any]:
                 "price": price,
                 "unrealized_pnl": pnl,
                 "trade_count": int(row.get("trade_count") or 0),
+                "volume": float(row.get("volume") or 0.0),
+                "cash_flow": float(row.get("cash_flow") or 0.0),
                 "last_trade_at": row.get("last_trade_at"),
             }
         )
@@ -397,15 +778,18 @@ def list_agent_trades(
     agent_id: int,
     since: Optional[int] = Query(None, description="Only trades with id > since"),
     limit: int = Query(500, ge=1, le=2000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ) -> Dict[str, Any]:
-    """Return cross-market trade history for one agent."""
+    """Return cross-market trade history for one agent (newest first)."""
     svc = get_market_service()
     try:
         svc.get_agent(agent_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
 
-    rows = svc.get_trades(agent_id=agent_id, since_trade_id=since, limit=limit)
+    rows, next_cursor = _trade_page(
+        get_analytics_service(), agent_id=agent_id, since=since, cursor=cursor, limit=limit,
+    )
     market_ids = sorted({int(t["market_id"]) for t in rows})
     titles: Dict[int, str] = {}
     for mid in market_ids:
@@ -416,12 +800,13 @@ def list_agent_trades(
     return {
         "trades": [_trade_response_row(t, titles) for t in rows],
         "total": len(rows),
+        "next_cursor": next_cursor,
     }
 
 
 @agents_router.get("/agents/{agent_id}/comments")
 def list_agent_comments(agent_id: int) -> Dict[str, Any]:
-    """Return in-memory trader-chat comments authored by one agent across markets."""
+    """Return trader-chat comments authored by one agent across markets."""
     svc = get_market_service()
     try:
         svc.get_agent(agent_id)
@@ -429,22 +814,21 @@ def list_agent_comments(agent_id: int) -> Dict[str, Any]:
         _http_from_value(e, not_found=True)
 
     comments: List[Dict[str, Any]] = []
-    for mid, rows in _market_comment_rows.items():
-        title = f"Market #{mid}"
-        try:
-            title = str(svc.get_market(mid).get("title") or title)
-        except ValueError:
-            pass
-        for row in rows:
-            if int(row.get("agent_id") or -1) != int(agent_id):
-                continue
-            comments.append(
-                {
-                    **row,
-                    "market_id": int(mid),
-                    "market_title": title,
-                }
-            )
+    titles: Dict[int, str] = {}
+    for mid, row in get_runtime_state().comments_by_agent(agent_id):
+        if mid not in titles:
+            titles[mid] = f"Market #{mid}"
+            try:
+                titles[mid] = str(svc.get_market(mid).get("title") or titles[mid])
+            except ValueError:
+                pass
+        comments.append(
+            {
+                **row,
+                "market_id": int(mid),
+                "market_title": titles[mid],
+            }
+        )
     comments.sort(key=lambda c: str(c.get("at") or ""), reverse=True)
     return {"comments": comments, "total": len(comments)}
 
@@ -512,7 +896,7 @@ def create_market(body: MarketCreateRequest) -> Dict[str, Any]:
         initial_price=body.initial_price,
     )
     mid = int(mkt["id"])
-    _market_initial_cash[mid] = 100.0
+    get_runtime_state().set_initial_cash(mid, 100.0)
 
     svc.set_market_status(mid, "open")
     price0 = svc.get_price(mid)
@@ -535,35 +919,32 @@ def delete_market_endpoint(market_id: int) -> Dict[str, Any]:
             runner.stop_market(mid)
         except ValueError:
             pass
-    _market_initial_cash.pop(mid, None)
-    _market_comment_rows.pop(mid, None)
-    _market_comment_llm_budget.pop(mid, None)
-    _trade_cursor_for_comments.pop(mid, None)
-    _comment_id_seq.pop(mid, None)
+    get_runtime_state().drop_market(mid)
     svc = get_market_service()
     try:
         agents_removed = svc.delete_market(mid)
     except ValueError as e:
         _http_from_value(e, not_found=True)
+    if _event_bus is not None:
+        _publish(mid, "status", {"status": "deleted"})
+        _event_bus.close_market(mid)
     return {"deleted": True, "market_id": mid, "agents_removed": agents_removed}
 
 
 @router.get("/{market_id}/detail")
-def get_market_detail(market_id: int) -> Dict[str, Any]:
+def get_market_detail(market_id: int, request: Request, response: Response) -> Dict[str, Any]:
     """Single-market summary for UI headers (title, status, volume)."""
     svc = get_market_service()
+    cached = not_modified(request, response, market_etag(svc, market_id))
+    if cached is not None:
+        return cached
     try:
         m = svc.get_market(market_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
-    summary = svc.list_markets_with_summary(status=None, limit=10_000, offset=0)
-    tc = 0
-    aa = 0
-    for row in summary["markets"]:
-        if int(row["id"]) == int(market_id):
-            tc = int(row.get("trade_count", 0))
-            aa = int(row.get("active_agents", 0))
-            break
+    row = svc.market_summaries([market_id]).get(int(market_id), {})
+    tc = int(row.get("trade_count", 0))
+    aa = int(row.get("active_agents", 0))
     price = float(svc.get_price(market_id))
     return {
         "market_id": int(market_id),
@@ -608,6 +989,8 @@ def resolve_market(market_id: int, body: Optional[ResolveMarketRequest] = None)
         settlement = svc.resolve_market(market_id, requested_outcome)
     except ValueError as e:
         _http_from_value(e)
+    _publish_status(svc, market_id)
+    _publish_quote(svc, market_id)
     if resolution_draw_u is not None:
         settlement["resolution_draw_u"] = resolution_draw_u
         settlement["resolution_mode"] = "ground_truth_draw"
@@ -616,13 +999,34 @@ def resolve_market(market_id: int, body: Optional[ResolveMarketRequest] = None)
     return settlement
 
 
+@router.post("/archive")
+def archive_resolved_markets() -> Dict[str, Any]:
+    """Archival job: move every resolved market's trades/orders to cold storage."""
+    svc = get_market_service()
+    try:
+        archived = svc.archive_resolved_markets()
+    except ValueError as e:
+        _http_from_value(e)
+    return {"archived": archived, "total": len(archived)}
+
+
+@router.post("/{market_id}/archive")
+def archive_market(market_id: int) -> Dict[str, Any]:
+    """Archive one resolved market (idempotent; 400 while it is still open)."""
+    svc = get_market_service()
+    try:
+        return svc.archive_market(market_id)
+    except ValueError as e:
+        _http_from_value(e)
+
+
 @router.get("/{market_id}/settlement")
 def get_market_settlement(market_id: int) -> Dict[str, Any]:
     """
-    Return settlement-style summary for an already-resolved market.
+    Return the settlement summary for an already-resolved market.
 
-    Reconstructs winners/losers from persisted market resolution + positions so
-    UI can rehydrate settlement details after navigation/reload.
+    Reads the snapshot persisted at resolution time so UI can rehydrate
+    settlement details after navigation/reload.
     """
     svc = get_market_service()
     try:
@@ -632,45 +1036,12 @@ def get_market_settlement(market_id: int) -> Dict[str, Any]:
     status = str(mkt.get("status") or "")
     if status != "resolved":
         raise HTTPException(status_code=409, detail=f"market {market_id} is not resolved")
-    outcome = str(mkt.get("resolution") or "no")
-    payoff = 1.0 if outcome == "yes" else 0.0
-    rows = svc.list_agents_for_market(market_id)
-    settled_rows: List[Dict[str, Any]] = []
-    total_payout = 0.0
-    for row in rows:
-        yes_shares = float(row.get("yes_shares") or 0.0)
-        payout = yes_shares * payoff
-        total_payout += float(payout)
-        settled_rows.append(
-            {
-                "agent_id": int(row["agent_id"]),
-                "name": str(row.get("name") or f"Agent {row['agent_id']}"),
-                "yes_shares": yes_shares,
-                "payout": float(payout),
-                # Current cash can drift after settlement if agent trades elsewhere.
-                # Keep this field for UI compatibility.
-                "cash_after": float(row.get("cash") or 0.0),
-            }
-        )
-    winners = sorted(
-        settled_rows,
-        key=lambda x: (-float(x["payout"]), int(x["agent_id"])),
-    )[:10]
-    losers = sorted(
-        settled_rows,
-        key=lambda x: (float(x["payout"]), int(x["agent_id"])),
-    )[:10]
-    return {
-        "market_id": int(market_id),
-        "outcome": outcome,
-        "payoff_per_yes_share": payoff,
-        "positions_settled": len(settled_rows),
-        "total_payout": float(total_payout),
-        "winners": winners,
-        "losers": losers,
-        "resolved_at": mkt.get("resolved_at"),
-        "resolution_mode": "persisted_snapshot",
-    }
+    try:
+        settlement = svc.get_settlement(market_id)
+    except ValueError as e:
+        _http_from_value(e)
+    settlement["resolution_mode"] = "persisted_snapshot"
+    return settlement
 
 
 @router.get("/{market_id}/comments")
@@ -681,9 +1052,9 @@ def list_market_comments(market_id: int, since: int = 0) -> Dict[str, Any]:
         svc.get_market(market_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
-    rows = _market_comment_rows.get(int(market_id), [])
-    out = [c for c in rows if int(c["id"]) > int(since)]
-    return {"comments": out, "total": len(rows)}
+    state = get_runtime_state()
+    out = state.comments(market_id, since=since)
+    return {"comments": out, "total": state.comment_seq(market_id)}
 
 
 @router.post("/{market_id}/comments/tick")
@@ -698,7 +1069,8 @@ def tick_market_comments(market_id: int) -> Dict[str, Any]:
     except ValueError as e:
         _http_from_value(e, not_found=True)
     mid = int(market_id)
-    last_c = _trade_cursor_for_comments.get(mid, 0)
+    state = get_runtime_state()
+    last_c = state.comment_cursor(mid)
     batch = svc.get_trades(market_id=mid, since_trade_id=last_c, limit=50)
     if not batch:
         return {"appended": 0, "comments": []}
@@ -719,8 +1091,9 @@ def tick_market_comments(market_id: int) -> Dict[str, Any]:
     except ValueError:
         belief = 0.5
     price = float(t.get("price_after") or svc.get_price(mid))
-    if mid not in _market_comment_llm_budget:
-        _market_comment_llm_budget[mid] = [llm_budget_initial()]
+    budget_initial = llm_budget_initial()
+    llm_budget = [state.llm_budget(mid, budget_initial)]
+    llm_left = llm_budget[0]
     rng = random.Random(tid * 17_389 + agent_id * 97 + mid)
     title = str(m.get("title") or "Prediction market")
     mech = str(m.get("mechanism") or "lmsr")
@@ -733,21 +1106,23 @@ def tick_market_comments(market_id: int) -> Dict[str, Any]:
         market_yes_price=float(price),
         trade_flow=trade_flow,
         rng=rng,
-        llm_budget=_market_comment_llm_budget[mid],
+        llm_budget=llm_budget,
     )
-    seq = _comment_id_seq.get(mid, 0) + 1
-    _comment_id_seq[mid] = seq
-    row = {
-        "id": seq,
-        "trade_id": tid,
-        "agent_id": agent_id,
-        "text": text,
-        "source": source,
-        "belief": float(belief),
-        "at": datetime.now(timezone.utc).isoformat(),
-    }
-    _market_comment_rows.setdefault(mid, []).append(row)
-    _trade_cursor_for_comments[mid] = tid
+    row = state.append_comment(
+        mid,
+        expect_cursor=last_c,
+        trade_id=tid,
+        agent_id=agent_id,
+        text=text,
+        source=source,
+        belief=float(belief),
+        llm_budget_initial=budget_initial,
+        llm_used=llm_left - llm_budget[0],
+    )
+    if row is None:
+        # Another worker commented on this trade first.
+        return {"appended": 0, "comments": []}
+    _publish(mid, "comment", row)
     return {"appended": 1, "comments": [row]}
 
 
@@ -774,42 +1149,51 @@ def get_market_crowd_belief(market_id: int) -> Dict[str, Any]:
         svc.get_market(market_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
+    return _crowd_belief(market_id)
+
+
+def _crowd_belief(market_id: int) -> Dict[str, Any]:
+    """Mean belief of comments inside the influence window (runtime state, not the market DB)."""
+    return _crowd_window(market_id)[1]
+
+
+def _crowd_window(market_id: int) -> Tuple[int, Dict[str, Any]]:
+    """
+    ``(comment version, crowd belief)``.  The sample only changes when a
+    comment is stored or its oldest one leaves the window, so one worker
+    reuses it until then instead of querying the runtime database.
+    """
     mid = int(market_id)
     window = max(1, _env_int("COMMENT_INFLUENCE_WINDOW_SEC", 300))
-    rows = _market_comment_rows.get(mid, [])
-    now = datetime.now(timezone.utc)
-    beliefs: List[float] = []
-    for r in rows:
-        b = r.get("belief")
-        at = r.get("at")
-        if b is None or at is None:
-            continue
-        try:
-            ts = datetime.fromisoformat(str(at))
-            age = (now - ts).total_seconds()
-        except (TypeError, ValueError):
-            continue
-        if age <= window:
-            beliefs.append(float(b))
-    if not beliefs:
-        return {
-            "market_id": mid,
-            "crowd_belief": None,
-            "sample_size": 0,
-            "window_seconds": window,
-        }
-    return {
+    state = get_runtime_state()
+    version = state.comment_version(mid)
+    now = now_us()
+    hit = _crowd_cache.get(mid)
+    if (
+        hit is not None and not multi_worker()
+        and hit[0] == version and hit[1] == window and now < hit[3]
+    ):
+        return version, dict(hit[2])
+    rows = state.comment_beliefs_since(mid, now - window * 1_000_000)
+    crowd: Dict[str, Any] = {
         "market_id": mid,
-        "crowd_belief": sum(beliefs) / len(beliefs),
-        "sample_size": len(beliefs),
+        "crowd_belief": sum(b for b, _ in rows) / len(rows) if rows else None,
+        "sample_size": len(rows),
         "window_seconds": window,
     }
+    # Valid until the oldest comment leaves the window (or, with none, for good).
+    until = rows[0][1] + window * 1_000_000 + 1 if rows else 2**63 - 1
+    _crowd_cache[mid] = (version, window, crowd, until)
+    return version, dict(crowd)
 
 
 @router.get("/{market_id}/price")
-def get_market_price(market_id: int) -> Dict[str, Any]:
+def get_market_price(market_id: int, request: Request, response: Response) -> Dict[str, Any]:
     """Latest mid / LMSR price plus optional CDA quotes and timestamps."""
     svc = get_market_service()
+    cached = not_modified(request, response, market_etag(svc, market_id))
+    if cached is not None:
+        return cached
     try:
         snap = svc.get_price_snapshot(market_id)
     except ValueError as e:
@@ -853,6 +1237,85 @@ def get_market_price(market_id: int) -> Dict[str, Any]:
     }
 
 
+@router.get("/{market_id}/stream")
+async def stream_market_events(market_id: int) -> StreamingResponse:
+    """
+    Server-Sent Events push of trades, quotes, mean-belief points, comments,
+    news and status changes for one market (see ``market_stream``).
+
+    A client that falls too far behind gets a ``dropped`` event and the stream
+    ends; ``EventSource`` reconnects on its own and should resync over REST.
+    With several workers this answers 503 (see ``API_WORKERS``).
+    """
+    if multi_worker():
+        raise HTTPException(status_code=503, detail=_STREAMS_SINGLE_WORKER)
+    svc = get_market_service()
+    try:
+        await run_in_threadpool(svc.get_market, market_id)
+    except ValueError as e:
+        _http_from_value(e, not_found=True)
+    bus = get_event_bus()
+    sub = bus.subscribe(market_id)
+
+    async def _frames():
+        try:
+            yield "retry: 2000\n\n"
+            while True:
+                event = await sub.get(_STREAM_HEARTBEAT_S)
+                if event is not None:
+                    yield event.sse()
+                elif sub.closed:
+                    if sub.dropped:
+                        yield sub.dropped_event().sse()
+                    return
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            bus.unsubscribe(sub)
+
+    return StreamingResponse(
+        _frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{market_id}/ws")
+async def market_events_ws(websocket: WebSocket, market_id: int) -> None:
+    """WebSocket flavour of ``GET .../stream``: one JSON event per text message."""
+    if multi_worker():
+        # Refused before the handshake, like an unknown market.
+        await websocket.close(code=1013, reason=_STREAMS_SINGLE_WORKER)
+        return
+    svc = get_market_service()
+    try:
+        await run_in_threadpool(svc.get_market, market_id)
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+    # Subscribe before accepting so nothing committed after the handshake is missed.
+    bus = get_event_bus()
+    sub = bus.subscribe(market_id)
+    try:
+        await websocket.accept()
+        while True:
+            event: Optional[MarketEvent] = await sub.get(_STREAM_HEARTBEAT_S)
+            if event is not None:
+                await websocket.send_text(event.text)
+            elif sub.closed:
+                if sub.dropped:
+                    await websocket.send_text(sub.dropped_event().text)
+                # 1013 "try again later" for dropped consumers, normal close otherwise.
+                await websocket.close(code=1013 if sub.dropped else 1000)
+                return
+            else:
+                await websocket.send_text('{"type":"ping"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        bus.unsubscribe(sub)
+
+
 @router.get("/{market_id}/mean-belief-series")
 def get_mean_belief_series(
     market_id: int,
@@ -864,14 +1327,39 @@ def get_mean_belief_series(
         svc.get_market(market_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
-    series = _market_mean_belief_series.get(int(market_id), [])
-    out = series[-int(limit):] if limit > 0 else []
-    return {"market_id": int(market_id), "samples": out, "total": len(series)}
+    out, total = get_runtime_state().belief_samples(market_id, limit)
+    return {"market_id": int(market_id), "samples": out, "total": total}
+
+
+@router.get("/{market_id}/candles")
+def get_market_candles(
+    market_id: int,
+    res: str = Query("1m", description="Bucket width: 1s, 1m or 1h"),
+    from_ts: Optional[str] = Query(None, alias="from", description=_SINCE_TS_HELP),
+    to_ts: Optional[str] = Query(None, alias="to", description=_UNTIL_TS_HELP),
+    limit: int = Query(1000, ge=1, le=10_000),
+) -> Dict[str, Any]:
+    """OHLCV + mean-belief buckets (oldest-first), maintained on every trade."""
+    svc = get_market_service()
+    try:
+        svc.get_market(market_id)
+    except ValueError as e:
+        _http_from_value(e, not_found=True)
+    try:
+        candles = svc.get_candles(
+            market_id, res, since_ts=from_ts, until_ts=to_ts, limit=limit,
+        )
+    except ValueError as e:
+        _http_from_value(e)
+    return {"market_id": int(market_id), "resolution": res, "candles": candles}
 
 
 @router.get("/{market_id}/book")
-def get_order_book(market_id: int) -> Dict[str, Any]:
+def get_order_book(market_id: int, request: Request, response: Response) -> Dict[str, Any]:
     svc = get_market_service()
+    cached = not_modified(request, response, market_etag(svc, market_id))
+    if cached is not None:
+        return cached
     try:
         m = svc.get_market(market_id)
     except ValueError as e:
@@ -901,9 +1389,17 @@ def post_trade(market_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
             raise HTTPException(status_code=400, detail="trade clipped to zero (insufficient funds?)")
         ag = svc.get_agent(req.agent_id, market_id)
         pos = svc.get_position(req.agent_id, market_id)
-        ic = _market_initial_cash.get(market_id, 100.0)
+        ic = get_runtime_state().initial_cash(market_id)
         price = float(r["price_after"])
         pnl = float(ag["cash"]) + float(pos["yes_shares"]) * price - ic
+        if _streaming(market_id):
+            _publish_trades(svc, market_id, [{
+                "id": r["trade_id"], "market_id": market_id, "agent_id": req.agent_id,
+                "side": "buy_yes" if r["quantity"] >= 0 else "sell_yes",
+                "shares": abs(float(r["quantity"])), "cost": r["cost"],
+                "price_before": r["price_before"], "price_after": price,
+                "created_us": r["created_us"],
+            }], last_trade_price=price)
         _append_mean_belief_sample(int(market_id))
         return {
             "trade_id": r["trade_id"],
@@ -932,9 +1428,20 @@ def post_trade(market_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
     px = float(r["price_after"])
     ag = svc.get_agent(req.agent_id, market_id)
     pos = svc.get_position(req.agent_id, market_id)
-    ic = _market_initial_cash.get(market_id, 100.0)
+    ic = get_runtime_state().initial_cash(market_id)
     pnl = float(ag["cash"]) + float(pos["yes_shares"]) * px - ic
     tid = r["trades"][0]["trade_id"] if r.get("trades") else None
+    if _streaming(market_id):
+        _publish_trades(svc, market_id, [
+            {
+                "id": t["trade_id"], "market_id": market_id, "agent_id": req.agent_id,
+                "side": t["aggressor_side"], "shares": t["quantity"],
+                "cost": t["price"] * t["quantity"],
+                "price_before": t["price"], "price_after": t["price"],
+                "created_us": t["created_us"],
+            }
+            for t in r.get("trades") or []
+        ])
     _append_mean_belief_sample(int(market_id))
     return {
         "trade_id": tid,
@@ -949,9 +1456,28 @@ def post_trade(market_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _publish_trades(
+    svc: MarketService,
+    market_id: int,
+    trades: List[Dict[str, Any]],
+    *,
+    last_trade_price: Optional[float] = None,
+) -> None:
+    """Push committed trades (same row shape as ``GET .../trades``), then the new quote."""
+    for t in trades:
+        _publish(market_id, "trade", _trade_response_row({**t, "created_at": us_to_iso(t["created_us"])}))
+    # A resting CDA order moves the quotes without trading.
+    _publish_quote(svc, market_id, last_trade_price)
+
+
 @router.get("/{market_id}/agent/{agent_id}")
-def get_one_agent(market_id: int, agent_id: int) -> Dict[str, Any]:
+def get_one_agent(
+    market_id: int, agent_id: int, request: Request, response: Response,
+) -> Dict[str, Any]:
     svc = get_market_service()
+    cached = not_modified(request, response, agent_etag(svc, market_id, agent_id))
+    if cached is not None:
+        return cached
     try:
         svc.get_market(market_id)
     except ValueError as e:
@@ -962,7 +1488,7 @@ def get_one_agent(market_id: int, agent_id: int) -> Dict[str, Any]:
         _http_from_value(e, not_found=True)
     pos = svc.get_position(agent_id, market_id)
     price = svc.get_price(market_id)
-    ic = _market_initial_cash.get(market_id, 100.0)
+    ic = get_runtime_state().initial_cash(market_id)
     shares = float(pos.get("yes_shares") or 0.0)
     pnl = float(ag["cash"]) + shares * float(price) - ic
     # Personality remains global, but belief is market-specific from the position.
@@ -978,6 +1504,46 @@ def get_one_agent(market_id: int, agent_id: int) -> Dict[str, Any]:
     }
 
 
+@router.get("/{market_id}/agent/{agent_id}/decision-context")
+def get_decision_context(
+    market_id: int, agent_id: int, request: Request, response: Response,
+) -> Dict[str, Any]:
+    """
+    One request per autonomous-agent cycle: price and quotes, the agent's cash,
+    shares, market belief, rho and personality (one read transaction), plus the
+    recent-comments crowd belief.
+    """
+    svc = get_market_service()
+    comments, crowd = _crowd_window(market_id)
+    # Comments are outside the market DB and leave the window with time, so
+    # the ETag names the comment sample as well as the market and cash versions.
+    extra = f"-c{comments}.{crowd['sample_size']}"
+    cached = not_modified(request, response, agent_etag(svc, market_id, agent_id, extra))
+    if cached is not None:
+        return cached
+    try:
+        ctx = svc.decision_context(market_id, agent_id)
+    except ValueError as e:
+        _http_from_value(e, not_found=True)
+    return {
+        "market_id": market_id,
+        "agent_id": agent_id,
+        "mechanism": ctx["mechanism"],
+        "status": ctx["status"],
+        "price": float(ctx["price"]),
+        "best_bid": ctx.get("best_bid"),
+        "best_ask": ctx.get("best_ask"),
+        "last_trade_price": ctx.get("last_trade_price"),
+        "cash": float(ctx["cash"]),
+        "shares": float(ctx["shares"]),
+        "belief": float(ctx["belief"]) if ctx.get("belief") is not None else 0.5,
+        "rho": float(ctx["rho"]) if ctx.get("rho") is not None else 1.0,
+        "personality": _parse_personality(ctx.get("personality")),
+        "crowd_belief": crowd["crowd_belief"],
+        "crowd_sample_size": crowd["sample_size"],
+    }
+
+
 @router.post("/{market_id}/agent/{agent_id}/belief")
 def post_agent_belief(
     market_id: int, agent_id: int, body: BeliefUpdateRequest,
@@ -1037,19 +1603,31 @@ def join_market(market_id: int, body: MarketJoinRequest) -> Dict[str, Any]:
 @router.get("/{market_id}/agents")
 def list_market_agents(
     market_id: int,
+    request: Request,
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ) -> Dict[str, Any]:
     svc = get_market_service()
+    cached = not_modified(request, response, agent_etag(svc, market_id))
+    if cached is not None:
+        return cached
     try:
         svc.get_market(market_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
-    rows = svc.list_agents_for_market(market_id)
+    after = _cursor_id(cursor)
+    if after is not None and offset:
+        raise HTTPException(status_code=400, detail="offset cannot be combined with cursor")
+    rows = svc.list_agents_for_market(
+        market_id, limit=limit + 1, offset=offset, after_agent_id=after,
+    )
+    next_cursor = encode_cursor(rows[limit - 1]["agent_id"]) if len(rows) > limit else None
     price = svc.get_price(market_id)
-    ic = _market_initial_cash.get(market_id, 100.0)
+    ic = get_runtime_state().initial_cash(market_id)
     out: List[Dict[str, Any]] = []
-    for r in rows[offset : offset + limit]:
+    for r in rows[:limit]:
         aid = int(r["agent_id"])
         sh = float(r.get("yes_shares") or 0)
         cash = float(r["cash"])
@@ -1067,7 +1645,11 @@ def list_market_agents(
                 "personality": pers,
             }
         )
-    return {"agents": out, "total": len(rows)}
+    return {
+        "agents": out,
+        "total": svc.count_agents_for_market(market_id),
+        "next_cursor": next_cursor,
+    }
 
 
 @router.get("/{market_id}/trades")
@@ -1075,13 +1657,20 @@ def list_trades(
     market_id: int,
     since: Optional[int] = Query(None, description="Only trades with id > since"),
     limit: int = Query(100, ge=1, le=100000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    since_ts: Optional[str] = Query(None, description=_SINCE_TS_HELP),
+    until_ts: Optional[str] = Query(None, description=_UNTIL_TS_HELP),
 ) -> Dict[str, Any]:
+    """Newest ``limit`` trades, oldest-first; ``next_cursor`` pages further back."""
     svc = get_market_service()
     try:
         svc.get_market(market_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
-    rows = svc.get_trades(market_id=market_id, since_trade_id=since, limit=limit)
+    rows, next_cursor = _trade_page(
+        svc, market_id=market_id, since=since, cursor=cursor, limit=limit,
+        since_ts=since_ts, until_ts=until_ts,
+    )
     # Oldest-first for feed readability (store returns DESC)
     rows = list(reversed(rows))
     trades_out: List[Dict[str, Any]] = []
@@ -1096,7 +1685,25 @@ def list_trades(
             }
         )
     total = svc.count_trades(market_id)
-    return {"trades": trades_out, "total": total}
+    return {"trades": trades_out, "total": total, "next_cursor": next_cursor}
+
+
+@router.get("/{market_id}/trade-stats")
+def get_trade_stats(
+    market_id: int,
+    since_ts: Optional[str] = Query(None, description=_SINCE_TS_HELP),
+    until_ts: Optional[str] = Query(None, description=_UNTIL_TS_HELP),
+) -> Dict[str, Any]:
+    """Trade count, share volume, notional and distinct traders in a time window."""
+    svc = get_market_service()
+    try:
+        svc.get_market(market_id)
+    except ValueError as e:
+        _http_from_value(e, not_found=True)
+    try:
+        return svc.trade_window_stats(market_id, since_ts=since_ts, until_ts=until_ts)
+    except ValueError as e:
+        _http_from_value(e)
 
 
 @router.post("/{market_id}/news")
@@ -1219,6 +1826,9 @@ def inject_news_event(market_id: int, body: NewsEventRequest) -> Dict[str, Any]:
         _http_from_value(e, not_found=True)
     result["news_event_id"] = int(persisted["id"])
     result["at_timestamp"] = str(persisted["at_timestamp"])
+    _publish(int(market_id), "news", {
+        k: v for k, v in result.items() if k != "affected_agents"
+    })
     _append_mean_belief_sample(
         int(market_id),
         mean_belief=float(result["mean_belief_after"]),
@@ -1232,13 +1842,22 @@ def list_news_events(
     market_id: int,
     limit: int = Query(200, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ) -> Dict[str, Any]:
     svc = get_market_service()
     try:
-        data = svc.list_news_events(market_id, limit=limit, offset=offset)
+        svc.get_market(market_id)
     except ValueError as e:
         _http_from_value(e, not_found=True)
-    return {"events": data["events"], "total": int(data["total"])}
+    try:
+        data = svc.list_news_events(market_id, limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        _http_from_value(e)
+    return {
+        "events": data["events"],
+        "total": int(data["total"]),
+        "next_cursor": data["next_cursor"],
+    }
 
 
 @router.post("/{market_id}/start")
@@ -1257,6 +1876,7 @@ def start_autonomous(market_id: int) -> Dict[str, Any]:
         n_active = runner.start_market(market_id)
     except ValueError as e:
         _http_from_value(e)
+    _publish_status(svc, market_id)
     _append_mean_belief_sample(int(market_id))
     return {"status": "started", "n_agents_running": n_active}
 
@@ -1278,6 +1898,7 @@ def stop_autonomous(market_id: int) -> Dict[str, Any]:
     except ValueError as e:
         _http_from_value(e)
 
+    _publish_status(svc, market_id)
     n = len(svc.get_trades(market_id=market_id, limit=100_000))
     return {
         "status": "stopped",
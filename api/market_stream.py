@@ -0,0 +1,190 @@
+"""
+In-process push channel for market updates.
+
+Route handlers publish an event after the write it describes has committed;
+:class:`MarketEventBus` serializes it to JSON once and fans that text out to
+every subscriber of the market (``GET /market/{id}/stream`` as Server-Sent
+Events, ``/market/{id}/ws`` as a WebSocket).
+
+Each subscriber owns a bounded queue.  A consumer that falls ``max_queue``
+events behind is dropped -- its backlog is discarded, it receives one final
+``dropped`` event and is disconnected -- so a stalled browser tab can neither
+grow server memory nor slow the publishers down.  Clients resync over the
+REST endpoints after reconnecting.
+
+Event payload (JSON)::
+
+    {"seq": 17, "type": "trade", "market_id": 3, "data": {...}}
+
+``seq`` increases by one per market.  ``type`` is one of ``trade``, ``quote``,
+``mean_belief``, ``comment``, ``news`` or ``status``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, NamedTuple, Optional, Set
+
+DEFAULT_MAX_QUEUE = 256
+
+
+class MarketEvent(NamedTuple):
+    seq: Optional[int]
+    type: str
+    text: str
+
+    def sse(self) -> str:
+        """Frame as one Server-Sent Events message."""
+        head = f"id: {self.seq}\n" if self.seq is not None else ""
+        return f"{head}event: {self.type}\ndata: {self.text}\n\n"
+
+
+def _encode(seq: Optional[int], kind: str, market_id: int, data: Any) -> MarketEvent:
+    text = json.dumps(
+        {"seq": seq, "type": kind, "market_id": int(market_id), "data": data},
+        separators=(",", ":"),
+    )
+    return MarketEvent(seq, kind, text)
+
+
+class Subscription:
+    """One consumer's bounded queue; filled from any thread, drained on its event loop."""
+
+    def __init__(self, market_id: int, max_queue: int, loop: asyncio.AbstractEventLoop):
+        self.market_id = int(market_id)
+        self.max_queue = max_queue
+        self.dropped = False
+        self.closed = False
+        self._loop = loop
+        self._items: Deque[MarketEvent] = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self._wake_pending = False
+
+    def _offer(self, event: MarketEvent) -> bool:
+        """Queue *event*; ``False`` when the subscriber was too far behind and is dropped."""
+        with self._lock:
+            if self.closed:
+                return True
+            if len(self._items) >= self.max_queue:
+                self._items.clear()
+                self.dropped = self.closed = True
+                accepted = False
+            else:
+                self._items.append(event)
+                accepted = True
+            wake = not self._wake_pending
+            self._wake_pending = True
+        if wake:
+            self._wake()
+        return accepted
+
+    def _close(self) -> None:
+        with self._lock:
+            self.closed = True
+            self._wake_pending = True
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The consumer's loop is gone; nothing is waiting.
+            pass
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[MarketEvent]:
+        """Next event, or ``None`` on timeout and once the subscription is closed."""
+        while True:
+            with self._lock:
+                if self._items:
+                    return self._items.popleft()
+                if self.closed:
+                    return None
+                self._wake_pending = False
+                self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    def dropped_event(self) -> MarketEvent:
+        return _encode(
+            None, "dropped", self.market_id,
+            {"reason": "slow consumer", "max_queue": self.max_queue},
+        )
+
+
+class MarketEventBus:
+    """Per-market fan-out of committed updates to push subscribers."""
+
+    def __init__(self, max_queue: int = DEFAULT_MAX_QUEUE):
+        if max_queue < 1:
+            raise ValueError("max_queue must be >= 1")
+        self.max_queue = max_queue
+        self.dropped_total = 0
+        self._lock = threading.Lock()
+        self._subs: Dict[int, Set[Subscription]] = {}
+        self._seq: Dict[int, int] = {}
+
+    def subscribe(self, market_id: int) -> Subscription:
+        """Register a consumer on the running event loop."""
+        sub = Subscription(market_id, self.max_queue, asyncio.get_running_loop())
+        with self._lock:
+            self._subs.setdefault(int(market_id), set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.market_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.market_id]
+
+    def has_subscribers(self, market_id: int) -> bool:
+        """Cheap check so publishers can skip building payloads nobody reads."""
+        return bool(self._subs.get(int(market_id)))
+
+    def subscriber_count(self, market_id: Optional[int] = None) -> int:
+        with self._lock:
+            if market_id is not None:
+                return len(self._subs.get(int(market_id), ()))
+            return sum(len(s) for s in self._subs.values())
+
+    def publish(self, market_id: int, kind: str, data: Any) -> int:
+        """Fan one event out; returns how many subscribers received it."""
+        mid = int(market_id)
+        with self._lock:
+            subs = self._subs.get(mid)
+            if not subs:
+                return 0
+            seq = self._seq.get(mid, 0) + 1
+            self._seq[mid] = seq
+            targets = list(subs)
+        event = _encode(seq, kind, mid, data)
+        delivered = 0
+        for sub in targets:
+            if sub._offer(event):
+                delivered += 1
+            else:
+                self.unsubscribe(sub)
+                with self._lock:
+                    self.dropped_total += 1
+        return delivered
+
+    def close_market(self, market_id: int) -> None:
+        """Disconnect every subscriber of *market_id* (e.g. the market was deleted)."""
+        with self._lock:
+            subs = self._subs.pop(int(market_id), set())
+            self._seq.pop(int(market_id), None)
+        for sub in subs:
+            sub._close()
+
+    def close(self) -> None:
+        with self._lock:
+            mids = list(self._subs)
+        for mid in mids:
+            self.close_market(mid)
@@ -0,0 +1,161 @@
+"""
+Response encoding for the simulation API.
+
+:func:`render_json` encodes engine payloads -- plain containers holding NumPy
+scalars and arrays -- in a single pass: with ``orjson`` when it is installed
+(``OPT_SERIALIZE_NUMPY``), otherwise with the stdlib C encoder plus a
+``default`` hook that only runs for the few values it cannot encode itself.
+Both replace the old recursive ``_jsonable`` walk over every value.
+
+:func:`json_response` returns the bytes as a pre-rendered ``Response`` (so
+FastAPI does not walk the payload again) and compresses bodies of at least
+``COMPRESS_MIN_BYTES`` when the client accepts it: ``br`` if the optional
+``brotli`` package is installed, else ``gzip``.  :class:`StreamCompressor`
+does the same for streamed NDJSON, one flushed block per line.
+
+Optional: ``pip install orjson brotli``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+import numpy as np
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Smaller bodies go out as-is; compressing them costs more than it saves.
+COMPRESS_MIN_BYTES = 4096
+
+_ORJSON_OPTS = (
+    (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, "item") and callable(obj.item):
+        try:
+            return obj.item()
+        except Exception:
+            pass
+    return str(obj)
+
+
+def render_json(obj: Any) -> bytes:
+    """Compact UTF-8 JSON for *obj*; NumPy values are encoded as plain numbers/lists."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTS)
+    return json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _accepted_codings(header: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            out[coding.strip().lower()] = q
+    return out
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick ``br`` or ``gzip`` from an ``Accept-Encoding`` header (``None``: send identity)."""
+    accepted = _accepted_codings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, wildcard) > 0.0:
+            return coding
+    return None
+
+
+def json_response(
+    payload: Any,
+    request: Optional[Request] = None,
+    *,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Pre-rendered JSON response, compressed when *request* allows and the body is large."""
+    return json_bytes_response(
+        render_json(payload), request, status_code=status_code, headers=headers,
+    )
+
+
+def json_bytes_response(
+    body: bytes,
+    request: Optional[Request] = None,
+    *,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Like :func:`json_response` for a body that is already encoded."""
+    out_headers = dict(headers or {})
+    if request is not None and len(body) >= COMPRESS_MIN_BYTES:
+        out_headers["Vary"] = "Accept-Encoding"
+        coding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if coding == "br":
+            body = brotli.compress(body, quality=4)
+        elif coding == "gzip":
+            body = gzip.compress(body, compresslevel=5)
+        if coding is not None:
+            out_headers["Content-Encoding"] = coding
+    return Response(
+        content=body, status_code=status_code, media_type="application/json", headers=out_headers,
+    )
+
+
+class StreamCompressor:
+    """Incremental ``gzip``/``br`` encoder; each chunk it returns decodes on arrival."""
+
+    def __init__(self, coding: str):
+        if coding == "br" and brotli is None:
+            raise ValueError("br needs the brotli package")
+        if coding not in ("br", "gzip"):
+            raise ValueError(f"unsupported coding {coding!r}")
+        self.coding = coding
+        if coding == "br":
+            self._c = brotli.Compressor(quality=4)
+        else:
+            self._c = zlib.compressobj(5, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress *data* and flush, so the client is not left waiting on a partial block."""
+        if self.coding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """End of stream (trailer bytes)."""
+        if self.coding == "br":
+            return self._c.finish()
+        return self._c.flush()
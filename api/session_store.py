@@ -0,0 +1,397 @@
+"""
+Bounded store for interactive ``/api/session/*`` engines.
+
+Each session keeps a live :class:`SimulationEngine`; abandoned browser tabs
+used to keep theirs until the process restarted.  :class:`SessionStore`
+holds sessions in least-recently-used order with an approximate size each
+(from the ``sizeof`` callback, re-measured after every use) and evicts:
+
+* sessions idle longer than ``ttl_s``;
+* the least recently used ones while the total exceeds ``max_bytes``.
+
+Sessions inside :meth:`SessionStore.use` are pinned and never evicted
+mid-request, so memory is bounded by ``max_bytes`` plus the sessions being
+served at that moment.
+
+With a ``spill_dir``, evicted sessions are pickled to
+``<spill_dir>/<session_id>.pkl`` instead of dropped and loaded back on the
+next access; spilled files idle longer than ``spill_ttl_s`` are deleted.
+The directory is looked up by session id, so a spilled session is also
+found after a restart.  It must be private to the server: files are
+unpickled.  Pickling and unpickling happen outside the store-wide lock (a
+per-session I/O lock orders them), so a spill or restore only delays
+requests for that one session.
+
+``shared=True`` (several worker processes on one ``spill_dir``) makes the
+directory the source of truth: every session is written through to its file
+when a request finishes with it, a copy in memory is used only while its
+file is unchanged, and requests for one session are serialized across
+processes with a lock file (``fcntl``; without it, per process only).
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_S = 30 * 60.0
+DEFAULT_SPILL_TTL_S = 24 * 3600.0
+
+# Spill files are swept at most this often (a directory scan).
+_SPILL_SWEEP_S = 60.0
+# Session ids hash onto this many spill/restore locks.
+_IO_LOCKS = 64
+_SESSION_ID = re.compile(r"^[0-9a-fA-F-]{1,64}$")
+
+
+class SessionNotFound(KeyError):
+    """Unknown session id, or the session expired."""
+
+
+class _Entry:
+    __slots__ = ("data", "size", "last_used", "pins", "stamp")
+
+    def __init__(self, data: Any, size: int, now: float):
+        self.data = data
+        self.size = size
+        self.last_used = now
+        self.pins = 0
+        # Shared mode: (inode, mtime) of the spill file this copy matches.
+        self.stamp: Optional[Tuple[int, int]] = None
+
+
+class SessionStore:
+    """Sessions under a memory budget: TTL and LRU eviction, optional spill to disk."""
+
+    def __init__(
+        self,
+        sizeof: Callable[[Any], int],
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_s: float = DEFAULT_TTL_S,
+        spill_dir: Optional[str] = None,
+        spill_ttl_s: float = DEFAULT_SPILL_TTL_S,
+        shared: bool = False,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        if ttl_s <= 0 or spill_ttl_s <= 0:
+            raise ValueError("ttl_s and spill_ttl_s must be > 0")
+        if shared and not spill_dir:
+            raise ValueError("shared sessions need a spill_dir")
+        self.sizeof = sizeof
+        self.max_bytes = int(max_bytes)
+        self.ttl_s = float(ttl_s)
+        self.spill_dir = spill_dir
+        self.spill_ttl_s = float(spill_ttl_s)
+        self.shared = shared
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._io_locks = [threading.Lock() for _ in range(_IO_LOCKS)]
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Evicted, not yet written to their spill file.
+        self._spilling: Dict[str, _Entry] = {}
+        self._bytes = 0
+        self._last_spill_sweep = 0.0
+        self.evicted = 0
+        self.spilled = 0
+        self.restored = 0
+
+    # ── Access ────────────────────────────────────────────────────────
+
+    def put(self, session_id: str, data: Any) -> None:
+        """Add a new session (the most recently used)."""
+        now = time.monotonic()
+        entry = _Entry(data, int(self.sizeof(data)), now)
+        if self.shared:
+            with self._file_lock(session_id):
+                self._write_through(session_id, entry)
+        with self._io_lock(session_id), self._lock:
+            old = self._entries.pop(session_id, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._spilling.pop(session_id, None)
+            self._entries[session_id] = entry
+            self._bytes += entry.size
+            victims = self._enforce(now)
+        self._spill(victims)
+
+    @contextmanager
+    def use(self, session_id: str) -> Iterator[Any]:
+        """
+        Pin a session for the duration of a request (:class:`SessionNotFound` if unknown or expired).
+
+        A spilled session is loaded back first.  On exit its size is
+        re-measured and the budget enforced (and, shared, the file rewritten).
+        """
+        with self._file_lock(session_id):
+            now = time.monotonic()
+            stamp = self._spill_stamp(session_id) if self.shared else None
+            with self._lock:
+                victims = self._expire(now)
+                entry = self._entries.get(session_id)
+                if entry is not None and self.shared and entry.stamp != stamp:
+                    # Another worker changed or discarded it since.
+                    self._drop(session_id)
+                    entry = None
+                if entry is not None:
+                    self._pin(session_id, entry, now)
+            self._spill(victims)
+            if entry is None:
+                entry = self._restore(session_id, now)
+            try:
+                yield entry.data
+            finally:
+                size = int(self.sizeof(entry.data))
+                now = time.monotonic()
+                with self._lock:
+                    entry.pins -= 1
+                    entry.last_used = now
+                    current = self._entries.get(session_id) is entry
+                    if current:
+                        self._entries.move_to_end(session_id)
+                        self._bytes += size - entry.size
+                        entry.size = size
+                if current and self.shared:
+                    self._write_through(session_id, entry)
+                with self._lock:
+                    victims = self._enforce(now)
+                self._spill(victims)
+
+    def discard(self, session_id: str) -> bool:
+        """Forget a session wherever it is; ``True`` if it existed."""
+        with self._file_lock(session_id):
+            with self._io_lock(session_id):
+                with self._lock:
+                    entry = self._entries.pop(session_id, None)
+                    if entry is not None:
+                        self._bytes -= entry.size
+                    pending = self._spilling.pop(session_id, None)
+                removed = self._remove_spill(session_id)
+            if self.shared:
+                self._remove_lock_file(session_id)
+        return entry is not None or pending is not None or removed
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self._entries or session_id in self._spilling:
+                return True
+        path = self._spill_path(session_id)
+        return path is not None and os.path.exists(path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evicted": self.evicted,
+                "spilled": self.spilled,
+                "restored": self.restored,
+            }
+
+    def clear(self) -> None:
+        """Drop every in-memory session (spill files are left in place)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ── Eviction (callers hold ``_lock``) ─────────────────────────────
+    #
+    # These only pick and detach victims; the caller passes the returned
+    # ``(session_id, entry)`` pairs to :meth:`_spill` once it lets go of the lock.
+
+    def _expire(self, now: float) -> List[Tuple[str, _Entry]]:
+        expired: List[str] = []
+        for sid, e in self._entries.items():
+            if e.pins:
+                continue
+            if now - e.last_used <= self.ttl_s:
+                # Entries are in last-use order; the rest are newer.
+                break
+            expired.append(sid)
+        return [v for v in map(self._evict, expired) if v is not None]
+
+    def _enforce(self, now: float) -> List[Tuple[str, _Entry]]:
+        spills = self._expire(now)
+        if self._bytes <= self.max_bytes:
+            return spills
+        victims: List[str] = []
+        excess = self._bytes - self.max_bytes
+        for sid, e in self._entries.items():
+            if excess <= 0:
+                break
+            if e.pins == 0:
+                victims.append(sid)
+                excess -= e.size
+        return spills + [v for v in map(self._evict, victims) if v is not None]
+
+    def _pin(self, session_id: str, entry: _Entry, now: float) -> None:
+        self._entries.move_to_end(session_id)
+        entry.pins += 1
+        entry.last_used = now
+
+    def _drop(self, session_id: str) -> _Entry:
+        entry = self._entries.pop(session_id)
+        self._bytes -= entry.size
+        return entry
+
+    def _evict(self, session_id: str) -> Optional[Tuple[str, _Entry]]:
+        entry = self._drop(session_id)
+        self.evicted += 1
+        if self.shared or self._spill_path(session_id) is None:
+            # Shared: its file is already current.
+            return None
+        self._spilling[session_id] = entry
+        return session_id, entry
+
+    # ── Spill I/O (callers do not hold ``_lock``) ─────────────────────
+
+    def _io_lock(self, session_id: str) -> threading.Lock:
+        return self._io_locks[hash(session_id) % _IO_LOCKS]
+
+    def _spill(self, victims: List[Tuple[str, _Entry]]) -> None:
+        """Write evicted sessions to their files, then sweep old files when due."""
+        for sid, entry in victims:
+            with self._io_lock(sid):
+                with self._lock:
+                    if self._spilling.get(sid) is not entry:
+                        # Put back, replaced or discarded before its turn.
+                        continue
+                written = False
+                try:
+                    self._dump(self._spill_path(sid), entry.data)
+                    written = True
+                finally:
+                    with self._lock:
+                        del self._spilling[sid]
+                        self.spilled += written
+        if not self.spill_dir:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_spill_sweep < _SPILL_SWEEP_S:
+                return
+            self._last_spill_sweep = now
+        self._sweep_spill()
+
+    @staticmethod
+    def _dump(path: str, data: Any) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _restore(self, session_id: str, now: float) -> _Entry:
+        """Pin *session_id* back in memory from its pending spill or its file."""
+        path = self._spill_path(session_id)
+        if path is None:
+            raise SessionNotFound(session_id)
+        with self._io_lock(session_id):
+            with self._lock:
+                # Another request may have brought it back while we waited.
+                entry = self._entries.get(session_id)
+                if entry is None:
+                    entry = self._spilling.pop(session_id, None)
+                    if entry is not None:
+                        self._entries[session_id] = entry
+                        self._bytes += entry.size
+                if entry is not None:
+                    self._pin(session_id, entry, now)
+                    return entry
+            try:
+                with open(path, "rb") as f:
+                    data = pickle.load(f)
+            except FileNotFoundError:
+                raise SessionNotFound(session_id) from None
+            entry = _Entry(data, int(self.sizeof(data)), now)
+            if self.shared:
+                entry.stamp = self._spill_stamp(session_id)
+            else:
+                os.remove(path)
+            with self._lock:
+                self._entries[session_id] = entry
+                self._bytes += entry.size
+                self.restored += 1
+                self._pin(session_id, entry, now)
+        return entry
+
+    def _spill_path(self, session_id: str) -> Optional[str]:
+        if not self.spill_dir or not _SESSION_ID.match(session_id):
+            return None
+        return os.path.join(self.spill_dir, f"{session_id}.pkl")
+
+    def _spill_stamp(self, session_id: str) -> Optional[Tuple[int, int]]:
+        path = self._spill_path(session_id)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _write_through(self, session_id: str, entry: _Entry) -> None:
+        path = self._spill_path(session_id)
+        if path is None:
+            raise ValueError(f"invalid session id for shared storage: {session_id!r}")
+        self._dump(path, entry.data)
+        entry.stamp = self._spill_stamp(session_id)
+
+    @contextmanager
+    def _file_lock(self, session_id: str) -> Iterator[None]:
+        """Hold the session's lock file (shared mode with ``fcntl`` only)."""
+        path = self._spill_path(session_id) if self.shared and fcntl is not None else None
+        if path is None:
+            yield
+            return
+        with open(f"{path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _remove_lock_file(self, session_id: str) -> None:
+        path = self._spill_path(session_id)
+        if path is not None:
+            try:
+                os.remove(f"{path}.lock")
+            except FileNotFoundError:
+                pass
+
+    def _remove_spill(self, session_id: str) -> bool:
+        path = self._spill_path(session_id)
+        if path is None:
+            return False
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _sweep_spill(self) -> None:
+        cutoff = time.time() - self.spill_ttl_s
+        for entry in os.scandir(self.spill_dir):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            if self.shared:
+                self._remove_lock_file(entry.name[:-4])
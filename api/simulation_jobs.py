@@ -0,0 +1,326 @@
+"""
+Background simulation jobs behind ``/api/simulate/jobs``.
+
+``POST /api/simulate`` runs every round inside the request worker, holding the
+GIL the persistent-market endpoints share.  :class:`SimulationJobQueue` runs
+the same work in a bounded :class:`~concurrent.futures.ProcessPoolExecutor`
+instead:
+
+* **Admission control** -- at most ``max_workers`` jobs run and
+  ``max_pending`` more wait; :meth:`SimulationJobQueue.submit` raises
+  :class:`JobQueueFull` beyond that rather than letting the backlog grow.
+* **Progress and cancellation** -- workers report rounds done through a
+  :mod:`multiprocessing` manager at most every ``_REPORT_INTERVAL_S``; the
+  same call raises :class:`JobCancelled` in the worker once a cancel was
+  requested.  Jobs still waiting are cancelled without ever starting.
+* **Result retention** -- the worker returns the encoded JSON body, so the
+  server process never re-encodes it.  Finished jobs are kept in LRU order
+  and the least recently read is evicted past ``max_results``.
+
+Workers are started with ``spawn`` (the server process has threads, which
+``fork`` does not copy safely) and lower their own scheduling priority by
+``nice`` so request handling wins when cores are contended.
+
+The job function must be a module-level callable ``fn(config, report)``
+returning ``bytes``; ``report(rounds_done)`` is the progress hook.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Set
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 8
+DEFAULT_MAX_RESULTS = 32
+DEFAULT_NICE = 5
+
+# Workers touch the manager (one IPC round trip) at most this often.
+_REPORT_INTERVAL_S = 0.1
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+JobFn = Callable[[Dict[str, Any], Callable[[int], None]], bytes]
+
+
+class JobQueueFull(RuntimeError):
+    """Every worker is busy and the pending queue is at its limit."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled while running."""
+
+
+class _Reporter:
+    """Progress hook handed to job functions in the worker process."""
+
+    def __init__(self, job_id: str, progress: Any, cancelled: Any):
+        self.job_id = job_id
+        self._progress = progress
+        self._cancelled = cancelled
+        self._last = 0.0
+
+    def __call__(self, rounds_done: int, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last < _REPORT_INTERVAL_S:
+            return
+        self._last = now
+        self._progress[self.job_id] = int(rounds_done)
+        if self.job_id in self._cancelled:
+            raise JobCancelled(self.job_id)
+
+
+def _init_worker(nice: int) -> None:
+    if nice and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+
+def _run_job(fn: JobFn, job_id: str, config: Dict[str, Any], progress: Any, cancelled: Any) -> bytes:
+    report = _Reporter(job_id, progress, cancelled)
+    report(0, force=True)
+    return fn(config, report)
+
+
+class SimulationJob:
+    """One submitted job; mutated only under the queue's lock."""
+
+    __slots__ = ("id", "n_rounds", "status", "rounds_done", "error", "body",
+                 "submitted_at", "started_at", "finished_at", "cancel_requested", "future")
+
+    def __init__(self, job_id: str, n_rounds: int):
+        self.id = job_id
+        self.n_rounds = int(n_rounds)
+        self.status = QUEUED
+        self.rounds_done = 0
+        self.error: Optional[str] = None
+        self.body: Optional[bytes] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self.future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+
+class SimulationJobQueue:
+    """Bounded process pool for simulation runs, with progress, cancellation and an LRU of results."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        *,
+        nice: int = DEFAULT_NICE,
+        start_method: str = "spawn",
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if max_pending < 0:
+            raise ValueError("max_pending must be >= 0")
+        if max_results < 1:
+            raise ValueError("max_results must be >= 1")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_results = max_results
+        self.nice = nice
+        self._ctx = multiprocessing.get_context(start_method)
+        # Re-entrant: cancelling a future runs its done callback in the caller.
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._jobs: Dict[str, SimulationJob] = {}
+        self._active: Set[str] = set()
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Any = None
+        self._progress: Any = None
+        self._cancelled: Any = None
+
+    # ── Submitting ────────────────────────────────────────────────────
+
+    def submit(self, fn: JobFn, config: Dict[str, Any], *, n_rounds: int) -> SimulationJob:
+        """Queue ``fn(config, report)``; raises :class:`JobQueueFull` when over capacity."""
+        with self._lock:
+            if len(self._active) >= self.max_workers + self.max_pending:
+                raise JobQueueFull(
+                    f"{len(self._active)} simulation jobs queued or running "
+                    f"(limit {self.max_workers + self.max_pending})"
+                )
+            job = SimulationJob(uuid.uuid4().hex, n_rounds)
+            self._jobs[job.id] = job
+            self._active.add(job.id)
+            try:
+                job.future = self._submit(fn, job.id, config)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool once.
+                self._shutdown_pool(wait=False)
+                job.future = self._submit(fn, job.id, config)
+            except Exception:
+                self._active.discard(job.id)
+                del self._jobs[job.id]
+                raise
+        job.future.add_done_callback(lambda fut, job=job: self._complete(job, fut))
+        return job
+
+    def _submit(self, fn: JobFn, job_id: str, config: Dict[str, Any]) -> Future:
+        if self._executor is None:
+            if self._manager is None:
+                self._manager = self._ctx.Manager()
+                self._progress = self._manager.dict()
+                self._cancelled = self._manager.dict()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._ctx,
+                initializer=_init_worker,
+                initargs=(self.nice,),
+            )
+        return self._executor.submit(_run_job, fn, job_id, config, self._progress, self._cancelled)
+
+    def _complete(self, job: SimulationJob, fut: Future) -> None:
+        status, body, error = DONE, None, None
+        try:
+            body = fut.result()
+        except (CancelledError, JobCancelled):
+            status = CANCELLED
+        except BaseException as e:  # noqa: BLE001 -- reported to the client, not raised
+            status, error = FAILED, f"{type(e).__name__}: {e}"
+        self._forget_shared(job.id)
+        with self._lock:
+            job.status = status
+            job.body = body
+            job.error = error
+            job.finished_at = time.time()
+            if status == DONE:
+                job.rounds_done = job.n_rounds
+            self._active.discard(job.id)
+            if job.id in self._jobs:
+                self._finished[job.id] = None
+                while len(self._finished) > self.max_results:
+                    old, _ = self._finished.popitem(last=False)
+                    self._jobs.pop(old, None)
+            self._changed.notify_all()
+
+    def _forget_shared(self, job_id: str) -> None:
+        try:
+            if self._progress is not None:
+                self._progress.pop(job_id, None)
+                self._cancelled.pop(job_id, None)
+        except (OSError, EOFError, BrokenPipeError):
+            # The manager is already gone (shutting down).
+            pass
+
+    # ── Reading ───────────────────────────────────────────────────────
+
+    def get(self, job_id: str) -> Optional[SimulationJob]:
+        """The job with current progress, or ``None`` if unknown or evicted."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.id in self._finished:
+                self._finished.move_to_end(job.id)
+                return job
+        self._poll(job)
+        return job
+
+    def _poll(self, job: SimulationJob) -> None:
+        try:
+            done = self._progress.get(job.id) if self._progress is not None else None
+        except (OSError, EOFError, BrokenPipeError):
+            done = None
+        if done is None:
+            return
+        with self._lock:
+            if job.status == QUEUED:
+                job.status = RUNNING
+                job.started_at = time.time()
+            if job.status == RUNNING:
+                job.rounds_done = max(job.rounds_done, int(done))
+
+    def wait(self, job: SimulationJob, timeout: Optional[float] = None) -> bool:
+        """Block until *job* finishes or *timeout* passes; ``True`` once finished."""
+        if job.future is not None:
+            wait_futures([job.future], timeout=timeout)
+        with self._lock:
+            if not job.finished and job.future is not None and job.future.done():
+                # The done callback runs right after the future resolves.
+                self._changed.wait_for(lambda: job.finished, timeout=1.0)
+            return job.finished
+
+    def describe(self, job: SimulationJob) -> Dict[str, Any]:
+        """Status payload for ``GET /api/simulate/jobs/{id}``."""
+        with self._lock:
+            return {
+                "job_id": job.id,
+                "status": job.status,
+                "rounds_done": job.rounds_done,
+                "n_rounds": job.n_rounds,
+                "progress": job.rounds_done / job.n_rounds if job.n_rounds else 1.0,
+                "cancel_requested": job.cancel_requested,
+                "error": job.error,
+                "submitted_at": job.submitted_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "active": len(self._active),
+                "retained": len(self._finished),
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "max_results": self.max_results,
+            }
+
+    # ── Cancelling / shutdown ─────────────────────────────────────────
+
+    def cancel(self, job_id: str) -> Optional[SimulationJob]:
+        """Cancel a queued job at once, or ask a running one to stop at its next report."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        with self._lock:
+            job.cancel_requested = True
+        if job.future is not None and job.future.cancel():
+            return job
+        try:
+            self._cancelled[job.id] = True
+        except (OSError, EOFError, BrokenPipeError):
+            pass
+        return job
+
+    def _shutdown_pool(self, *, wait: bool) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def shutdown(self) -> None:
+        """Cancel everything and stop the workers (running jobs are asked to stop first)."""
+        with self._lock:
+            active = list(self._active)
+        for job_id in active:
+            self.cancel(job_id)
+        self._shutdown_pool(wait=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = self._progress = self._cancelled = None
@@ -0,0 +1,149 @@
+"""
+Hot snapshot replica of the market database for analytics reads.
+
+Heavy reports (cross-market agent histories, ``list_markets_for_agent``)
+should not share the live file's page cache and locks with the trading path.
+:class:`SnapshotReplica` copies the primary into a separate replica file with
+SQLite's online backup API -- readers and writers on the primary keep going
+while the copy runs -- and serves the copy through a separate
+:class:`MarketService` that only analytics reads use.
+
+The replica is in WAL mode, so a refresh is just another writer there and
+analytics readers keep their current snapshot until it commits.  Each refresh
+stamps ``replica_meta.snapshot_us``; :meth:`SnapshotReplica.service` refreshes
+first whenever the copy is older than ``max_age_s`` (the freshness bound), and
+:meth:`SnapshotReplica.start` additionally refreshes every ``interval_s`` in a
+daemon thread so requests rarely pay for the copy.
+
+Usage:
+    replica = SnapshotReplica(svc, "data/analytics.sqlite", max_age_s=30.0)
+    replica.start(interval_s=10.0)
+    rows = replica.service().list_markets_for_agent(agent_id)
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Optional
+
+from market_service import MarketService
+from market_store import now_us
+
+_REPLICA_META = """\
+CREATE TABLE IF NOT EXISTS replica_meta (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    snapshot_us INTEGER NOT NULL
+);
+"""
+
+
+class SnapshotReplica:
+    """Periodically refreshed backup copy of a :class:`MarketService` database."""
+
+    def __init__(
+        self,
+        primary: MarketService,
+        replica_path: str,
+        *,
+        max_age_s: float = 30.0,
+        archive_dir: Optional[str] = None,
+        read_pool_size: int = 4,
+    ):
+        if max_age_s < 0:
+            raise ValueError("max_age_s must be >= 0")
+        self._primary = primary
+        self.replica_path = replica_path
+        self.max_age_s = float(max_age_s)
+        self._archive_dir = archive_dir
+        self._read_pool_size = read_pool_size
+        self._lock = threading.Lock()
+        self._dst: Optional[sqlite3.Connection] = None
+        self._service: Optional[MarketService] = None
+        self._snapshot_us: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ── Refreshing ────────────────────────────────────────────────────
+
+    def refresh(self) -> int:
+        """Copy the primary into the replica now; returns the snapshot time (epoch us)."""
+        with self._lock:
+            if self._dst is None:
+                self._dst = sqlite3.connect(self.replica_path, check_same_thread=False)
+                self._dst.isolation_level = None
+                self._dst.execute("PRAGMA busy_timeout=5000")
+            taken_us = now_us()
+            src = self._primary._backend.connect_readonly()
+            try:
+                # One step: the source read snapshot is consistent and, in WAL
+                # mode, never blocks the primary's writers.
+                src.backup(self._dst)
+            finally:
+                src.close()
+            # The copied header carries the primary's journal mode.
+            self._dst.execute("PRAGMA journal_mode=WAL")
+            self._dst.executescript(_REPLICA_META)
+            self._dst.execute(
+                "INSERT OR REPLACE INTO replica_meta (id, snapshot_us) VALUES (1, ?)",
+                (taken_us,),
+            )
+            self._snapshot_us = taken_us
+            if self._service is None:
+                self._service = MarketService(
+                    self.replica_path, archive_dir=self._archive_dir,
+                    read_pool_size=self._read_pool_size,
+                )
+            return taken_us
+
+    def age_s(self) -> Optional[float]:
+        """Seconds since the last snapshot (``None`` before the first one)."""
+        if self._snapshot_us is None:
+            return None
+        return max(0.0, (now_us() - self._snapshot_us) / 1e6)
+
+    def ensure_fresh(self, max_age_s: Optional[float] = None) -> None:
+        """Refresh when the copy is missing or older than the freshness bound."""
+        bound = self.max_age_s if max_age_s is None else float(max_age_s)
+        age = self.age_s()
+        if age is None or age > bound:
+            self.refresh()
+
+    def service(self, max_age_s: Optional[float] = None) -> MarketService:
+        """Analytics service over a copy no older than the bound (reads only)."""
+        self.ensure_fresh(max_age_s)
+        assert self._service is not None
+        return self._service
+
+    # ── Background refresher ──────────────────────────────────────────
+
+    def start(self, interval_s: Optional[float] = None) -> None:
+        """Refresh every *interval_s* (default: half the freshness bound) in a daemon thread."""
+        if self._thread is not None:
+            return
+        interval = interval_s if interval_s is not None else max(self.max_age_s / 2.0, 0.5)
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except sqlite3.Error:
+                    # Transient (e.g. busy primary); the next tick or request retries.
+                    continue
+
+        self._thread = threading.Thread(target=_loop, name="snapshot-replica", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._service is not None:
+                self._service.close()
+                self._service = None
+            if self._dst is not None:
+                self._dst.close()
+                self._dst = None
@@ -2,10 +2,17 @@
 Thread-safe market service with transactional trade execution for LMSR and CDA.
 
 Depends on MarketStore for persistence and row conversion, LMSRMarketMaker
-(team_a) for LMSR cost-function math, and ContinuousDoubleAuction (team_b)
+and its scalar helpers (team_a) for LMSR cost-function math, and
+ContinuousDoubleAuction (team_b)
 for CDA order matching.  Does not re-implement either pricing or matching
 logic.
 
+Storage is pluggable (see ``storage_backend``): a file path uses SQLite in WAL
+mode, ``":memory:"`` a shared in-process database with the same semantics.
+Writes go through per-thread connections; reads borrow a store from a bounded
+pool of read-only connections, so GET traffic never queues behind a writer's
+``BEGIN IMMEDIATE``.
+
 Usage:
     svc = MarketService("markets.db")
     mkt   = svc.create_market("btc-100k", "BTC > $100k?", mechanism="lmsr", b=200.0)
@@ -19,11 +26,12 @@ from __future__ import annotations
 import sqlite3
 import sys
 import threading
+import uuid
 from collections import defaultdict, deque
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
 
 import numpy as np
 
@@ -31,12 +39,45 @@ _SRC = Path(__file__).resolve().parent.parent / "src"
 if str(_SRC) not in sys.path:
     sys.path.insert(0, str(_SRC))
 
-from team_a_market_logic import LMSRMarketMaker
+from team_a_market_logic import LMSRMarketMaker, lmsr_price, lmsr_trade_cost
 from team_b_market_logic import ContinuousDoubleAuction, Trade
 
-from market_store import MarketStore, _SCHEMA, _TRADEABLE_STATUSES
+from market_store import MarketStore, _SCHEMA, _TRADEABLE_STATUSES, now_us, us_to_iso
+from storage_backend import ReadPool, StorageBackend, open_backend
+from trade_archive import TradeArchive
+
+# The LMSR trade path's single read: market, agent, whether the position row
+# exists yet and the market's belief running sums.
+_LMSR_TRADE_READ = """
+SELECT m.id, m.status, m.mechanism, m.b, m.inv_yes, m.inv_no, m.ground_truth,
+       a.id AS agent_id, a.cash, a.belief AS agent_belief,
+       EXISTS (
+           SELECT 1 FROM positions p WHERE p.agent_id = ? AND p.market_id = m.id
+       ) AS has_position,
+       s.belief_sum, s.belief_count
+FROM markets m
+LEFT JOIN agents a ON a.id = ? AND a.deleted_at IS NULL
+LEFT JOIN market_belief_stats s ON s.market_id = m.id
+WHERE m.id = ?
+"""
+
+# Columns ``agent_leaderboard`` can rank by (all summed over agent_market_stats).
+LEADERBOARD_METRICS = ("cash_flow", "volume", "trade_count")
+
 
-_BUSY_TIMEOUT_MS = 5000
+def decision_context_row(
+    snapshot: Dict[str, Any], agent: Dict[str, Any], position: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Merge a price snapshot, an agent row and its position into one decision context."""
+    return {
+        **snapshot,
+        "agent_id": int(agent["id"]),
+        "cash": float(agent["cash"]),
+        "shares": float(position.get("yes_shares") or 0.0),
+        "belief": position.get("belief"),
+        "rho": agent.get("rho"),
+        "personality": agent.get("personality"),
+    }
 
 
 class MarketService:
@@ -44,33 +85,66 @@ class MarketService:
 
     Creates per-thread connections and per-thread ``MarketStore`` instances
     (with ``_external_transactions=True``) so that all write operations are
-    serialized via ``BEGIN IMMEDIATE``.
+    serialized via ``BEGIN IMMEDIATE``.  Read-only methods use at most
+    *read_pool_size* pooled read-only connections instead.
+
+    *profile* names a ``storage_backend.TUNING_PROFILES`` entry for file
+    databases (default ``"durable"``).
+
+    Every committed write bumps an in-memory version (:meth:`market_version`)
+    for the market it touched, or for all markets when it changed agents, so
+    HTTP handlers can answer conditional GETs without reading the database.
+    Agent cash is shared by every market, so writes that move it also bump the
+    agents' own versions (:meth:`agent_version`).
+    Versions are per instance; :attr:`instance_id` tells instances apart.
     """
 
-    def __init__(self, db_path: str):
-        if db_path == ":memory:":
-            raise ValueError(
-                "In-memory databases cannot be shared across threads. "
-                "Use a file path or 'file::memory:?cache=shared' with uri=True."
-            )
-        self._db_path = db_path
-        self._uri = db_path.startswith("file:")
+    def __init__(
+        self,
+        db_path: Union[str, StorageBackend],
+        *,
+        archive_dir: Optional[str] = None,
+        profile: Optional[str] = None,
+        read_pool_size: int = 8,
+    ):
+        self._backend = open_backend(db_path, profile=profile)
+        self._db_path = self._backend.db_path
         self._local = threading.local()
+        self._writers_lock = threading.Lock()
+        self._writers: List[sqlite3.Connection] = []
+        self.instance_id = uuid.uuid4().hex[:12]
+        self._version_lock = threading.Lock()
+        self._version_seq = 0
+        self._all_markets_version = 0
+        self._market_versions: Dict[int, int] = {}
+        self._listing_version = 0
+        self._agent_versions: Dict[int, int] = {}
+        self._agent_cash_version = 0
+        self._readers: "ReadPool[MarketStore]" = ReadPool(
+            lambda: MarketStore(
+                _conn=self._backend.connect_readonly(),
+                _external_transactions=True,
+                _read_only=True,
+            ),
+            lambda store: store.conn.close(),
+            read_pool_size,
+        )
+        # Cold storage for resolved markets; ``None`` disables archiving.
+        self._archive = TradeArchive(archive_dir) if archive_dir else None
         conn = self._get_conn()
         conn.executescript(_SCHEMA)
+        # Run the store's schema migrations once, before worker threads race for them.
+        self._get_store()
 
     # ── Connection / store management ─────────────────────────────────
 
     def _get_conn(self) -> sqlite3.Connection:
         conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
         if conn is None:
-            conn = sqlite3.connect(self._db_path, uri=self._uri, check_same_thread=False)
-            conn.row_factory = sqlite3.Row
-            conn.isolation_level = None
-            conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA foreign_keys=ON")
+            conn = self._backend.connect()
             self._local.conn = conn
+            with self._writers_lock:
+                self._writers.append(conn)
         return conn
 
     def _get_store(self) -> MarketStore:
@@ -83,8 +157,17 @@ class MarketService:
         return store
 
     @contextmanager
-    def _begin_immediate(self):
-        """Context manager: wraps body in BEGIN IMMEDIATE / COMMIT / ROLLBACK."""
+    def _begin_immediate(
+        self, market_id: Optional[int] = None, *, listing: bool = False,
+        agents: Iterable[int] = (),
+    ):
+        """
+        Context manager: wraps body in BEGIN IMMEDIATE / COMMIT / ROLLBACK.
+
+        A commit bumps *market_id*'s version (every market's when ``None``), the
+        listing version too when *listing* is set, and the version of each
+        agent in *agents* (read after the body, so it may fill a list in).
+        """
         conn = self._get_store().conn
         conn.execute("BEGIN IMMEDIATE")
         try:
@@ -93,21 +176,93 @@ class MarketService:
         except Exception:
             conn.execute("ROLLBACK")
             raise
+        self._bump_version(market_id, listing=listing, agents=agents)
+
+    # ── Change versions ───────────────────────────────────────────────
+
+    def _bump_version(
+        self, market_id: Optional[int] = None, *, listing: bool = False,
+        agents: Iterable[int] = (),
+    ) -> None:
+        with self._version_lock:
+            self._version_seq += 1
+            if market_id is None:
+                self._all_markets_version = self._version_seq
+            else:
+                self._market_versions[int(market_id)] = self._version_seq
+            if listing:
+                self._listing_version = self._version_seq
+            for agent_id in agents:
+                self._agent_versions[int(agent_id)] = self._version_seq
+                self._agent_cash_version = self._version_seq
+
+    def market_version(self, market_id: int) -> int:
+        """Monotonic counter that changes after every committed write affecting *market_id*."""
+        return max(self._market_versions.get(int(market_id), 0), self._all_markets_version)
+
+    def agent_version(self, agent_id: Optional[int] = None) -> int:
+        """
+        Monotonic counter that changes when *agent_id*'s cash moves in any
+        market (any agent's when ``None``), or when agents change at all.
+        """
+        if agent_id is None:
+            version = self._agent_cash_version
+        else:
+            version = self._agent_versions.get(int(agent_id), 0)
+        return max(version, self._all_markets_version)
+
+    def catalog_version(self) -> int:
+        """Monotonic counter that changes after every committed write to any market or agent."""
+        return self._version_seq
+
+    def listing_version(self) -> int:
+        """Monotonic counter that changes when a market is created, deleted, or changes status."""
+        return self._listing_version
+
+    @contextmanager
+    def _reader(self):
+        """
+        Borrow a read-only ``MarketStore`` from the pool for one read.
+
+        Re-entrant per thread (nested reads reuse the borrowed store, so a
+        pool of one cannot deadlock), and a read issued inside this thread's
+        own write transaction uses the writer so it sees uncommitted rows.
+        """
+        held: Optional[MarketStore] = getattr(self._local, "reader", None)
+        if held is not None:
+            yield held
+            return
+        writer: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if writer is not None and writer.in_transaction:
+            yield self._get_store()
+            return
+        with self._readers.acquire() as store:
+            self._local.reader = store
+            try:
+                yield store
+            finally:
+                self._local.reader = None
 
     def close(self) -> None:
-        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
-        if conn is not None:
+        """Close every writer and pooled reader connection, then the backend."""
+        self._readers.close()
+        with self._writers_lock:
+            writers, self._writers = self._writers, []
+        for conn in writers:
             conn.close()
-            self._local.conn = None
-            self._local.store = None
+        self._local.conn = None
+        self._local.store = None
+        self._backend.close()
 
     # ── Read operations (delegate to MarketStore) ─────────────────────
 
     def get_market(self, market_id: int) -> Dict[str, Any]:
-        return self._get_store().get_market(market_id)
+        with self._reader() as store:
+            return store.get_market(market_id)
 
     def list_markets(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
-        return self._get_store().list_markets(status)
+        with self._reader() as store:
+            return store.list_markets(status)
 
     def list_markets_with_summary(
         self,
@@ -115,90 +270,90 @@ class MarketService:
         *,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Market-discovery helper for API/UI.
 
         Returns paged market rows with current price, total trade count, and
         active agents (distinct traders) derived from persisted trade history.
+        Pages are keyset-paginated on market id; pass ``next_cursor`` back as
+        *cursor* to fetch the next one.
         """
-        if limit < 1:
-            raise ValueError("limit must be >= 1")
-        if offset < 0:
-            raise ValueError("offset must be >= 0")
-        all_markets = self._get_store().list_markets(status)
-        total = len(all_markets)
-        page = all_markets[offset : offset + limit]
-        out: List[Dict[str, Any]] = []
-        store = self._get_store()
-        for m in page:
-            mid = int(m["id"])
-            row = store.conn.execute(
-                """
-                SELECT
-                    COUNT(*) AS trade_count,
-                    COUNT(DISTINCT agent_id) AS active_agents
-                FROM trades
-                WHERE market_id = ?
-                """,
-                (mid,),
-            ).fetchone()
-            out.append(
-                {
-                    **m,
-                    "price": self.get_price(mid),
-                    "trade_count": int(row["trade_count"] if row else 0),
-                    "active_agents": int(row["active_agents"] if row else 0),
-                }
-            )
-        return {"markets": out, "total": total}
+        with self._reader() as store:
+            page = store.list_markets_page(status, limit=limit, offset=offset, cursor=cursor)
+            out = [self._summarise_market(store, m) for m in page["markets"]]
+            return {"markets": out, "total": page["total"], "next_cursor": page["next_cursor"]}
+
+    def market_summaries(self, market_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        :meth:`list_markets_with_summary` rows for just *market_ids*, keyed by id
+        (ids that no longer exist are left out).
+        """
+        out: Dict[int, Dict[str, Any]] = {}
+        with self._reader() as store:
+            for mid in market_ids:
+                try:
+                    m = store.get_market(int(mid))
+                except ValueError:
+                    continue
+                out[int(mid)] = self._summarise_market(store, m)
+        return out
+
+    def _summarise_market(self, store: MarketStore, m: Dict[str, Any]) -> Dict[str, Any]:
+        mid = int(m["id"])
+        # Archived markets have no hot trades, so their rollup simply adds on.
+        row = store.conn.execute(
+            """
+            SELECT
+                COUNT(*) + COALESCE(
+                    (SELECT trade_count FROM archived_markets WHERE market_id = ?), 0
+                ) AS trade_count,
+                COUNT(DISTINCT agent_id) + COALESCE(
+                    (SELECT active_agents FROM archived_markets WHERE market_id = ?), 0
+                ) AS active_agents
+            FROM trades
+            WHERE market_id = ?
+            """,
+            (mid, mid, mid),
+        ).fetchone()
+        return {
+            **m,
+            "price": self.get_price(mid),
+            "trade_count": int(row["trade_count"] if row else 0),
+            "active_agents": int(row["active_agents"] if row else 0),
+        }
 
     def get_agent(self, agent_id: int, market_id: Optional[int] = None) -> Dict[str, Any]:
-        agent = self._get_store().get_agent(agent_id)
-        if market_id is not None:
-            pos = self._get_store().get_position(agent_id, market_id)
-            agent["yes_shares"] = pos["yes_shares"]
-        return agent
+        with self._reader() as store:
+            agent = store.get_agent(agent_id)
+            if market_id is not None:
+                pos = store.get_position(agent_id, market_id)
+                agent["yes_shares"] = pos["yes_shares"]
+            return agent
 
     def list_agents(
         self,
         *,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        return self._get_store().list_agents(limit=limit, offset=offset)
+        with self._reader() as store:
+            return store.list_agents(limit=limit, offset=offset, cursor=cursor)
 
     def mean_belief_all_agents(self) -> Optional[float]:
         """Mean belief across all agent rows (same roster as global ``/api/agents``)."""
-        data = self.list_agents(limit=1_000_000, offset=0)
-        beliefs: List[float] = []
-        for r in data["agents"]:
-            b = r.get("belief")
-            if b is None:
-                continue
-            try:
-                beliefs.append(float(b))
-            except (TypeError, ValueError):
-                continue
-        if not beliefs:
-            return None
-        return float(np.mean(beliefs))
+        with self._reader() as store:
+            row = store.conn.execute(
+                "SELECT AVG(belief) AS m FROM agents WHERE deleted_at IS NULL AND belief IS NOT NULL"
+            ).fetchone()
+            return None if row["m"] is None else float(row["m"])
 
     def mean_belief_for_market(self, market_id: int) -> Optional[float]:
-        """Mean belief across agents with a position in one market."""
-        rows = self.list_agents_for_market(market_id)
-        beliefs: List[float] = []
-        for r in rows:
-            b = r.get("belief")
-            if b is None:
-                continue
-            try:
-                beliefs.append(float(b))
-            except (TypeError, ValueError):
-                continue
-        if not beliefs:
-            return None
-        return float(np.mean(beliefs))
+        """Mean belief across agents with a position in one market (O(1) running sums)."""
+        with self._reader() as store:
+            return store.mean_belief_for_market(market_id)
 
     def mean_belief_joined_markets_by_agent(self, agent_ids: List[int]) -> Dict[int, Optional[float]]:
         """
@@ -211,60 +366,176 @@ class MarketService:
         ids = [int(x) for x in agent_ids]
         out: Dict[int, Optional[float]] = {aid: None for aid in ids}
         placeholders = ",".join("?" for _ in ids)
-        rows = self._get_store().conn.execute(
-            f"""
-            SELECT agent_id, AVG(belief) AS avg_belief
-            FROM positions
-            WHERE belief IS NOT NULL
-              AND agent_id IN ({placeholders})
-            GROUP BY agent_id
-            """,
-            ids,
-        ).fetchall()
-        for r in rows:
-            aid = int(r["agent_id"])
-            v = r["avg_belief"]
-            out[aid] = float(v) if v is not None else None
-        return out
+        with self._reader() as store:
+            rows = store.conn.execute(
+                f"""
+                SELECT agent_id, AVG(belief) AS avg_belief
+                FROM positions
+                WHERE belief IS NOT NULL
+                  AND agent_id IN ({placeholders})
+                GROUP BY agent_id
+                """,
+                ids,
+            ).fetchall()
+            for r in rows:
+                aid = int(r["agent_id"])
+                v = r["avg_belief"]
+                out[aid] = float(v) if v is not None else None
+            return out
 
     def get_position(self, agent_id: int, market_id: int) -> Dict[str, Any]:
-        return self._get_store().get_position(agent_id, market_id)
+        with self._reader() as store:
+            return store.get_position(agent_id, market_id)
 
     def get_order_book(self, market_id: int) -> Dict[str, Any]:
-        return self._get_store().get_order_book(market_id)
+        with self._reader() as store:
+            return store.get_order_book(market_id)
 
     def get_trades(
         self, market_id: Optional[int] = None, agent_id: Optional[int] = None,
         since_trade_id: Optional[int] = None, limit: int = 100,
+        before_trade_id: Optional[int] = None,
+        *,
+        since_ts: Any = None,
+        until_ts: Any = None,
     ) -> List[Dict[str, Any]]:
-        return self._get_store().get_trades(market_id, agent_id, since_trade_id, limit)
+        """
+        Newest-first trades from the hot DB, merged with archived markets'
+        history when the archive is enabled.  ``since_ts``/``until_ts`` bound
+        a half-open time window (see ``MarketStore.get_trades``).
+        """
+        with self._reader() as store:
+            archived = self._archived_market_ids(market_id=market_id, agent_id=agent_id)
+            window = {"since_ts": since_ts, "until_ts": until_ts}
+            if market_id is not None and archived:
+                return self._archived_trades(
+                    market_id, agent_id, since_trade_id, limit, before_trade_id, **window,
+                )
+            rows = store.get_trades(
+                market_id, agent_id, since_trade_id, limit, before_trade_id=before_trade_id,
+                **window,
+            )
+            if not archived:
+                return rows
+            for mid in archived:
+                rows.extend(self._archived_trades(
+                    mid, agent_id, since_trade_id, limit, before_trade_id, **window,
+                ))
+            rows.sort(key=lambda t: int(t["id"]), reverse=True)
+            return rows[:limit]
+
+    def _archived_trades(
+        self, market_id: int, agent_id: Optional[int], since_trade_id: Optional[int],
+        limit: int, before_trade_id: Optional[int], *, since_ts: Any, until_ts: Any,
+    ) -> List[Dict[str, Any]]:
+        rows = self._archive.query_trades(
+            market_id, agent_id=agent_id, since_trade_id=since_trade_id,
+            before_trade_id=before_trade_id, since_ts=since_ts, until_ts=until_ts,
+            limit=limit,
+        )
+        return [MarketStore._trade_row_to_dict(r) for r in rows]
+
+    def trade_window_stats(
+        self, market_id: int, *, since_ts: Any = None, until_ts: Any = None,
+    ) -> Dict[str, Any]:
+        """Windowed volume / trader counts (hot trades only; archived markets report zeros)."""
+        with self._reader() as store:
+            store.get_market(market_id)
+            return store.trade_window_stats(market_id, since_ts=since_ts, until_ts=until_ts)
+
+    def _archived_market_ids(
+        self, *, market_id: Optional[int] = None, agent_id: Optional[int] = None,
+    ) -> List[int]:
+        """Archived markets whose history a trade query has to read from disk."""
+        if self._archive is None:
+            return []
+        with self._reader() as store:
+            conn = store.conn
+            if market_id is not None:
+                rows = conn.execute(
+                    "SELECT market_id FROM archived_markets WHERE market_id = ?", (market_id,)
+                ).fetchall()
+            elif agent_id is not None:
+                rows = conn.execute(
+                    "SELECT market_id FROM archived_agent_trades WHERE agent_id = ?", (agent_id,)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT market_id FROM archived_markets").fetchall()
+            return [int(r["market_id"]) for r in rows]
+
+    def get_candles(
+        self,
+        market_id: int,
+        resolution: str = "1m",
+        *,
+        since_ts: Any = None,
+        until_ts: Any = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        with self._reader() as store:
+            store.get_market(market_id)
+            return store.get_candles(
+                market_id, resolution, since_ts=since_ts, until_ts=until_ts, limit=limit,
+            )
 
     def count_trades(self, market_id: int) -> int:
-        row = self._get_store().conn.execute(
-            "SELECT COUNT(*) AS c FROM trades WHERE market_id = ?", (market_id,)
-        ).fetchone()
-        return int(row["c"] if hasattr(row, "keys") else row[0])
+        with self._reader() as store:
+            row = store.conn.execute(
+                "SELECT COUNT(*) + COALESCE("
+                "(SELECT trade_count FROM archived_markets WHERE market_id = ?), 0"
+                ") AS c FROM trades WHERE market_id = ?",
+                (market_id, market_id),
+            ).fetchone()
+            return int(row["c"] if hasattr(row, "keys") else row[0])
 
-    def list_agents_for_market(self, market_id: int) -> List[Dict[str, Any]]:
+    def list_agents_for_market(
+        self,
+        market_id: int,
+        *,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_agent_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Return one row per agent with a position in this market: id, name, cash,
         yes_shares, belief, rho, personality (raw string from DB).
+
+        With *limit* / *after_agent_id* only one keyset page (agent id order)
+        is read; *offset* is kept for legacy callers.
         """
-        store = self._get_store()
-        rows = store.conn.execute(
-            """
-            SELECT a.id AS agent_id, a.name, a.cash,
-                   COALESCE(p.belief, a.belief) AS belief,
-                   a.rho, a.personality,
-                   p.yes_shares
-            FROM positions p
-            JOIN agents a ON a.id = p.agent_id
-            WHERE p.market_id = ? AND a.deleted_at IS NULL
-            ORDER BY a.id
-            """,
-            (market_id,),
-        ).fetchall()
-        return [{k: r[k] for k in r.keys()} for r in rows]
+        with self._reader() as store:
+            params: List[Any] = [market_id, after_agent_id if after_agent_id is not None else 0]
+            page = ""
+            if limit is not None:
+                page = " LIMIT ? OFFSET ?"
+                params.extend([limit, offset])
+            rows = store.conn.execute(
+                f"""
+                SELECT a.id AS agent_id, a.name, a.cash,
+                       COALESCE(p.belief, a.belief) AS belief,
+                       a.rho, a.personality,
+                       p.yes_shares
+                FROM positions p
+                JOIN agents a ON a.id = p.agent_id
+                WHERE p.market_id = ? AND p.agent_id > ? AND a.deleted_at IS NULL
+                ORDER BY p.agent_id{page}
+                """,
+                params,
+            ).fetchall()
+            return [{k: r[k] for k in r.keys()} for r in rows]
+
+    def count_agents_for_market(self, market_id: int) -> int:
+        with self._reader() as store:
+            row = store.conn.execute(
+                """
+                SELECT COUNT(*) AS c
+                FROM positions p
+                JOIN agents a ON a.id = p.agent_id
+                WHERE p.market_id = ? AND a.deleted_at IS NULL
+                """,
+                (market_id,),
+            ).fetchone()
+            return int(row["c"])
 
     def list_markets_for_agent(self, agent_id: int) -> List[Dict[str, Any]]:
         """
@@ -272,39 +543,88 @@ class MarketService:
 
         The detail page needs this cross-market view, but positions alone are
         not enough because older trades may exist even if a position row was
-        later flattened to zero shares.
+        later flattened to zero shares.  Trade totals come from
+        ``agent_market_stats``, so the cost is one row per joined market.
         """
         self.get_agent(agent_id)
-        store = self._get_store()
-        rows = store.conn.execute(
-            """
-            WITH agent_market_ids AS (
-                SELECT market_id FROM positions WHERE agent_id = ?
-                UNION
-                SELECT market_id FROM trades WHERE agent_id = ?
-            )
-            SELECT
-                m.*,
-                COALESCE(p.yes_shares, 0.0) AS yes_shares,
-                (
-                    SELECT COUNT(*)
-                    FROM trades t
-                    WHERE t.market_id = m.id AND t.agent_id = ?
-                ) AS trade_count,
-                (
-                    SELECT MAX(t.created_at)
-                    FROM trades t
-                    WHERE t.market_id = m.id AND t.agent_id = ?
-                ) AS last_trade_at
-            FROM agent_market_ids ami
-            JOIN markets m ON m.id = ami.market_id
-            LEFT JOIN positions p
-                ON p.market_id = m.id AND p.agent_id = ?
-            ORDER BY COALESCE(last_trade_at, m.created_at) DESC, m.id DESC
-            """,
-            (agent_id, agent_id, agent_id, agent_id, agent_id),
-        ).fetchall()
-        return [{k: r[k] for k in r.keys()} for r in rows]
+        with self._reader() as store:
+            rows = store.conn.execute(
+                """
+                WITH agent_market_ids AS (
+                    SELECT market_id FROM positions WHERE agent_id = ?
+                    UNION
+                    SELECT market_id FROM agent_market_stats WHERE agent_id = ?
+                )
+                SELECT
+                    m.*,
+                    COALESCE(p.yes_shares, 0.0) AS yes_shares,
+                    COALESCE(s.trade_count, 0) AS trade_count,
+                    COALESCE(s.volume, 0.0) AS volume,
+                    COALESCE(s.cash_flow, 0.0) AS cash_flow,
+                    s.last_trade_us
+                FROM agent_market_ids ami
+                JOIN markets m ON m.id = ami.market_id
+                LEFT JOIN positions p
+                    ON p.market_id = m.id AND p.agent_id = ?
+                LEFT JOIN agent_market_stats s
+                    ON s.market_id = m.id AND s.agent_id = ?
+                """,
+                (agent_id, agent_id, agent_id, agent_id),
+            ).fetchall()
+            out = []
+            for r in rows:
+                row = {k: r[k] for k in r.keys()}
+                row["last_trade_at"] = us_to_iso(row.pop("last_trade_us"))
+                out.append(row)
+            out.sort(key=lambda r: (r["last_trade_at"] or r["created_at"], r["id"]), reverse=True)
+            return out
+
+    def agent_leaderboard(
+        self,
+        market_id: Optional[int] = None,
+        *,
+        by: str = "cash_flow",
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank live agents by realized cash flow, volume or trade count.
+
+        Totals are summed over ``agent_market_stats`` (all markets, or just
+        *market_id*), so archived markets still count.
+        """
+        if by not in LEADERBOARD_METRICS:
+            raise ValueError(f"by must be one of {LEADERBOARD_METRICS}, got {by!r}")
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        where, params = "", []
+        if market_id is not None:
+            self.get_market(market_id)
+            where, params = "WHERE s.market_id = ?", [market_id]
+        with self._reader() as store:
+            rows = store.conn.execute(
+                f"""
+                SELECT a.id AS agent_id, a.name,
+                       SUM(s.trade_count) AS trade_count,
+                       SUM(s.volume) AS volume,
+                       SUM(s.cash_flow) AS cash_flow,
+                       COUNT(*) AS markets,
+                       MAX(s.last_trade_us) AS last_trade_us
+                FROM agent_market_stats s
+                JOIN agents a ON a.id = s.agent_id AND a.deleted_at IS NULL
+                {where}
+                GROUP BY s.agent_id
+                ORDER BY {by} DESC, a.id ASC
+                LIMIT ?
+                """,
+                (*params, int(limit)),
+            ).fetchall()
+        out = []
+        for rank, r in enumerate(rows, start=1):
+            row = {k: r[k] for k in r.keys()}
+            row["rank"] = rank
+            row["last_trade_at"] = us_to_iso(row.pop("last_trade_us"))
+            out.append(row)
+        return out
 
     # ── Write operations (delegate with BEGIN IMMEDIATE) ──────────────
 
@@ -315,7 +635,7 @@ class MarketService:
         min_price: float = 0.001, max_price: float = 0.999,
         initial_price: float = 0.5,
     ) -> Dict[str, Any]:
-        with self._begin_immediate():
+        with self._begin_immediate(listing=True):
             return self._get_store().create_market(
                 slug, title, mechanism=mechanism, b=b, ground_truth=ground_truth,
                 description=description, tick_size=tick_size,
@@ -337,8 +657,18 @@ class MarketService:
                 self._get_store().ensure_position(agent["id"], market_id)
             return agent
 
-    def set_market_status(self, market_id: int, status: str) -> Dict[str, Any]:
+    def create_agents_bulk(
+        self,
+        agents: Sequence[Dict[str, Any]],
+        *,
+        market_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Insert many agents (and optional positions in *market_id*) in one transaction."""
         with self._begin_immediate():
+            return self._get_store().create_agents_bulk(agents, market_id=market_id)
+
+    def set_market_status(self, market_id: int, status: str) -> Dict[str, Any]:
+        with self._begin_immediate(market_id, listing=True):
             return self._get_store().set_market_status(market_id, status)
 
     def delete_market(self, market_id: int) -> int:
@@ -351,7 +681,7 @@ class MarketService:
         Returns:
             Number of agent rows removed (always 0).
         """
-        with self._begin_immediate():
+        with self._begin_immediate(market_id, listing=True):
             store = self._get_store()
             conn = store.conn
             row = conn.execute("SELECT id FROM markets WHERE id = ?", (market_id,)).fetchone()
@@ -362,8 +692,14 @@ class MarketService:
             conn.execute("DELETE FROM orders WHERE market_id = ?", (market_id,))
             conn.execute("DELETE FROM positions WHERE market_id = ?", (market_id,))
             conn.execute("DELETE FROM news_events WHERE market_id = ?", (market_id,))
+            conn.execute("DELETE FROM settlements WHERE market_id = ?", (market_id,))
+            conn.execute("DELETE FROM candles WHERE market_id = ?", (market_id,))
+            conn.execute("DELETE FROM archived_agent_trades WHERE market_id = ?", (market_id,))
+            conn.execute("DELETE FROM archived_markets WHERE market_id = ?", (market_id,))
             conn.execute("DELETE FROM markets WHERE id = ?", (market_id,))
-            return 0
+        if self._archive is not None:
+            self._archive.delete(market_id)
+        return 0
 
     def delete_agent(self, agent_id: int) -> Dict[str, Any]:
         """
@@ -381,20 +717,26 @@ class MarketService:
             conn.execute("DELETE FROM positions WHERE agent_id = ?", (agent_id,))
             trade_count = int(
                 conn.execute(
-                    "SELECT COUNT(*) FROM trades WHERE agent_id = ?",
+                    "SELECT COALESCE(SUM(trade_count), 0) FROM agent_market_stats WHERE agent_id = ?",
                     (agent_id,),
                 ).fetchone()[0]
             )
             return {"agent": deleted, "trade_count_retained": trade_count}
 
     def set_agent_belief(self, market_id: int, agent_id: int, new_belief: float) -> float:
-        with self._begin_immediate():
+        with self._begin_immediate(market_id):
             return self._get_store().set_agent_belief(agent_id, market_id, new_belief)
 
+    def record_mean_belief(
+        self, market_id: int, mean_belief: float, *, at_ts: Any = None,
+    ) -> None:
+        with self._begin_immediate(market_id):
+            self._get_store().record_mean_belief(market_id, mean_belief, at_ts=at_ts)
+
     def update_agent_portfolio(
         self, market_id: int, agent_id: int, cash_delta: float, shares_delta: float,
     ) -> Dict[str, Any]:
-        with self._begin_immediate():
+        with self._begin_immediate(market_id, agents=(agent_id,)):
             return self._get_store().update_agent_portfolio(
                 market_id, agent_id, cash_delta, shares_delta,
             )
@@ -421,34 +763,129 @@ class MarketService:
 
     def ensure_position(self, agent_id: int, market_id: int) -> Dict[str, Any]:
         """Lazy-position helper used by trade execution paths."""
-        with self._begin_immediate():
+        with self._begin_immediate(market_id):
             return self._get_store().ensure_position(agent_id, market_id)
 
+    def ensure_positions(self, agent_ids: Sequence[int], market_id: int) -> None:
+        """Bulk :meth:`ensure_position` in one transaction."""
+        with self._begin_immediate(market_id):
+            self._get_store()._ensure_position_rows(agent_ids, market_id)
+
     def resolve_market(self, market_id: int, outcome: str) -> Dict[str, Any]:
-        with self._begin_immediate():
+        # Settlement pays every holder, wherever else they trade.
+        holders: List[int] = []
+        with self._begin_immediate(market_id, listing=True, agents=holders) as conn:
+            holders.extend(
+                r[0] for r in conn.execute(
+                    "SELECT agent_id FROM positions WHERE market_id = ?", (market_id,)
+                )
+            )
             return self._get_store().resolve_market(market_id, outcome)
 
+    def get_settlement(self, market_id: int) -> Dict[str, Any]:
+        with self._reader() as store:
+            return store.get_settlement(market_id)
+
     def cancel_agent_orders(self, agent_id: int, market_id: int) -> int:
-        with self._begin_immediate():
+        with self._begin_immediate(market_id):
             return self._get_store().cancel_agent_orders(agent_id, market_id)
 
-    # ── Pricing (uses LMSRMarketMaker for team_a delegation) ──────────
+    # ── Cold-storage archival ─────────────────────────────────────────
 
-    def get_price(self, market_id: int) -> float:
+    def archive_market(self, market_id: int) -> Dict[str, Any]:
+        """
+        Move a resolved market's trades and orders into its archive file.
+
+        The file is written first and the hot rows are deleted afterwards in one
+        transaction, so a crash in between only leaves a file that the next run
+        overwrites.  Archived trades stay readable through :meth:`get_trades`.
+        """
+        if self._archive is None:
+            raise ValueError("Trade archive is not configured")
         store = self._get_store()
-        row = store.conn.execute(
-            "SELECT mechanism, inv_yes, inv_no, b FROM markets WHERE id = ?",
-            (market_id,),
+        conn = store.conn
+        mkt = store.get_market(market_id)
+        if mkt["status"] != "resolved":
+            raise ValueError(f"Market {market_id} is not resolved")
+        done = conn.execute(
+            "SELECT * FROM archived_markets WHERE market_id = ?", (market_id,)
         ).fetchone()
-        if row is None:
-            raise ValueError(f"Market {market_id} not found")
-        if row["mechanism"] == "lmsr":
-            mm = LMSRMarketMaker(row["b"], [row["inv_yes"], row["inv_no"]])
-            return float(mm.get_price())
-        return store._cda_reference_price(market_id)
+        if done is not None:
+            return {
+                "market_id": int(market_id),
+                "trades_archived": int(done["trade_count"]),
+                "orders_archived": int(done["order_count"]),
+                "archived_at": done["archived_at"],
+            }
+        # Resolved markets reject trades, so these reads cannot miss rows.
+        tables = {
+            t: conn.execute(
+                f"SELECT * FROM {t} WHERE market_id = ? ORDER BY id", (market_id,)
+            ).fetchall()
+            for t in ("trades", "orders")
+        }
+        columns = {
+            t: [(c["name"], c["type"]) for c in conn.execute(f"PRAGMA table_info({t})")]
+            for t in tables
+        }
+        self._archive.write(market_id, tables, columns)
+
+        per_agent: Dict[int, List[Any]] = {}
+        for t in tables["trades"]:
+            stats = per_agent.setdefault(int(t["agent_id"]), [0, None])
+            stats[0] += 1
+            stats[1] = t["created_us"]
+        now = datetime.now(timezone.utc).isoformat()
+        with self._begin_immediate(market_id) as conn:
+            conn.execute(
+                "INSERT INTO archived_markets "
+                "(market_id, trade_count, order_count, active_agents, archived_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (market_id, len(tables["trades"]), len(tables["orders"]), len(per_agent), now),
+            )
+            conn.executemany(
+                "INSERT INTO archived_agent_trades (market_id, agent_id, trade_count, last_trade_us) "
+                "VALUES (?, ?, ?, ?)",
+                [(market_id, aid, n, last) for aid, (n, last) in per_agent.items()],
+            )
+            conn.execute("DELETE FROM trades WHERE market_id = ?", (market_id,))
+            conn.execute("DELETE FROM orders WHERE market_id = ?", (market_id,))
+        return {
+            "market_id": int(market_id),
+            "trades_archived": len(tables["trades"]),
+            "orders_archived": len(tables["orders"]),
+            "archived_at": now,
+        }
+
+    def archive_resolved_markets(self) -> List[Dict[str, Any]]:
+        """Archival job: archive every resolved market that is still hot."""
+        rows = self._get_store().conn.execute(
+            "SELECT id FROM markets WHERE status = 'resolved' "
+            "AND id NOT IN (SELECT market_id FROM archived_markets) ORDER BY id"
+        ).fetchall()
+        return [self.archive_market(int(r["id"])) for r in rows]
+
+    # ── Pricing (uses LMSRMarketMaker for team_a delegation) ──────────
+
+    def get_price(self, market_id: int) -> float:
+        with self._reader() as store:
+            row = store.conn.execute(
+                "SELECT mechanism, inv_yes, inv_no, b FROM markets WHERE id = ?",
+                (market_id,),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Market {market_id} not found")
+            if row["mechanism"] == "lmsr":
+                mm = LMSRMarketMaker(row["b"], [row["inv_yes"], row["inv_no"]])
+                return float(mm.get_price())
+            return store._cda_reference_price(market_id)
 
     def get_price_snapshot(self, market_id: int) -> Dict[str, Any]:
-        store = self._get_store()
+        with self._reader() as store:
+            return self._price_snapshot(store, market_id)
+
+    @staticmethod
+    def _price_snapshot(store: MarketStore, market_id: int) -> Dict[str, Any]:
         mkt = store.get_market(market_id)
         result: Dict[str, Any] = {
             "market_id": market_id,
@@ -468,6 +905,27 @@ class MarketService:
             result["last_trade_price"] = mkt["last_trade_price"]
         return result
 
+    def decision_context(self, market_id: int, agent_id: int) -> Dict[str, Any]:
+        """
+        Everything an autonomous agent reads per cycle -- price and quotes plus
+        its cash, position, belief, rho and personality -- from one read
+        transaction, so the price and the position always agree.
+        """
+        with self._reader() as store:
+            conn = store.conn
+            # Inside this thread's write transaction the reads already share one snapshot.
+            own_txn = not conn.in_transaction
+            if own_txn:
+                conn.execute("BEGIN")
+            try:
+                snap = self._price_snapshot(store, market_id)
+                agent = store.get_agent(agent_id)
+                pos = store.get_position(agent_id, market_id)
+            finally:
+                if own_txn:
+                    conn.execute("COMMIT")
+        return decision_context_row(snap, agent, pos)
+
     # ── LMSR Trading ──────────────────────────────────────────────────
 
     def execute_lmsr_trade(
@@ -476,7 +934,10 @@ class MarketService:
         """
         Execute an LMSR trade.  Positive quantity = buy YES, negative = sell YES.
         Clips to the largest affordable quantity when the agent has insufficient cash.
-        Uses LMSRMarketMaker from team_a_market_logic for all cost/price math.
+        Uses the scalar LMSR helpers from team_a_market_logic for all cost/price math.
+
+        Hot path: one joined read (market, agent, position, belief sums), then
+        the market/agent/position writes, the trade row and the candle upsert.
         """
         if quantity == 0:
             raise ValueError("quantity must be non-zero")
@@ -484,42 +945,28 @@ class MarketService:
         conn = store.conn
         conn.execute("BEGIN IMMEDIATE")
         try:
-            mkt = conn.execute(
-                "SELECT * FROM markets WHERE id = ?", (market_id,)
-            ).fetchone()
-            if mkt is None:
+            row = conn.execute(_LMSR_TRADE_READ, (agent_id, agent_id, market_id)).fetchone()
+            if row is None:
                 raise ValueError(f"Market {market_id} not found")
-            store._check_tradeable(mkt)
-            if mkt["mechanism"] != "lmsr":
+            store._check_tradeable(row)
+            if row["mechanism"] != "lmsr":
                 raise ValueError(
                     f"execute_lmsr_trade is for LMSR markets; "
-                    f"market {market_id} uses {mkt['mechanism']!r}."
+                    f"market {market_id} uses {row['mechanism']!r}."
                 )
-            agent = conn.execute(
-                "SELECT * FROM agents WHERE id = ? AND deleted_at IS NULL", (agent_id,)
-            ).fetchone()
-            if agent is None:
+            if row["agent_id"] is None:
                 raise ValueError(f"Agent {agent_id} not found")
-            # Explicit lazy-link helper per Task 2; safe under active tx.
-            store.ensure_position(agent_id, market_id)
 
-            b = mkt["b"]
-            inv_yes, inv_no = float(mkt["inv_yes"]), float(mkt["inv_no"])
-
-            mm = LMSRMarketMaker(b, [inv_yes, inv_no])
-            price_before = float(mm.get_price())
-
-            old_cost_val = float(mm.get_cost(mm.inventory))
-            full_inv = np.array([inv_yes + quantity, inv_no], dtype=float)
-            full_cost = float(mm.get_cost(full_inv)) - old_cost_val
+            b = float(row["b"])
+            inv_yes, inv_no = float(row["inv_yes"]), float(row["inv_no"])
+            cash = float(row["cash"])
+            price_before = lmsr_price(b, inv_yes, inv_no)
 
             actual_quantity = quantity
             clipped = False
-
-            if full_cost > agent["cash"] and quantity > 0:
-                actual_quantity = self._clip_lmsr_buy(
-                    inv_yes, inv_no, b, quantity, agent["cash"],
-                )
+            cost = lmsr_trade_cost(b, inv_yes, inv_no, quantity)
+            if cost > cash and quantity > 0:
+                actual_quantity = self._clip_lmsr_buy(inv_yes, inv_no, b, quantity, cash)
                 clipped = True
                 if actual_quantity < 1e-9:
                     conn.execute("ROLLBACK")
@@ -530,48 +977,63 @@ class MarketService:
                         "cost": 0.0, "price_before": price_before,
                         "price_after": price_before,
                     }
+                cost = lmsr_trade_cost(b, inv_yes, inv_no, actual_quantity)
 
-            exec_mm = LMSRMarketMaker(b, [inv_yes, inv_no])
-            cost = float(exec_mm.calculate_trade_cost(actual_quantity))
-            new_inv_yes = float(exec_mm.inventory[0])
-            new_inv_no = float(exec_mm.inventory[1])
-            price_after = float(exec_mm.get_price())
-
+            new_inv_yes = inv_yes + actual_quantity
+            price_after = lmsr_price(b, new_inv_yes, inv_no)
             side = "buy_yes" if actual_quantity >= 0 else "sell_yes"
-            share_delta = actual_quantity
+
+            # Lazy-link: a first trade creates the position with its initial
+            # belief, which the belief-stats trigger then adds to the running sums.
+            belief_sum = float(row["belief_sum"] or 0.0)
+            belief_count = int(row["belief_count"] or 0)
+            initial_belief = None
+            if not row["has_position"]:
+                initial_belief = store._initial_position_belief(
+                    {"id": agent_id, "belief": row["agent_belief"]},
+                    {"id": market_id, "ground_truth": row["ground_truth"]},
+                )
+                belief_sum += initial_belief
+                belief_count += 1
 
             conn.execute(
-                "UPDATE markets SET inv_yes = ?, inv_no = ? WHERE id = ?",
-                (new_inv_yes, new_inv_no, market_id),
+                "UPDATE markets SET inv_yes = ? WHERE id = ?", (new_inv_yes, market_id),
             )
             conn.execute(
-                "UPDATE agents SET cash = cash - ? WHERE id = ?",
-                (cost, agent_id),
+                "UPDATE agents SET cash = cash - ? WHERE id = ?", (cost, agent_id),
             )
             conn.execute(
-                "INSERT INTO positions (agent_id, market_id, yes_shares) VALUES (?, ?, ?) "
-                "ON CONFLICT(agent_id, market_id) DO UPDATE SET yes_shares = yes_shares + ?",
-                (agent_id, market_id, share_delta, share_delta),
+                "INSERT INTO positions (agent_id, market_id, yes_shares, belief) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(agent_id, market_id) DO UPDATE SET "
+                "yes_shares = yes_shares + excluded.yes_shares",
+                (agent_id, market_id, actual_quantity, initial_belief),
             )
-            now = datetime.now(timezone.utc).isoformat()
+            now = now_us()
             cur = conn.execute(
                 "INSERT INTO trades "
-                "(market_id, agent_id, side, shares, cost, price_before, price_after, created_at) "
+                "(market_id, agent_id, side, shares, cost, price_before, price_after, created_us) "
                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
                 (market_id, agent_id, side, abs(actual_quantity), cost,
                  price_before, price_after, now),
             )
             trade_id = cur.lastrowid
+            store._record_candle(
+                market_id, now, prices=[price_after], volume=abs(actual_quantity),
+                mean_belief=belief_sum / belief_count if belief_count > 0 else None,
+            )
             conn.execute("COMMIT")
         except Exception:
             conn.execute("ROLLBACK")
             raise
+        self._bump_version(market_id, agents=(agent_id,))
 
         return {
             "trade_id": trade_id, "market_id": market_id, "agent_id": agent_id,
             "quantity": actual_quantity, "requested_quantity": quantity,
             "clipped": clipped, "cost": cost,
             "price_before": price_before, "price_after": price_after,
+            "created_us": now,
         }
 
     def execute_trade(
@@ -602,19 +1064,9 @@ class MarketService:
         inv_yes: float, inv_no: float, b: float,
         max_quantity: float, max_cost: float,
     ) -> float:
-        """Binary-search for the largest quantity whose LMSR cost <= max_cost."""
+        """Largest quantity <= max_quantity whose LMSR cost <= max_cost (closed form)."""
         mm = LMSRMarketMaker(b, [inv_yes, inv_no])
-        old_cost_val = float(mm.get_cost(mm.inventory))
-        lo, hi = 0.0, max_quantity
-        for _ in range(64):
-            mid = (lo + hi) * 0.5
-            test_inv = np.array([inv_yes + mid, inv_no], dtype=float)
-            cost = float(mm.get_cost(test_inv)) - old_cost_val
-            if cost <= max_cost + 1e-12:
-                lo = mid
-            else:
-                hi = mid
-        return lo
+        return min(max_quantity, mm.max_affordable_quantity(max_cost))
 
     # ── CDA Trading ────────────────────────────────────────────────────
 
@@ -673,7 +1125,7 @@ class MarketService:
 
             persisted_trades: List[Dict[str, Any]] = []
             total_filled = 0.0
-            now = datetime.now(timezone.utc).isoformat()
+            now = now_us()
 
             for trade in cda_result["trades"]:
                 fill_qty = trade.quantity
@@ -719,7 +1171,7 @@ class MarketService:
                 cur = conn.execute(
                     "INSERT INTO trades "
                     "(market_id, agent_id, side, shares, cost, "
-                    " price_before, price_after, created_at) "
+                    " price_before, price_after, created_us) "
                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
                     (market_id, agent_id, trade.aggressor_side, fill_qty,
                      notional, trade.price, trade.price, now),
@@ -731,6 +1183,7 @@ class MarketService:
                     "price": trade.price,
                     "quantity": fill_qty,
                     "aggressor_side": trade.aggressor_side,
+                    "created_us": now,
                 })
                 total_filled += fill_qty
 
@@ -764,17 +1217,28 @@ class MarketService:
                 norm_price = cda._normalize_price(limit_price)
                 cur = conn.execute(
                     "INSERT INTO orders "
-                    "(market_id, agent_id, side, price, quantity, remaining, created_at) "
+                    "(market_id, agent_id, side, price, quantity, remaining, created_us) "
                     "VALUES (?, ?, ?, ?, ?, ?, ?)",
                     (market_id, agent_id, side, norm_price, quantity, actual_remaining, now),
                 )
                 resting_order_id = cur.lastrowid
 
+            if persisted_trades:
+                store._record_passive_fills(market_id, now, persisted_trades)
+                store._record_candle(
+                    market_id, now,
+                    prices=[t["price"] for t in persisted_trades],
+                    volume=total_filled,
+                    mean_belief=store.mean_belief_for_market(market_id),
+                )
             price_after = store._cda_reference_price(market_id)
             conn.execute("COMMIT")
         except Exception:
             conn.execute("ROLLBACK")
             raise
+        self._bump_version(market_id, agents={
+            aid for t in persisted_trades for aid in (t["buyer_id"], t["seller_id"])
+        })
 
         return {
             "trades": persisted_trades,
@@ -849,7 +1313,7 @@ class MarketService:
         return cda, resting_lookup
 
     def create_news_event(self, **kwargs: Any) -> Dict[str, Any]:
-        with self._begin_immediate():
+        with self._begin_immediate(kwargs.get("market_id")):
             return self._get_store().create_news_event(**kwargs)
 
     def list_news_events(
@@ -858,5 +1322,9 @@ class MarketService:
         *,
         limit: int = 200,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        return self._get_store().list_news_events(market_id, limit=limit, offset=offset)
+        with self._reader() as store:
+            return store.list_news_events(
+                market_id, limit=limit, offset=offset, cursor=cursor,
+            )
@@ -27,14 +27,26 @@ Usage:
 
 from __future__ import annotations
 
+import base64
+import binascii
+import json
 import math
+import re
 import sqlite3
+import time
 from contextlib import contextmanager
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+# Oldest SQLite library the schema runs on (upserts, ``ON CONFLICT ... DO
+# UPDATE``).  Newer syntax is used when available, with a fallback:
+# ``UPDATE ... FROM`` (3.33) and ``ALTER TABLE ... DROP COLUMN`` (3.35).
+MIN_SQLITE_VERSION = (3, 24, 0)
+_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+_HAS_DROP_COLUMN = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 _VALID_MARKET_STATUSES = {"created", "open", "running", "stopped"}
 _TRADEABLE_STATUSES = {"open", "running"}
 _INITIAL_BELIEF_NOISE_STD = 0.10
@@ -90,7 +102,7 @@ CREATE TABLE IF NOT EXISTS trades (
     cost         REAL    NOT NULL,
     price_before REAL    NOT NULL,
     price_after  REAL    NOT NULL,
-    created_at   TEXT    NOT NULL
+    created_us   INTEGER NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS orders (
@@ -102,7 +114,7 @@ CREATE TABLE IF NOT EXISTS orders (
     quantity   REAL    NOT NULL,
     remaining  REAL    NOT NULL,
     status     TEXT    NOT NULL DEFAULT 'open',
-    created_at TEXT    NOT NULL
+    created_us INTEGER NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS news_events (
@@ -118,9 +130,341 @@ CREATE TABLE IF NOT EXISTS news_events (
     n_affected             INTEGER NOT NULL,
     mean_belief_before     REAL    NOT NULL,
     mean_belief_after      REAL    NOT NULL,
-    created_at             TEXT    NOT NULL
+    created_us             INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS settlements (
+    market_id            INTEGER PRIMARY KEY REFERENCES markets(id),
+    outcome              TEXT    NOT NULL,
+    payoff_per_yes_share REAL    NOT NULL,
+    positions_settled    INTEGER NOT NULL,
+    total_payout         REAL    NOT NULL,
+    winners              TEXT    NOT NULL,
+    losers               TEXT    NOT NULL,
+    resolved_at          TEXT    NOT NULL
+);
+
+-- Markets whose trades/orders were moved to cold storage (see trade_archive.py),
+-- with the per-agent rollups the hot queries still need.
+CREATE TABLE IF NOT EXISTS archived_markets (
+    market_id     INTEGER PRIMARY KEY REFERENCES markets(id),
+    trade_count   INTEGER NOT NULL,
+    order_count   INTEGER NOT NULL,
+    active_agents INTEGER NOT NULL,
+    archived_at   TEXT    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS archived_agent_trades (
+    market_id     INTEGER NOT NULL REFERENCES markets(id),
+    agent_id      INTEGER NOT NULL REFERENCES agents(id),
+    trade_count   INTEGER NOT NULL,
+    last_trade_us INTEGER,
+    PRIMARY KEY (market_id, agent_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_archived_agent_trades_agent ON archived_agent_trades(agent_id);
+CREATE INDEX IF NOT EXISTS idx_trades_market ON trades(market_id);
+CREATE INDEX IF NOT EXISTS idx_trades_agent ON trades(agent_id);
+CREATE INDEX IF NOT EXISTS idx_positions_market ON positions(market_id);
+CREATE INDEX IF NOT EXISTS idx_news_events_market ON news_events(market_id);
+CREATE INDEX IF NOT EXISTS idx_markets_status ON markets(status);
+-- Open book in matching order (price, then time priority).
+CREATE INDEX IF NOT EXISTS idx_orders_open_book
+    ON orders(market_id, side, price, id) WHERE status = 'open';
+"""
+
+# Event tables keep time as integer epoch microseconds (``created_us``) so time
+# windows are indexed range scans; ISO strings are only rendered on the way out.
+# Created by ``MarketStore._migrate_timestamps_schema`` because pre-migration
+# databases do not have the column yet when ``_SCHEMA`` runs.
+_TIMESTAMP_INDEXES = """\
+CREATE INDEX IF NOT EXISTS idx_trades_market_time ON trades(market_id, created_us);
+CREATE INDEX IF NOT EXISTS idx_trades_time ON trades(created_us);
+CREATE INDEX IF NOT EXISTS idx_news_events_market_time ON news_events(market_id, created_us);
+"""
+_TIMESTAMPED_TABLES = ("trades", "orders", "news_events")
+
+# OHLCV + mean-belief buckets per market and resolution, maintained inside the
+# trade / belief transactions (see ``MarketStore._record_candle``).  Created by
+# ``MarketStore._migrate_candles_schema`` so existing trades are bucketed once.
+_CANDLES_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS candles (
+    market_id      INTEGER NOT NULL REFERENCES markets(id),
+    resolution_s   INTEGER NOT NULL,
+    bucket_us      INTEGER NOT NULL,
+    open           REAL,
+    high           REAL,
+    low            REAL,
+    close          REAL,
+    volume         REAL    NOT NULL DEFAULT 0.0,
+    trade_count    INTEGER NOT NULL DEFAULT 0,
+    belief_sum     REAL    NOT NULL DEFAULT 0.0,
+    belief_samples INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (market_id, resolution_s, bucket_us)
+) WITHOUT ROWID;
+"""
+
+# Running per-market belief sums behind ``mean_belief_for_market``.  A position
+# counts with ``COALESCE(p.belief, a.belief)`` while its agent is not deleted
+# (the same roster ``list_agents_for_market`` shows).  Triggers keep the sums
+# in step with every write path inside the writer's own transaction.
+_BELIEF_STATS_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS market_belief_stats (
+    market_id    INTEGER PRIMARY KEY,
+    belief_sum   REAL    NOT NULL DEFAULT 0.0,
+    belief_count INTEGER NOT NULL DEFAULT 0
 );
+
+CREATE TRIGGER IF NOT EXISTS trg_belief_stats_position_insert
+AFTER INSERT ON positions
+BEGIN
+    INSERT INTO market_belief_stats (market_id, belief_sum, belief_count)
+    SELECT NEW.market_id, COALESCE(NEW.belief, a.belief), 1
+    FROM agents a
+    WHERE a.id = NEW.agent_id AND a.deleted_at IS NULL
+      AND COALESCE(NEW.belief, a.belief) IS NOT NULL
+    ON CONFLICT(market_id) DO UPDATE SET
+        belief_sum = belief_sum + excluded.belief_sum,
+        belief_count = belief_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_belief_stats_position_delete
+AFTER DELETE ON positions
+BEGIN
+    UPDATE market_belief_stats
+    SET belief_sum = belief_sum - (
+            SELECT COALESCE(OLD.belief, a.belief) FROM agents a WHERE a.id = OLD.agent_id
+        ),
+        belief_count = belief_count - 1
+    WHERE market_id = OLD.market_id
+      AND EXISTS (
+        SELECT 1 FROM agents a
+        WHERE a.id = OLD.agent_id AND a.deleted_at IS NULL
+          AND COALESCE(OLD.belief, a.belief) IS NOT NULL
+      );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_belief_stats_position_belief
+AFTER UPDATE OF belief ON positions
+WHEN OLD.belief IS NOT NEW.belief
+BEGIN
+    UPDATE market_belief_stats
+    SET belief_sum = belief_sum
+            - (SELECT COALESCE(OLD.belief, a.belief) FROM agents a WHERE a.id = OLD.agent_id),
+        belief_count = belief_count - 1
+    WHERE market_id = OLD.market_id
+      AND EXISTS (
+        SELECT 1 FROM agents a
+        WHERE a.id = OLD.agent_id AND a.deleted_at IS NULL
+          AND COALESCE(OLD.belief, a.belief) IS NOT NULL
+      );
+    INSERT INTO market_belief_stats (market_id, belief_sum, belief_count)
+    SELECT NEW.market_id, COALESCE(NEW.belief, a.belief), 1
+    FROM agents a
+    WHERE a.id = NEW.agent_id AND a.deleted_at IS NULL
+      AND COALESCE(NEW.belief, a.belief) IS NOT NULL
+    ON CONFLICT(market_id) DO UPDATE SET
+        belief_sum = belief_sum + excluded.belief_sum,
+        belief_count = belief_count + 1;
+END;
+
+-- Agent-level changes: soft delete/restore moves all the agent's positions in
+-- or out; a profile belief change only matters where the position has none.
+CREATE TRIGGER IF NOT EXISTS trg_belief_stats_agent
+AFTER UPDATE OF belief, deleted_at ON agents
+WHEN OLD.deleted_at IS NOT NEW.deleted_at OR OLD.belief IS NOT NEW.belief
+BEGIN
+    UPDATE market_belief_stats
+    SET belief_sum = belief_sum - (
+            SELECT COALESCE(p.belief, OLD.belief) FROM positions p
+            WHERE p.agent_id = OLD.id AND p.market_id = market_belief_stats.market_id
+        ),
+        belief_count = belief_count - 1
+    WHERE OLD.deleted_at IS NULL
+      AND market_id IN (
+        SELECT p.market_id FROM positions p
+        WHERE p.agent_id = OLD.id
+          AND COALESCE(p.belief, OLD.belief) IS NOT NULL
+          AND (OLD.deleted_at IS NOT NEW.deleted_at OR p.belief IS NULL)
+      );
+    INSERT INTO market_belief_stats (market_id, belief_sum, belief_count)
+    SELECT p.market_id, COALESCE(p.belief, NEW.belief), 1
+    FROM positions p
+    WHERE NEW.deleted_at IS NULL AND p.agent_id = NEW.id
+      AND COALESCE(p.belief, NEW.belief) IS NOT NULL
+      AND (OLD.deleted_at IS NOT NEW.deleted_at OR p.belief IS NULL)
+    ON CONFLICT(market_id) DO UPDATE SET
+        belief_sum = belief_sum + excluded.belief_sum,
+        belief_count = belief_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_belief_stats_market_delete
+AFTER DELETE ON markets
+BEGIN
+    DELETE FROM market_belief_stats WHERE market_id = OLD.id;
+END;
+"""
+
+# Per (agent, market) trade summary behind ``list_markets_for_agent`` and
+# ``agent_leaderboard``.  A trade row belongs to its aggressor, so the trigger
+# credits ``agent_id`` only; the CDA paths credit the passive side of each fill
+# with ``_record_passive_fills``.  ``cash_flow`` is realized cash in minus cash out:
+# LMSR ``cost`` is already signed (negative for sells), CDA ``cost`` is the
+# notional and its sign comes from ``side``.  Archiving deletes trades but not
+# these rows, so totals survive it.
+_AGENT_MARKET_STATS_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS agent_market_stats (
+    agent_id      INTEGER NOT NULL,
+    market_id     INTEGER NOT NULL,
+    trade_count   INTEGER NOT NULL,
+    volume        REAL    NOT NULL,
+    cash_flow     REAL    NOT NULL,
+    last_trade_us INTEGER,
+    PRIMARY KEY (agent_id, market_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_agent_market_stats_market ON agent_market_stats(market_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_agent_market_stats_trade
+AFTER INSERT ON trades
+BEGIN
+    INSERT INTO agent_market_stats
+        (agent_id, market_id, trade_count, volume, cash_flow, last_trade_us)
+    VALUES (
+        NEW.agent_id, NEW.market_id, 1, NEW.shares,
+        CASE WHEN NEW.side = 'sell' THEN NEW.cost ELSE -NEW.cost END,
+        NEW.created_us
+    )
+    ON CONFLICT(agent_id, market_id) DO UPDATE SET
+        trade_count = trade_count + 1,
+        volume = volume + excluded.volume,
+        cash_flow = cash_flow + excluded.cash_flow,
+        last_trade_us = MAX(COALESCE(last_trade_us, 0), excluded.last_trade_us);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agent_market_stats_market_delete
+AFTER DELETE ON markets
+BEGIN
+    DELETE FROM agent_market_stats WHERE market_id = OLD.id;
+END;
+"""
+
+# Same fold as ``trg_agent_market_stats_trade``, for a CDA fill's resting side.
+_AGENT_STATS_UPSERT = """
+INSERT INTO agent_market_stats
+    (agent_id, market_id, trade_count, volume, cash_flow, last_trade_us)
+VALUES (?, ?, 1, ?, ?, ?)
+ON CONFLICT(agent_id, market_id) DO UPDATE SET
+    trade_count = trade_count + 1,
+    volume = volume + excluded.volume,
+    cash_flow = cash_flow + excluded.cash_flow,
+    last_trade_us = MAX(COALESCE(last_trade_us, 0), excluded.last_trade_us)
+"""
+
+# Candle resolutions served by ``get_candles`` (label -> bucket width in seconds).
+CANDLE_RESOLUTIONS: Dict[str, int] = {"1s": 1, "1m": 60, "1h": 3600}
+_MAX_CANDLES = 10_000
+
+# Price columns are NULL in belief-only buckets, hence the COALESCE dance:
+# SQLite's scalar MAX/MIN return NULL when any argument is NULL.
+# One statement upserts the bucket of every resolution (a row per resolution).
+_CANDLE_UPSERT = """
+INSERT INTO candles (
+    market_id, resolution_s, bucket_us, open, high, low, close,
+    volume, trade_count, belief_sum, belief_samples
+) VALUES """ + ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(CANDLE_RESOLUTIONS)) + """
+ON CONFLICT(market_id, resolution_s, bucket_us) DO UPDATE SET
+    open = COALESCE(candles.open, excluded.open),
+    high = MAX(COALESCE(candles.high, excluded.high), COALESCE(excluded.high, candles.high)),
+    low = MIN(COALESCE(candles.low, excluded.low), COALESCE(excluded.low, candles.low)),
+    close = COALESCE(excluded.close, candles.close),
+    volume = candles.volume + excluded.volume,
+    trade_count = candles.trade_count + excluded.trade_count,
+    belief_sum = candles.belief_sum + excluded.belief_sum,
+    belief_samples = candles.belief_samples + excluded.belief_samples
 """
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def now_us() -> int:
+    """Current UTC time as integer microseconds since the Unix epoch."""
+    return time.time_ns() // 1000
+
+
+def us_to_iso(us: Optional[int]) -> Optional[str]:
+    """Render epoch microseconds as the ISO-8601 string the API has always returned."""
+    if us is None:
+        return None
+    return (_EPOCH + timedelta(microseconds=int(us))).isoformat()
+
+
+def to_epoch_us(ts: Any) -> int:
+    """Epoch microseconds from a ``datetime``, an ISO-8601 string or epoch seconds."""
+    if isinstance(ts, datetime):
+        dt = ts
+    elif isinstance(ts, str):
+        try:
+            return to_epoch_us(float(ts))
+        except ValueError:
+            pass
+        try:
+            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid timestamp {ts!r}") from None
+    elif isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        if not math.isfinite(ts):
+            raise ValueError(f"Invalid timestamp {ts!r}")
+        return int(round(float(ts) * 1_000_000))
+    else:
+        raise ValueError(f"Invalid timestamp {ts!r}")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque page token for keyset pagination (wraps the last row id seen)."""
+    raw = f"id:{int(last_id)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on bad tokens."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+        prefix, _, value = raw.partition(":")
+        if prefix != "id":
+            raise ValueError
+        return int(value)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValueError(f"Invalid cursor {cursor!r}") from None
+
+
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER for ``IN (...)`` lists.
+_IN_CHUNK = 500
+
+
+def _chunks(items: Sequence[Any], size: int = _IN_CHUNK) -> Iterator[Sequence[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _check_page_args(limit: int, offset: int, cursor: Optional[str]) -> None:
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    if cursor is not None and offset:
+        raise ValueError("offset cannot be combined with cursor")
+
+
+def _next_cursor(rows: List[sqlite3.Row], limit: int) -> Optional[str]:
+    """Token for the page after *rows* (fetched with ``LIMIT limit + 1``)."""
+    if len(rows) <= limit:
+        return None
+    return encode_cursor(rows[limit - 1]["id"])
 
 
 class MarketStore:
@@ -138,7 +482,13 @@ class MarketStore:
         *,
         _conn: Optional[sqlite3.Connection] = None,
         _external_transactions: bool = False,
+        _read_only: bool = False,
     ):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {sqlite3.sqlite_version} is too old for the market store; "
+                f"need {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer"
+            )
         self._ext_txn = _external_transactions
         if _conn is not None:
             self.conn = _conn
@@ -150,8 +500,15 @@ class MarketStore:
             self.conn.execute("PRAGMA foreign_keys=ON")
             self.conn.executescript(_SCHEMA)
             self._owns_conn = True
+        if _read_only:
+            # Pooled readers: the writer that opened the database migrated it.
+            return
         self._migrate_agents_schema()
         self._migrate_positions_schema()
+        self._migrate_timestamps_schema()
+        self._migrate_candles_schema()
+        self._migrate_belief_stats_schema()
+        self._migrate_agent_market_stats_schema()
 
     def _migrate_agents_schema(self) -> None:
         """
@@ -193,6 +550,149 @@ class MarketStore:
                 """
             )
 
+    def _migrate_timestamps_schema(self) -> None:
+        """Convert ISO ``created_at`` text on event tables to integer ``created_us``."""
+        pending = []
+        for table in _TIMESTAMPED_TABLES:
+            cols = {
+                row["name"]
+                for row in self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+            }
+            if "created_us" not in cols:
+                pending.append(table)
+        if pending:
+            self.conn.create_function(
+                "iso_to_us", 1, lambda v: None if v is None else to_epoch_us(v),
+                deterministic=True,
+            )
+            self.conn.execute("SAVEPOINT migrate_timestamps")
+            try:
+                for table in pending:
+                    self.conn.execute(
+                        f"ALTER TABLE {table} ADD COLUMN created_us INTEGER NOT NULL DEFAULT 0"
+                    )
+                    self.conn.execute(f"UPDATE {table} SET created_us = iso_to_us(created_at)")
+                    if _HAS_DROP_COLUMN:
+                        self.conn.execute(f"ALTER TABLE {table} DROP COLUMN created_at")
+                    else:
+                        self._rebuild_table(table)
+                self.conn.execute("RELEASE migrate_timestamps")
+            except Exception:
+                self.conn.execute("ROLLBACK TO migrate_timestamps")
+                self.conn.execute("RELEASE migrate_timestamps")
+                raise
+            if not _HAS_DROP_COLUMN:
+                # Rebuilt tables lost their indexes.
+                self.conn.executescript(_SCHEMA)
+        self.conn.executescript(_TIMESTAMP_INDEXES)
+
+    def _rebuild_table(self, table: str) -> None:
+        """
+        Recreate *table* with its current ``_SCHEMA`` definition, keeping the
+        columns both share (for SQLite without ``DROP COLUMN``).
+
+        Only for tables no foreign key points at; the caller recreates indexes.
+        """
+        match = re.search(
+            rf"CREATE TABLE IF NOT EXISTS {table} \(.*?\n\);", _SCHEMA, re.DOTALL,
+        )
+        create = match.group(0).replace(
+            f"CREATE TABLE IF NOT EXISTS {table} (", f"CREATE TABLE {table}__new (", 1,
+        )
+        self.conn.execute(create)
+        new_cols = [r["name"] for r in self.conn.execute(f"PRAGMA table_info({table}__new)")]
+        old_cols = {r["name"] for r in self.conn.execute(f"PRAGMA table_info({table})")}
+        cols = ", ".join(c for c in new_cols if c in old_cols)
+        self.conn.execute(f"INSERT INTO {table}__new ({cols}) SELECT {cols} FROM {table}")
+        self.conn.execute(f"DROP TABLE {table}")
+        self.conn.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
+
+    def _migrate_candles_schema(self) -> None:
+        """Create the candles (and bucket existing trades into them once)."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candles'"
+        ).fetchone()
+        if exists is not None:
+            return
+        # Open/close are the first/last trade by id in each bucket.  Archived
+        # trades and past belief samples are gone, so they are not bucketed.
+        backfill = "".join(
+            f"""
+            INSERT OR REPLACE INTO candles
+                (market_id, resolution_s, bucket_us, open, high, low, close, volume, trade_count)
+            SELECT g.market_id, {res_s}, g.bucket_us, o.price_after, g.high, g.low,
+                   c.price_after, g.volume, g.n
+            FROM (
+                SELECT market_id, created_us - created_us % {res_s * 1_000_000} AS bucket_us,
+                       MIN(id) AS first_id, MAX(id) AS last_id,
+                       MAX(price_after) AS high, MIN(price_after) AS low,
+                       SUM(shares) AS volume, COUNT(*) AS n
+                FROM trades
+                GROUP BY market_id, bucket_us
+            ) g
+            JOIN trades o ON o.id = g.first_id
+            JOIN trades c ON c.id = g.last_id;
+            """
+            for res_s in CANDLE_RESOLUTIONS.values()
+        )
+        self.conn.executescript(
+            "BEGIN IMMEDIATE;\n" + _CANDLES_SCHEMA + backfill + "COMMIT;\n"
+        )
+
+    def _migrate_belief_stats_schema(self) -> None:
+        """Create the belief running sums (and backfill them once for existing data)."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'market_belief_stats'"
+        ).fetchone()
+        if exists is not None:
+            return
+        # One script so table, triggers and backfill commit together; the
+        # backfill is INSERT OR REPLACE so a racing second run is harmless.
+        self.conn.executescript(
+            "BEGIN IMMEDIATE;\n"
+            + _BELIEF_STATS_SCHEMA
+            + """
+            INSERT OR REPLACE INTO market_belief_stats (market_id, belief_sum, belief_count)
+            SELECT p.market_id, SUM(COALESCE(p.belief, a.belief)), COUNT(*)
+            FROM positions p
+            JOIN agents a ON a.id = p.agent_id
+            WHERE a.deleted_at IS NULL AND COALESCE(p.belief, a.belief) IS NOT NULL
+            GROUP BY p.market_id;
+            COMMIT;
+            """
+        )
+
+    def _migrate_agent_market_stats_schema(self) -> None:
+        """Create the per-agent market stats (and backfill them once for existing data)."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'agent_market_stats'"
+        ).fetchone()
+        if exists is not None:
+            return
+        # Archived markets only kept counts, so their volume and cash flow
+        # start from zero.
+        self.conn.executescript(
+            "BEGIN IMMEDIATE;\n"
+            + _AGENT_MARKET_STATS_SCHEMA
+            + """
+            INSERT OR REPLACE INTO agent_market_stats
+                (agent_id, market_id, trade_count, volume, cash_flow, last_trade_us)
+            SELECT agent_id, market_id, SUM(n), SUM(volume), SUM(cash_flow), MAX(last_us)
+            FROM (
+                SELECT agent_id, market_id, COUNT(*) AS n, SUM(shares) AS volume,
+                       SUM(CASE WHEN side = 'sell' THEN cost ELSE -cost END) AS cash_flow,
+                       MAX(created_us) AS last_us
+                FROM trades
+                GROUP BY agent_id, market_id
+                UNION ALL
+                SELECT agent_id, market_id, trade_count, 0.0, 0.0, last_trade_us
+                FROM archived_agent_trades
+            )
+            GROUP BY agent_id, market_id;
+            COMMIT;
+            """
+        )
+
     def close(self) -> None:
         if self._owns_conn:
             self.conn.close()
@@ -223,7 +723,7 @@ class MarketStore:
             center = 0.5
         rng = np.random.default_rng(self._belief_seed(int(agent_row["id"]), int(market_row["id"])))
         noisy = center + float(rng.normal(0.0, _INITIAL_BELIEF_NOISE_STD))
-        return float(np.clip(noisy, 0.01, 0.99))
+        return min(0.99, max(0.01, noisy))
 
     def _ensure_position_row(self, agent_id: int, market_id: int) -> None:
         """
@@ -251,6 +751,40 @@ class MarketStore:
             (agent_id, market_id, initial_belief),
         )
 
+    def _ensure_position_rows(self, agent_ids: Sequence[int], market_id: int) -> None:
+        """
+        Bulk variant of :meth:`_ensure_position_row` (one ``executemany``).
+
+        Caller is responsible for wrapping this in a transaction.
+        """
+        market = self.conn.execute(
+            "SELECT id, ground_truth FROM markets WHERE id = ?",
+            (market_id,),
+        ).fetchone()
+        if market is None:
+            raise ValueError(f"Market {market_id} not found")
+        agents: Dict[int, sqlite3.Row] = {}
+        for chunk in _chunks(list(agent_ids)):
+            placeholders = ",".join("?" for _ in chunk)
+            for row in self.conn.execute(
+                f"SELECT id, belief FROM agents "
+                f"WHERE id IN ({placeholders}) AND deleted_at IS NULL",
+                list(chunk),
+            ).fetchall():
+                agents[int(row["id"])] = row
+        params = []
+        for agent_id in agent_ids:
+            agent = agents.get(int(agent_id))
+            if agent is None:
+                raise ValueError(f"Agent {agent_id} not found")
+            params.append((agent_id, market_id, self._initial_position_belief(agent, market)))
+        self.conn.executemany(
+            "INSERT INTO positions (agent_id, market_id, yes_shares, belief) "
+            "VALUES (?, ?, 0.0, ?) "
+            "ON CONFLICT(agent_id, market_id) DO NOTHING",
+            params,
+        )
+
     # ── LMSR math (pure functions) ─────────────────────────────────────
 
     @staticmethod
@@ -364,6 +898,39 @@ class MarketStore:
             rows = self.conn.execute("SELECT * FROM markets ORDER BY id").fetchall()
         return [self._market_row_to_dict(r) for r in rows]
 
+    def list_markets_page(
+        self,
+        status: Optional[str] = None,
+        *,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """One page of markets in id order; pass ``next_cursor`` back to continue."""
+        _check_page_args(limit, offset, cursor)
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        total_row = self.conn.execute(
+            f"SELECT COUNT(*) AS c FROM markets{where}", params
+        ).fetchone()
+        if cursor is not None:
+            clauses.append("id > ?")
+            params.append(decode_cursor(cursor))
+            where = " WHERE " + " AND ".join(clauses)
+        rows = self.conn.execute(
+            f"SELECT * FROM markets{where} ORDER BY id LIMIT ? OFFSET ?",
+            [*params, limit + 1, offset],
+        ).fetchall()
+        return {
+            "markets": [self._market_row_to_dict(r) for r in rows[:limit]],
+            "total": int(total_row["c"] if total_row is not None else 0),
+            "next_cursor": _next_cursor(rows, limit),
+        }
+
     def get_price(self, market_id: int) -> float:
         row = self.conn.execute(
             "SELECT mechanism, inv_yes, inv_no, b FROM markets WHERE id = ?",
@@ -434,53 +1001,121 @@ class MarketStore:
                 "WHERE id = ?",
                 (outcome, now, market_id),
             )
-            positions = self.conn.execute(
-                """
-                SELECT p.agent_id, p.yes_shares, a.name, a.cash
-                FROM positions p
-                JOIN agents a ON a.id = p.agent_id
-                WHERE p.market_id = ?
-                """,
-                (market_id,),
-            ).fetchall()
-            settled_rows: List[Dict[str, Any]] = []
-            total_payout = 0.0
-            for pos in positions:
-                yes_shares = float(pos["yes_shares"])
-                payout = yes_shares * payoff
+            # One set-based credit instead of an UPDATE per position row.
+            if payoff != 0.0 and _HAS_UPDATE_FROM:
                 self.conn.execute(
-                    "UPDATE agents SET cash = cash + ? WHERE id = ?",
-                    (payout, pos["agent_id"]),
+                    """
+                    UPDATE agents SET cash = agents.cash + p.yes_shares * ?
+                    FROM positions p
+                    WHERE p.agent_id = agents.id AND p.market_id = ?
+                    """,
+                    (payoff, market_id),
                 )
-                total_payout += float(payout)
-                settled_rows.append(
-                    {
-                        "agent_id": int(pos["agent_id"]),
-                        "name": str(pos["name"]),
-                        "yes_shares": yes_shares,
-                        "payout": float(payout),
-                        "cash_after": float(pos["cash"]) + float(payout),
-                    }
+            elif payoff != 0.0:
+                self.conn.execute(
+                    """
+                    UPDATE agents SET cash = cash + ? * (
+                        SELECT p.yes_shares FROM positions p
+                        WHERE p.agent_id = agents.id AND p.market_id = ?
+                    )
+                    WHERE id IN (SELECT agent_id FROM positions WHERE market_id = ?)
+                    """,
+                    (payoff, market_id, market_id),
                 )
-        winners = sorted(
-            settled_rows,
-            key=lambda row: (-float(row["payout"]), int(row["agent_id"])),
-        )[:10]
-        losers = sorted(
-            settled_rows,
-            key=lambda row: (float(row["payout"]), int(row["agent_id"])),
-        )[:10]
+            summary = self._settlement_summary(market_id, payoff)
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO settlements (
+                    market_id, outcome, payoff_per_yes_share, positions_settled,
+                    total_payout, winners, losers, resolved_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    market_id, outcome, payoff, summary["positions_settled"],
+                    summary["total_payout"], json.dumps(summary["winners"]),
+                    json.dumps(summary["losers"]), now,
+                ),
+            )
         return {
             "market_id": market_id,
             "outcome": outcome,
             "payoff_per_yes_share": payoff,
-            "positions_settled": len(positions),
-            "total_payout": float(total_payout),
-            "winners": winners,
-            "losers": losers,
+            "positions_settled": summary["positions_settled"],
+            "total_payout": summary["total_payout"],
+            "winners": summary["winners"],
+            "losers": summary["losers"],
             "resolved_at": now,
         }
 
+    def _settlement_summary(self, market_id: int, payoff: float) -> Dict[str, Any]:
+        """Totals plus top/bottom 10 payouts via aggregate and ORDER BY/LIMIT queries."""
+        totals = self.conn.execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(yes_shares), 0.0) AS shares "
+            "FROM positions WHERE market_id = ?",
+            (market_id,),
+        ).fetchone()
+
+        def _top(order: str) -> List[Dict[str, Any]]:
+            rows = self.conn.execute(
+                f"""
+                SELECT p.agent_id, a.name, p.yes_shares,
+                       p.yes_shares * ? AS payout, a.cash
+                FROM positions p
+                JOIN agents a ON a.id = p.agent_id
+                WHERE p.market_id = ? AND a.deleted_at IS NULL
+                ORDER BY payout {order}, p.agent_id
+                LIMIT 10
+                """,
+                (payoff, market_id),
+            ).fetchall()
+            return [
+                {
+                    "agent_id": int(r["agent_id"]),
+                    "name": str(r["name"]),
+                    "yes_shares": float(r["yes_shares"]),
+                    "payout": float(r["payout"]),
+                    "cash_after": float(r["cash"]),
+                }
+                for r in rows
+            ]
+
+        return {
+            "positions_settled": int(totals["n"]),
+            "total_payout": float(totals["shares"]) * payoff,
+            "winners": _top("DESC"),
+            "losers": _top("ASC"),
+        }
+
+    def get_settlement(self, market_id: int) -> Dict[str, Any]:
+        """Persisted settlement summary for a resolved market (one row read)."""
+        row = self.conn.execute(
+            "SELECT * FROM settlements WHERE market_id = ?", (market_id,)
+        ).fetchone()
+        if row is not None:
+            return {
+                "market_id": int(row["market_id"]),
+                "outcome": row["outcome"],
+                "payoff_per_yes_share": float(row["payoff_per_yes_share"]),
+                "positions_settled": int(row["positions_settled"]),
+                "total_payout": float(row["total_payout"]),
+                "winners": json.loads(row["winners"]),
+                "losers": json.loads(row["losers"]),
+                "resolved_at": row["resolved_at"],
+            }
+        # Markets resolved before the settlements table existed: rebuild the
+        # summary from positions (cash_after is then current cash).
+        mkt = self.get_market(market_id)
+        if mkt["status"] != "resolved":
+            raise ValueError(f"Market {market_id} is not resolved")
+        outcome = str(mkt.get("resolution") or "no")
+        payoff = 1.0 if outcome == "yes" else 0.0
+        summary = self._settlement_summary(market_id, payoff)
+        summary.update(
+            market_id=int(market_id), outcome=outcome,
+            payoff_per_yes_share=payoff, resolved_at=mkt.get("resolved_at"),
+        )
+        return summary
+
     # ── Agents ─────────────────────────────────────────────────────────
 
     def create_agent(
@@ -503,6 +1138,60 @@ class MarketStore:
         row = self.conn.execute("SELECT * FROM agents WHERE id = ?", (agent_id,)).fetchone()
         return self._agent_row_to_dict(row)
 
+    def create_agents_bulk(
+        self,
+        agents: Sequence[Dict[str, Any]],
+        *,
+        market_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert many agents with one ``executemany`` inside a single transaction.
+
+        Each item carries ``name`` and ``cash`` plus optional ``belief``, ``rho``
+        and ``personality``.  With *market_id*, position rows are created for
+        every new agent in the same transaction.
+        """
+        if not agents:
+            return []
+        names = [str(a["name"]) for a in agents]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate agent names in bulk request")
+        now = datetime.now(timezone.utc).isoformat()
+        with self._transaction():
+            if market_id is not None:
+                mkt = self.conn.execute(
+                    "SELECT id FROM markets WHERE id = ?", (market_id,)
+                ).fetchone()
+                if mkt is None:
+                    raise ValueError(f"Market {market_id} not found")
+            for chunk in _chunks(names):
+                placeholders = ",".join("?" for _ in chunk)
+                taken = self.conn.execute(
+                    f"SELECT name FROM agents WHERE name IN ({placeholders}) LIMIT 1",
+                    list(chunk),
+                ).fetchone()
+                if taken is not None:
+                    raise ValueError(f"Agent name {taken['name']!r} already exists")
+            # AUTOINCREMENT ids are strictly increasing, so the new rows are
+            # exactly those above the current maximum.
+            last_id = self.conn.execute(
+                "SELECT COALESCE(MAX(id), 0) AS m FROM agents"
+            ).fetchone()["m"]
+            self.conn.executemany(
+                "INSERT INTO agents (name, cash, belief, rho, personality, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (name, a["cash"], a.get("belief"), a.get("rho"), a.get("personality"), now)
+                    for name, a in zip(names, agents)
+                ],
+            )
+            rows = self.conn.execute(
+                "SELECT * FROM agents WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+            if market_id is not None:
+                self._ensure_position_rows([int(r["id"]) for r in rows], market_id)
+        return [self._agent_row_to_dict(r) for r in rows]
+
     def get_agent(self, agent_id: int) -> Dict[str, Any]:
         row = self.conn.execute(
             "SELECT * FROM agents WHERE id = ? AND deleted_at IS NULL",
@@ -517,22 +1206,26 @@ class MarketStore:
         *,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        if limit < 1:
-            raise ValueError("limit must be >= 1")
-        if offset < 0:
-            raise ValueError("offset must be >= 0")
+        _check_page_args(limit, offset, cursor)
         total_row = self.conn.execute(
             "SELECT COUNT(*) AS c FROM agents WHERE deleted_at IS NULL"
         ).fetchone()
         total = int(total_row["c"] if total_row is not None else 0)
+        after_id = decode_cursor(cursor) if cursor is not None else 0
         rows = self.conn.execute(
-            "SELECT * FROM agents WHERE deleted_at IS NULL ORDER BY id LIMIT ? OFFSET ?",
-            (limit, offset),
+            """
+            SELECT * FROM agents
+            WHERE deleted_at IS NULL AND id > ?
+            ORDER BY id LIMIT ? OFFSET ?
+            """,
+            (after_id, limit + 1, offset),
         ).fetchall()
         return {
-            "agents": [self._agent_row_to_dict(r) for r in rows],
+            "agents": [self._agent_row_to_dict(r) for r in rows[:limit]],
             "total": total,
+            "next_cursor": _next_cursor(rows, limit),
         }
 
     def update_agent(
@@ -591,6 +1284,9 @@ class MarketStore:
                 "UPDATE positions SET belief = ? WHERE agent_id = ? AND market_id = ?",
                 (new_belief, agent_id, market_id),
             )
+            self._record_candle(
+                market_id, now_us(), mean_belief=self.mean_belief_for_market(market_id),
+            )
         return old_belief
 
     def soft_delete_agent(self, agent_id: int) -> Dict[str, Any]:
@@ -750,13 +1446,17 @@ class MarketStore:
                 "DO UPDATE SET yes_shares = yes_shares + ?",
                 (agent_id, market_id, share_delta, share_delta),
             )
-            now = datetime.now(timezone.utc).isoformat()
+            now = now_us()
             cur = self.conn.execute(
                 "INSERT INTO trades "
-                "(market_id, agent_id, side, shares, cost, price_before, price_after, created_at) "
+                "(market_id, agent_id, side, shares, cost, price_before, price_after, created_us) "
                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
                 (market_id, agent_id, side, shares, cost, price_before, price_after, now),
             )
+            self._record_candle(
+                market_id, now, prices=[price_after], volume=shares,
+                mean_belief=self.mean_belief_for_market(market_id),
+            )
 
         return {
             "trade_id": cur.lastrowid,
@@ -799,6 +1499,14 @@ class MarketStore:
         self, *, agent_id: int, market_id: int, side: str,
         quantity: float, limit_price: Optional[float], is_market: bool,
     ) -> Dict[str, Any]:
+        """
+        Match against the opposite side, then rest any limit remainder.
+
+        Fills are streamed from one cursor over the crossing orders in
+        price-time priority.  Cash, position and order changes accumulate in
+        memory and are written back with a few ``executemany`` calls at the
+        end, so the statement count does not grow with the number of fills.
+        """
         if side not in ("buy", "sell"):
             raise ValueError(f"side must be 'buy' or 'sell', got {side!r}")
         if quantity <= 0:
@@ -830,127 +1538,107 @@ class MarketStore:
 
             price_before = self._cda_reference_price(market_id)
             remaining = float(quantity)
-            matched_trades: List[Dict[str, Any]] = []
             eps = 1e-12
-            now = datetime.now(timezone.utc).isoformat()
-
-            while remaining > eps:
-                if side == "buy":
-                    best = self._cda_best_ask(market_id)
-                    if best is None:
-                        break
-                    if not is_market and limit_price is not None and limit_price < best:
-                        break
-                    resting = self.conn.execute(
-                        "SELECT * FROM orders "
-                        "WHERE market_id = ? AND side = 'sell' AND status = 'open' "
-                        "  AND price = ? ORDER BY id ASC LIMIT 1",
-                        (market_id, best),
-                    ).fetchone()
-                    if resting is None:
-                        break
-                    executed = min(remaining, resting["remaining"])
-                    trade_price = resting["price"]
-                    notional = trade_price * executed
-                    buyer_cash = self.conn.execute(
-                        "SELECT cash FROM agents WHERE id = ?", (agent_id,)
-                    ).fetchone()["cash"]
-                    if buyer_cash < notional:
+            now = now_us()
+
+            # Running cash per agent (exact sequential arithmetic, written back
+            # as absolute values), share deltas, and touched resting orders.
+            cash: Dict[int, float] = {agent_id: float(agent["cash"])}
+            shares: Dict[int, float] = {}
+            order_updates: List[Tuple[float, str, int]] = []
+            fills: List[Tuple[int, float, float]] = []  # (counterparty, qty, price)
+
+            book_side, direction = ("sell", "ASC") if side == "buy" else ("buy", "DESC")
+            sql = (
+                "SELECT o.id, o.agent_id, o.price, o.remaining, a.cash "
+                "FROM orders o JOIN agents a ON a.id = o.agent_id "
+                "WHERE o.market_id = ? AND o.side = ? AND o.status = 'open'"
+            )
+            params: List[Any] = [market_id, book_side]
+            if not is_market and limit_price is not None:
+                sql += " AND o.price <= ?" if side == "buy" else " AND o.price >= ?"
+                params.append(limit_price)
+            sql += f" ORDER BY o.price {direction}, o.id ASC"
+
+            for resting in self.conn.execute(sql, params):
+                if remaining <= eps:
+                    break
+                other = int(resting["agent_id"])
+                cash.setdefault(other, float(resting["cash"]))
+                executed = min(remaining, resting["remaining"])
+                trade_price = resting["price"]
+                notional = trade_price * executed
+                buyer, seller = (agent_id, other) if side == "buy" else (other, agent_id)
+                if cash[buyer] < notional:
+                    if side == "buy":
                         break
-                    self.conn.execute("UPDATE agents SET cash = cash - ? WHERE id = ?", (notional, agent_id))
-                    self.conn.execute("UPDATE agents SET cash = cash + ? WHERE id = ?", (notional, resting["agent_id"]))
-                    self._ensure_position_row(agent_id, market_id)
-                    self._ensure_position_row(resting["agent_id"], market_id)
-                    self.conn.execute(
-                        "INSERT INTO positions (agent_id, market_id, yes_shares) VALUES (?, ?, ?) "
-                        "ON CONFLICT(agent_id, market_id) DO UPDATE SET yes_shares = yes_shares + ?",
-                        (agent_id, market_id, executed, executed),
-                    )
-                    self.conn.execute(
-                        "INSERT INTO positions (agent_id, market_id, yes_shares) VALUES (?, ?, ?) "
-                        "ON CONFLICT(agent_id, market_id) DO UPDATE SET yes_shares = yes_shares + ?",
-                        (resting["agent_id"], market_id, -executed, -executed),
-                    )
-                    new_rem = resting["remaining"] - executed
-                    if new_rem <= eps:
-                        self.conn.execute("UPDATE orders SET remaining = 0, status = 'filled' WHERE id = ?", (resting["id"],))
-                    else:
-                        self.conn.execute("UPDATE orders SET remaining = ? WHERE id = ?", (new_rem, resting["id"]))
-                    self.conn.execute("UPDATE markets SET last_trade_price = ? WHERE id = ?", (trade_price, market_id))
-                    cur = self.conn.execute(
-                        "INSERT INTO trades (market_id, agent_id, side, shares, cost, price_before, price_after, created_at) "
-                        "VALUES (?, ?, 'buy', ?, ?, ?, ?, ?)",
-                        (market_id, agent_id, executed, notional, trade_price, trade_price, now),
-                    )
-                    matched_trades.append({
-                        "trade_id": cur.lastrowid, "buyer_id": agent_id,
-                        "seller_id": resting["agent_id"], "price": trade_price,
-                        "quantity": executed, "aggressor_side": "buy",
-                    })
-                    remaining -= executed
+                    # A resting bid its owner can no longer pay for is dropped.
+                    order_updates.append((resting["remaining"], "cancelled", resting["id"]))
+                    continue
+                cash[buyer] -= notional
+                cash[seller] += notional
+                shares[buyer] = shares.get(buyer, 0.0) + executed
+                shares[seller] = shares.get(seller, 0.0) - executed
+                new_rem = resting["remaining"] - executed
+                if new_rem <= eps:
+                    order_updates.append((0.0, "filled", resting["id"]))
                 else:
-                    best = self._cda_best_bid(market_id)
-                    if best is None:
-                        break
-                    if not is_market and limit_price is not None and limit_price > best:
-                        break
-                    resting = self.conn.execute(
-                        "SELECT * FROM orders "
-                        "WHERE market_id = ? AND side = 'buy' AND status = 'open' "
-                        "  AND price = ? ORDER BY id ASC LIMIT 1",
-                        (market_id, best),
-                    ).fetchone()
-                    if resting is None:
-                        break
-                    executed = min(remaining, resting["remaining"])
-                    trade_price = resting["price"]
-                    notional = trade_price * executed
-                    resting_buyer_cash = self.conn.execute(
-                        "SELECT cash FROM agents WHERE id = ?", (resting["agent_id"],)
-                    ).fetchone()["cash"]
-                    if resting_buyer_cash < notional:
-                        self.conn.execute("UPDATE orders SET status = 'cancelled' WHERE id = ?", (resting["id"],))
-                        continue
-                    self.conn.execute("UPDATE agents SET cash = cash + ? WHERE id = ?", (notional, agent_id))
-                    self.conn.execute("UPDATE agents SET cash = cash - ? WHERE id = ?", (notional, resting["agent_id"]))
-                    self._ensure_position_row(agent_id, market_id)
-                    self._ensure_position_row(resting["agent_id"], market_id)
-                    self.conn.execute(
-                        "INSERT INTO positions (agent_id, market_id, yes_shares) VALUES (?, ?, ?) "
-                        "ON CONFLICT(agent_id, market_id) DO UPDATE SET yes_shares = yes_shares + ?",
-                        (agent_id, market_id, -executed, -executed),
-                    )
-                    self.conn.execute(
-                        "INSERT INTO positions (agent_id, market_id, yes_shares) VALUES (?, ?, ?) "
-                        "ON CONFLICT(agent_id, market_id) DO UPDATE SET yes_shares = yes_shares + ?",
-                        (resting["agent_id"], market_id, executed, executed),
-                    )
-                    new_rem = resting["remaining"] - executed
-                    if new_rem <= eps:
-                        self.conn.execute("UPDATE orders SET remaining = 0, status = 'filled' WHERE id = ?", (resting["id"],))
-                    else:
-                        self.conn.execute("UPDATE orders SET remaining = ? WHERE id = ?", (new_rem, resting["id"]))
-                    self.conn.execute("UPDATE markets SET last_trade_price = ? WHERE id = ?", (trade_price, market_id))
-                    cur = self.conn.execute(
-                        "INSERT INTO trades (market_id, agent_id, side, shares, cost, price_before, price_after, created_at) "
-                        "VALUES (?, ?, 'sell', ?, ?, ?, ?, ?)",
-                        (market_id, agent_id, executed, notional, trade_price, trade_price, now),
-                    )
+                    order_updates.append((new_rem, "open", resting["id"]))
+                fills.append((other, executed, trade_price))
+                remaining -= executed
+
+            matched_trades: List[Dict[str, Any]] = []
+            if fills:
+                self._ensure_position_rows(list(shares), market_id)
+                self.conn.executemany(
+                    "UPDATE agents SET cash = ? WHERE id = ?",
+                    [(c, aid) for aid, c in cash.items() if aid in shares],
+                )
+                self.conn.executemany(
+                    "UPDATE positions SET yes_shares = yes_shares + ? "
+                    "WHERE agent_id = ? AND market_id = ?",
+                    [(dq, aid, market_id) for aid, dq in shares.items()],
+                )
+                self.conn.execute(
+                    "UPDATE markets SET last_trade_price = ? WHERE id = ?",
+                    (fills[-1][2], market_id),
+                )
+                self.conn.executemany(
+                    "INSERT INTO trades (market_id, agent_id, side, shares, cost, price_before, price_after, created_us) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(market_id, agent_id, side, q, p * q, p, p, now) for _, q, p in fills],
+                )
+                # AUTOINCREMENT ids of one executemany under the write lock are consecutive.
+                last_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                first_id = last_id - len(fills) + 1
+                for i, (other, q, p) in enumerate(fills):
+                    buyer, seller = (agent_id, other) if side == "buy" else (other, agent_id)
                     matched_trades.append({
-                        "trade_id": cur.lastrowid, "buyer_id": resting["agent_id"],
-                        "seller_id": agent_id, "price": trade_price,
-                        "quantity": executed, "aggressor_side": "sell",
+                        "trade_id": first_id + i, "buyer_id": buyer,
+                        "seller_id": seller, "price": p,
+                        "quantity": q, "aggressor_side": side,
                     })
-                    remaining -= executed
+            if order_updates:
+                self.conn.executemany(
+                    "UPDATE orders SET remaining = ?, status = ? WHERE id = ?", order_updates,
+                )
 
             resting_order_id = None
             if not is_market and remaining > eps and limit_price is not None:
                 cur = self.conn.execute(
-                    "INSERT INTO orders (market_id, agent_id, side, price, quantity, remaining, created_at) "
+                    "INSERT INTO orders (market_id, agent_id, side, price, quantity, remaining, created_us) "
                     "VALUES (?, ?, ?, ?, ?, ?, ?)",
                     (market_id, agent_id, side, limit_price, quantity, remaining, now),
                 )
                 resting_order_id = cur.lastrowid
+            if matched_trades:
+                self._record_passive_fills(market_id, now, matched_trades)
+                self._record_candle(
+                    market_id, now,
+                    prices=[t["price"] for t in matched_trades],
+                    volume=sum(t["quantity"] for t in matched_trades),
+                    mean_belief=self.mean_belief_for_market(market_id),
+                )
             price_after = self._cda_reference_price(market_id)
 
         return {
@@ -967,7 +1655,17 @@ class MarketStore:
         agent_id: Optional[int] = None,
         since_trade_id: Optional[int] = None,
         limit: int = 100,
+        before_trade_id: Optional[int] = None,
+        *,
+        since_ts: Any = None,
+        until_ts: Any = None,
     ) -> List[Dict[str, Any]]:
+        """
+        Newest-first trades; ``before_trade_id`` pages further back.
+
+        ``since_ts``/``until_ts`` bound the half-open window
+        ``[since_ts, until_ts)`` (anything :func:`to_epoch_us` accepts).
+        """
         clauses: List[str] = []
         params: List[Any] = []
         if market_id is not None:
@@ -979,12 +1677,167 @@ class MarketStore:
         if since_trade_id is not None:
             clauses.append("id > ?")
             params.append(since_trade_id)
+        if before_trade_id is not None:
+            clauses.append("id < ?")
+            params.append(before_trade_id)
+        self._time_window_clauses(clauses, params, since_ts, until_ts)
         where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
         params.append(limit)
         rows = self.conn.execute(
             f"SELECT * FROM trades{where} ORDER BY id DESC LIMIT ?", params
         ).fetchall()
-        return [dict(r) for r in rows]
+        return [self._trade_row_to_dict(r) for r in rows]
+
+    @staticmethod
+    def _time_window_clauses(
+        clauses: List[str], params: List[Any], since_ts: Any, until_ts: Any,
+    ) -> None:
+        if since_ts is not None:
+            clauses.append("created_us >= ?")
+            params.append(to_epoch_us(since_ts))
+        if until_ts is not None:
+            clauses.append("created_us < ?")
+            params.append(to_epoch_us(until_ts))
+
+    def trade_window_stats(
+        self, market_id: int, *, since_ts: Any = None, until_ts: Any = None,
+    ) -> Dict[str, Any]:
+        """
+        Trade count, share volume, notional and distinct traders in a time window.
+
+        Served from the ``(market_id, created_us)`` index, so recent windows on
+        long-running markets stay cheap.
+        """
+        clauses = ["market_id = ?"]
+        params: List[Any] = [market_id]
+        self._time_window_clauses(clauses, params, since_ts, until_ts)
+        row = self.conn.execute(
+            f"""
+            SELECT
+                COUNT(*) AS trade_count,
+                COALESCE(SUM(ABS(shares)), 0.0) AS volume,
+                COALESCE(SUM(ABS(cost)), 0.0) AS notional,
+                COUNT(DISTINCT agent_id) AS traders,
+                MIN(created_us) AS first_us,
+                MAX(created_us) AS last_us
+            FROM trades
+            WHERE {" AND ".join(clauses)}
+            """,
+            params,
+        ).fetchone()
+        return {
+            "market_id": int(market_id),
+            "since": None if since_ts is None else us_to_iso(to_epoch_us(since_ts)),
+            "until": None if until_ts is None else us_to_iso(to_epoch_us(until_ts)),
+            "trade_count": int(row["trade_count"]),
+            "volume": float(row["volume"]),
+            "notional": float(row["notional"]),
+            "traders": int(row["traders"]),
+            "first_trade_at": us_to_iso(row["first_us"]),
+            "last_trade_at": us_to_iso(row["last_us"]),
+        }
+
+    # ── Candles ────────────────────────────────────────────────────────
+
+    def _record_candle(
+        self,
+        market_id: int,
+        ts_us: int,
+        *,
+        prices: Sequence[float] = (),
+        volume: float = 0.0,
+        mean_belief: Optional[float] = None,
+    ) -> None:
+        """
+        Fold fills (in execution order) and/or a mean-belief sample into every
+        resolution's bucket.  Caller is responsible for the transaction.
+        """
+        if prices:
+            o, h, l, c = prices[0], max(prices), min(prices), prices[-1]
+        else:
+            o = h = l = c = None
+        b_sum, b_n = (float(mean_belief), 1) if mean_belief is not None else (0.0, 0)
+        params: List[Any] = []
+        for res_s in CANDLE_RESOLUTIONS.values():
+            params += (market_id, res_s, ts_us - ts_us % (res_s * 1_000_000),
+                       o, h, l, c, float(volume), len(prices), b_sum, b_n)
+        self.conn.execute(_CANDLE_UPSERT, params)
+
+    def _record_passive_fills(
+        self, market_id: int, ts_us: int, trades: Sequence[Dict[str, Any]],
+    ) -> None:
+        """
+        Credit the resting counterparty of each CDA fill in ``agent_market_stats``
+        (the trade row, and so the trigger, only names the aggressor).  Caller
+        is responsible for the transaction.
+        """
+        rows = []
+        for t in trades:
+            notional = t["price"] * t["quantity"]
+            if t["aggressor_side"] == "buy":
+                rows.append((t["seller_id"], market_id, t["quantity"], notional, ts_us))
+            else:
+                rows.append((t["buyer_id"], market_id, t["quantity"], -notional, ts_us))
+        self.conn.executemany(_AGENT_STATS_UPSERT, rows)
+
+    def mean_belief_for_market(self, market_id: int) -> Optional[float]:
+        """O(1) mean position belief from the running sums."""
+        row = self.conn.execute(
+            "SELECT belief_sum, belief_count FROM market_belief_stats WHERE market_id = ?",
+            (market_id,),
+        ).fetchone()
+        if row is None or row["belief_count"] <= 0:
+            return None
+        return float(row["belief_sum"]) / int(row["belief_count"])
+
+    def record_mean_belief(
+        self, market_id: int, mean_belief: float, *, at_ts: Any = None,
+    ) -> None:
+        """Add a mean-belief sample to the market's candles (defaults to now)."""
+        ts_us = now_us() if at_ts is None else to_epoch_us(at_ts)
+        with self._transaction():
+            self._record_candle(market_id, ts_us, mean_belief=mean_belief)
+
+    def get_candles(
+        self,
+        market_id: int,
+        resolution: str = "1m",
+        *,
+        since_ts: Any = None,
+        until_ts: Any = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Oldest-first buckets whose start lies in ``[since_ts, until_ts)``.
+
+        When more than ``limit`` buckets match, the most recent ones are kept.
+        ``open``/``high``/``low``/``close`` are ``None`` for buckets that only
+        saw belief updates.
+        """
+        res_s = CANDLE_RESOLUTIONS.get(resolution)
+        if res_s is None:
+            raise ValueError(
+                f"resolution must be one of {sorted(CANDLE_RESOLUTIONS)}, got {resolution!r}"
+            )
+        if not 1 <= limit <= _MAX_CANDLES:
+            raise ValueError(f"limit must be between 1 and {_MAX_CANDLES}")
+        clauses = ["market_id = ?", "resolution_s = ?"]
+        params: List[Any] = [market_id, res_s]
+        if since_ts is not None:
+            clauses.append("bucket_us >= ?")
+            params.append(to_epoch_us(since_ts))
+        if until_ts is not None:
+            clauses.append("bucket_us < ?")
+            params.append(to_epoch_us(until_ts))
+        params.append(limit)
+        rows = self.conn.execute(
+            f"SELECT * FROM candles WHERE {' AND '.join(clauses)} "
+            "ORDER BY bucket_us DESC LIMIT ?",
+            params,
+        ).fetchall()
+        return [self._candle_row_to_dict(r) for r in reversed(rows)]
+
+    # ── News events ────────────────────────────────────────────────────
 
     def create_news_event(
         self,
@@ -1001,7 +1854,7 @@ class MarketStore:
         mean_belief_before: float,
         mean_belief_after: float,
     ) -> Dict[str, Any]:
-        now = datetime.now(timezone.utc).isoformat()
+        now = now_us()
         with self._transaction():
             mkt = self.conn.execute("SELECT id FROM markets WHERE id = ?", (market_id,)).fetchone()
             if mkt is None:
@@ -1011,7 +1864,7 @@ class MarketStore:
                 INSERT INTO news_events (
                     market_id, headline, mode, requested_new_belief, requested_delta,
                     affected_fraction, min_signal_sensitivity, n_candidates, n_affected,
-                    mean_belief_before, mean_belief_after, created_at
+                    mean_belief_before, mean_belief_after, created_us
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
@@ -1032,11 +1885,9 @@ class MarketStore:
         *,
         limit: int = 200,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        if limit < 1:
-            raise ValueError("limit must be >= 1")
-        if offset < 0:
-            raise ValueError("offset must be >= 0")
+        _check_page_args(limit, offset, cursor)
         mkt = self.conn.execute("SELECT id FROM markets WHERE id = ?", (market_id,)).fetchone()
         if mkt is None:
             raise ValueError(f"Market {market_id} not found")
@@ -1045,18 +1896,24 @@ class MarketStore:
             (market_id,),
         ).fetchone()
         total = int(total_row["c"] if total_row is not None else 0)
+        params: List[Any] = [market_id]
+        keyset = ""
+        if cursor is not None:
+            keyset = " AND id < ?"
+            params.append(decode_cursor(cursor))
         rows = self.conn.execute(
-            """
+            f"""
             SELECT * FROM news_events
-            WHERE market_id = ?
+            WHERE market_id = ?{keyset}
             ORDER BY id DESC
             LIMIT ? OFFSET ?
             """,
-            (market_id, limit, offset),
+            [*params, limit + 1, offset],
         ).fetchall()
         return {
-            "events": [self._news_row_to_dict(r) for r in rows],
+            "events": [self._news_row_to_dict(r) for r in rows[:limit]],
             "total": total,
+            "next_cursor": _next_cursor(rows, limit),
         }
 
     # ── Row converters ─────────────────────────────────────────────────
@@ -1097,6 +1954,28 @@ class MarketStore:
             "deleted_at": row["deleted_at"],
         }
 
+    @staticmethod
+    def _candle_row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        samples = row["belief_samples"]
+        return {
+            "t": us_to_iso(row["bucket_us"]),
+            "t_us": row["bucket_us"],
+            "open": row["open"],
+            "high": row["high"],
+            "low": row["low"],
+            "close": row["close"],
+            "volume": row["volume"],
+            "trade_count": row["trade_count"],
+            "mean_belief": row["belief_sum"] / samples if samples else None,
+        }
+
+    @staticmethod
+    def _trade_row_to_dict(row: Any) -> Dict[str, Any]:
+        """Trade columns as-is plus the ISO ``created_at`` rendered from ``created_us``."""
+        out = dict(row)
+        out["created_at"] = us_to_iso(out["created_us"])
+        return out
+
     @staticmethod
     def _news_row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
         return {
@@ -1112,5 +1991,5 @@ class MarketStore:
             "n_affected": row["n_affected"],
             "mean_belief_before": row["mean_belief_before"],
             "mean_belief_after": row["mean_belief_after"],
-            "at_timestamp": row["created_at"],
+            "at_timestamp": us_to_iso(row["created_us"]),
         }
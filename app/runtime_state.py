@@ -0,0 +1,447 @@
+"""
+Shared runtime state for the market API, in its own SQLite database.
+
+The HTTP layer used to keep trader chat, mean-belief samples, the comment
+trade cursor, per-market LLM budgets and starting cash in module globals, so
+``uvicorn --workers N`` gave every worker a different view.
+:class:`RuntimeState` keeps them in SQLite next to the market database, where
+every worker (and a restarted server) sees the same rows:
+
+- ``market_runtime`` -- per market: starting cash, comment cursor / id
+  sequence, remaining LLM comment budget, mean-belief sample sequence;
+- ``market_comments`` and ``mean_belief_samples`` -- the chat rows and the
+  belief time series (trimmed to the newest ``max_samples``);
+- ``runner_lease``, ``runner_markets`` and ``runner_pending_agents`` -- the
+  bookkeeping :class:`runner_coordinator.RunnerCoordinator` uses to run the
+  autonomous agents in exactly one worker.
+
+Storage is a :mod:`storage_backend` backend: a file in WAL mode, or
+``":memory:"`` for a process-private database (tests, single worker).
+
+Like :class:`market_service.MarketService`, each handle also counts its own
+comment writes in memory (:meth:`RuntimeState.comment_version`), so a single
+worker can answer conditional GETs without reading this database.
+
+Usage:
+    state = RuntimeState("data/runtime.sqlite")
+    state.set_initial_cash(3, 100.0)
+    row = state.append_comment(3, expect_cursor=0, trade_id=41, agent_id=7, ...)
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from market_store import now_us, us_to_iso
+from storage_backend import StorageBackend, open_backend
+
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS market_runtime (
+    market_id      INTEGER PRIMARY KEY,
+    initial_cash   REAL,
+    comment_cursor INTEGER NOT NULL DEFAULT 0,
+    comment_seq    INTEGER NOT NULL DEFAULT 0,
+    llm_budget     INTEGER,
+    belief_seq     INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS market_comments (
+    market_id INTEGER NOT NULL,
+    id        INTEGER NOT NULL,
+    trade_id  INTEGER,
+    agent_id  INTEGER NOT NULL,
+    text      TEXT NOT NULL,
+    source    TEXT,
+    belief    REAL,
+    at_us     INTEGER NOT NULL,
+    PRIMARY KEY (market_id, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_market_comments_agent ON market_comments (agent_id);
+CREATE INDEX IF NOT EXISTS idx_market_comments_time ON market_comments (market_id, at_us);
+CREATE TABLE IF NOT EXISTS mean_belief_samples (
+    market_id   INTEGER NOT NULL,
+    seq         INTEGER NOT NULL,
+    t           TEXT NOT NULL,
+    mean_belief REAL NOT NULL,
+    PRIMARY KEY (market_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runner_lease (
+    id         INTEGER PRIMARY KEY CHECK (id = 1),
+    owner      TEXT NOT NULL,
+    expires_us INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runner_markets (
+    market_id  INTEGER PRIMARY KEY,
+    state      TEXT NOT NULL,
+    n_agents   INTEGER,
+    stop_info  TEXT,
+    error      TEXT,
+    updated_us INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runner_pending_agents (
+    agent_id INTEGER PRIMARY KEY,
+    row      TEXT NOT NULL
+);
+"""
+
+# ``runner_markets.state``: requested -> running -> stopping -> stopped (row then deleted).
+RUNNER_STARTING = "starting"
+RUNNER_RUNNING = "running"
+RUNNER_STOPPING = "stopping"
+RUNNER_STOPPED = "stopped"
+RUNNER_FAILED = "failed"
+_RUNNER_ACTIVE = (RUNNER_STARTING, RUNNER_RUNNING)
+
+
+def _comment_row(r: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": int(r["id"]),
+        "trade_id": r["trade_id"],
+        "agent_id": int(r["agent_id"]),
+        "text": r["text"],
+        "source": r["source"],
+        "belief": r["belief"],
+        "at": us_to_iso(r["at_us"]),
+        "at_us": int(r["at_us"]),
+    }
+
+
+class RuntimeState:
+    """Per-market API state and runner bookkeeping shared by every worker process."""
+
+    def __init__(self, db_path: Union[str, StorageBackend], *, profile: Optional[str] = None):
+        self._backend = open_backend(db_path, profile=profile)
+        self._local = threading.local()
+        self._conns_lock = threading.Lock()
+        self._conns: List[sqlite3.Connection] = []
+        self._version_lock = threading.Lock()
+        self._version_seq = 0
+        self._comment_versions: Dict[int, int] = {}
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._backend.connect()
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._backend.close()
+
+    def _bump_comments(self, market_id: int) -> None:
+        with self._version_lock:
+            self._version_seq += 1
+            self._comment_versions[int(market_id)] = self._version_seq
+
+    def comment_version(self, market_id: int) -> int:
+        """
+        Counter that changes after this handle stores or drops *market_id*'s
+        comments; other processes' writes are not seen.
+        """
+        return self._comment_versions.get(int(market_id), 0)
+
+    @staticmethod
+    def _ensure_market(conn: sqlite3.Connection, market_id: int) -> None:
+        conn.execute(
+            "INSERT OR IGNORE INTO market_runtime (market_id) VALUES (?)", (int(market_id),),
+        )
+
+    # ── Per-market values ─────────────────────────────────────────────
+
+    def set_initial_cash(self, market_id: int, cash: float) -> None:
+        with self._tx() as conn:
+            self._ensure_market(conn, market_id)
+            conn.execute(
+                "UPDATE market_runtime SET initial_cash = ? WHERE market_id = ?",
+                (float(cash), int(market_id)),
+            )
+
+    def initial_cash(self, market_id: int, default: float = 100.0) -> float:
+        row = self._conn().execute(
+            "SELECT initial_cash FROM market_runtime WHERE market_id = ?", (int(market_id),),
+        ).fetchone()
+        if row is None or row["initial_cash"] is None:
+            return default
+        return float(row["initial_cash"])
+
+    def drop_market(self, market_id: int) -> None:
+        """Forget everything kept for a deleted market."""
+        mid = int(market_id)
+        with self._tx() as conn:
+            for table in ("market_runtime", "market_comments", "mean_belief_samples"):
+                conn.execute(f"DELETE FROM {table} WHERE market_id = ?", (mid,))
+        self._bump_comments(mid)
+
+    # ── Trader chat ───────────────────────────────────────────────────
+
+    def comment_cursor(self, market_id: int) -> int:
+        """Id of the last trade a comment was generated for (0: none yet)."""
+        row = self._conn().execute(
+            "SELECT comment_cursor FROM market_runtime WHERE market_id = ?", (int(market_id),),
+        ).fetchone()
+        return int(row["comment_cursor"]) if row is not None else 0
+
+    def comment_seq(self, market_id: int) -> int:
+        """Id of the newest comment (0: none); also the comment count."""
+        row = self._conn().execute(
+            "SELECT comment_seq FROM market_runtime WHERE market_id = ?", (int(market_id),),
+        ).fetchone()
+        return int(row["comment_seq"]) if row is not None else 0
+
+    def llm_budget(self, market_id: int, initial: int) -> int:
+        """Remaining LLM comment attempts for the market (starts at *initial*)."""
+        row = self._conn().execute(
+            "SELECT llm_budget FROM market_runtime WHERE market_id = ?", (int(market_id),),
+        ).fetchone()
+        if row is None or row["llm_budget"] is None:
+            return int(initial)
+        return int(row["llm_budget"])
+
+    def append_comment(
+        self,
+        market_id: int,
+        *,
+        expect_cursor: int,
+        trade_id: int,
+        agent_id: int,
+        text: str,
+        source: Optional[str],
+        belief: Optional[float],
+        llm_budget_initial: int,
+        llm_used: int = 0,
+        at_us: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Store the comment for *trade_id* and advance the cursor to it.
+
+        Returns ``None`` (and stores nothing) when the cursor is no longer
+        *expect_cursor*: another worker commented on that trade first.
+        *llm_used* LLM attempts are taken off the market's budget.
+        """
+        mid = int(market_id)
+        at = int(at_us) if at_us is not None else now_us()
+        with self._tx() as conn:
+            self._ensure_market(conn, mid)
+            cur = conn.execute(
+                "SELECT comment_cursor, comment_seq, llm_budget FROM market_runtime WHERE market_id = ?",
+                (mid,),
+            ).fetchone()
+            if int(cur["comment_cursor"]) != int(expect_cursor):
+                return None
+            seq = int(cur["comment_seq"]) + 1
+            budget = int(llm_budget_initial) if cur["llm_budget"] is None else int(cur["llm_budget"])
+            conn.execute(
+                "INSERT INTO market_comments (market_id, id, trade_id, agent_id, text, source, belief, at_us)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (mid, seq, int(trade_id), int(agent_id), text, source,
+                 None if belief is None else float(belief), at),
+            )
+            conn.execute(
+                "UPDATE market_runtime SET comment_cursor = ?, comment_seq = ?, llm_budget = ?"
+                " WHERE market_id = ?",
+                (int(trade_id), seq, max(0, budget - int(llm_used)), mid),
+            )
+        self._bump_comments(mid)
+        return {
+            "id": seq,
+            "trade_id": int(trade_id),
+            "agent_id": int(agent_id),
+            "text": text,
+            "source": source,
+            "belief": None if belief is None else float(belief),
+            "at": us_to_iso(at),
+            "at_us": at,
+        }
+
+    def comments(self, market_id: int, since: int = 0) -> List[Dict[str, Any]]:
+        """Comments with id > *since*, oldest first."""
+        rows = self._conn().execute(
+            "SELECT * FROM market_comments WHERE market_id = ? AND id > ? ORDER BY id",
+            (int(market_id), int(since)),
+        ).fetchall()
+        return [_comment_row(r) for r in rows]
+
+    def comments_by_agent(self, agent_id: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """``(market_id, comment)`` for every comment *agent_id* wrote."""
+        rows = self._conn().execute(
+            "SELECT * FROM market_comments WHERE agent_id = ? ORDER BY market_id, id",
+            (int(agent_id),),
+        ).fetchall()
+        return [(int(r["market_id"]), _comment_row(r)) for r in rows]
+
+    def comment_beliefs_since(self, market_id: int, since_us: int) -> List[Tuple[float, int]]:
+        """``(belief, at_us)`` of comments made at or after *since_us*, oldest first."""
+        rows = self._conn().execute(
+            "SELECT belief, at_us FROM market_comments"
+            " WHERE market_id = ? AND at_us >= ? AND belief IS NOT NULL ORDER BY at_us",
+            (int(market_id), int(since_us)),
+        ).fetchall()
+        return [(float(r["belief"]), int(r["at_us"])) for r in rows]
+
+    # ── Mean-belief samples ───────────────────────────────────────────
+
+    def append_belief_sample(
+        self, market_id: int, t: str, mean_belief: float, *, max_samples: int,
+    ) -> Dict[str, Any]:
+        mid = int(market_id)
+        with self._tx() as conn:
+            self._ensure_market(conn, mid)
+            conn.execute(
+                "UPDATE market_runtime SET belief_seq = belief_seq + 1 WHERE market_id = ?", (mid,),
+            )
+            seq = conn.execute(
+                "SELECT belief_seq FROM market_runtime WHERE market_id = ?", (mid,),
+            ).fetchone()["belief_seq"]
+            conn.execute(
+                "INSERT INTO mean_belief_samples (market_id, seq, t, mean_belief) VALUES (?, ?, ?, ?)",
+                (mid, int(seq), str(t), float(mean_belief)),
+            )
+            conn.execute(
+                "DELETE FROM mean_belief_samples WHERE market_id = ? AND seq <= ?",
+                (mid, int(seq) - int(max_samples)),
+            )
+        return {"t": str(t), "mean_belief": float(mean_belief)}
+
+    def belief_samples(self, market_id: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """The newest *limit* samples (oldest first) and how many are kept."""
+        conn = self._conn()
+        mid = int(market_id)
+        total = conn.execute(
+            "SELECT COUNT(*) FROM mean_belief_samples WHERE market_id = ?", (mid,),
+        ).fetchone()[0]
+        rows = conn.execute(
+            "SELECT t, mean_belief FROM mean_belief_samples WHERE market_id = ?"
+            " ORDER BY seq DESC LIMIT ?",
+            (mid, max(0, int(limit))),
+        ).fetchall()
+        return [{"t": r["t"], "mean_belief": float(r["mean_belief"])} for r in reversed(rows)], int(total)
+
+    # ── Runner lease and requested markets ────────────────────────────
+
+    def acquire_lease(self, owner: str, ttl_s: float) -> bool:
+        """Take or renew the runner lease for *owner*; ``False`` while someone else holds it."""
+        now = now_us()
+        with self._tx() as conn:
+            row = conn.execute("SELECT owner, expires_us FROM runner_lease WHERE id = 1").fetchone()
+            if row is not None and row["owner"] != owner and int(row["expires_us"]) > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO runner_lease (id, owner, expires_us) VALUES (1, ?, ?)",
+                (owner, now + int(ttl_s * 1_000_000)),
+            )
+        return True
+
+    def release_lease(self, owner: str) -> None:
+        with self._tx() as conn:
+            conn.execute("DELETE FROM runner_lease WHERE id = 1 AND owner = ?", (owner,))
+
+    def lease_owner(self) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT owner FROM runner_lease WHERE id = 1 AND expires_us > ?", (now_us(),),
+        ).fetchone()
+        return row["owner"] if row is not None else None
+
+    def request_runner_start(self, market_id: int) -> bool:
+        """Ask for *market_id* to run; ``False`` if it already runs or is starting."""
+        with self._tx() as conn:
+            row = conn.execute(
+                "SELECT state FROM runner_markets WHERE market_id = ?", (int(market_id),),
+            ).fetchone()
+            if row is not None and row["state"] in _RUNNER_ACTIVE + (RUNNER_STOPPING,):
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO runner_markets (market_id, state, updated_us) VALUES (?, ?, ?)",
+                (int(market_id), RUNNER_STARTING, now_us()),
+            )
+        return True
+
+    def request_runner_stop(self, market_id: int) -> bool:
+        """Ask for *market_id* to stop; ``False`` if it is not running."""
+        with self._tx() as conn:
+            cur = conn.execute(
+                "UPDATE runner_markets SET state = ?, updated_us = ?"
+                " WHERE market_id = ? AND state IN (?, ?)",
+                (RUNNER_STOPPING, now_us(), int(market_id), *_RUNNER_ACTIVE),
+            )
+            return cur.rowcount > 0
+
+    def set_runner_state(
+        self,
+        market_id: int,
+        state: str,
+        *,
+        n_agents: Optional[int] = None,
+        stop_info: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE runner_markets SET state = ?, n_agents = COALESCE(?, n_agents),"
+                " stop_info = COALESCE(?, stop_info), error = ?, updated_us = ? WHERE market_id = ?",
+                (state, n_agents, json.dumps(stop_info) if stop_info is not None else None,
+                 error, now_us(), int(market_id)),
+            )
+
+    def runner_market(self, market_id: int) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT * FROM runner_markets WHERE market_id = ?", (int(market_id),),
+        ).fetchone()
+        return self._runner_row(row) if row is not None else None
+
+    def runner_markets(self) -> Dict[int, Dict[str, Any]]:
+        rows = self._conn().execute("SELECT * FROM runner_markets").fetchall()
+        return {int(r["market_id"]): self._runner_row(r) for r in rows}
+
+    @staticmethod
+    def _runner_row(row: sqlite3.Row) -> Dict[str, Any]:
+        out = dict(row)
+        out["stop_info"] = json.loads(row["stop_info"]) if row["stop_info"] else None
+        return out
+
+    def clear_runner_market(self, market_id: int) -> None:
+        with self._tx() as conn:
+            conn.execute("DELETE FROM runner_markets WHERE market_id = ?", (int(market_id),))
+
+    def any_runner_active(self) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM runner_markets WHERE state IN (?, ?) LIMIT 1", _RUNNER_ACTIVE,
+        ).fetchone()
+        return row is not None
+
+    def queue_runner_agents(self, agents: Sequence[Dict[str, Any]]) -> None:
+        """Hand agent rows created in this worker to the runner owner."""
+        if not agents:
+            return
+        with self._tx() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO runner_pending_agents (agent_id, row) VALUES (?, ?)",
+                [(int(a["id"]), json.dumps(a, default=str)) for a in agents],
+            )
+
+    def take_runner_agents(self) -> List[Dict[str, Any]]:
+        with self._tx() as conn:
+            rows = conn.execute("SELECT row FROM runner_pending_agents ORDER BY agent_id").fetchall()
+            if rows:
+                conn.execute("DELETE FROM runner_pending_agents")
+        return [json.loads(r["row"]) for r in rows]
@@ -0,0 +1,948 @@
+"""
+Sharded market service: one catalog database plus one SQLite file per market.
+
+The catalog holds the agent roster (with each agent's unallocated *wallet*
+cash) and the market registry.  Every market gets its own shard file holding
+that market's live row, positions, orders, trades and news, so a trade in
+market A never waits on the write lock of market B.
+
+Each shard is a complete :class:`MarketService` database, which means the
+existing LMSR/CDA trade paths run unchanged inside one shard.  Agents are
+mirrored into a shard the first time they touch the market; the mirror's
+``cash`` column is the agent's per-market cash *sub-account*.
+
+Cash crossing shards moves only through journaled transfers:
+
+1. catalog transaction — insert a ``pending`` row in ``cash_transfers`` (and
+   debit the wallet for deposits);
+2. shard transaction — apply the transfer to the sub-account unless its id is
+   already in the shard's ``cash_ledger`` (idempotent);
+3. catalog transaction — mark the row ``applied`` (and credit the wallet for
+   withdrawals, using the amount recorded in the shard ledger).
+
+A crash between steps leaves a ``pending`` row which :meth:`recover_transfers`
+(run on start-up) replays; the ledger makes the replay safe.
+
+Usage:
+    svc = ShardedMarketService("catalog.db", "shards/", market_allocation=50.0)
+    mkt = svc.create_market("btc-100k", "BTC > $100k?", mechanism="lmsr", b=200.0)
+    alice = svc.create_agent("alice", cash=100.0)
+    svc.set_market_status(mkt["id"], "running")
+    svc.execute_lmsr_trade(mkt["id"], alice["id"], quantity=5.0)   # funds 50.0 first
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from market_service import LEADERBOARD_METRICS, MarketService, decision_context_row
+from trade_archive import TradeArchive
+from market_store import _chunks, us_to_iso
+
+# Per-shard AUTOINCREMENT tables start at ``market_id << _ID_SHIFT`` so trade,
+# order and news ids stay globally unique across shard files.
+_ID_SHIFT = 32
+_SHARDED_ID_TABLES = ("positions", "trades", "orders", "news_events")
+
+_CATALOG_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS agent_accounts (
+    agent_id   INTEGER NOT NULL REFERENCES agents(id),
+    market_id  INTEGER NOT NULL,
+    created_at TEXT    NOT NULL,
+    PRIMARY KEY (agent_id, market_id)
+);
+
+CREATE TABLE IF NOT EXISTS cash_transfers (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    agent_id   INTEGER NOT NULL REFERENCES agents(id),
+    market_id  INTEGER NOT NULL,
+    amount     REAL,
+    status     TEXT    NOT NULL DEFAULT 'pending',
+    created_at TEXT    NOT NULL,
+    applied_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_cash_transfers_status ON cash_transfers(status);
+"""
+
+_SHARD_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS cash_ledger (
+    transfer_id INTEGER PRIMARY KEY,
+    agent_id    INTEGER NOT NULL,
+    amount      REAL    NOT NULL,
+    created_at  TEXT    NOT NULL
+);
+"""
+
+
+class ShardedMarketService:
+    """Drop-in :class:`MarketService` replacement over a catalog + per-market shards.
+
+    *market_allocation* is how much wallet cash is moved into a market's
+    sub-account when an agent first touches that market (capped at the wallet
+    balance); ``None`` moves the whole wallet.  Further funding goes through
+    :meth:`transfer_cash`, and resolution sweeps every sub-account back.
+    """
+
+    def __init__(
+        self,
+        catalog_path: str,
+        shard_dir: str,
+        *,
+        market_allocation: Optional[float] = None,
+        archive_dir: Optional[str] = None,
+        profile: Optional[str] = None,
+        read_pool_size: int = 8,
+    ):
+        if market_allocation is not None and market_allocation < 0:
+            raise ValueError("market_allocation must be >= 0")
+        # Catalog and every shard share one tuning profile and reader-pool bound.
+        self._storage = {"profile": profile, "read_pool_size": read_pool_size}
+        self._catalog = MarketService(catalog_path, **self._storage)
+        self._archive_dir = archive_dir
+        self._catalog._get_conn().executescript(_CATALOG_SCHEMA)
+        self._shard_dir = Path(shard_dir)
+        self._shard_dir.mkdir(parents=True, exist_ok=True)
+        self._market_allocation = market_allocation
+        self._lock = threading.Lock()
+        self._shards: Dict[int, MarketService] = {}
+        # Per-market locks serializing a shard's first open with its deletion.
+        self._shard_locks: Dict[int, threading.Lock] = {}
+        # Versions of dropped shards, so the summed versions never move backwards.
+        self._retired_versions = {"catalog": 0, "listing": 0}
+        self._accounts: Set[Tuple[int, int]] = set()
+        self.recover_transfers()
+
+    # ── Shard management ──────────────────────────────────────────────
+
+    def shard_path(self, market_id: int) -> str:
+        return str(self._shard_dir / f"market_{int(market_id)}.sqlite")
+
+    def _shard_lock(self, market_id: int) -> threading.Lock:
+        with self._lock:
+            return self._shard_locks.setdefault(int(market_id), threading.Lock())
+
+    def _catalog_market_row(self, market_id: int):
+        return self._catalog._get_conn().execute(
+            "SELECT * FROM markets WHERE id = ?", (int(market_id),)
+        ).fetchone()
+
+    def _shard(self, market_id: int) -> MarketService:
+        mid = int(market_id)
+        with self._lock:
+            shard = self._shards.get(mid)
+        if shard is not None:
+            return shard
+        # One thread opens a given shard; the others wait and reuse it.
+        with self._shard_lock(mid):
+            with self._lock:
+                shard = self._shards.get(mid)
+            if shard is not None:
+                return shard
+            row = self._catalog_market_row(mid)
+            if row is None:
+                raise ValueError(f"Market {mid} not found")
+            shard = MarketService(
+                self.shard_path(mid), archive_dir=self._archive_dir, **self._storage,
+            )
+            self._init_shard(shard, row)
+            if self._catalog_market_row(mid) is None:
+                # Deleted while the file was being opened: don't leave an orphan shard.
+                shard.close()
+                self._remove_shard_files(mid)
+                raise ValueError(f"Market {mid} not found")
+            with self._lock:
+                self._shards[mid] = shard
+            return shard
+
+    def _remove_shard_files(self, market_id: int) -> None:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.shard_path(market_id) + suffix)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _init_shard(shard: MarketService, market_row) -> None:
+        """Create shard-only tables and mirror the registry row (idempotent)."""
+        mid = int(market_row["id"])
+        shard._get_conn().executescript(_SHARD_SCHEMA)
+        cols = list(market_row.keys())
+        with shard._begin_immediate() as conn:
+            conn.execute(
+                f"INSERT INTO markets ({', '.join(cols)}) "
+                f"VALUES ({', '.join('?' for _ in cols)}) "
+                "ON CONFLICT(id) DO NOTHING",
+                [market_row[c] for c in cols],
+            )
+            for table in _SHARDED_ID_TABLES:
+                conn.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) SELECT ?, ? "
+                    "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)",
+                    (table, mid << _ID_SHIFT, table),
+                )
+
+    # ── Change versions ───────────────────────────────────────────────
+
+    @property
+    def instance_id(self) -> str:
+        return self._catalog.instance_id
+
+    def market_version(self, market_id: int) -> int:
+        """Shard writes for *market_id* combined with catalog (agent/wallet) writes."""
+        with self._lock:
+            shard = self._shards.get(int(market_id))
+        # Separate counters, so add them: the sum moves whenever either does.
+        version = self._catalog.market_version(market_id)
+        if shard is not None:
+            version += shard.market_version(market_id)
+        return version
+
+    def agent_version(self, agent_id: Optional[int] = None) -> int:
+        """Catalog (agent/wallet) writes only: market views show per-market sub-accounts."""
+        return self._catalog.agent_version(agent_id)
+
+    def catalog_version(self) -> int:
+        with self._lock:
+            shards = list(self._shards.values())
+            retired = self._retired_versions["catalog"]
+        return self._catalog.catalog_version() + retired + sum(s.catalog_version() for s in shards)
+
+    def listing_version(self) -> int:
+        with self._lock:
+            shards = list(self._shards.values())
+            retired = self._retired_versions["listing"]
+        return self._catalog.listing_version() + retired + sum(s.listing_version() for s in shards)
+
+    def _linked_markets(self, agent_id: int) -> List[int]:
+        rows = self._catalog._get_conn().execute(
+            "SELECT market_id FROM agent_accounts WHERE agent_id = ? ORDER BY market_id",
+            (agent_id,),
+        ).fetchall()
+        return [int(r["market_id"]) for r in rows]
+
+    def _is_linked(self, agent_id: int, market_id: int) -> bool:
+        key = (int(agent_id), int(market_id))
+        with self._lock:
+            if key in self._accounts:
+                return True
+        row = self._catalog._get_conn().execute(
+            "SELECT 1 FROM agent_accounts WHERE agent_id = ? AND market_id = ?", key,
+        ).fetchone()
+        if row is not None:
+            with self._lock:
+                self._accounts.add(key)
+        return row is not None
+
+    def _opening_allocation(self, wallet: float) -> float:
+        if self._market_allocation is None:
+            return max(0.0, float(wallet))
+        return max(0.0, min(float(wallet), self._market_allocation))
+
+    def _ensure_account(self, agent_id: int, market_id: int) -> None:
+        """Open the agent's sub-account in *market_id*, funding it from the wallet."""
+        if self._is_linked(agent_id, market_id):
+            return
+        self._open_accounts([agent_id], market_id)
+
+    def _open_accounts(self, agent_ids: Sequence[int], market_id: int) -> None:
+        """Open sub-accounts for many agents with one catalog and one shard transaction."""
+        self._shard(market_id)
+        now = datetime.now(timezone.utc).isoformat()
+        pending: List[int] = []
+        with self._catalog._begin_immediate() as conn:
+            for agent_id in agent_ids:
+                agent = conn.execute(
+                    "SELECT * FROM agents WHERE id = ? AND deleted_at IS NULL", (agent_id,)
+                ).fetchone()
+                if agent is None:
+                    raise ValueError(f"Agent {agent_id} not found")
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO agent_accounts (agent_id, market_id, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (agent_id, market_id, now),
+                )
+                if cur.rowcount == 1:
+                    amount = self._opening_allocation(agent["cash"])
+                    conn.execute(
+                        "UPDATE agents SET cash = cash - ? WHERE id = ?", (amount, agent_id)
+                    )
+                    conn.execute(
+                        "INSERT INTO cash_transfers (agent_id, market_id, amount, created_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (agent_id, market_id, amount, now),
+                    )
+                # A concurrent opener may not have applied its funding yet; applying
+                # is idempotent, so finish whatever is pending for this account.
+                pending.extend(
+                    int(r["id"])
+                    for r in conn.execute(
+                        "SELECT id FROM cash_transfers "
+                        "WHERE agent_id = ? AND market_id = ? AND status = 'pending'",
+                        (agent_id, market_id),
+                    ).fetchall()
+                )
+        self._apply_transfers(market_id, pending)
+        with self._lock:
+            self._accounts.update((int(aid), int(market_id)) for aid in agent_ids)
+
+    # ── Cash transfer protocol ────────────────────────────────────────
+
+    def transfer_cash(
+        self, agent_id: int, market_id: int, amount: Optional[float],
+    ) -> Dict[str, Any]:
+        """
+        Move cash between an agent's wallet and one market sub-account.
+
+        Positive *amount* deposits into the market, negative withdraws, and
+        ``None`` withdraws the whole sub-account balance.
+        """
+        if amount is not None and amount > 0:
+            self._ensure_account(agent_id, market_id)
+        elif not self._is_linked(agent_id, market_id):
+            raise ValueError(f"Agent {agent_id} has no account in market {market_id}")
+        ids = self._journal_transfers(market_id, [(agent_id, amount)])
+        self._apply_transfers(market_id, ids)
+        return {
+            "agent_id": int(agent_id),
+            "market_id": int(market_id),
+            "wallet_cash": float(self._catalog.get_agent(agent_id)["cash"]),
+            "market_cash": float(self._shard(market_id).get_agent(agent_id)["cash"]),
+        }
+
+    def _journal_transfers(
+        self, market_id: int, items: Iterable[Tuple[int, Optional[float]]],
+    ) -> List[int]:
+        """Step 1: record pending transfers, debiting wallets for deposits."""
+        now = datetime.now(timezone.utc).isoformat()
+        ids: List[int] = []
+        with self._catalog._begin_immediate() as conn:
+            for agent_id, amount in items:
+                if amount is not None and amount > 0:
+                    cash = conn.execute(
+                        "SELECT cash FROM agents WHERE id = ? AND deleted_at IS NULL",
+                        (agent_id,),
+                    ).fetchone()
+                    if cash is None:
+                        raise ValueError(f"Agent {agent_id} not found")
+                    if cash["cash"] < amount:
+                        raise ValueError(
+                            f"Insufficient funds: agent {agent_id} wallet has "
+                            f"{cash['cash']:.4f}, transfer needs {amount:.4f}"
+                        )
+                    conn.execute(
+                        "UPDATE agents SET cash = cash - ? WHERE id = ?", (amount, agent_id)
+                    )
+                ids.append(conn.execute(
+                    "INSERT INTO cash_transfers (agent_id, market_id, amount, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (agent_id, market_id, amount, now),
+                ).lastrowid)
+        return ids
+
+    def _apply_transfers(self, market_id: int, transfer_ids: List[int]) -> None:
+        """Steps 2 and 3 for a batch of pending transfers into one shard."""
+        if not transfer_ids:
+            return
+        catalog = self._catalog._get_conn()
+        placeholders = ",".join("?" for _ in transfer_ids)
+        pending = catalog.execute(
+            f"SELECT * FROM cash_transfers WHERE id IN ({placeholders}) "
+            "AND status = 'pending' ORDER BY id",
+            transfer_ids,
+        ).fetchall()
+        if not pending:
+            return
+        shard = self._shard(market_id)
+        agents = {
+            int(r["id"]): r
+            for r in catalog.execute(
+                f"SELECT * FROM agents WHERE id IN "
+                f"(SELECT agent_id FROM cash_transfers WHERE id IN ({placeholders}))",
+                transfer_ids,
+            ).fetchall()
+        }
+        now = datetime.now(timezone.utc).isoformat()
+        failed: List[int] = []
+        with shard._begin_immediate() as conn:
+            for t in pending:
+                seen = conn.execute(
+                    "SELECT 1 FROM cash_ledger WHERE transfer_id = ?", (t["id"],)
+                ).fetchone()
+                if seen is not None:
+                    continue
+                agent = agents[int(t["agent_id"])]
+                # The shard mirror carries the profile; its cash is the sub-account.
+                conn.execute(
+                    "INSERT INTO agents (id, name, cash, belief, rho, personality, created_at) "
+                    "VALUES (?, ?, 0.0, ?, ?, ?, ?) ON CONFLICT(id) DO NOTHING",
+                    (agent["id"], agent["name"], agent["belief"], agent["rho"],
+                     agent["personality"], agent["created_at"]),
+                )
+                row = conn.execute(
+                    "SELECT cash FROM agents WHERE id = ?", (t["agent_id"],)
+                ).fetchone()
+                amount = t["amount"]
+                if amount is None:
+                    amount = -float(row["cash"])
+                elif amount < 0 and row["cash"] + amount < -1e-9:
+                    failed.append(int(t["id"]))
+                    continue
+                conn.execute(
+                    "UPDATE agents SET cash = cash + ? WHERE id = ?", (amount, t["agent_id"])
+                )
+                conn.execute(
+                    "INSERT INTO cash_ledger (transfer_id, agent_id, amount, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (t["id"], t["agent_id"], amount, now),
+                )
+        applied = {
+            int(r["transfer_id"]): float(r["amount"])
+            for r in shard._get_conn().execute(
+                f"SELECT transfer_id, amount FROM cash_ledger "
+                f"WHERE transfer_id IN ({placeholders})",
+                transfer_ids,
+            ).fetchall()
+        }
+        with self._catalog._begin_immediate() as conn:
+            for t in pending:
+                tid = int(t["id"])
+                if tid in failed:
+                    cur = conn.execute(
+                        "UPDATE cash_transfers SET status = 'failed', applied_at = ? "
+                        "WHERE id = ? AND status = 'pending'",
+                        (now, tid),
+                    )
+                    if cur.rowcount == 1 and t["amount"] is not None and t["amount"] > 0:
+                        conn.execute(
+                            "UPDATE agents SET cash = cash + ? WHERE id = ?",
+                            (t["amount"], t["agent_id"]),
+                        )
+                    continue
+                amount = applied[tid]
+                cur = conn.execute(
+                    "UPDATE cash_transfers SET status = 'applied', amount = ?, applied_at = ? "
+                    "WHERE id = ? AND status = 'pending'",
+                    (amount, now, tid),
+                )
+                if cur.rowcount == 1 and amount < 0:
+                    conn.execute(
+                        "UPDATE agents SET cash = cash - ? WHERE id = ?",
+                        (amount, t["agent_id"]),
+                    )
+        if failed:
+            raise ValueError(
+                f"Insufficient funds: transfers {failed} exceed the sub-account balance"
+            )
+
+    def recover_transfers(self) -> int:
+        """Replay transfers left ``pending`` by a crash; returns how many were found."""
+        rows = self._catalog._get_conn().execute(
+            "SELECT id, market_id FROM cash_transfers WHERE status = 'pending' ORDER BY id"
+        ).fetchall()
+        by_market: Dict[int, List[int]] = {}
+        for r in rows:
+            by_market.setdefault(int(r["market_id"]), []).append(int(r["id"]))
+        for mid, ids in by_market.items():
+            try:
+                self._apply_transfers(mid, ids)
+            except ValueError:
+                continue
+        return len(rows)
+
+    def _sweep_accounts(self, market_id: int) -> None:
+        """Withdraw every sub-account balance in one market back to the wallets."""
+        agent_ids = [
+            int(r["agent_id"])
+            for r in self._catalog._get_conn().execute(
+                "SELECT agent_id FROM agent_accounts WHERE market_id = ?", (market_id,)
+            ).fetchall()
+        ]
+        ids = self._journal_transfers(market_id, [(aid, None) for aid in agent_ids])
+        self._apply_transfers(market_id, ids)
+
+    # ── Read operations ───────────────────────────────────────────────
+
+    def get_market(self, market_id: int) -> Dict[str, Any]:
+        return self._shard(market_id).get_market(market_id)
+
+    def list_markets(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            self.get_market(int(m["id"])) for m in self._catalog.list_markets(status)
+        ]
+
+    def list_markets_with_summary(
+        self,
+        status: Optional[str] = None,
+        *,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Page over the catalog registry and summarise each market from its shard."""
+        page = self._catalog._get_store().list_markets_page(
+            status, limit=limit, offset=offset, cursor=cursor,
+        )
+        out: List[Dict[str, Any]] = []
+        for m in page["markets"]:
+            summary = self._shard(int(m["id"])).list_markets_with_summary(limit=1)
+            out.extend(summary["markets"])
+        return {"markets": out, "total": page["total"], "next_cursor": page["next_cursor"]}
+
+    def market_summaries(self, market_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        out: Dict[int, Dict[str, Any]] = {}
+        for mid in market_ids:
+            try:
+                shard = self._shard(int(mid))
+            except ValueError:
+                continue
+            out.update(shard.market_summaries([mid]))
+        return out
+
+    def get_agent(self, agent_id: int, market_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Catalog profile; ``cash`` is the wallet.  With *market_id*, ``cash`` is
+        the market sub-account (or what opening it would transfer).
+        """
+        agent = self._catalog.get_agent(agent_id)
+        if market_id is None:
+            return agent
+        if self._is_linked(agent_id, market_id):
+            shard = self._shard(market_id)
+            agent["cash"] = shard.get_agent(agent_id)["cash"]
+            agent["yes_shares"] = shard.get_position(agent_id, market_id)["yes_shares"]
+        else:
+            self._shard(market_id)
+            agent["cash"] = self._opening_allocation(agent["cash"])
+            agent["yes_shares"] = 0.0
+        return agent
+
+    def list_agents(
+        self, *, limit: int = 100, offset: int = 0, cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self._catalog.list_agents(limit=limit, offset=offset, cursor=cursor)
+
+    def mean_belief_all_agents(self) -> Optional[float]:
+        return self._catalog.mean_belief_all_agents()
+
+    def mean_belief_for_market(self, market_id: int) -> Optional[float]:
+        return self._shard(market_id).mean_belief_for_market(market_id)
+
+    def mean_belief_joined_markets_by_agent(
+        self, agent_ids: List[int],
+    ) -> Dict[int, Optional[float]]:
+        if not agent_ids:
+            return {}
+        ids = [int(x) for x in agent_ids]
+        placeholders = ",".join("?" for _ in ids)
+        links = self._catalog._get_conn().execute(
+            f"SELECT agent_id, market_id FROM agent_accounts WHERE agent_id IN ({placeholders})",
+            ids,
+        ).fetchall()
+        by_market: Dict[int, List[int]] = {}
+        for r in links:
+            by_market.setdefault(int(r["market_id"]), []).append(int(r["agent_id"]))
+        sums: Dict[int, float] = {}
+        counts: Dict[int, int] = {}
+        for mid, aids in by_market.items():
+            ph = ",".join("?" for _ in aids)
+            rows = self._shard(mid)._get_conn().execute(
+                f"SELECT agent_id, SUM(belief) AS s, COUNT(belief) AS c FROM positions "
+                f"WHERE belief IS NOT NULL AND agent_id IN ({ph}) GROUP BY agent_id",
+                aids,
+            ).fetchall()
+            for r in rows:
+                aid = int(r["agent_id"])
+                sums[aid] = sums.get(aid, 0.0) + float(r["s"])
+                counts[aid] = counts.get(aid, 0) + int(r["c"])
+        return {
+            aid: (sums[aid] / counts[aid] if counts.get(aid) else None) for aid in ids
+        }
+
+    def get_position(self, agent_id: int, market_id: int) -> Dict[str, Any]:
+        if self._is_linked(agent_id, market_id):
+            return self._shard(market_id).get_position(agent_id, market_id)
+        self._shard(market_id)
+        agent = self._catalog._get_conn().execute(
+            "SELECT belief, rho, personality FROM agents WHERE id = ?", (agent_id,)
+        ).fetchone()
+        return {
+            "agent_id": agent_id, "market_id": market_id,
+            "yes_shares": 0.0,
+            "belief": agent["belief"] if agent is not None else None,
+            "rho": agent["rho"] if agent is not None else None,
+            "personality": agent["personality"] if agent is not None else None,
+        }
+
+    def get_order_book(self, market_id: int) -> Dict[str, Any]:
+        return self._shard(market_id).get_order_book(market_id)
+
+    def get_trades(
+        self, market_id: Optional[int] = None, agent_id: Optional[int] = None,
+        since_trade_id: Optional[int] = None, limit: int = 100,
+        before_trade_id: Optional[int] = None,
+        *,
+        since_ts: Any = None,
+        until_ts: Any = None,
+    ) -> List[Dict[str, Any]]:
+        window = {"since_ts": since_ts, "until_ts": until_ts}
+        if market_id is not None:
+            return self._shard(market_id).get_trades(
+                market_id, agent_id, since_trade_id, limit, before_trade_id=before_trade_id,
+                **window,
+            )
+        if agent_id is not None:
+            market_ids = self._linked_markets(agent_id)
+        else:
+            market_ids = [int(m["id"]) for m in self._catalog.list_markets()]
+        rows: List[Dict[str, Any]] = []
+        for mid in market_ids:
+            rows.extend(self._shard(mid).get_trades(
+                mid, agent_id, since_trade_id, limit, before_trade_id=before_trade_id,
+                **window,
+            ))
+        # Id order (like MarketStore.get_trades) so id cursors stay valid across
+        # shards; ids are globally unique because each shard owns an id range.
+        rows.sort(key=lambda t: int(t["id"]), reverse=True)
+        return rows[:limit]
+
+    def get_candles(
+        self,
+        market_id: int,
+        resolution: str = "1m",
+        *,
+        since_ts: Any = None,
+        until_ts: Any = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        return self._shard(market_id).get_candles(
+            market_id, resolution, since_ts=since_ts, until_ts=until_ts, limit=limit,
+        )
+
+    def count_trades(self, market_id: int) -> int:
+        return self._shard(market_id).count_trades(market_id)
+
+    def trade_window_stats(
+        self, market_id: int, *, since_ts: Any = None, until_ts: Any = None,
+    ) -> Dict[str, Any]:
+        return self._shard(market_id).trade_window_stats(
+            market_id, since_ts=since_ts, until_ts=until_ts,
+        )
+
+    def list_agents_for_market(
+        self,
+        market_id: int,
+        *,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_agent_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return self._shard(market_id).list_agents_for_market(
+            market_id, limit=limit, offset=offset, after_agent_id=after_agent_id,
+        )
+
+    def count_agents_for_market(self, market_id: int) -> int:
+        return self._shard(market_id).count_agents_for_market(market_id)
+
+    def list_markets_for_agent(self, agent_id: int) -> List[Dict[str, Any]]:
+        self._catalog.get_agent(agent_id)
+        rows: List[Dict[str, Any]] = []
+        for mid in self._linked_markets(agent_id):
+            rows.extend(self._shard(mid).list_markets_for_agent(agent_id))
+        rows.sort(
+            key=lambda r: (str(r.get("last_trade_at") or r["created_at"]), int(r["id"])),
+            reverse=True,
+        )
+        return rows
+
+    def agent_leaderboard(
+        self,
+        market_id: Optional[int] = None,
+        *,
+        by: str = "cash_flow",
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Sum every shard's ``agent_market_stats``; the catalog decides who is live."""
+        if by not in LEADERBOARD_METRICS:
+            raise ValueError(f"by must be one of {LEADERBOARD_METRICS}, got {by!r}")
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        if market_id is not None:
+            market_ids = [int(market_id)]
+            self._shard(market_id)
+        else:
+            market_ids = [int(m["id"]) for m in self._catalog.list_markets()]
+        totals: Dict[int, Dict[str, Any]] = {}
+        for mid in market_ids:
+            rows = self._shard(mid)._get_conn().execute(
+                "SELECT agent_id, trade_count, volume, cash_flow, last_trade_us "
+                "FROM agent_market_stats WHERE market_id = ?",
+                (mid,),
+            ).fetchall()
+            for r in rows:
+                acc = totals.setdefault(int(r["agent_id"]), {
+                    "trade_count": 0, "volume": 0.0, "cash_flow": 0.0,
+                    "markets": 0, "last_trade_us": None,
+                })
+                acc["trade_count"] += int(r["trade_count"])
+                acc["volume"] += float(r["volume"])
+                acc["cash_flow"] += float(r["cash_flow"])
+                acc["markets"] += 1
+                if r["last_trade_us"] is not None:
+                    acc["last_trade_us"] = max(acc["last_trade_us"] or 0, int(r["last_trade_us"]))
+        names: Dict[int, str] = {}
+        conn = self._catalog._get_conn()
+        for chunk in _chunks(list(totals)):
+            ph = ",".join("?" for _ in chunk)
+            for r in conn.execute(
+                f"SELECT id, name FROM agents WHERE deleted_at IS NULL AND id IN ({ph})",
+                list(chunk),
+            ):
+                names[int(r["id"])] = r["name"]
+        ranked = sorted(
+            (aid for aid in totals if aid in names),
+            key=lambda aid: (-totals[aid][by], aid),
+        )[:limit]
+        out = []
+        for rank, aid in enumerate(ranked, start=1):
+            acc = totals[aid]
+            out.append({
+                "agent_id": aid,
+                "name": names[aid],
+                "trade_count": acc["trade_count"],
+                "volume": acc["volume"],
+                "cash_flow": acc["cash_flow"],
+                "markets": acc["markets"],
+                "rank": rank,
+                "last_trade_at": us_to_iso(acc["last_trade_us"]),
+            })
+        return out
+
+    # ── Write operations ──────────────────────────────────────────────
+
+    def create_market(self, slug: str, title: str, **kwargs: Any) -> Dict[str, Any]:
+        mkt = self._catalog.create_market(slug, title, **kwargs)
+        return self._shard(int(mkt["id"])).get_market(int(mkt["id"]))
+
+    def create_agent(
+        self, name: str, cash: float, *, market_id: Optional[int] = None,
+        belief: Optional[float] = None, rho: Optional[float] = None,
+        personality: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        agent = self._catalog.create_agent(
+            name, cash, belief=belief, rho=rho, personality=personality,
+        )
+        if market_id is not None:
+            self.ensure_position(int(agent["id"]), market_id)
+        return agent
+
+    def create_agents_bulk(
+        self,
+        agents: Sequence[Dict[str, Any]],
+        *,
+        market_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Bulk-insert profiles in the catalog, then open all sub-accounts in one batch."""
+        if market_id is not None:
+            self._shard(market_id)
+        created = self._catalog.create_agents_bulk(agents)
+        if market_id is not None and created:
+            self.ensure_positions([int(a["id"]) for a in created], market_id)
+        return created
+
+    def set_market_status(self, market_id: int, status: str) -> Dict[str, Any]:
+        mkt = self._shard(market_id).set_market_status(market_id, status)
+        self._catalog.set_market_status(market_id, status)
+        return mkt
+
+    def delete_market(self, market_id: int) -> int:
+        """Refund sub-accounts to wallets, then drop the registry row and shard file."""
+        mid = int(market_id)
+        self._shard(mid)
+        self._sweep_accounts(mid)
+        with self._shard_lock(mid):
+            with self._catalog._begin_immediate(listing=True) as conn:
+                conn.execute("DELETE FROM agent_accounts WHERE market_id = ?", (mid,))
+                conn.execute("DELETE FROM markets WHERE id = ?", (mid,))
+            with self._lock:
+                shard = self._shards.pop(mid, None)
+                if shard is not None:
+                    self._retired_versions["catalog"] += shard.catalog_version()
+                    self._retired_versions["listing"] += shard.listing_version()
+                self._accounts = {k for k in self._accounts if k[1] != mid}
+            if shard is not None:
+                shard.close()
+            self._remove_shard_files(mid)
+        with self._lock:
+            self._shard_locks.pop(mid, None)
+        if self._archive_dir:
+            TradeArchive(self._archive_dir).delete(mid)
+        return 0
+
+    def delete_agent(self, agent_id: int) -> Dict[str, Any]:
+        market_ids = self._linked_markets(agent_id)
+        deleted = self._catalog.delete_agent(agent_id)
+        retained = 0
+        for mid in market_ids:
+            retained += int(self._shard(mid).delete_agent(agent_id)["trade_count_retained"])
+        return {"agent": deleted["agent"], "trade_count_retained": retained}
+
+    def set_agent_belief(self, market_id: int, agent_id: int, new_belief: float) -> float:
+        self._ensure_account(agent_id, market_id)
+        return self._shard(market_id).set_agent_belief(market_id, agent_id, new_belief)
+
+    def record_mean_belief(
+        self, market_id: int, mean_belief: float, *, at_ts: Any = None,
+    ) -> None:
+        self._shard(market_id).record_mean_belief(market_id, mean_belief, at_ts=at_ts)
+
+    def update_agent_portfolio(
+        self, market_id: int, agent_id: int, cash_delta: float, shares_delta: float,
+    ) -> Dict[str, Any]:
+        self._ensure_account(agent_id, market_id)
+        return self._shard(market_id).update_agent_portfolio(
+            market_id, agent_id, cash_delta, shares_delta,
+        )
+
+    def update_agent(
+        self,
+        agent_id: int,
+        *,
+        name: Optional[str] = None,
+        cash: Optional[float] = None,
+        belief: Optional[float] = None,
+        rho: Optional[float] = None,
+        personality: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Update the catalog profile (``cash`` is the wallet) and mirror it to shards."""
+        updated = self._catalog.update_agent(
+            agent_id, name=name, cash=cash, belief=belief, rho=rho, personality=personality,
+        )
+        if name is not None or belief is not None or rho is not None or personality is not None:
+            for mid in self._linked_markets(agent_id):
+                self._shard(mid).update_agent(
+                    agent_id, name=name, belief=belief, rho=rho, personality=personality,
+                )
+        return updated
+
+    def ensure_position(self, agent_id: int, market_id: int) -> Dict[str, Any]:
+        self._ensure_account(agent_id, market_id)
+        return self._shard(market_id).ensure_position(agent_id, market_id)
+
+    def ensure_positions(self, agent_ids: Sequence[int], market_id: int) -> None:
+        # Chunked so the transfer batch's ``IN (...)`` lists stay bounded.
+        for chunk in _chunks(list(agent_ids)):
+            self._open_accounts(chunk, market_id)
+        self._shard(market_id).ensure_positions(agent_ids, market_id)
+
+    def resolve_market(self, market_id: int, outcome: str) -> Dict[str, Any]:
+        """Settle inside the shard, sweep sub-accounts to wallets, then close the registry row."""
+        settlement = self._shard(market_id).resolve_market(market_id, outcome)
+        self._sweep_accounts(market_id)
+        with self._catalog._begin_immediate(listing=True) as conn:
+            conn.execute(
+                "UPDATE markets SET status = 'resolved', resolution = ?, resolved_at = ? "
+                "WHERE id = ?",
+                (outcome, settlement["resolved_at"], market_id),
+            )
+        return settlement
+
+    def get_settlement(self, market_id: int) -> Dict[str, Any]:
+        return self._shard(market_id).get_settlement(market_id)
+
+    def archive_market(self, market_id: int) -> Dict[str, Any]:
+        return self._shard(market_id).archive_market(market_id)
+
+    def archive_resolved_markets(self) -> List[Dict[str, Any]]:
+        archived: List[Dict[str, Any]] = []
+        for mkt in self._catalog.list_markets(status="resolved"):
+            archived.extend(self._shard(int(mkt["id"])).archive_resolved_markets())
+        return archived
+
+    def cancel_agent_orders(self, agent_id: int, market_id: int) -> int:
+        return self._shard(market_id).cancel_agent_orders(agent_id, market_id)
+
+    # ── Pricing and trading (run entirely inside one shard) ───────────
+
+    def get_price(self, market_id: int) -> float:
+        return self._shard(market_id).get_price(market_id)
+
+    def get_price_snapshot(self, market_id: int) -> Dict[str, Any]:
+        return self._shard(market_id).get_price_snapshot(market_id)
+
+    def decision_context(self, market_id: int, agent_id: int) -> Dict[str, Any]:
+        """
+        One shard read for price and position; rho and personality come from
+        the catalog profile, which is where profile edits land.
+        """
+        agent = self._catalog.get_agent(agent_id)
+        if self._is_linked(agent_id, market_id):
+            ctx = self._shard(market_id).decision_context(market_id, agent_id)
+        else:
+            ctx = decision_context_row(
+                self.get_price_snapshot(market_id),
+                {**agent, "cash": self._opening_allocation(agent["cash"])},
+                self.get_position(agent_id, market_id),
+            )
+        ctx["rho"] = agent["rho"]
+        ctx["personality"] = agent["personality"]
+        return ctx
+
+    def execute_lmsr_trade(
+        self, market_id: int, agent_id: int, quantity: float,
+    ) -> Dict[str, Any]:
+        self._ensure_account(agent_id, market_id)
+        return self._shard(market_id).execute_lmsr_trade(market_id, agent_id, quantity)
+
+    def execute_trade(
+        self, agent_id: int, market_id: int, side: str, shares: float,
+    ) -> Dict[str, Any]:
+        self._ensure_account(agent_id, market_id)
+        return self._shard(market_id).execute_trade(agent_id, market_id, side, shares)
+
+    def execute_cda_order(
+        self, market_id: int, agent_id: int, side: str,
+        quantity: float, limit_price: Optional[float],
+        order_type: str,
+    ) -> Dict[str, Any]:
+        self._ensure_account(agent_id, market_id)
+        return self._shard(market_id).execute_cda_order(
+            market_id, agent_id, side, quantity, limit_price, order_type,
+        )
+
+    def execute_limit_order(
+        self, agent_id: int, market_id: int, side: str,
+        quantity: float, price: float,
+    ) -> Dict[str, Any]:
+        return self.execute_cda_order(market_id, agent_id, side, quantity, price, "limit")
+
+    def execute_market_order(
+        self, agent_id: int, market_id: int, side: str, quantity: float,
+    ) -> Dict[str, Any]:
+        return self.execute_cda_order(market_id, agent_id, side, quantity, None, "market")
+
+    def create_news_event(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._shard(int(kwargs["market_id"])).create_news_event(**kwargs)
+
+    def list_news_events(
+        self,
+        market_id: int,
+        *,
+        limit: int = 200,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self._shard(market_id).list_news_events(
+            market_id, limit=limit, offset=offset, cursor=cursor,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            shard.close()
+        self._catalog.close()
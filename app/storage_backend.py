@@ -0,0 +1,245 @@
+"""
+Storage backends for :class:`MarketService`.
+
+A backend decides where the market tables (markets, agents, positions, orders,
+trades, news, ...) live and hands out SQLite connections to them.  Everything
+above the connection -- ``MarketStore`` queries, ``BEGIN IMMEDIATE`` write
+serialization, row converters -- is shared, so both backends have identical
+transactional semantics.
+
+- :class:`SQLiteFileBackend` -- a database file in WAL mode (the default),
+  tuned by one of the named :data:`TUNING_PROFILES`.
+- :class:`InMemoryBackend` -- a process-private database in SQLite's ``memdb``
+  VFS.  Every thread's connection sees the same database, locking works as for
+  a file, and nothing touches the disk: no file creation, journal or fsync.
+  The database lives until :meth:`InMemoryBackend.close`.  Needs SQLite 3.36+
+  (``memdb``); older libraries must use a file.
+
+Read paths borrow connections from a :class:`ReadPool` of read-only
+connections (``mode=ro`` + ``query_only``), separate from the per-thread
+writers.  In WAL mode those readers never wait on a writer.
+
+Usage:
+    svc = MarketService(":memory:")               # InMemoryBackend
+    svc = MarketService("markets.db")             # SQLiteFileBackend
+    svc = MarketService("markets.db", profile="balanced")
+    svc = MarketService(InMemoryBackend())        # explicit
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, TypeVar, Union
+
+_BUSY_TIMEOUT_MS = 5000
+# First SQLite release with the ``memdb`` VFS.
+_MEMDB_VERSION = (3, 36, 0)
+
+# Named SQLite tuning profiles (see ``run_storage_benchmark.py`` for numbers).
+#   durable  -- fsync on every commit; survives power loss (the historical setting)
+#   balanced -- WAL + synchronous=NORMAL: a power cut may drop the last commits,
+#               never corrupts; bigger page cache and mmap reads
+#   fast     -- no fsyncs at all; for simulations and benchmarks whose database
+#               is disposable
+TUNING_PROFILES: Dict[str, Dict[str, Any]] = {
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -16_000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "wal_autocheckpoint": 1000,
+    },
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,
+    },
+    "fast": {
+        "synchronous": "OFF",
+        "cache_size": -256_000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 10_000,
+    },
+}
+DEFAULT_PROFILE = "durable"
+# Pragmas that only matter on the connection that writes.
+_WRITER_PRAGMAS = ("synchronous", "wal_autocheckpoint")
+
+T = TypeVar("T")
+
+
+def resolve_profile(name: Optional[str]) -> str:
+    """Validate a profile name (``None``/empty selects :data:`DEFAULT_PROFILE`)."""
+    profile = (name or DEFAULT_PROFILE).strip().lower()
+    if profile not in TUNING_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile {name!r}; expected one of {sorted(TUNING_PROFILES)}"
+        )
+    return profile
+
+
+class StorageBackend:
+    """Source of per-thread SQLite connections for one market database."""
+
+    #: Path or URI the connections open (informational for the memory backend).
+    db_path: str
+    #: Whether data outlives the process (file) or dies with it (memory).
+    persistent = True
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a read-write connection (one per writer thread)."""
+        raise NotImplementedError
+
+    def connect_readonly(self) -> sqlite3.Connection:
+        """Open a connection that cannot write (for :class:`ReadPool`)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release backend-wide resources (per-thread connections are the caller's)."""
+
+    def _configure(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.row_factory = sqlite3.Row
+        conn.isolation_level = None
+        conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+
+class SQLiteFileBackend(StorageBackend):
+    """A SQLite database file (or ``file:`` URI) in WAL mode."""
+
+    def __init__(self, db_path: str, *, profile: Optional[str] = None):
+        self.db_path = db_path
+        self.profile = resolve_profile(profile)
+        self._uri = db_path.startswith("file:")
+
+    def _tune(self, conn: sqlite3.Connection, *, writer: bool) -> None:
+        for pragma, value in TUNING_PROFILES[self.profile].items():
+            if writer or pragma not in _WRITER_PRAGMAS:
+                conn.execute(f"PRAGMA {pragma}={value}")
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, uri=self._uri, check_same_thread=False)
+        self._configure(conn)
+        conn.execute("PRAGMA journal_mode=WAL")
+        self._tune(conn, writer=True)
+        return conn
+
+    def connect_readonly(self) -> sqlite3.Connection:
+        if self._uri:
+            sep = "&" if "?" in self.db_path else "?"
+            target = f"{self.db_path}{sep}mode=ro"
+        else:
+            target = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(target, uri=True, check_same_thread=False)
+        self._configure(conn)
+        conn.execute("PRAGMA query_only=1")
+        self._tune(conn, writer=False)
+        return conn
+
+
+class InMemoryBackend(StorageBackend):
+    """A shared in-process database in the ``memdb`` VFS.
+
+    Each instance gets its own uniquely named database.  An anchor connection
+    keeps it alive while threads open and close their own connections.
+    """
+
+    persistent = False
+
+    def __init__(self, name: Optional[str] = None):
+        if sqlite3.sqlite_version_info < _MEMDB_VERSION:
+            raise RuntimeError(
+                f"the in-memory backend needs SQLite 3.36+ (memdb VFS), this is "
+                f"{sqlite3.sqlite_version}; use a database file instead of ':memory:'"
+            )
+        self.db_path = f"file:/{name or uuid.uuid4().hex}?vfs=memdb"
+        self._lock = threading.Lock()
+        self._anchor: Optional[sqlite3.Connection] = self.connect()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, uri=True, check_same_thread=False)
+        return self._configure(conn)
+
+    def connect_readonly(self) -> sqlite3.Connection:
+        # memdb has no ``mode=ro``; ``query_only`` still rejects writes.
+        conn = self.connect()
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            anchor, self._anchor = self._anchor, None
+        if anchor is not None:
+            anchor.close()
+
+
+class ReadPool(Generic[T]):
+    """Bounded pool of read-only resources, opened lazily up to *size*.
+
+    :meth:`acquire` blocks while all *size* items are checked out, so read
+    traffic can never open more than *size* connections.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], T],
+        close: Callable[[T], None],
+        size: int,
+    ):
+        if size < 1:
+            raise ValueError("read pool size must be >= 1")
+        self.size = size
+        self._factory = factory
+        self._close = close
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: "queue.LifoQueue[T]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened: List[T] = []
+
+    @contextmanager
+    def acquire(self) -> Iterator[T]:
+        self._slots.acquire()
+        try:
+            try:
+                item = self._idle.get_nowait()
+            except queue.Empty:
+                item = self._factory()
+                with self._lock:
+                    self._opened.append(item)
+            try:
+                yield item
+            finally:
+                self._idle.put(item)
+        finally:
+            self._slots.release()
+
+    @property
+    def opened(self) -> int:
+        with self._lock:
+            return len(self._opened)
+
+    def close(self) -> None:
+        with self._lock:
+            items, self._opened = self._opened, []
+        for item in items:
+            self._close(item)
+
+
+def open_backend(
+    target: Union[str, StorageBackend], *, profile: Optional[str] = None,
+) -> StorageBackend:
+    """Resolve a path, ``":memory:"`` or an existing backend to a backend."""
+    if isinstance(target, StorageBackend):
+        return target
+    if target == ":memory:":
+        return InMemoryBackend()
+    return SQLiteFileBackend(target, profile=profile)
@@ -0,0 +1,157 @@
+"""
+Cold storage for resolved markets' trade and order history.
+
+Once a market is resolved its ``trades`` and ``orders`` rows never change, so
+the archival job (:meth:`MarketService.archive_market`) moves them out of the
+hot SQLite file into one compressed columnar ``.npz`` file per market.  Each
+table becomes a set of numpy column arrays (INTEGER -> int64, REAL -> float64,
+TEXT -> unicode), written atomically with ``np.savez_compressed``.
+
+Archives are read-only.  :class:`TradeArchive` answers the same filters as
+``MarketStore.get_trades`` (agent, id and time bounds, newest-first limit)
+with vectorised masks, keeping a few recently used markets decoded in memory.
+
+Usage:
+    archive = TradeArchive("data/archive")
+    archive.write(market_id, {"trades": trade_rows, "orders": order_rows}, columns)
+    rows = archive.query_trades(market_id, agent_id=7, limit=50)
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from market_store import to_epoch_us
+
+_CACHE_MARKETS = 8
+_SQL_TO_DTYPE = {"INTEGER": np.int64, "REAL": np.float64}
+
+
+class TradeArchive:
+    """Directory of per-market ``market_<id>.npz`` history files."""
+
+    def __init__(self, archive_dir: str):
+        self._dir = Path(archive_dir)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[int, Dict[str, Dict[str, np.ndarray]]]" = OrderedDict()
+
+    def path(self, market_id: int) -> str:
+        return str(self._dir / f"market_{int(market_id)}.npz")
+
+    # ── Writing ───────────────────────────────────────────────────────
+
+    def write(
+        self,
+        market_id: int,
+        tables: Dict[str, Sequence[Any]],
+        columns: Dict[str, Sequence[Sequence[str]]],
+    ) -> str:
+        """
+        Persist *tables* (name -> rows) for one market and return the file path.
+
+        *columns* maps each table to ``(name, sql_type)`` pairs, usually taken
+        from ``PRAGMA table_info``.  The file is written to a temp name and
+        renamed, so readers never see a partial archive.
+        """
+        arrays: Dict[str, np.ndarray] = {}
+        for table, rows in tables.items():
+            for name, sql_type in columns[table]:
+                values = [r[name] for r in rows]
+                dtype = _SQL_TO_DTYPE.get(str(sql_type).upper())
+                if dtype is None:
+                    arr = np.array([str(v) for v in values], dtype=np.str_)
+                else:
+                    arr = np.asarray(values, dtype=dtype)
+                arrays[f"{table}.{name}"] = arr
+        self._dir.mkdir(parents=True, exist_ok=True)
+        final = self.path(market_id)
+        fd, tmp = tempfile.mkstemp(dir=str(self._dir), suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez_compressed(fh, **arrays)
+            os.replace(tmp, final)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock:
+            self._cache.pop(int(market_id), None)
+        return final
+
+    def exists(self, market_id: int) -> bool:
+        return os.path.exists(self.path(market_id))
+
+    def delete(self, market_id: int) -> None:
+        with self._lock:
+            self._cache.pop(int(market_id), None)
+        try:
+            os.remove(self.path(market_id))
+        except FileNotFoundError:
+            pass
+
+    # ── Reading ───────────────────────────────────────────────────────
+
+    def _load(self, market_id: int) -> Dict[str, Dict[str, np.ndarray]]:
+        mid = int(market_id)
+        with self._lock:
+            cached = self._cache.get(mid)
+            if cached is not None:
+                self._cache.move_to_end(mid)
+                return cached
+        path = self.path(mid)
+        if not os.path.exists(path):
+            raise ValueError(f"Archive for market {mid} not found")
+        tables: Dict[str, Dict[str, np.ndarray]] = {}
+        with np.load(path, allow_pickle=False) as data:
+            for key in data.files:
+                table, _, col = key.partition(".")
+                tables.setdefault(table, {})[col] = data[key]
+        with self._lock:
+            self._cache[mid] = tables
+            while len(self._cache) > _CACHE_MARKETS:
+                self._cache.popitem(last=False)
+        return tables
+
+    @staticmethod
+    def _rows(cols: Dict[str, np.ndarray], idx: np.ndarray) -> List[Dict[str, Any]]:
+        names = list(cols)
+        picked = [cols[n][idx].tolist() for n in names]
+        return [dict(zip(names, values)) for values in zip(*picked)]
+
+    def query_trades(
+        self,
+        market_id: int,
+        *,
+        agent_id: Optional[int] = None,
+        since_trade_id: Optional[int] = None,
+        before_trade_id: Optional[int] = None,
+        since_ts: Any = None,
+        until_ts: Any = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first raw trade rows (``created_us`` not yet rendered)."""
+        cols = self._load(market_id).get("trades", {})
+        if not cols:
+            return []
+        ids = cols["id"]
+        mask = np.ones(ids.shape[0], dtype=bool)
+        if agent_id is not None:
+            mask &= cols["agent_id"] == int(agent_id)
+        if since_trade_id is not None:
+            mask &= ids > int(since_trade_id)
+        if before_trade_id is not None:
+            mask &= ids < int(before_trade_id)
+        if since_ts is not None:
+            mask &= cols["created_us"] >= to_epoch_us(since_ts)
+        if until_ts is not None:
+            mask &= cols["created_us"] < to_epoch_us(until_ts)
+        # Rows are stored in id order, so the newest matches are at the end.
+        idx = np.flatnonzero(mask)[-int(limit):][::-1] if limit > 0 else np.empty(0, dtype=int)
+        return self._rows(cols, idx)
@@ -79,6 +79,8 @@ type SimMetrics = {
   final_error: number | null;
   best_bid_series?: (number | null)[];
   best_ask_series?: (number | null)[];
+  /** Round each point ends at, when the series are downsampled (streamed batches). */
+  rounds?: number[];
 };
 
 type SettlementRow = {
@@ -121,6 +123,8 @@ type SimulateResponse = {
 
 type SessionSnapshot = {
   session_id: string;
+  /** "delta": series, comments and agents hold only what changed since the request's since_round. */
+  mode?: "full" | "delta";
   target_rounds: number;
   round: number;
   done: boolean;
@@ -148,6 +152,24 @@ type StreamTick = {
   append_best_ask?: number | null;
 };
 
+/** Columnar stream line: parallel arrays of the chart points since the previous batch. */
+type StreamBatch = {
+  type: "batch";
+  state: SimState;
+  mean_initial_belief: number;
+  columns: {
+    round: number[];
+    price: number[];
+    mean_belief: number[];
+    error: number[];
+    trade_volume: number[];
+    best_bid?: (number | null)[];
+    best_ask?: (number | null)[];
+  };
+  new_comments: SimComment[];
+  comment_sampling: CommentSampling;
+};
+
 function mergeStreamTick(
   prev: SimulateResponse | null,
   tick: StreamTick,
@@ -187,6 +209,35 @@ function mergeStreamTick(
   };
 }
 
+function mergeStreamBatch(
+  prev: SimulateResponse | null,
+  batch: StreamBatch,
+  form: SimulatePayload,
+): SimulateResponse {
+  const c = batch.columns;
+  const p = prev?.metrics;
+  const metrics: SimMetrics = {
+    total_rounds: batch.state.round,
+    rounds: [...(p?.rounds ?? []), ...c.round],
+    price_series: [...(p?.price_series ?? []), ...c.price],
+    mean_belief_series: [...(p?.mean_belief_series ?? []), ...c.mean_belief],
+    error_series: [...(p?.error_series ?? []), ...c.error],
+    trade_volume: [...(p?.trade_volume ?? []), ...c.trade_volume],
+    mean_initial_belief: batch.mean_initial_belief,
+    final_price: batch.state.price,
+    final_error: batch.state.error,
+  };
+  if (c.best_bid != null) metrics.best_bid_series = [...(p?.best_bid_series ?? []), ...c.best_bid];
+  if (c.best_ask != null) metrics.best_ask_series = [...(p?.best_ask_series ?? []), ...c.best_ask];
+  return {
+    event_name: form.event_name,
+    metrics,
+    state: batch.state,
+    comments: [...(prev?.comments ?? []), ...batch.new_comments],
+    comment_sampling: batch.comment_sampling,
+  };
+}
+
 function ResultsSkeleton({
   eventName,
   mechanism,
@@ -261,6 +312,9 @@ const defaultPayload: SimulatePayload = {
 
 const CHART_REVEAL_MS = 5000;
 const COMMENT_PROB = 0.01;
+/** Live charts need about one point per pixel column; the stream folds rounds beyond that. */
+const STREAM_MAX_POINTS = 600;
+const STREAM_INTERVAL_MS = 100;
 
 function tradeFlowDescription(flow: TradeFlow | undefined): string {
   if (flow === "buy_yes") return " · bought Yes";
@@ -280,6 +334,37 @@ function snapshotToResult(snapshot: SessionSnapshot, eventName: string): Simulat
   };
 }
 
+/** Apply a session response to the current result (delta responses append). */
+function mergeSessionSnapshot(
+  prev: SimulateResponse | null,
+  snapshot: SessionSnapshot,
+  eventName: string,
+): SimulateResponse {
+  if (snapshot.mode !== "delta" || !prev) return snapshotToResult(snapshot, eventName);
+  const d = snapshot.metrics;
+  const p = prev.metrics;
+  const metrics: SimMetrics = {
+    ...d,
+    price_series: [...p.price_series, ...d.price_series],
+    error_series: [...p.error_series, ...d.error_series],
+    trade_volume: [...p.trade_volume, ...d.trade_volume],
+    mean_belief_series: [...p.mean_belief_series, ...d.mean_belief_series],
+  };
+  if (d.best_bid_series != null) metrics.best_bid_series = [...(p.best_bid_series ?? []), ...d.best_bid_series];
+  if (d.best_ask_series != null) metrics.best_ask_series = [...(p.best_ask_series ?? []), ...d.best_ask_series];
+  return {
+    ...snapshotToResult(snapshot, eventName),
+    metrics,
+    comments: [...prev.comments, ...snapshot.comments],
+  };
+}
+
+/** Position the server diffs delta responses against. */
+function sessionDeltaFields(prev: SimulateResponse | null): Record<string, number> {
+  if (!prev) return {};
+  return { since_round: prev.metrics.price_series.length, since_comment: prev.comments.length };
+}
+
 function parseAgentIds(raw: string): number[] | undefined {
   const t = raw.trim();
   if (!t) return undefined;
@@ -314,7 +399,7 @@ function buildChartRows(metrics: SimMetrics) {
     const p = metrics.price_series[i];
     const mb = metrics.mean_belief_series[i];
     rows.push({
-      round: i + 1,
+      round: metrics.rounds?.[i] ?? i + 1,
       yes: Math.round(p * 1000) / 10,
       no: Math.round((1 - p) * 1000) / 10,
       meanBelief: mb != null ? Math.round(mb * 1000) / 10 : null,
@@ -389,7 +474,7 @@ export function ClassicDashboard() {
     return chartData.slice(0, count);
   }, [chartData, chartReveal01, chartLive]);
 
-  const roundDomainMax = Math.max(1, chartData.length);
+  const roundDomainMax = Math.max(1, chartData.length ? chartData[chartData.length - 1].round : 0);
 
   const commentsSorted = useMemo(() => {
     if (!result?.comments?.length) return [];
@@ -430,7 +515,8 @@ export function ClassicDashboard() {
     }
 
     try {
-      const res = await fetch("/api/simulate/stream", {
+      const query = `max_points=${STREAM_MAX_POINTS}&interval_ms=${STREAM_INTERVAL_MS}&compress=true`;
+      const res = await fetch(`/api/simulate/stream?${query}`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body,
@@ -456,9 +542,11 @@ export function ClassicDashboard() {
         for (const line of lines) {
           const trimmed = line.trim();
           if (!trimmed) continue;
-          const msg = JSON.parse(trimmed) as StreamTick | (SimulateResponse & { type: string });
+          const msg = JSON.parse(trimmed) as StreamTick | StreamBatch | (SimulateResponse & { type: string });
           if (msg.type === "tick") {
             setResult((prev) => mergeStreamTick(prev, msg as StreamTick, form));
+          } else if (msg.type === "batch") {
+            setResult((prev) => mergeStreamBatch(prev, msg as StreamBatch, form));
           } else if (msg.type === "done") {
             const { type: _t, ...rest } = msg as SimulateResponse & { type: "done" };
             setResult(rest);
@@ -515,14 +603,18 @@ export function ClassicDashboard() {
       const res = await fetch("/api/session/step", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ session_id: sessionId, rounds: roundsPerStep }),
+        body: JSON.stringify({
+          session_id: sessionId,
+          rounds: roundsPerStep,
+          ...sessionDeltaFields(result),
+        }),
       });
       if (!res.ok) {
         const t = await res.text();
         throw new Error(t || `HTTP ${res.status}`);
       }
       const snap = (await res.json()) as SessionSnapshot;
-      setResult(snapshotToResult(snap, form.event_name));
+      setResult((prev) => mergeSessionSnapshot(prev, snap, form.event_name));
     } catch (e) {
       setError(e instanceof Error ? e.message : String(e));
     } finally {
@@ -538,6 +630,7 @@ export function ClassicDashboard() {
       const payload: Record<string, unknown> = {
         session_id: sessionId,
         agent_ids: parseAgentIds(shockAgentIds),
+        ...sessionDeltaFields(result),
       };
       if (shockMode === "new_belief") {
         const v = shockValue;
@@ -558,7 +651,7 @@ export function ClassicDashboard() {
         throw new Error(t || `HTTP ${res.status}`);
       }
       const snap = (await res.json()) as SessionSnapshot;
-      setResult(snapshotToResult(snap, form.event_name));
+      setResult((prev) => mergeSessionSnapshot(prev, snap, form.event_name));
       if (snap.shift_event) {
         const ev = snap.shift_event;
         const kind = ev.new_belief != null ? `set to ${(ev.new_belief * 100).toFixed(0)}%` : `Δ ${ev.delta != null ? (ev.delta * 100).toFixed(1) : ""}%`;
@@ -86,6 +86,9 @@ type SettlementResult = {
 
 const MAX_MEAN_BELIEF_SAMPLES = 3000;
 
+/** One message from GET /api/market/{id}/stream (see api/market_stream.py). */
+type StreamEvent<T> = { seq: number | null; type: string; market_id: number; data: T };
+
 export function MarketDetailPage() {
   const navigate = useNavigate();
   const { marketId: midParam } = useParams();
@@ -103,6 +106,8 @@ export function MarketDetailPage() {
   const [busy, setBusy] = useState(false);
   const lastTradeIdRef = useRef(0);
   const lastCommentIdRef = useRef(0);
+  /** True while the push stream is connected; the fast polls below stand down. */
+  const streamLiveRef = useRef(false);
   const tickRef = useRef(0);
   const [demoN, setDemoN] = useState(12);
   const [showNews, setShowNews] = useState(false);
@@ -296,7 +301,7 @@ export function MarketDetailPage() {
     if (!Number.isFinite(marketId)) return;
     let cancelled = false;
     const run = async () => {
-      if (cancelled) return;
+      if (cancelled || streamLiveRef.current) return;
       try {
         await fetchMeanBeliefSeries();
       } catch (e) {
@@ -315,7 +320,7 @@ export function MarketDetailPage() {
     if (!Number.isFinite(marketId)) return;
     let cancelled = false;
     const run = async () => {
-      if (cancelled) return;
+      if (cancelled || streamLiveRef.current) return;
       try {
         await fetchPrice();
       } catch (e) {
@@ -334,7 +339,7 @@ export function MarketDetailPage() {
     if (!Number.isFinite(marketId)) return;
     let cancelled = false;
     const run = async () => {
-      if (cancelled) return;
+      if (cancelled || streamLiveRef.current) return;
       try {
         await fetchTrades();
       } catch (e) {
@@ -353,7 +358,7 @@ export function MarketDetailPage() {
     if (!Number.isFinite(marketId) || detail?.mechanism !== "cda") return;
     let cancelled = false;
     const run = async () => {
-      if (cancelled) return;
+      if (cancelled || streamLiveRef.current) return;
       try {
         await fetchBook();
       } catch {
@@ -374,7 +379,7 @@ export function MarketDetailPage() {
     const gen = tickRef.current;
     let cancelled = false;
     const poll = async () => {
-      if (cancelled || tickRef.current !== gen) return;
+      if (cancelled || tickRef.current !== gen || streamLiveRef.current) return;
       try {
         await fetchComments();
       } catch {
@@ -413,7 +418,7 @@ export function MarketDetailPage() {
     if (!Number.isFinite(marketId)) return;
     let cancelled = false;
     const run = async () => {
-      if (cancelled) return;
+      if (cancelled || streamLiveRef.current) return;
       try {
         await fetchNewsHistory();
       } catch {
@@ -428,6 +433,78 @@ export function MarketDetailPage() {
     };
   }, [marketId, fetchNewsHistory]);
 
+  /** Latest loaders for the push handlers, so the stream is not reopened on every render. */
+  const streamCallbacks = useRef({
+    fetchTrades, fetchPrice, fetchBook, fetchComments, fetchNewsHistory, loadDetail,
+    mechanism: detail?.mechanism,
+  });
+  streamCallbacks.current = {
+    fetchTrades, fetchPrice, fetchBook, fetchComments, fetchNewsHistory, loadDetail,
+    mechanism: detail?.mechanism,
+  };
+
+  /**
+   * Push channel: apply trades, quotes, mean-belief points, comments, news and
+   * status changes as the server commits them. Polling above resumes whenever
+   * the stream is down; each (re)connect resyncs once over REST. A multi-worker
+   * server answers 503, which closes the EventSource for good, so the page
+   * just keeps polling.
+   */
+  useEffect(() => {
+    if (!Number.isFinite(marketId) || typeof EventSource === "undefined") return;
+    const cb = streamCallbacks;
+    const es = new EventSource(`/api/market/${marketId}/stream`);
+    const on = <T,>(type: string, apply: (data: T) => void) =>
+      es.addEventListener(type, (ev) => {
+        try {
+          apply((JSON.parse((ev as MessageEvent).data) as StreamEvent<T>).data);
+        } catch {
+          /* ignore malformed frame */
+        }
+      });
+
+    es.onopen = () => {
+      streamLiveRef.current = true;
+      void cb.current.fetchTrades().catch(() => undefined);
+      void cb.current.fetchPrice().catch(() => undefined);
+      void cb.current.fetchComments();
+      void cb.current.fetchNewsHistory();
+    };
+    es.onerror = () => {
+      streamLiveRef.current = false;
+    };
+    on<TradeRow>("trade", (t) => {
+      setChartTrades((prev) => mergeTradesUnique(prev, [t]));
+      setTrades((prev) => mergeTradesUnique(prev, [t], 200));
+      setServerTradeTotal((n) => (n == null ? n : n + 1));
+      lastTradeIdRef.current = Math.max(lastTradeIdRef.current, Number.parseInt(t.trade_id, 10) || 0);
+    });
+    on<Omit<PriceSnap, "market_id">>("quote", (q) => {
+      setPrice((prev) => ({ ...(prev ?? {}), ...q, market_id: marketId }));
+      if (cb.current.mechanism === "cda") void cb.current.fetchBook();
+    });
+    on<{ t: string; mean_belief: number }>("mean_belief", (s) => {
+      const t = Date.parse(s.t);
+      if (!Number.isFinite(t) || !Number.isFinite(Number(s.mean_belief))) return;
+      setMeanBeliefSamples((prev) => mergeMeanBeliefSamples(prev, [{ t, meanBelief: Number(s.mean_belief) }]));
+    });
+    on<CommentRow>("comment", (c) => {
+      if (c.id <= lastCommentIdRef.current) return;
+      setComments((prev) => [...prev, c].slice(-120));
+      lastCommentIdRef.current = c.id;
+    });
+    on<unknown>("news", () => void cb.current.fetchNewsHistory());
+    on<unknown>("status", () => void cb.current.loadDetail());
+    on<unknown>("dropped", () => {
+      // Fell behind: the server closed us; EventSource reconnects and onopen resyncs.
+      streamLiveRef.current = false;
+    });
+    return () => {
+      streamLiveRef.current = false;
+      es.close();
+    };
+  }, [marketId, mergeTradesUnique, mergeMeanBeliefSamples]);
+
   useEffect(() => {
     if (!Number.isFinite(marketId)) return;
     if (detail?.status !== "resolved") {
@@ -7,7 +7,12 @@
 #   3. news event response and persistence
 #   4. multi-market validation
 #
-# how to run: python run_autonomous_benchmark.py [--experiment 1|2|3|4|all]
+# how to run: python run_autonomous_benchmark.py [--experiment 1|2|3|4|all] [--sharded] [--memory]
+#
+# --sharded puts every market in its own sqlite file (MARKET_SHARD_DIR) so
+# concurrent markets stop sharing one write lock
+# --memory keeps the market db in memory (no file i/o or fsyncs); with
+# --sharded only the catalog moves to memory
 
 from __future__ import annotations
 
@@ -49,9 +54,10 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 class _BackgroundServer:
     # runs the fastapi app in a thread so agents can hit real http endpoints
 
-    def __init__(self, port: int, db_path: str):
+    def __init__(self, port: int, db_path: str, shard_dir: Optional[str] = None):
         self.port = port
         self.db_path = db_path
+        self.shard_dir = shard_dir
         self.base_url = f"http://127.0.0.1:{port}"
         self._server: Optional[uvicorn.Server] = None
         self._thread: Optional[threading.Thread] = None
@@ -59,6 +65,13 @@ class _BackgroundServer:
     def start(self):
         os.environ["MARKET_DB_PATH"] = self.db_path
         os.environ["AUTONOMOUS_API_BASE"] = f"{self.base_url}/api"
+        if self.shard_dir:
+            os.environ["MARKET_SHARD_DIR"] = self.shard_dir
+            # agents join both markets in exp4, so split their cash evenly
+            os.environ["MARKET_SHARD_ALLOCATION"] = str(_SHARD_ALLOCATION)
+        else:
+            os.environ.pop("MARKET_SHARD_DIR", None)
+            os.environ.pop("MARKET_SHARD_ALLOCATION", None)
 
         # reset singletons before importing, so they pick up the fresh db path + url
         from api.market_routes import reset_market_runtime
@@ -93,6 +106,9 @@ class _BackgroundServer:
 
 
 _port_counter = [8100]
+_sharded = [False]
+_memory = [False]
+_SHARD_ALLOCATION = 50.0
 
 
 def _next_port() -> int:
@@ -105,9 +121,10 @@ def _next_port() -> int:
 def running_server():
     # context manager so experiments are isolated from each other
     tmp = tempfile.mkdtemp(prefix="bench_")
-    db_path = os.path.join(tmp, "bench.sqlite")
+    db_path = ":memory:" if _memory[0] else os.path.join(tmp, "bench.sqlite")
     port = _next_port()
-    server = _BackgroundServer(port=port, db_path=db_path)
+    shard_dir = os.path.join(tmp, "shards") if _sharded[0] else None
+    server = _BackgroundServer(port=port, db_path=db_path, shard_dir=shard_dir)
     try:
         server.start()
         yield server
@@ -644,8 +661,8 @@ def experiment_4_multimarket(seeds=(42, 101, 777), duration_sec: float = 45.0,
             api_start(server.base_url, market_id_1)
             api_start(server.base_url, market_id_2)
             time.sleep(duration_sec)
-            api_stop(server.base_url, market_id_1)
-            api_stop(server.base_url, market_id_2)
+            stop_1 = api_stop(server.base_url, market_id_1)
+            stop_2 = api_stop(server.base_url, market_id_2)
 
             price_1 = api_price(server.base_url, market_id_1)
             price_2 = api_price(server.base_url, market_id_2)
@@ -656,6 +673,8 @@ def experiment_4_multimarket(seeds=(42, 101, 777), duration_sec: float = 45.0,
             "market_a_error": abs(price_1 - gt_1),
             "market_b_gt": gt_2, "market_b_price": price_2,
             "market_b_error": abs(price_2 - gt_2),
+            # write throughput across both markets; compare with --sharded
+            "trades_per_sec": (stop_1["total_trades"] + stop_2["total_trades"]) / duration_sec,
         })
 
     df = pd.DataFrame(rows)
@@ -685,10 +704,15 @@ def experiment_4_multimarket(seeds=(42, 101, 777), duration_sec: float = 45.0,
     err_b = mean(r["market_b_error"] for r in rows)
     print(f"  market a mean error: {err_a:.4f} (target {gt_1})")
     print(f"  market b mean error: {err_b:.4f} (target {gt_2})")
+    tps = mean(r["trades_per_sec"] for r in rows)
+    print(f"  trades/sec across both markets: {tps:.1f}"
+          f" ({'sharded' if _sharded[0] else 'single db'})")
 
     return {
         "market_a": {"ground_truth": gt_1, "mean_error": err_a},
         "market_b": {"ground_truth": gt_2, "mean_error": err_b},
+        "trades_per_sec": tps,
+        "sharded": _sharded[0],
         "per_seed": rows,
     }
 
@@ -703,7 +727,13 @@ def main():
                          choices=["1", "2", "3", "4", "all"])
     parser.add_argument("--quick", action="store_true",
                          help="shorter durations for smoke testing")
+    parser.add_argument("--sharded", action="store_true",
+                         help="one sqlite file per market (MARKET_SHARD_DIR)")
+    parser.add_argument("--memory", action="store_true",
+                         help="in-memory storage backend (MARKET_DB_PATH=:memory:)")
     args = parser.parse_args()
+    _sharded[0] = args.sharded
+    _memory[0] = args.memory
 
     if args.quick:
         dur1 = 15.0; dur2 = 15.0; dur3b = 8.0; dur3r = 10.0; dur4 = 15.0
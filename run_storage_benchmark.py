@@ -0,0 +1,138 @@
+# storage tuning benchmark
+# measures MarketService write throughput and read latency per sqlite tuning
+# profile, saves json to outputs/storage/
+#
+# for each profile (durable / balanced / fast) a fresh file db gets one lmsr
+# market and a pool of agents; writer threads hammer execute_lmsr_trade while
+# reader threads loop over the GET-path reads (price snapshot, recent trades,
+# market summary list). writers hold BEGIN IMMEDIATE, readers use the read-only
+# pool, so read latency should stay flat while writes run.
+#
+# how to run: python run_storage_benchmark.py [--profile durable|balanced|fast|all]
+#             [--seconds 5] [--writers 4] [--readers 8] [--pool-size 8]
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+_REPO = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(_REPO / "app"))
+sys.path.insert(0, str(_REPO / "src"))
+
+from market_service import MarketService
+from storage_backend import TUNING_PROFILES
+
+OUTPUT_DIR = _REPO / "outputs" / "storage"
+
+
+def _setup(svc: MarketService, n_agents: int) -> Dict[str, Any]:
+    mkt = svc.create_market("bench", "storage benchmark", mechanism="lmsr", b=500.0)
+    svc.set_market_status(mkt["id"], "running")
+    agents = [
+        svc.create_agent(f"bench-{i}", cash=1e9, market_id=mkt["id"])["id"]
+        for i in range(n_agents)
+    ]
+    return {"market_id": mkt["id"], "agent_ids": agents}
+
+
+def run_profile(
+    profile: str, *, seconds: float, writers: int, readers: int, pool_size: int,
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        svc = MarketService(
+            str(pathlib.Path(tmp) / "bench.sqlite"), profile=profile, read_pool_size=pool_size,
+        )
+        ctx = _setup(svc, n_agents=max(writers, 1) * 4)
+        mid = ctx["market_id"]
+        stop = threading.Event()
+        write_counts = [0] * writers
+        read_lat: List[List[float]] = [[] for _ in range(readers)]
+
+        def _writer(i: int) -> None:
+            rng = random.Random(i)
+            while not stop.is_set():
+                aid = rng.choice(ctx["agent_ids"])
+                svc.execute_lmsr_trade(mid, aid, rng.choice([-1.0, 1.0]) * rng.uniform(0.1, 2.0))
+                write_counts[i] += 1
+
+        def _reader(i: int) -> None:
+            reads = (
+                lambda: svc.get_price_snapshot(mid),
+                lambda: svc.get_trades(market_id=mid, limit=50),
+                lambda: svc.list_markets_with_summary(limit=20),
+            )
+            k = 0
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                reads[k % len(reads)]()
+                read_lat[i].append(time.perf_counter() - t0)
+                k += 1
+
+        threads = [threading.Thread(target=_writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=_reader, args=(i,)) for i in range(readers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        svc.close()
+
+    lat_ms = np.array([x for per in read_lat for x in per]) * 1000.0
+    return {
+        "profile": profile,
+        "pragmas": TUNING_PROFILES[profile],
+        "seconds": round(elapsed, 3),
+        "writers": writers,
+        "readers": readers,
+        "read_pool_size": pool_size,
+        "trades": int(sum(write_counts)),
+        "trades_per_sec": round(sum(write_counts) / elapsed, 1),
+        "reads": int(lat_ms.size),
+        "read_p50_ms": round(float(np.percentile(lat_ms, 50)), 3) if lat_ms.size else None,
+        "read_p99_ms": round(float(np.percentile(lat_ms, 99)), 3) if lat_ms.size else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", default="all", choices=[*TUNING_PROFILES, "all"])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+
+    profiles = list(TUNING_PROFILES) if args.profile == "all" else [args.profile]
+    results = []
+    for profile in profiles:
+        res = run_profile(
+            profile, seconds=args.seconds, writers=args.writers,
+            readers=args.readers, pool_size=args.pool_size,
+        )
+        print(
+            f"{profile:<9} {res['trades_per_sec']:>9.1f} trades/s   "
+            f"read p50 {res['read_p50_ms']} ms   p99 {res['read_p99_ms']} ms"
+        )
+        results.append(res)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out = OUTPUT_DIR / "storage_profiles.json"
+    out.write_text(json.dumps(results, indent=2))
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# lmsr trade path micro-benchmark
+# counts sql statements and latency per MarketService.execute_lmsr_trade call,
+# saves json to outputs/storage/
+#
+# statements are counted with sqlite3's set_trace_callback on the writer
+# connection (BEGIN/COMMIT included; executemany counts every row). the run
+# mixes plain buys, sells, first trades that create the position row and
+# cash-clipped buys, which is what autonomous agents send near the end of a run.
+#
+# how to run: python run_trade_path_benchmark.py [--trades 2000] [--memory] [--profile durable]
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict
+
+import numpy as np
+
+_REPO = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(_REPO / "app"))
+sys.path.insert(0, str(_REPO / "src"))
+
+from market_service import MarketService
+
+OUTPUT_DIR = _REPO / "outputs" / "storage"
+
+
+def run(svc: MarketService, n_trades: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    mkt = svc.create_market("path", "trade path benchmark", mechanism="lmsr", b=100.0)
+    svc.set_market_status(mkt["id"], "running")
+    rich = [svc.create_agent(f"rich-{i}", cash=1e9)["id"] for i in range(20)]
+    poor = [svc.create_agent(f"poor-{i}", cash=5.0)["id"] for i in range(20)]
+
+    statements = Counter()
+    conn = svc._get_conn()
+    conn.set_trace_callback(lambda sql: statements.update([sql.split(None, 1)[0].upper()]))
+    kinds = Counter()
+    lat = []
+    try:
+        for _ in range(n_trades):
+            if rng.random() < 0.2:
+                aid, qty, kind = rng.choice(poor), rng.uniform(20.0, 50.0), "clipped"
+            else:
+                aid = rng.choice(rich)
+                qty = rng.choice([-1.0, 1.0]) * rng.uniform(0.1, 5.0)
+                kind = "buy" if qty > 0 else "sell"
+            t0 = time.perf_counter()
+            svc.execute_lmsr_trade(mkt["id"], aid, qty)
+            lat.append(time.perf_counter() - t0)
+            kinds[kind] += 1
+    finally:
+        conn.set_trace_callback(None)
+
+    lat_us = np.array(lat) * 1e6
+    total = sum(statements.values())
+    return {
+        "trades": n_trades,
+        "trade_mix": dict(kinds),
+        "statements_per_trade": round(total / n_trades, 2),
+        "statements_by_verb": {k: round(v / n_trades, 2) for k, v in statements.most_common()},
+        "latency_mean_us": round(float(lat_us.mean()), 1),
+        "latency_p50_us": round(float(np.percentile(lat_us, 50)), 1),
+        "latency_p99_us": round(float(np.percentile(lat_us, 99)), 1),
+        "trades_per_sec": round(n_trades / float(np.sum(lat)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trades", type=int, default=2000)
+    parser.add_argument("--memory", action="store_true", help="in-memory backend")
+    parser.add_argument("--profile", default=None, help="file-db tuning profile")
+    parser.add_argument("--label", default="current", help="name stored with the result")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        target = ":memory:" if args.memory else str(pathlib.Path(tmp) / "path.sqlite")
+        svc = MarketService(target, profile=args.profile)
+        try:
+            res = run(svc, args.trades)
+        finally:
+            svc.close()
+    res["label"] = args.label
+    res["backend"] = "memory" if args.memory else f"file/{args.profile or 'durable'}"
+    print(json.dumps(res, indent=2))
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out = OUTPUT_DIR / f"trade_path_{args.label}.json"
+    out.write_text(json.dumps(res, indent=2))
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
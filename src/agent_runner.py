@@ -12,13 +12,15 @@ import logging
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Optional, Set
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
 
 from autonomous_agent import AutonomousAgent
 from market_service import MarketService
 
 logger = logging.getLogger(__name__)
 
+_AGENT_PAGE_SIZE = 500
+
 
 @dataclass
 class _AgentSeed:
@@ -82,29 +84,40 @@ class AgentRunner:
 
         self._market_service.get_market(market_id)
         self._market_service.set_market_status(market_id, "running")
-        rows = self._market_service.list_agents(limit=1_000_000, offset=0)["agents"]
+        # Stream the roster one keyset page at a time instead of loading every
+        # agent row up front.
+        started_agent_ids: Set[int] = set()
+        cursor: Optional[str] = None
+        while True:
+            page = self._market_service.list_agents(limit=_AGENT_PAGE_SIZE, cursor=cursor)
+            with self._lock:
+                self._ensure_monitor_locked()
+                for row in page["agents"]:
+                    seed = self._seed_from_row(row)
+                    aid = seed.agent_id
+                    started_agent_ids.add(aid)
+                    state = self._agent_states.get(aid)
+                    if state is None:
+                        self._start_agent_locked(seed, {market_id})
+                    else:
+                        state.markets.add(market_id)
+                        state.stop_requested = False
+                    self._agent_seeds[aid] = seed
+            cursor = page.get("next_cursor")
+            if cursor is None:
+                break
 
         with self._lock:
-            self._ensure_monitor_locked()
-            started_agent_ids: Set[int] = set()
-            for row in rows:
-                seed = self._seed_from_row(row)
-                aid = seed.agent_id
-                started_agent_ids.add(aid)
-                state = self._agent_states.get(aid)
-                if state is None:
-                    self._start_agent_locked(seed, {market_id})
-                else:
-                    state.markets.add(market_id)
-                    state.stop_requested = False
-                self._agent_seeds[aid] = seed
             self._market_agents[market_id] = started_agent_ids
             self._market_started_at[market_id] = time.monotonic()
             return self.agent_count_active(market_id)
 
-    def stop_market(self, market_id: int) -> Dict[str, Any]:
+    def stop_market(self, market_id: int, *, set_status: bool = True) -> Dict[str, Any]:
         """
         Mark market stopped and stop agents no longer used by other markets.
+
+        ``set_status=False`` only detaches the threads here and leaves the
+        market status alone (another process takes the market over).
         """
         join_targets = []
         with self._lock:
@@ -127,7 +140,8 @@ class AgentRunner:
                     logger.exception("Agent %s stop() failed", aid)
                 join_targets.append((aid, state.thread))
 
-        self._market_service.set_market_status(market_id, "stopped")
+        if set_status:
+            self._market_service.set_market_status(market_id, "stopped")
         zombies = self._join_and_prune(join_targets)
 
         with self._lock:
@@ -175,6 +189,10 @@ class AgentRunner:
         with self._lock:
             return market_id in self._market_agents
 
+    def running_markets(self) -> List[int]:
+        with self._lock:
+            return list(self._market_agents)
+
     def agent_count_active(self, market_id: int) -> int:
         with self._lock:
             aids = self._market_agents.get(market_id, set())
@@ -198,22 +216,28 @@ class AgentRunner:
         Called by API agent create/update endpoints so autonomous execution stays
         global and independent from per-market joins.
         """
-        seed = self._seed_from_row(agent)
-        aid = seed.agent_id
+        self.register_agents([agent])
+
+    def register_agents(self, agents: Iterable[Dict[str, Any]]) -> None:
+        """Bulk :meth:`register_or_update_agent`: one lock acquisition for all rows."""
+        seeds = [self._seed_from_row(agent) for agent in agents]
         with self._lock:
-            self._agent_seeds[aid] = seed
+            for seed in seeds:
+                self._agent_seeds[seed.agent_id] = seed
             running_markets = set(self._market_agents.keys())
-            if not running_markets:
+            if not running_markets or not seeds:
                 return
             self._ensure_monitor_locked()
-            state = self._agent_states.get(aid)
-            if state is None:
-                self._start_agent_locked(seed, running_markets)
-            else:
-                state.markets.update(running_markets)
-                state.stop_requested = False
-            for mid in running_markets:
-                self._market_agents[mid].add(aid)
+            for seed in seeds:
+                aid = seed.agent_id
+                state = self._agent_states.get(aid)
+                if state is None:
+                    self._start_agent_locked(seed, running_markets)
+                else:
+                    state.markets.update(running_markets)
+                    state.stop_requested = False
+                for mid in running_markets:
+                    self._market_agents[mid].add(aid)
 
     def _seed_from_row(self, row: Dict[str, Any]) -> _AgentSeed:
         raw_personality = row.get("personality")
@@ -13,7 +13,7 @@ import logging
 import os
 import random
 import threading
-from typing import Any, Callable, Dict, List, Mapping, Optional, Set
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
 
 import requests
 
@@ -65,6 +65,8 @@ class AutonomousAgent:
         self._stop_flag = threading.Event()
         self._shares_by_market: Dict[int, float] = {}
         self._belief_by_market: Dict[int, float] = {}
+        # url -> (ETag, parsed body) for conditional GETs; a 304 reuses the body.
+        self._etag_cache: Dict[str, Tuple[str, Any]] = {}
         # When set (by AgentRunner), only those markets are considered after discovery.
         self._allowed_market_ids = allowed_market_ids
 
@@ -84,6 +86,34 @@ class AutonomousAgent:
             path = "/" + path
         return f"{self.api_base_url}{path}"
 
+    def _get(self, path: str) -> Tuple[int, Any]:
+        """
+        Conditional GET: returns ``(status, parsed JSON)``, or ``(status, text)``
+        for errors.  Sends the last ``ETag`` seen for the URL, and a ``304``
+        comes back as ``200`` with the cached body, so an unchanged market costs
+        the server a dict lookup.  Cached bodies are shared; callers only read them.
+        """
+        url = self._url(path)
+        cached = self._etag_cache.get(url)
+        if cached is None:
+            response = self.session.get(url, timeout=self.timeout)
+        else:
+            response = self.session.get(
+                url, timeout=self.timeout, headers={"If-None-Match": cached[0]},
+            )
+        if response.status_code == 304 and cached is not None:
+            return 200, cached[1]
+        if response.status_code >= 400:
+            self._etag_cache.pop(url, None)
+            return response.status_code, response.text
+        payload = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[url] = (etag, payload)
+        else:
+            self._etag_cache.pop(url, None)
+        return response.status_code, payload
+
     def _p(self, key: str) -> float:
         """Return personality field value as float."""
         return float(getattr(self.personality, key))
@@ -99,15 +129,9 @@ class AutonomousAgent:
         return self._stop_flag.wait(1.0)
 
     def list_open_markets(self) -> List[Dict[str, Any]]:
-        response = self.session.get(
-            self._url("/markets?status=running"),
-            timeout=self.timeout,
-        )
-        if response.status_code >= 400:
-            raise RuntimeError(
-                f"markets request failed with status {response.status_code}: {response.text}"
-            )
-        payload = response.json()
+        status, payload = self._get("/markets?status=running")
+        if status >= 400:
+            raise RuntimeError(f"markets request failed with status {status}: {payload}")
         markets = payload.get("markets", payload) if isinstance(payload, dict) else payload
         if not isinstance(markets, list):
             raise RuntimeError("markets response must be a list or {\"markets\": [...]} payload")
@@ -152,57 +176,17 @@ class AutonomousAgent:
         idx = min(int(self.rng.uniform(0, len(markets))), len(markets) - 1)
         return markets[idx]
 
-    def get_price_snapshot(self, market_id: int) -> Dict[str, Any]:
-        response = self.session.get(
-            self._url(f"/market/{market_id}/price"),
-            timeout=self.timeout,
-        )
-        if response.status_code >= 400:
-            raise RuntimeError(
-                f"price request failed with status {response.status_code}: {response.text}"
-            )
-        return response.json()
-
-    def get_crowd_belief(self, market_id: int) -> Optional[float]:
-        """Fetch the recent-comments crowd-belief signal for *market_id*.
-
-        Returns ``None`` on any error or when no recent comments exist; the
-        caller treats that as "no signal" and skips the blend. The endpoint
-        is cheap and the agent loop must never crash on its failure.
+    def get_decision_context(self, market_id: int) -> Dict[str, Any]:
         """
-        try:
-            response = self.session.get(
-                self._url(f"/market/{market_id}/comments/crowd_belief"),
-                timeout=self.timeout,
-            )
-        except requests.RequestException:
-            return None
-        if response.status_code >= 400:
-            return None
-        try:
-            payload = response.json()
-        except ValueError:
-            return None
-        cb = payload.get("crowd_belief")
-        if cb is None:
-            return None
-        try:
-            return float(cb)
-        except (TypeError, ValueError):
-            return None
-
-    def get_agent_state(self, market_id: int) -> Optional[Dict[str, Any]]:
-        response = self.session.get(
-            self._url(f"/market/{market_id}/agent/{self.agent_id}"),
-            timeout=self.timeout,
+        Price, quotes, this agent's cash/shares/belief/rho and the crowd belief
+        for *market_id*, in one (conditional) request.
+        """
+        status, payload = self._get(
+            f"/market/{market_id}/agent/{self.agent_id}/decision-context"
         )
-        if response.status_code == 404:
-            return None
-        if response.status_code >= 400:
-            raise RuntimeError(
-                f"agent request failed with status {response.status_code}: {response.text}"
-            )
-        return response.json()
+        if status >= 400:
+            raise RuntimeError(f"decision-context request failed with status {status}: {payload}")
+        return payload
 
     def submit_trade(
         self,
@@ -253,50 +237,43 @@ class AutonomousAgent:
 
         market_id = int(market.get("id", market.get("market_id")))
         mechanism = str(market.get("mechanism") or "lmsr").lower()
-        price_snapshot = self.get_price_snapshot(market_id)
-        agent_state = self.get_agent_state(market_id)
+        ctx = self.get_decision_context(market_id)
 
-        price = float(price_snapshot["price"])
+        price = float(ctx["price"])
         belief = float(self._belief_by_market.get(market_id, self.belief))
-        if agent_state is None:
-            cash = self.cash
-            shares = float(self._shares_by_market.get(market_id, 0.0))
-            rho = self.rho
-        else:
-            # Market state provides cash, shares, rho, and a market-specific
-            # belief target. Blend incoming belief updates through personality.
-            cash = float(agent_state["cash"])
-            shares = float(agent_state["shares"])
-            rho = float(agent_state["rho"])
-            self.cash = cash
-            self.rho = rho
-            self._shares_by_market[market_id] = shares
-
-            market_belief_raw = agent_state.get("belief")
-            if market_belief_raw is not None:
-                market_belief = float(market_belief_raw)
-                if abs(market_belief - belief) > 1e-9:
-                    # Apply signal_sensitivity and stubbornness to blend the
-                    # externally-updated market belief into the local state.
-                    sensitivity = min(max(self._p("signal_sensitivity"), 0.0), 1.0)
-                    stubbornness = min(max(self._p("stubbornness"), 0.0), 1.0)
-                    influence = sensitivity * (1.0 - stubbornness)
-                    raw = belief + influence * (market_belief - belief)
-                    belief = max(0.01, min(0.99, raw))
-            self._belief_by_market[market_id] = belief
+        # Market state provides cash, shares, rho, and a market-specific
+        # belief target. Blend incoming belief updates through personality.
+        cash = float(ctx["cash"])
+        shares = float(ctx["shares"])
+        rho = float(ctx["rho"])
+        self.cash = cash
+        self.rho = rho
+        self._shares_by_market[market_id] = shares
+
+        market_belief_raw = ctx.get("belief")
+        if market_belief_raw is not None:
+            market_belief = float(market_belief_raw)
+            if abs(market_belief - belief) > 1e-9:
+                # Apply signal_sensitivity and stubbornness to blend the
+                # externally-updated market belief into the local state.
+                sensitivity = min(max(self._p("signal_sensitivity"), 0.0), 1.0)
+                stubbornness = min(max(self._p("stubbornness"), 0.0), 1.0)
+                influence = sensitivity * (1.0 - stubbornness)
+                raw = belief + influence * (market_belief - belief)
+                belief = max(0.01, min(0.99, raw))
+        self._belief_by_market[market_id] = belief
 
         # Optional crowd-belief signal from recent comments. Gated globally by
         # COMMENTS_INFLUENCE_TRADERS so existing simulations are unaffected by
         # default. Each agent's reactivity is tuned by personality.comment_influence.
         comment_weight = min(max(self._p("comment_influence"), 0.0), 1.0)
-        if _comments_influence_enabled() and comment_weight > 0.0:
-            crowd_belief = self.get_crowd_belief(market_id)
-            if crowd_belief is not None:
-                stubbornness = min(max(self._p("stubbornness"), 0.0), 1.0)
-                influence = comment_weight * (1.0 - stubbornness)
-                raw = belief + influence * (crowd_belief - belief)
-                belief = max(0.01, min(0.99, raw))
-                self._belief_by_market[market_id] = belief
+        crowd_belief = ctx.get("crowd_belief")
+        if _comments_influence_enabled() and comment_weight > 0.0 and crowd_belief is not None:
+            stubbornness = min(max(self._p("stubbornness"), 0.0), 1.0)
+            influence = comment_weight * (1.0 - stubbornness)
+            raw = belief + influence * (float(crowd_belief) - belief)
+            belief = max(0.01, min(0.99, raw))
+            self._belief_by_market[market_id] = belief
 
         self._belief_by_market[market_id] = belief
         self.belief = belief
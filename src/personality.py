@@ -23,7 +23,7 @@ Usage:
 from __future__ import annotations
 
 import random
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
 
@@ -45,7 +45,8 @@ class Personality:
 
     def to_dict(self) -> Dict[str, float]:
         """Serialize to plain dict (JSON-safe)."""
-        return asdict(self)
+        # Flat float fields: skip asdict()'s recursive deepcopy.
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
 
     @classmethod
     def from_dict(cls, d: Dict[str, Any]) -> "Personality":
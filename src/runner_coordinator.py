@@ -0,0 +1,271 @@
+"""
+Single-owner autonomous runner for an API served by several worker processes.
+
+:class:`AgentRunner` keeps agent threads in the process that started them, so
+with ``uvicorn --workers N`` a start request, the stop request after it and
+agent creations could land in different workers, each with its own runner.
+:class:`RunnerCoordinator` has the same ``start_market`` / ``stop_market`` /
+``register_agents`` surface but records what is wanted in
+:class:`runtime_state.RuntimeState`, and only the worker holding the runner
+lease runs agent threads:
+
+* **Election** -- a lease row with an expiry; the owner renews it every
+  ``poll_s`` and any worker takes it over once it lapses (``lease_s``), so a
+  crashed owner's markets are resumed elsewhere.  A worker that finds it lost
+  the lease detaches its threads without touching market status.
+* **Requests** -- a handler in the owner acts at once; elsewhere it records
+  the request and waits up to ``handoff_timeout_s`` for the owner to act.
+  On timeout the request stays recorded and the owner carries it out later.
+* **Reconcile** -- the owner's background loop starts requested markets,
+  stops ones asked to stop, detaches markets that were deleted, and
+  registers agents other workers created while markets were running.
+
+With one worker, every request is handled in the owner and behaves exactly
+like a bare :class:`AgentRunner`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from agent_runner import AgentRunner
+from market_service import MarketService
+from runtime_state import (
+    RUNNER_FAILED,
+    RUNNER_RUNNING,
+    RUNNER_STARTING,
+    RUNNER_STOPPED,
+    RUNNER_STOPPING,
+    RuntimeState,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_S = 10.0
+DEFAULT_POLL_S = 1.0
+DEFAULT_HANDOFF_TIMEOUT_S = 10.0
+
+# How often a handler in a non-owner worker re-reads the requested state.
+_HANDOFF_POLL_S = 0.05
+
+
+class RunnerCoordinator:
+    """Routes runner calls to the one worker holding the runner lease."""
+
+    def __init__(
+        self,
+        runner: AgentRunner,
+        state: RuntimeState,
+        market_service: MarketService,
+        *,
+        owner_id: Optional[str] = None,
+        lease_s: float = DEFAULT_LEASE_S,
+        poll_s: float = DEFAULT_POLL_S,
+        handoff_timeout_s: float = DEFAULT_HANDOFF_TIMEOUT_S,
+    ):
+        if poll_s <= 0 or lease_s <= poll_s:
+            raise ValueError("need 0 < poll_s < lease_s")
+        self._runner = runner
+        self._state = state
+        self._market_service = market_service
+        self.owner_id = owner_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_s = float(lease_s)
+        self.poll_s = float(poll_s)
+        self.handoff_timeout_s = float(handoff_timeout_s)
+        # Serializes local runner changes between request handlers and the loop.
+        self._ops = threading.RLock()
+        self._owner = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ── Lifecycle ─────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the lease/reconcile loop (idempotent)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="runner-coordinator", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """
+        Stop the loop, detach local agent threads and release the lease.
+
+        Requested markets stay recorded, so another worker (or the next
+        server start) resumes them.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_s + 5.0)
+            self._thread = None
+        with self._ops:
+            for mid in self._runner.running_markets():
+                self._runner.stop_market(mid, set_status=False)
+            self._runner.shutdown()
+        if self._owner:
+            self._state.release_lease(self.owner_id)
+            self._owner = False
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.poll_s):
+            try:
+                self.reconcile()
+            except Exception:
+                logger.exception("Runner reconcile failed")
+
+    @property
+    def is_owner(self) -> bool:
+        return self._owner
+
+    def _claim(self) -> bool:
+        self._owner = self._state.acquire_lease(self.owner_id, self.lease_s)
+        return self._owner
+
+    # ── Runner surface used by the routes ─────────────────────────────
+
+    def is_running(self, market_id: int) -> bool:
+        row = self._state.runner_market(market_id)
+        return row is not None and row["state"] in (RUNNER_STARTING, RUNNER_RUNNING)
+
+    def agent_count_active(self, market_id: int) -> int:
+        if self._runner.is_running(market_id):
+            return self._runner.agent_count_active(market_id)
+        row = self._state.runner_market(market_id)
+        return int(row["n_agents"] or 0) if row is not None else 0
+
+    def start_market(self, market_id: int) -> int:
+        """Start *market_id* in the owner; returns its active agent threads (``ValueError`` if running)."""
+        mid = int(market_id)
+        if not self._state.request_runner_start(mid):
+            raise ValueError(f"Market {mid} already running")
+        if self._claim():
+            try:
+                return self._start_local(mid)
+            except Exception:
+                self._state.clear_runner_market(mid)
+                raise
+        row = self._await(mid, (RUNNER_RUNNING, RUNNER_FAILED))
+        if row is None:
+            return 0
+        if row["state"] == RUNNER_FAILED:
+            self._state.clear_runner_market(mid)
+            raise ValueError(row["error"] or f"Market {mid} failed to start")
+        return int(row["n_agents"] or 0)
+
+    def stop_market(self, market_id: int) -> Dict[str, Any]:
+        """Stop *market_id* in the owner; returns the runner's stop summary (``ValueError`` if not running)."""
+        mid = int(market_id)
+        if not self._state.request_runner_stop(mid):
+            raise ValueError(f"Market {mid} is not running")
+        if self._claim():
+            with self._ops:
+                row = self._state.runner_market(mid)
+                if row is not None and row["state"] == RUNNER_STOPPED and row["stop_info"]:
+                    info = row["stop_info"]
+                else:
+                    info = self._stop_local(mid)
+                self._state.clear_runner_market(mid)
+            return info
+        row = self._await(mid, (RUNNER_STOPPED,))
+        # Without a row the owner detaches the market on its next pass.
+        self._state.clear_runner_market(mid)
+        if row is None or not row["stop_info"]:
+            return self._stop_summary(mid)
+        return row["stop_info"]
+
+    def register_or_update_agent(self, agent: Dict[str, Any]) -> None:
+        self.register_agents([agent])
+
+    def register_agents(self, agents: Iterable[Dict[str, Any]]) -> None:
+        """Attach new agents to running markets, in the owner (queued for it from other workers)."""
+        rows = list(agents)
+        if self._owner:
+            with self._ops:
+                self._runner.register_agents(rows)
+        elif self._state.any_runner_active():
+            self._state.queue_runner_agents(rows)
+
+    # ── Owner side ────────────────────────────────────────────────────
+
+    def reconcile(self) -> None:
+        """One pass of the loop: renew or take the lease, then match local threads to requests."""
+        rows = self._state.runner_markets()
+        local = self._runner.running_markets()
+        wanted = any(r["state"] in (RUNNER_STARTING, RUNNER_RUNNING, RUNNER_STOPPING) for r in rows.values())
+        if not wanted and not local:
+            if self._owner:
+                self._state.release_lease(self.owner_id)
+                self._owner = False
+            return
+        if not self._claim():
+            if local:
+                logger.warning("Runner lease lost; detaching %d market(s)", len(local))
+                with self._ops:
+                    for mid in self._runner.running_markets():
+                        self._runner.stop_market(mid, set_status=False)
+            return
+        with self._ops:
+            for mid, row in rows.items():
+                if row["state"] in (RUNNER_STARTING, RUNNER_RUNNING):
+                    try:
+                        self._start_local(mid)
+                    except Exception as e:  # noqa: BLE001 -- reported to the waiting request
+                        logger.exception("Starting market %s failed", mid)
+                        self._state.set_runner_state(mid, RUNNER_FAILED, error=str(e))
+                elif row["state"] == RUNNER_STOPPING:
+                    self._state.set_runner_state(mid, RUNNER_STOPPED, stop_info=self._stop_local(mid))
+            for mid in self._runner.running_markets():
+                if mid not in rows:
+                    # Deleted, or a stop whose request gave up waiting.
+                    self._stop_local(mid)
+            pending = self._state.take_runner_agents()
+            if pending:
+                self._runner.register_agents(pending)
+
+    def _start_local(self, market_id: int) -> int:
+        with self._ops:
+            if self._runner.is_running(market_id):
+                n = self._runner.agent_count_active(market_id)
+            else:
+                n = self._runner.start_market(market_id)
+            self._state.set_runner_state(market_id, RUNNER_RUNNING, n_agents=n)
+            return n
+
+    def _stop_local(self, market_id: int) -> Dict[str, Any]:
+        with self._ops:
+            if self._runner.is_running(market_id):
+                info = self._runner.stop_market(market_id, set_status=False)
+            else:
+                info = self._stop_summary(market_id)
+        try:
+            self._market_service.set_market_status(market_id, "stopped")
+        except ValueError:
+            # The market was deleted.
+            pass
+        return info
+
+    def _stop_summary(self, market_id: int) -> Dict[str, Any]:
+        return {
+            "market_id": int(market_id),
+            "duration_sec": 0.0,
+            "agents_detached": 0,
+            "zombie_threads": 0,
+            "markets_running": len(self._runner.running_markets()),
+        }
+
+    def _await(self, market_id: int, states: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """The market's row once it reaches one of *states*; ``None`` on timeout or removal."""
+        deadline = time.monotonic() + self.handoff_timeout_s
+        while True:
+            row = self._state.runner_market(market_id)
+            if row is None or row["state"] in states:
+                return row
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(_HANDOFF_POLL_S)
@@ -410,6 +410,9 @@ class SimulationEngine:
             # Apply execution noise: small random multiplier simulates imprecise sizing
             if self.execution_noise > 0.0:
                 x_star *= 1.0 + self.rng.normal(0.0, self.execution_noise)
+            # Pre-clip buys to what the agent can pay for (price moves along the trade)
+            if x_star > 0:
+                x_star = min(x_star, self.market.max_affordable_quantity(max(agent.cash, 0.0)))
             if abs(x_star) < self.min_trade_size:
                 continue
             trade_cost = self.market.calculate_trade_cost(x_star)
@@ -7,6 +7,8 @@ outcome 1 a proper probability p1 in (0, 1). Inventory `inventory[0]` is net YES
 the *change* in C (no free lunch).
 """
 
+import math
+
 import numpy as np
 
 
@@ -38,4 +40,62 @@ class LMSRMarketMaker:
         #final trade cost calculation
         trade_price = new_cost - old_cost
         self.inventory = new_inventory
-        return trade_price
\ No newline at end of file
+        return trade_price
+
+    def max_affordable_quantity(self, cash):
+        # Largest YES purchase from the current inventory whose cost is <= cash
+        # (exact closed-form inverse of the cost function, see lmsr_max_affordable).
+        return lmsr_max_affordable(
+            self.b, float(self.inventory[0]), float(self.inventory[1]), float(cash),
+        )
+
+
+# ── Scalar binary LMSR (hot trade path) ──────────────────────────────────────
+# Same cost function as LMSRMarketMaker, on plain floats and written in terms of
+# d = (q1 - q0) / b so that large inventories never overflow exp().
+
+
+def _softplus(x):
+    # log(1 + e^x) without overflow
+    return x + math.log1p(math.exp(-x)) if x > 0 else math.log1p(math.exp(x))
+
+
+def lmsr_price(b, q_yes, q_no):
+    """P(YES) = 1 / (1 + e^{-d}), the logistic of d = (q_yes - q_no) / b."""
+    d = (q_yes - q_no) / b
+    if d >= 0:
+        return 1.0 / (1.0 + math.exp(-d))
+    e = math.exp(d)
+    return e / (1.0 + e)
+
+
+def lmsr_trade_cost(b, q_yes, q_no, delta_yes):
+    """C(q_yes + delta, q_no) - C(q_yes, q_no) = b * log(p e^{delta/b} + 1 - p)."""
+    u = delta_yes / b
+    if -30.0 < u < 700.0:
+        return b * math.log1p(lmsr_price(b, q_yes, q_no) * math.expm1(u))
+    # huge trades: log p = -softplus(-d), log(1 - p) = -softplus(d), then logaddexp
+    d = (q_yes - q_no) / b
+    x, y = u - _softplus(-d), -_softplus(d)
+    return b * (max(x, y) + math.log1p(math.exp(-abs(x - y))))
+
+
+def lmsr_max_affordable(b, q_yes, q_no, cash):
+    """
+    Largest YES purchase x >= 0 with lmsr_trade_cost(b, q_yes, q_no, x) <= cash.
+
+    Inverting cost(x) = b * log1p(p * expm1(x / b)) gives
+    x = b * log1p(expm1(c) / p) with c = cash / b, evaluated as
+    b * softplus(c + log(-expm1(-c)) + softplus(-d)) to stay finite for any
+    inventory; the last ulps are shaved so the cost never exceeds cash.
+    """
+    if cash <= 0:
+        return 0.0
+    c = cash / b
+    d = (q_yes - q_no) / b
+    x = b * _softplus(c + math.log(-math.expm1(-c)) + _softplus(-d))
+    step = max(x * 4e-16, 5e-324)
+    while x > 0 and lmsr_trade_cost(b, q_yes, q_no, x) > cash:
+        x = max(0.0, x - step)
+        step *= 2.0
+    return x
@@ -2,10 +2,11 @@ from autonomous_agent import AutonomousAgent
 
 
 class FakeResponse:
-    def __init__(self, status_code=200, payload=None, text=""):
+    def __init__(self, status_code=200, payload=None, text="", headers=None):
         self.status_code = status_code
         self._payload = {} if payload is None else payload
         self.text = text or str(self._payload)
+        self.headers = {} if headers is None else headers
 
     def json(self):
         return self._payload
@@ -52,8 +53,9 @@ def test_run_cycle_submits_trade_when_edge_is_large():
                 ]
             }
         ),
-        FakeResponse(payload={"price": 0.40}),
-        FakeResponse(payload={"cash": 100.0, "shares": 0.0, "belief": 0.80, "rho": 1.0}),
+        FakeResponse(
+            payload={"price": 0.40, "cash": 100.0, "shares": 0.0, "belief": 0.80, "rho": 1.0}
+        ),
     ]
 
     def fake_get(_url, timeout):
@@ -93,8 +95,9 @@ def test_run_cycle_skips_when_edge_is_below_threshold():
 
     responses = [
         FakeResponse(payload={"markets": [{"id": 1, "price": 0.50}]}),
-        FakeResponse(payload={"price": 0.50}),
-        FakeResponse(payload={"cash": 100.0, "shares": 0.0, "belief": 0.52, "rho": 1.0}),
+        FakeResponse(
+            payload={"price": 0.50, "cash": 100.0, "shares": 0.0, "belief": 0.52, "rho": 1.0}
+        ),
     ]
     post_calls = []
 
@@ -124,8 +127,9 @@ def test_run_cycle_skips_when_participation_check_fails():
 
     responses = [
         FakeResponse(payload={"markets": [{"id": 1, "price": 0.40}]}),
-        FakeResponse(payload={"price": 0.40}),
-        FakeResponse(payload={"cash": 100.0, "shares": 0.0, "belief": 0.80, "rho": 1.0}),
+        FakeResponse(
+            payload={"price": 0.40, "cash": 100.0, "shares": 0.0, "belief": 0.80, "rho": 1.0}
+        ),
     ]
     post_calls = []
 
@@ -138,7 +142,7 @@ def test_run_cycle_skips_when_participation_check_fails():
     assert post_calls == []
 
 
-def test_run_cycle_uses_constructor_state_before_position_exists():
+def test_run_cycle_reads_market_state_with_one_request():
     agent = AutonomousAgent(
         agent_id=5,
         api_base_url="http://127.0.0.1:8000/api",
@@ -159,9 +163,9 @@ def test_run_cycle_uses_constructor_state_before_position_exists():
         get_calls.append(_url)
         if "/markets" in _url:
             return FakeResponse(payload={"markets": [{"id": 11, "price": 0.30}]})
-        if _url.endswith("/price"):
-            return FakeResponse(payload={"price": 0.30})
-        return FakeResponse(status_code=404, payload={"detail": "agent has no position"})
+        return FakeResponse(
+            payload={"price": 0.30, "cash": 120.0, "shares": 0.0, "belief": 0.80, "rho": 1.0}
+        )
 
     submitted = {}
 
@@ -170,7 +174,7 @@ def test_run_cycle_uses_constructor_state_before_position_exists():
         return FakeResponse(
             payload={
                 "trade_id": "t-new",
-                "agent_cash_after": 200.0,
+                "agent_cash_after": 70.0,
                 "agent_shares_after": 50.0,
             }
         )
@@ -182,9 +186,11 @@ def test_run_cycle_uses_constructor_state_before_position_exists():
 
     assert outcome == "traded"
     assert submitted["quantity"] > 0.0
-    assert agent.cash == 200.0
+    assert agent.cash == 70.0
     assert agent._shares_by_market[11] == 50.0
-    assert any(url.endswith("/agent/5") for url in get_calls)
+    assert get_calls[1:] == [
+        "http://127.0.0.1:8000/api/market/11/agent/5/decision-context",
+    ]
 
 
 def test_run_retries_after_409_conflict():
@@ -218,9 +224,7 @@ def test_run_retries_after_409_conflict():
         if "/markets" in _url:
             return FakeResponse(payload={"markets": [{"id": 1, "price": 0.40}]})
         return FakeResponse(
-            payload={"price": 0.40}
-            if _url.endswith("/price")
-            else {"cash": 100.0, "shares": 0.0, "belief": 0.80, "rho": 1.0}
+            payload={"price": 0.40, "cash": 100.0, "shares": 0.0, "belief": 0.80, "rho": 1.0}
         )
 
     def fake_post(_url, json, timeout):
@@ -239,3 +243,27 @@ def test_run_retries_after_409_conflict():
 
     assert wait_calls == ["retry"]
     assert post_statuses == []
+
+
+def test_repeat_polls_are_conditional_and_reuse_cached_body():
+    agent = AutonomousAgent(
+        agent_id=7,
+        api_base_url="http://127.0.0.1:8000/api",
+        belief=0.5,
+        rho=1.0,
+        cash=100.0,
+        personality=None,
+    )
+    sent = []
+
+    def fake_get(_url, timeout, headers=None):
+        sent.append((headers or {}).get("If-None-Match"))
+        if headers and headers.get("If-None-Match") == 'W/"v1"':
+            return FakeResponse(status_code=304, payload=None, text="")
+        return FakeResponse(payload={"price": 0.42}, headers={"ETag": 'W/"v1"'})
+
+    agent.session.get = fake_get
+
+    assert agent.get_decision_context(3) == {"price": 0.42}
+    assert agent.get_decision_context(3) == {"price": 0.42}
+    assert sent == [None, 'W/"v1"']
@@ -1,8 +1,8 @@
 """
 Integration tests for ``/api/market/*`` + ``/api/agents*``.
 
-Uses a temporary SQLite file and ``reset_market_runtime`` so each test gets a
-clean service singleton.
+Runs on the in-memory storage backend (``MARKET_DB_PATH=:memory:``) and uses
+``reset_market_runtime`` so each test gets a clean service singleton.
 """
 
 from __future__ import annotations
@@ -25,7 +25,8 @@ if ROOT not in sys.path:
 def client(monkeypatch):
     tmp_base = os.path.join(ROOT, "tests", "tmp_market_api_tests", str(uuid.uuid4()))
     os.makedirs(tmp_base, exist_ok=True)
-    monkeypatch.setenv("MARKET_DB_PATH", os.path.join(tmp_base, "m.sqlite"))
+    monkeypatch.setenv("MARKET_DB_PATH", ":memory:")
+    monkeypatch.setenv("MARKET_ARCHIVE_DIR", os.path.join(tmp_base, "archive"))
     from api.market_routes import reset_market_runtime
 
     reset_market_runtime()
@@ -280,6 +281,7 @@ def test_resolve_market_returns_settlement_and_blocks_trading(client, monkeypatc
     assert d["status"] == "resolved"
     assert d["resolution"] == "yes"
     assert d["resolved_at"] is not None
+    assert (d["trade_count"], d["active_agents"]) == (1, 1)
 
     profile = client.get(f"/api/market/{mid}/agent/{aid}")
     assert profile.status_code == 200, profile.text
@@ -546,3 +548,464 @@ def test_agent_detail_activity_endpoints(client):
     assert len(comment_rows) == 1
     assert comment_rows[0]["market_id"] == mid
     assert comment_rows[0]["text"]
+
+
+def test_keyset_cursors_page_agents_and_trades(client):
+    aids = [_create_agent(client, name=f"pager-{i}")["agent_id"] for i in range(5)]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    for aid in aids:
+        assert client.post(f"/api/market/{mid}/join", json={"agent_id": aid}).status_code == 200
+        tr = client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 1.0})
+        assert tr.status_code == 200, tr.text
+
+    seen = []
+    url = "/api/agents?limit=2"
+    while url:
+        body = client.get(url).json()
+        assert body["total"] == 5
+        seen.extend(r["agent_id"] for r in body["agents"])
+        url = f"/api/agents?limit=2&cursor={body['next_cursor']}" if body["next_cursor"] else None
+    assert seen == aids
+
+    first = client.get(f"/api/market/{mid}/trades?limit=3").json()
+    assert first["total"] == 5
+    assert [t["agent_id"] for t in first["trades"]] == aids[2:]
+    older = client.get(f"/api/market/{mid}/trades?limit=3&cursor={first['next_cursor']}").json()
+    assert [t["agent_id"] for t in older["trades"]] == aids[:2]
+    assert older["next_cursor"] is None
+
+    roster = client.get(f"/api/market/{mid}/agents?limit=4").json()
+    assert roster["total"] == 5
+    tail = client.get(f"/api/market/{mid}/agents?limit=4&cursor={roster['next_cursor']}").json()
+    assert [r["agent_id"] for r in tail["agents"]] == aids[4:]
+
+    discovery = client.get("/api/markets?limit=1").json()
+    assert discovery["total"] == 1
+    assert discovery["next_cursor"] is None
+
+    assert client.get("/api/agents?cursor=bogus").status_code == 400
+
+
+def test_bulk_agent_create_joins_market(client):
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    res = client.post(
+        "/api/agents/bulk",
+        json={
+            "agents": [{"name": f"bulk-{i}", "cash": 120.0} for i in range(25)],
+            "market_id": mid,
+        },
+    )
+    assert res.status_code == 201, res.text
+    body = res.json()
+    assert body["total"] == 25
+    assert len(body["agent_ids"]) == 25
+
+    roster = client.get(f"/api/market/{mid}/agents?limit=100").json()
+    assert roster["total"] == 25
+    assert {r["agent_id"] for r in roster["agents"]} == set(body["agent_ids"])
+    profile = client.get(f"/api/agents/{body['agent_ids'][0]}").json()
+    assert profile["name"] == "bulk-0"
+    assert profile["personality"]
+    assert 0.01 <= profile["belief"] <= 0.99
+
+    dup = client.post("/api/agents/bulk", json={"agents": [{"name": "bulk-0"}]})
+    assert dup.status_code == 400
+    missing = client.post(
+        "/api/agents/bulk", json={"agents": [{"name": "new"}], "market_id": 9999},
+    )
+    assert missing.status_code == 404
+    assert client.get("/api/agents").json()["total"] == 25
+
+
+def test_archive_job_keeps_trade_history_served(client):
+    aid = _create_agent(client, name="archivist")["agent_id"]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    assert client.post(f"/api/market/{mid}/join", json={"agent_id": aid}).status_code == 200
+    for _ in range(3):
+        tr = client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 1.0})
+        assert tr.status_code == 200, tr.text
+    before = client.get(f"/api/market/{mid}/trades").json()
+
+    assert client.post(f"/api/market/{mid}/archive").status_code == 400
+    assert client.post(f"/api/market/{mid}/resolve", json={"outcome": "yes"}).status_code == 200
+    job = client.post("/api/market/archive").json()
+    assert job["total"] == 1
+    assert job["archived"][0]["trades_archived"] == 3
+
+    after = client.get(f"/api/market/{mid}/trades").json()
+    assert after["trades"] == before["trades"]
+    assert after["total"] == 3
+    assert client.post("/api/market/archive").json()["total"] == 0
+
+
+def test_trade_time_window_and_stats(client):
+    aid = _create_agent(client, name="windowed")["agent_id"]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    assert client.post(f"/api/market/{mid}/join", json={"agent_id": aid}).status_code == 200
+    for _ in range(2):
+        tr = client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 1.0})
+        assert tr.status_code == 200, tr.text
+
+    now = time.time()
+    stats = client.get(f"/api/market/{mid}/trade-stats?since_ts={now - 60}").json()
+    assert stats["trade_count"] == 2
+    assert stats["traders"] == 1
+    assert stats["volume"] == pytest.approx(2.0)
+    assert client.get(f"/api/market/{mid}/trade-stats?since_ts={now + 60}").json()["trade_count"] == 0
+
+    recent = client.get(f"/api/market/{mid}/trades?since_ts={now - 60}&until_ts={now + 60}").json()
+    assert len(recent["trades"]) == 2
+    assert recent["trades"][0]["at"].endswith("+00:00")
+    assert client.get(f"/api/market/{mid}/trades?since_ts=not-a-time").status_code == 400
+
+
+def test_candles_endpoint_tracks_trades(client):
+    aid = _create_agent(client, name="charted")["agent_id"]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    assert client.post(f"/api/market/{mid}/join", json={"agent_id": aid}).status_code == 200
+    for qty in (2.0, -1.0):
+        tr = client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": qty})
+        assert tr.status_code == 200, tr.text
+
+    body = client.get(f"/api/market/{mid}/candles?res=1h").json()
+    [bar] = body["candles"]
+    assert bar["trade_count"] == 2
+    assert bar["volume"] == pytest.approx(3.0)
+    assert bar["high"] >= bar["close"] >= bar["low"]
+    assert bar["mean_belief"] is not None
+
+    later = client.get(f"/api/market/{mid}/candles?res=1m&from={time.time() + 120}").json()
+    assert later["candles"] == []
+    assert client.get(f"/api/market/{mid}/candles?res=7m").status_code == 400
+    assert client.get("/api/market/9999/candles").status_code == 404
+
+
+def test_analytics_endpoints_read_bounded_snapshot(client, monkeypatch, tmp_path):
+    monkeypatch.setenv("MARKET_ANALYTICS_REPLICA", str(tmp_path / "analytics.sqlite"))
+    monkeypatch.setenv("MARKET_ANALYTICS_MAX_AGE_S", "3600")
+    aid = _create_agent(client, name="analyst-subject")["agent_id"]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    assert client.post(f"/api/market/{mid}/join", json={"agent_id": aid}).status_code == 200
+    assert client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 1.0}).status_code == 200
+
+    assert len(client.get(f"/api/agents/{aid}/trades").json()["trades"]) == 1
+    client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 1.0})
+    # Within the freshness bound the snapshot is served as-is ...
+    assert len(client.get(f"/api/agents/{aid}/trades").json()["trades"]) == 1
+    assert len(client.get(f"/api/market/{mid}/trades").json()["trades"]) == 2
+    # Agents and markets newer than the snapshot exist all the same.
+    late = _create_agent(client, name="late-analyst")["agent_id"]
+    late_mid = client.post("/api/market/create", json={"mechanism": "lmsr"}).json()["market_id"]
+    assert client.get(f"/api/agents/{late}/markets").json()["markets"] == []
+    assert client.get(f"/api/agents/{late}/trades").json()["trades"] == []
+    board = client.get("/api/agents/leaderboard", params={"market_id": late_mid})
+    assert board.status_code == 200 and board.json()["agents"] == []
+    assert client.get(f"/api/agents/{late + 100}/markets").status_code == 404
+
+    # ... and a zero bound refreshes it on the next request.
+    from api import market_routes
+
+    market_routes._analytics_replica.max_age_s = 0.0
+    assert len(client.get(f"/api/agents/{aid}/trades").json()["trades"]) == 2
+    [row] = client.get(f"/api/agents/{aid}/markets").json()["markets"]
+    assert row["trade_count"] == 2
+
+
+def test_agent_leaderboard_ranks_by_stats(client):
+    a = _create_agent(client, name="board-a")["agent_id"]
+    b = _create_agent(client, name="board-b")["agent_id"]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    for aid, qty in ((a, 1.0), (b, 4.0)):
+        assert client.post(f"/api/market/{mid}/join", json={"agent_id": aid}).status_code == 200
+        assert client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": qty}).status_code == 200
+
+    r = client.get("/api/agents/leaderboard", params={"market_id": mid, "by": "volume"})
+    assert r.status_code == 200, r.text
+    assert [row["agent_id"] for row in r.json()["agents"]] == [b, a]
+    [row] = [m for m in client.get(f"/api/agents/{b}/markets").json()["markets"] if m["market_id"] == mid]
+    assert row["volume"] == pytest.approx(4.0)
+    assert row["cash_flow"] < 0
+
+    assert client.get("/api/agents/leaderboard", params={"by": "pnl"}).status_code == 400
+    assert client.get("/api/agents/leaderboard", params={"market_id": 99999}).status_code == 404
+
+
+def test_market_websocket_pushes_committed_updates(client):
+    aid = _create_agent(client, name="ws-trader")["agent_id"]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    assert client.post(f"/api/market/{mid}/join", json={"agent_id": aid}).status_code == 200
+    client.post(f"/api/market/{mid}/start")
+
+    with client.websocket_connect(f"/api/market/{mid}/ws") as ws:
+        r = client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 2.0})
+        assert r.status_code == 200
+        trade, quote, belief = ws.receive_json(), ws.receive_json(), ws.receive_json()
+        assert [e["type"] for e in (trade, quote, belief)] == ["trade", "quote", "mean_belief"]
+        assert [e["seq"] for e in (trade, quote, belief)] == [1, 2, 3]
+        assert trade["data"]["trade_id"] == str(r.json()["trade_id"])
+        assert trade["data"]["quantity"] == pytest.approx(2.0)
+        assert quote["data"]["price"] == pytest.approx(r.json()["new_price"])
+        # Same timestamp as the stored row a REST resync returns.
+        stored = client.get(f"/api/market/{mid}/trades").json()["trades"][-1]
+        assert trade["data"]["at"] == stored["at"]
+
+        client.post(f"/api/market/{mid}/comments/tick")
+        assert ws.receive_json()["type"] == "comment"
+        client.post(f"/api/market/{mid}/stop")
+        status = ws.receive_json()
+        assert (status["type"], status["data"]["status"]) == ("status", "stopped")
+
+
+def test_market_sse_stream_ends_when_market_is_deleted(client):
+    from api import market_routes
+
+    aid = _create_agent(client, name="sse-trader")["agent_id"]
+    mid = client.post("/api/market/create", json={"mechanism": "lmsr", "b": 100.0}).json()["market_id"]
+    client.post(f"/api/market/{mid}/join", json={"agent_id": aid})
+    client.post(f"/api/market/{mid}/start")
+    assert client.get("/api/market/99999/stream").status_code == 404
+
+    body = {}
+    reader = threading.Thread(
+        target=lambda: body.update(r=client.get(f"/api/market/{mid}/stream")), daemon=True,
+    )
+    reader.start()
+    deadline = time.time() + 5
+    while market_routes.get_event_bus().subscriber_count(mid) == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 1.0})
+    client.delete(f"/api/market/{mid}")
+    reader.join(timeout=5)
+
+    r = body["r"]
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = [line.split(": ", 1)[1] for line in r.text.splitlines() if line.startswith("event: ")]
+    assert events[:2] == ["trade", "quote"]
+    assert events[-1] == "status"
+    assert market_routes.get_event_bus().subscriber_count(mid) == 0
+
+
+def test_market_reads_answer_conditional_gets_with_304(client):
+    aid = _create_agent(client, name="etag-trader")["agent_id"]
+    mid = client.post(
+        "/api/market/create",
+        json={"mechanism": "lmsr", "ground_truth": 0.5, "b": 100.0},
+    ).json()["market_id"]
+    other = client.post("/api/market/create", json={"mechanism": "lmsr"}).json()["market_id"]
+    client.post(f"/api/market/{mid}/join", json={"agent_id": aid})
+    client.post(f"/api/market/{mid}/start")
+
+    paths = [
+        f"/api/market/{mid}/price",
+        f"/api/market/{mid}/detail",
+        f"/api/market/{mid}/agents",
+        f"/api/market/{mid}/agent/{aid}",
+        "/api/markets?status=all",
+    ]
+    etags = {}
+    for path in paths:
+        r = client.get(path)
+        assert r.status_code == 200, path
+        etags[path] = r.headers["etag"]
+        again = client.get(path, headers={"If-None-Match": etags[path]})
+        assert again.status_code == 304, path
+        assert again.content == b""
+        assert again.headers["etag"] == etags[path]
+
+    # A write to another market leaves this market's reads cached ...
+    client.post(f"/api/market/{other}/start")
+    assert client.get(paths[0], headers={"If-None-Match": etags[paths[0]]}).status_code == 304
+    # ... and a trade here invalidates them.
+    client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 1.0})
+    for path in paths:
+        r = client.get(path, headers={"If-None-Match": etags[path]})
+        assert r.status_code == 200, path
+        assert r.headers["etag"] != etags[path]
+
+
+def test_agent_reads_revalidate_after_a_trade_in_another_market(client):
+    aid = _create_agent(client, name="two-market-trader")["agent_id"]
+    a, b = (
+        client.post("/api/market/create", json={"mechanism": "lmsr", "b": 100.0}).json()["market_id"]
+        for _ in range(2)
+    )
+    for mid in (a, b):
+        client.post(f"/api/market/{mid}/join", json={"agent_id": aid})
+        client.post(f"/api/market/{mid}/start")
+
+    paths = [f"/api/market/{a}/agent/{aid}", f"/api/market/{a}/agents"]
+    etags = {path: client.get(path).headers["etag"] for path in paths}
+    # Cash is shared across markets, so a trade in b changes what a shows.
+    cash = client.post(
+        f"/api/market/{b}/trade", json={"agent_id": aid, "quantity": 5.0},
+    ).json()["agent_cash_after"]
+    r = client.get(paths[0], headers={"If-None-Match": etags[paths[0]]})
+    assert r.status_code == 200
+    assert r.json()["cash"] == pytest.approx(cash)
+    r = client.get(paths[1], headers={"If-None-Match": etags[paths[1]]})
+    assert r.status_code == 200
+    assert r.json()["agents"][0]["cash"] == pytest.approx(cash)
+
+
+def test_market_discovery_cache_follows_trades_and_status(client):
+    aid = _create_agent(client, name="discovery-trader")["agent_id"]
+    mid = client.post("/api/market/create", json={"mechanism": "lmsr", "b": 100.0}).json()["market_id"]
+    client.post(f"/api/market/{mid}/join", json={"agent_id": aid})
+
+    first = client.get("/api/markets")
+    assert first.headers["content-type"] == "application/json"
+    assert [m["market_id"] for m in first.json()["markets"]] == [mid]
+
+    client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 3.0})
+    row = client.get("/api/markets").json()["markets"][0]
+    assert row["trade_count_24h"] == 1
+    assert row["active_agents_24h"] == 1
+    assert row["price"] == pytest.approx(client.get(f"/api/market/{mid}/price").json()["price"])
+
+    client.post(f"/api/market/{mid}/start")
+    assert client.get("/api/markets").json()["total"] == 0
+    running = client.get("/api/markets?status=running").json()
+    assert [m["market_id"] for m in running["markets"]] == [mid]
+    assert client.get("/api/markets?cursor=garbage").status_code == 400
+
+
+def test_decision_context_matches_the_separate_reads(client):
+    aid = _create_agent(client, name="ctx-trader", belief=0.55)["agent_id"]
+    mid = client.post("/api/market/create", json={"mechanism": "lmsr", "b": 50.0}).json()["market_id"]
+    client.post(f"/api/market/{mid}/join", json={"agent_id": aid})
+    client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 2.0})
+
+    path = f"/api/market/{mid}/agent/{aid}/decision-context"
+    r = client.get(path)
+    assert r.status_code == 200, r.text
+    ctx = r.json()
+    state = client.get(f"/api/market/{mid}/agent/{aid}").json()
+    assert ctx["price"] == pytest.approx(client.get(f"/api/market/{mid}/price").json()["price"])
+    for key in ("cash", "shares", "belief", "rho", "personality"):
+        assert ctx[key] == state[key], key
+    assert ctx["crowd_belief"] is None
+
+    assert client.get(path, headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+    # A new comment moves the crowd belief without a market write.
+    assert client.post(f"/api/market/{mid}/comments/tick").json()["appended"] == 1
+    fresh = client.get(path, headers={"If-None-Match": r.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.json()["crowd_sample_size"] == 1
+
+    assert client.get(f"/api/market/{mid}/agent/999999/decision-context").status_code == 404
+    assert client.get(f"/api/market/999999/agent/{aid}/decision-context").status_code == 404
+
+
+def test_decision_context_repeat_polls_skip_the_runtime_db(client, monkeypatch):
+    from api import market_routes
+
+    aid = _create_agent(client, name="poller")["agent_id"]
+    a, b = (
+        client.post("/api/market/create", json={"mechanism": "lmsr", "b": 100.0}).json()["market_id"]
+        for _ in range(2)
+    )
+    for mid in (a, b):
+        client.post(f"/api/market/{mid}/join", json={"agent_id": aid})
+        client.post(f"/api/market/{mid}/start")
+    client.post(f"/api/market/{a}/trade", json={"agent_id": aid, "quantity": 1.0})
+    assert client.post(f"/api/market/{a}/comments/tick").json()["appended"] == 1
+
+    state = market_routes.get_runtime_state()
+    reads = []
+    real = state.comment_beliefs_since
+    monkeypatch.setattr(state, "comment_beliefs_since", lambda *args: reads.append(args) or real(*args))
+
+    path = f"/api/market/{a}/agent/{aid}/decision-context"
+    r = client.get(path)
+    assert r.json()["crowd_sample_size"] == 1
+    assert len(reads) == 1
+    assert client.get(path, headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+    assert len(reads) == 1
+
+    # Cash is shared across markets, so a trade in b changes a's context.
+    cash = client.post(
+        f"/api/market/{b}/trade", json={"agent_id": aid, "quantity": 5.0},
+    ).json()["agent_cash_after"]
+    fresh = client.get(path, headers={"If-None-Match": r.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.json()["cash"] == pytest.approx(cash)
+    assert len(reads) == 1
+
+    # Once the comment leaves the window the sample is read again.
+    real_now = market_routes.now_us
+    monkeypatch.setattr(market_routes, "now_us", lambda: real_now() + 301 * 1_000_000)
+    aged = client.get(path, headers={"If-None-Match": fresh.headers["etag"]})
+    assert aged.status_code == 200
+    assert aged.json()["crowd_sample_size"] == 0
+    assert len(reads) == 2
+
+
+def test_multi_worker_mode_shares_runtime_state_and_skips_etags(client, monkeypatch, tmp_path):
+    from api.market_routes import reset_market_runtime
+
+    monkeypatch.setenv("API_WORKERS", "2")
+    monkeypatch.setenv("MARKET_DB_PATH", str(tmp_path / "markets.sqlite"))
+    reset_market_runtime()
+    aid = _create_agent(client, name="mw-trader")["agent_id"]
+    mid = client.post("/api/market/create", json={"mechanism": "lmsr", "b": 100.0}).json()["market_id"]
+    client.post(f"/api/market/{mid}/join", json={"agent_id": aid})
+    client.post(f"/api/market/{mid}/trade", json={"agent_id": aid, "quantity": 2.0})
+    assert client.post(f"/api/market/{mid}/comments/tick").json()["appended"] == 1
+    assert client.post(f"/api/market/{mid}/start").status_code == 200
+
+    r = client.get(f"/api/market/{mid}/price")
+    assert r.status_code == 200 and "etag" not in r.headers
+    listing = client.get("/api/markets?status=all")
+    assert "etag" not in listing.headers
+    assert [m["market_id"] for m in listing.json()["markets"]] == [mid]
+
+    # A fresh process (another worker, or a restart) sees the same state.
+    reset_market_runtime()
+    comments = client.get(f"/api/market/{mid}/comments").json()
+    assert comments["total"] == 1 and comments["comments"][0]["agent_id"] == aid
+    assert client.get(f"/api/market/{mid}/mean-belief-series").json()["total"] >= 1
+    assert client.post(f"/api/market/{mid}/start").status_code == 409
+    assert client.post(f"/api/market/{mid}/stop").status_code == 200
+
+
+def test_multi_worker_mode_refuses_push_streams(client, monkeypatch, tmp_path):
+    from starlette.websockets import WebSocketDisconnect
+
+    from api.market_routes import reset_market_runtime
+
+    monkeypatch.setenv("API_WORKERS", "2")
+    monkeypatch.setenv("MARKET_DB_PATH", str(tmp_path / "markets.sqlite"))
+    reset_market_runtime()
+    mid = client.post("/api/market/create", json={"mechanism": "lmsr", "b": 100.0}).json()["market_id"]
+
+    # Another worker's writes never reach this bus, so the page has to keep polling.
+    r = client.get(f"/api/market/{mid}/stream")
+    assert r.status_code == 503 and "API_WORKERS" in r.json()["detail"]
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/api/market/{mid}/ws"):
+            pass
+    assert exc.value.code == 1013
@@ -0,0 +1,97 @@
+"""
+Tests for the cached ``/api/markets`` pages (``api/market_discovery.py``).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for p in (ROOT, os.path.join(ROOT, "app"), os.path.join(ROOT, "src")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from api.market_discovery import DiscoveryCache
+from market_service import MarketService
+
+
+class CountingService(MarketService):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = {"list": 0, "summaries": []}
+
+    def list_markets_with_summary(self, *args, **kwargs):
+        self.calls["list"] += 1
+        return super().list_markets_with_summary(*args, **kwargs)
+
+    def market_summaries(self, market_ids):
+        self.calls["summaries"].append(sorted(market_ids))
+        return super().market_summaries(market_ids)
+
+
+@pytest.fixture
+def svc(tmp_path):
+    s = CountingService(str(tmp_path / "discovery.db"))
+    yield s
+    s.close()
+
+
+def _running(svc, slug):
+    mkt = svc.create_market(slug, slug, mechanism="lmsr", b=100.0)
+    svc.set_market_status(mkt["id"], "running")
+    return int(mkt["id"])
+
+
+def test_unchanged_page_is_served_without_reading(svc):
+    m1 = _running(svc, "a")
+    cache = DiscoveryCache()
+    body = cache.get(svc, "running")
+    assert cache.get(svc, "running") is body
+    assert svc.calls["list"] == 1
+    rows = json.loads(body)["markets"]
+    assert [r["market_id"] for r in rows] == [m1]
+    assert rows[0]["trade_count_24h"] == 0
+
+
+def test_trade_patches_only_the_traded_row(svc):
+    m1, m2 = _running(svc, "a"), _running(svc, "b")
+    alice = svc.create_agent("alice", cash=100.0)
+    cache = DiscoveryCache()
+    cache.get(svc, "running")
+
+    svc.execute_lmsr_trade(m2, alice["id"], 5.0)
+    rows = {r["id"]: r for r in json.loads(cache.get(svc, "running"))["markets"]}
+    assert svc.calls == {"list": 1, "summaries": [[m2]]}
+    assert rows[m2]["trade_count"] == 1
+    assert rows[m2]["price"] == pytest.approx(svc.get_price(m2))
+    assert rows[m1]["trade_count"] == 0
+
+
+def test_status_change_rebuilds_the_filtered_page(svc):
+    m1, m2 = _running(svc, "a"), _running(svc, "b")
+    cache = DiscoveryCache()
+    assert json.loads(cache.get(svc, "running"))["total"] == 2
+
+    svc.set_market_status(m1, "stopped")
+    page = json.loads(cache.get(svc, "running"))
+    assert svc.calls["list"] == 2
+    assert page["total"] == 1
+    assert [r["id"] for r in page["markets"]] == [m2]
+
+
+def test_least_recently_used_pages_are_evicted(svc):
+    _running(svc, "a")
+    cache = DiscoveryCache(max_pages=2)
+    cache.get(svc, None, limit=1)
+    cache.get(svc, None, limit=2)
+    cache.get(svc, None, limit=1)
+    cache.get(svc, None, limit=3)
+    assert svc.calls["list"] == 3
+    cache.get(svc, None, limit=1)
+    assert svc.calls["list"] == 3
+    cache.get(svc, None, limit=2)
+    assert svc.calls["list"] == 4
@@ -11,6 +11,7 @@ Proves:
 from __future__ import annotations
 
 import math
+import sqlite3
 import sys
 import threading
 from pathlib import Path
@@ -23,6 +24,8 @@ if str(_APP) not in sys.path:
 
 from market_service import MarketService
 from market_store import MarketStore
+from storage_backend import InMemoryBackend, SQLiteFileBackend
+from team_a_market_logic import LMSRMarketMaker
 
 
 def _lmsr_price(inv_yes: float, inv_no: float, b: float) -> float:
@@ -80,9 +83,16 @@ class TestSingleThread:
         assert result["filled_quantity"] == pytest.approx(5.0)
         assert svc.get_price(mkt["id"]) == pytest.approx(0.50)
 
-    def test_rejects_memory_db(self):
-        with pytest.raises(ValueError, match="In-memory"):
-            MarketService(":memory:")
+    def test_memory_db_uses_in_memory_backend(self, tmp_path):
+        mem = MarketService(":memory:")
+        try:
+            assert isinstance(mem._backend, InMemoryBackend)
+            mkt = _make_running_lmsr(mem)
+            alice = mem.create_agent("alice", cash=100.0)
+            mem.execute_lmsr_trade(mkt["id"], alice["id"], 1.0)
+            assert mem.count_trades(mkt["id"]) == 1
+        finally:
+            mem.close()
 
     def test_market_status_lifecycle(self, svc: MarketService):
         mkt = svc.create_market(slug="s", title="S", mechanism="lmsr", b=100.0, ground_truth=0.7)
@@ -195,6 +205,42 @@ class TestExecuteLMSRTrade:
         with pytest.raises(ValueError, match="non-zero"):
             svc.execute_lmsr_trade(mkt["id"], agent["id"], quantity=0)
 
+    def test_first_trade_links_position_with_initial_belief(self, svc: MarketService):
+        mkt = _make_open_lmsr(svc, slug="lmsr-link", ground_truth=0.7)
+        agent = svc.create_agent(name="alice", cash=1000.0, belief=0.2)
+        svc.execute_lmsr_trade(mkt["id"], agent["id"], quantity=3.0)
+        pos = svc.get_position(agent["id"], mkt["id"])
+        assert pos["yes_shares"] == pytest.approx(3.0)
+        assert pos["belief"] == pytest.approx(0.7, abs=0.2)
+        assert svc.mean_belief_for_market(mkt["id"]) == pytest.approx(pos["belief"])
+        candle = svc.get_candles(mkt["id"], "1h")[-1]
+        assert candle["mean_belief"] == pytest.approx(pos["belief"])
+
+    def test_matches_reference_lmsr_math(self, svc: MarketService):
+        mkt = _make_open_lmsr(svc, slug="lmsr-ref", b=50.0)
+        agent = svc.create_agent(name="alice", cash=10000.0)
+        for q in (7.0, -2.5, 12.0):
+            before = svc.get_market(mkt["id"])
+            ref = LMSRMarketMaker(50.0, [before["inv_yes"], before["inv_no"]])
+            expected_cost = float(ref.calculate_trade_cost(q))
+            result = svc.execute_lmsr_trade(mkt["id"], agent["id"], quantity=q)
+            assert result["cost"] == pytest.approx(expected_cost, rel=1e-9)
+            assert result["price_after"] == pytest.approx(float(ref.get_price()), rel=1e-12)
+
+    def test_trade_uses_few_statements(self, svc: MarketService):
+        mkt = _make_open_lmsr(svc, slug="lmsr-stmts")
+        agent = svc.create_agent(name="alice", cash=1000.0)
+        seen: list = []
+        conn = svc._get_conn()
+        conn.set_trace_callback(seen.append)
+        try:
+            svc.execute_lmsr_trade(mkt["id"], agent["id"], quantity=1.0)
+        finally:
+            conn.set_trace_callback(None)
+        top_level = [sql for sql in seen if not sql.startswith("--")]
+        # BEGIN, read, 3 writes, trade insert, candle upsert, COMMIT
+        assert len(top_level) <= 8
+
 
 # ── Clipping (insufficient cash) ──────────────────────────────────────
 
@@ -216,6 +262,16 @@ class TestClipping:
         pos = svc.get_position(agent["id"], mkt["id"])
         assert pos["yes_shares"] == pytest.approx(result["quantity"])
 
+    def test_lmsr_clip_spends_all_cash(self, svc: MarketService):
+        """The closed-form clip is exact: the clipped buy costs the whole balance."""
+        mkt = _make_open_lmsr(svc, slug="clip-exact", b=20.0)
+        agent = svc.create_agent(name="exact", cash=3.0)
+        result = svc.execute_lmsr_trade(mkt["id"], agent["id"], quantity=500.0)
+        assert result["clipped"] is True
+        assert result["cost"] == pytest.approx(3.0, rel=1e-12)
+        assert result["cost"] <= 3.0
+        assert svc.get_agent(agent["id"])["cash"] >= 0.0
+
     def test_lmsr_clips_to_zero_when_broke(self, svc: MarketService):
         """Agent with nearly zero cash gets clipped to zero -> no trade."""
         mkt = _make_open_lmsr(svc, slug="clip-zero")
@@ -354,6 +410,19 @@ class TestPriceSnapshot:
         snap = svc.get_price_snapshot(mkt["id"])
         assert snap["last_trade_price"] == pytest.approx(0.55)
 
+    def test_decision_context_reads_price_and_position_together(self, svc: MarketService):
+        mkt = _make_running_lmsr(svc)
+        alice = svc.create_agent("alice", cash=100.0, belief=0.7, rho=1.5)
+        svc.execute_lmsr_trade(mkt["id"], alice["id"], 4.0)
+        ctx = svc.decision_context(mkt["id"], alice["id"])
+        assert ctx["price"] == pytest.approx(svc.get_price(mkt["id"]))
+        assert ctx["shares"] == pytest.approx(4.0)
+        assert ctx["cash"] == pytest.approx(svc.get_agent(alice["id"])["cash"])
+        assert ctx["belief"] == pytest.approx(svc.get_position(alice["id"], mkt["id"])["belief"])
+        assert ctx["rho"] == 1.5
+        with pytest.raises(ValueError, match="not found"):
+            svc.decision_context(mkt["id"], 9999)
+
 
 # ── Concurrent LMSR trading ───────────────────────────────────────────
 
@@ -636,3 +705,422 @@ class TestTenThreadStress:
             svc.get_position(a["id"], mkt["id"])["yes_shares"] for a in agents
         )
         assert total_shares == pytest.approx(n_threads * trades_each)
+
+
+# ── Belief running sums ────────────────────────────────────────────────
+
+
+def _brute_mean_belief(svc: MarketService, market_id: int):
+    beliefs = [r["belief"] for r in svc.list_agents_for_market(market_id) if r["belief"] is not None]
+    return sum(beliefs) / len(beliefs) if beliefs else None
+
+
+class TestBeliefStats:
+    def test_running_sums_track_every_write_path(self, svc: MarketService):
+        m1 = _make_running_lmsr(svc, slug="m1")
+        m2 = _make_running_lmsr(svc, slug="m2")
+        assert svc.mean_belief_for_market(m1["id"]) is None
+
+        agents = svc.create_agents_bulk(
+            [{"name": f"a{i}", "cash": 100.0, "belief": 0.2 + 0.1 * i} for i in range(4)],
+            market_id=m1["id"],
+        )
+        svc.ensure_position(agents[0]["id"], m2["id"])
+        svc.set_agent_belief(m1["id"], agents[1]["id"], 0.9)
+        svc.execute_lmsr_trade(m1["id"], agents[2]["id"], 1.0)
+        svc.delete_agent(agents[3]["id"])
+        # A legacy position without its own belief falls back to the profile.
+        svc._get_store().conn.execute(
+            "UPDATE positions SET belief = NULL WHERE agent_id = ? AND market_id = ?",
+            (agents[0]["id"], m1["id"]),
+        )
+        svc.update_agent(agents[0]["id"], belief=0.33)
+
+        for mid in (m1["id"], m2["id"]):
+            assert svc.mean_belief_for_market(mid) == pytest.approx(_brute_mean_belief(svc, mid))
+
+        svc.delete_market(m2["id"])
+        assert svc._get_store().conn.execute(
+            "SELECT COUNT(*) FROM market_belief_stats WHERE market_id = ?", (m2["id"],)
+        ).fetchone()[0] == 0
+
+    def test_backfills_existing_database(self, svc: MarketService, tmp_path):
+        mkt = _make_running_lmsr(svc)
+        for i in range(3):
+            a = svc.create_agent(f"a{i}", cash=10.0)
+            svc.ensure_position(a["id"], mkt["id"])
+        expected = _brute_mean_belief(svc, mkt["id"])
+        conn = svc._get_store().conn
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE 'trg_belief_stats_%'"
+        ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP TABLE market_belief_stats")
+        svc.close()
+
+        reopened = MarketService(str(tmp_path / "test.db"))
+        try:
+            assert reopened.mean_belief_for_market(mkt["id"]) == pytest.approx(expected)
+        finally:
+            reopened.close()
+
+    def test_mean_belief_all_agents_in_sql(self, svc: MarketService):
+        assert svc.mean_belief_all_agents() is None
+        svc.create_agent("a", cash=1.0, belief=0.2)
+        b = svc.create_agent("b", cash=1.0, belief=0.6)
+        svc.create_agent("c", cash=1.0)
+        assert svc.mean_belief_all_agents() == pytest.approx(0.4)
+        svc.delete_agent(b["id"])
+        assert svc.mean_belief_all_agents() == pytest.approx(0.2)
+
+
+def _brute_agent_market_stats(svc: MarketService):
+    rows = svc._get_store().conn.execute(
+        "SELECT agent_id, market_id, COUNT(*), SUM(shares), "
+        "SUM(CASE WHEN side = 'sell' THEN cost ELSE -cost END), MAX(created_us) "
+        "FROM trades GROUP BY agent_id, market_id"
+    ).fetchall()
+    return {(r[0], r[1]): tuple(r[2:]) for r in rows}
+
+
+def _agent_market_stats(svc: MarketService):
+    rows = svc._get_store().conn.execute(
+        "SELECT agent_id, market_id, trade_count, volume, cash_flow, last_trade_us "
+        "FROM agent_market_stats"
+    ).fetchall()
+    return {(r[0], r[1]): tuple(r[2:]) for r in rows}
+
+
+class TestAgentMarketStats:
+    def _trade_both_mechanisms(self, svc: MarketService):
+        lmsr = _make_running_lmsr(svc, slug="lmsr")
+        cda = _make_open_cda(svc, slug="cda")
+        alice = svc.create_agent("alice", cash=1000.0)
+        bob = svc.create_agent("bob", cash=1000.0)
+        svc.execute_lmsr_trade(lmsr["id"], alice["id"], 5.0)
+        svc.execute_lmsr_trade(lmsr["id"], alice["id"], -2.0)
+        svc.execute_lmsr_trade(lmsr["id"], bob["id"], 1.0)
+        svc.execute_cda_order(cda["id"], bob["id"], "sell", 4.0, 0.60, "limit")
+        svc.execute_cda_order(cda["id"], alice["id"], "buy", 3.0, 0.60, "limit")
+        svc.execute_cda_order(cda["id"], bob["id"], "sell", 1.0, 0.50, "market")
+        return lmsr, cda, alice, bob
+
+    def test_trade_paths_maintain_stats(self, svc: MarketService):
+        lmsr, cda, alice, bob = self._trade_both_mechanisms(svc)
+        stats = _agent_market_stats(svc)
+        brute = _brute_agent_market_stats(svc)
+        # Trade rows name the aggressor; bob's resting ask was the other side.
+        passive = (bob["id"], cda["id"])
+        assert passive not in brute
+        assert stats.keys() == brute.keys() | {passive}
+        for key, row in brute.items():
+            assert stats[key] == pytest.approx(row)
+        assert stats[passive][:3] == pytest.approx((1, 3.0, 1.8))
+
+        # Every fill is credited to both sides, so each agent's cash flow adds
+        # up to its cash change.
+        for agent in (alice, bob):
+            flow = sum(r["cash_flow"] for r in svc.list_markets_for_agent(agent["id"]))
+            assert flow == pytest.approx(svc.get_agent(agent["id"])["cash"] - 1000.0)
+
+        # LMSR cash flow is exactly the agent's cash change in that market.
+        lmsr_rows = {r["id"]: r for r in svc.list_markets_for_agent(alice["id"])}
+        assert lmsr_rows[lmsr["id"]]["trade_count"] == 2
+        assert lmsr_rows[lmsr["id"]]["volume"] == pytest.approx(7.0)
+        assert lmsr_rows[cda["id"]]["cash_flow"] == pytest.approx(-1.8)
+        assert (
+            lmsr_rows[lmsr["id"]]["cash_flow"] + lmsr_rows[cda["id"]]["cash_flow"]
+            == pytest.approx(svc.get_agent(alice["id"])["cash"] - 1000.0)
+        )
+
+        svc.delete_market(cda["id"])
+        assert all(mid != cda["id"] for _, mid in _agent_market_stats(svc))
+        assert svc.delete_agent(bob["id"])["trade_count_retained"] == 1
+
+    def test_backfills_existing_database(self, svc: MarketService, tmp_path):
+        self._trade_both_mechanisms(svc)
+        # Only the aggressor side can be rebuilt from the trades table.
+        expected = _brute_agent_market_stats(svc)
+        conn = svc._get_store().conn
+        conn.execute("DROP TRIGGER trg_agent_market_stats_trade")
+        conn.execute("DROP TRIGGER trg_agent_market_stats_market_delete")
+        conn.execute("DROP TABLE agent_market_stats")
+        svc.close()
+
+        reopened = MarketService(str(tmp_path / "test.db"))
+        try:
+            got = _agent_market_stats(reopened)
+            assert got.keys() == expected.keys()
+            for key, row in expected.items():
+                assert got[key] == pytest.approx(row)
+        finally:
+            reopened.close()
+
+    def test_leaderboard(self, svc: MarketService):
+        lmsr, cda, alice, bob = self._trade_both_mechanisms(svc)
+        carol = svc.create_agent("carol", cash=10.0)
+        svc.execute_lmsr_trade(lmsr["id"], carol["id"], 1.0)
+
+        by_volume = svc.agent_leaderboard(by="volume")
+        assert [r["name"] for r in by_volume] == ["alice", "bob", "carol"]
+        assert by_volume[0]["volume"] == pytest.approx(10.0)
+        assert by_volume[0]["markets"] == 2
+        assert [r["rank"] for r in by_volume] == [1, 2, 3]
+
+        in_cda = svc.agent_leaderboard(cda["id"], by="trade_count")
+        assert [(r["name"], r["trade_count"]) for r in in_cda] == [("alice", 1), ("bob", 1)]
+        by_flow = svc.agent_leaderboard(cda["id"], limit=1)
+        assert [(r["name"], r["cash_flow"]) for r in by_flow] == [("bob", pytest.approx(1.8))]
+
+        flows = [r["cash_flow"] for r in svc.agent_leaderboard()]
+        assert flows == sorted(flows, reverse=True)
+
+        svc.delete_agent(carol["id"])
+        assert "carol" not in [r["name"] for r in svc.agent_leaderboard()]
+        with pytest.raises(ValueError, match="by must be"):
+            svc.agent_leaderboard(by="pnl")
+        with pytest.raises(ValueError, match="not found"):
+            svc.agent_leaderboard(9999)
+
+
+class TestChangeVersions:
+    def test_commits_bump_only_the_touched_market(self, svc: MarketService):
+        m1 = _make_running_lmsr(svc, slug="m1")
+        m2 = _make_running_lmsr(svc, slug="m2")
+        alice = svc.create_agent("alice", cash=100.0)
+        v1, v2, cat = svc.market_version(m1["id"]), svc.market_version(m2["id"]), svc.catalog_version()
+
+        svc.execute_lmsr_trade(m1["id"], alice["id"], 1.0)
+        assert svc.market_version(m1["id"]) > v1
+        assert svc.market_version(m2["id"]) == v2
+        assert svc.catalog_version() > cat
+
+        # Rolled-back writes leave versions alone.
+        v1 = svc.market_version(m1["id"])
+        with pytest.raises(ValueError):
+            svc.execute_lmsr_trade(m1["id"], 9999, 1.0)
+        assert svc.market_version(m1["id"]) == v1
+
+        # Agent-level writes can change any market's payloads.
+        svc.update_agent(alice["id"], cash=50.0)
+        assert svc.market_version(m1["id"]) > v1
+        assert svc.market_version(m2["id"]) > v2
+
+    def test_agent_versions_follow_cash_across_markets(self, svc: MarketService):
+        lmsr = _make_running_lmsr(svc, slug="m1")
+        cda = _make_open_cda(svc, slug="m2")
+        alice, bob, carol = (svc.create_agent(n, cash=100.0) for n in ("alice", "bob", "carol"))
+        va, vb, vc = (svc.agent_version(a["id"]) for a in (alice, bob, carol))
+        anyone = svc.agent_version()
+
+        svc.execute_lmsr_trade(lmsr["id"], alice["id"], 1.0)
+        assert svc.agent_version(alice["id"]) > va
+        assert svc.agent_version(bob["id"]) == vb
+        assert svc.agent_version() > anyone
+
+        # A fill moves both counterparties; a resting order moves nobody's cash.
+        svc.execute_cda_order(cda["id"], carol["id"], "buy", 1.0, 0.40, "limit")
+        assert svc.agent_version(carol["id"]) == vc
+        svc.execute_cda_order(cda["id"], bob["id"], "sell", 1.0, 0.40, "limit")
+        assert svc.agent_version(bob["id"]) > vb
+        assert svc.agent_version(carol["id"]) > vc
+
+        # Settlement pays every holder.
+        va = svc.agent_version(alice["id"])
+        svc.resolve_market(lmsr["id"], "yes")
+        assert svc.agent_version(alice["id"]) > va
+
+    def test_listing_version_moves_only_with_market_membership(self, svc: MarketService):
+        m1 = _make_running_lmsr(svc, slug="m1")
+        alice = svc.create_agent("alice", cash=100.0)
+        listing = svc.listing_version()
+        svc.execute_lmsr_trade(m1["id"], alice["id"], 1.0)
+        svc.update_agent(alice["id"], cash=50.0)
+        assert svc.listing_version() == listing
+
+        svc.set_market_status(m1["id"], "stopped")
+        assert svc.listing_version() > listing
+        listing = svc.listing_version()
+        svc.resolve_market(m1["id"], "yes")
+        assert svc.listing_version() > listing
+
+
+# ── In-memory backend ──────────────────────────────────────────────────
+
+
+class TestInMemoryBackend:
+    def test_instances_are_isolated(self):
+        a, b = MarketService(InMemoryBackend()), MarketService(InMemoryBackend())
+        try:
+            a.create_agent("alice", cash=10.0)
+            assert b.list_agents()["total"] == 0
+        finally:
+            a.close()
+            b.close()
+
+    def test_threads_share_one_database(self):
+        mem = MarketService(":memory:")
+        try:
+            mkt = _make_running_lmsr(mem)
+            agents = [mem.create_agent(f"a{i}", cash=1000.0) for i in range(8)]
+            errors: list = []
+
+            def worker(aid: int):
+                try:
+                    for _ in range(25):
+                        mem.execute_lmsr_trade(mkt["id"], aid, 1.0)
+                except Exception as exc:
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=worker, args=(a["id"],)) for a in agents]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert errors == []
+            assert mem.count_trades(mkt["id"]) == 200
+            assert mem.get_market(mkt["id"])["inv_yes"] == pytest.approx(200.0)
+        finally:
+            mem.close()
+
+    def test_failed_write_rolls_back(self):
+        mem = MarketService(":memory:")
+        try:
+            with pytest.raises(RuntimeError):
+                with mem._begin_immediate() as conn:
+                    conn.execute(
+                        "INSERT INTO agents (name, cash, belief, rho, created_at) "
+                        "VALUES ('ghost', 1.0, 0.5, 1.0, 'now')"
+                    )
+                    raise RuntimeError("boom")
+            assert mem.list_agents()["total"] == 0
+        finally:
+            mem.close()
+
+
+
+class TestReadPool:
+    def test_pool_connections_are_read_only(self, svc: MarketService):
+        _make_running_lmsr(svc)
+        with svc._reader() as store:
+            with pytest.raises(sqlite3.OperationalError):
+                store.conn.execute("DELETE FROM markets")
+        assert len(svc.list_markets()) == 1
+
+    def test_pool_is_bounded(self, tmp_path):
+        s = MarketService(str(tmp_path / "pool.db"), read_pool_size=2)
+        try:
+            mkt = _make_running_lmsr(s)
+            errors: list = []
+
+            def reader():
+                try:
+                    for _ in range(20):
+                        s.get_price_snapshot(mkt["id"])
+                except Exception as exc:
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=reader) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert errors == []
+            assert s._readers.opened <= 2
+        finally:
+            s.close()
+
+    def test_reads_do_not_wait_for_writer(self, svc: MarketService):
+        mkt = _make_running_lmsr(svc)
+        alice = svc.create_agent("alice", cash=100.0)
+        svc.execute_lmsr_trade(mkt["id"], alice["id"], 1.0)
+        with svc._begin_immediate() as conn:
+            conn.execute("UPDATE markets SET inv_yes = 99 WHERE id = ?", (mkt["id"],))
+            # Another thread reads the committed snapshot, not the pending write.
+            seen: list = []
+            t = threading.Thread(target=lambda: seen.append(svc.get_market(mkt["id"])))
+            t.start()
+            t.join(timeout=2.0)
+            assert not t.is_alive()
+            assert seen[0]["inv_yes"] == pytest.approx(1.0)
+            # The writing thread itself sees its own uncommitted row.
+            assert svc.get_market(mkt["id"])["inv_yes"] == pytest.approx(99.0)
+
+    def test_tuning_profiles(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown storage profile"):
+            MarketService(str(tmp_path / "x.db"), profile="turbo")
+        backend = SQLiteFileBackend(str(tmp_path / "fast.db"), profile="fast")
+        conn = backend.connect()
+        try:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -256_000
+        finally:
+            conn.close()
+        durable = SQLiteFileBackend(str(tmp_path / "durable.db")).connect()
+        try:
+            assert durable.execute("PRAGMA synchronous").fetchone()[0] == 2
+        finally:
+            durable.close()
+
+
+# ── Cold-storage archival ──────────────────────────────────────────────
+
+
+class TestArchive:
+    @pytest.fixture
+    def asvc(self, tmp_path):
+        s = MarketService(str(tmp_path / "test.db"), archive_dir=str(tmp_path / "archive"))
+        yield s
+        s.close()
+
+    def _traded_market(self, svc: MarketService):
+        mkt = _make_running_lmsr(svc, slug="cold")
+        alice = svc.create_agent("alice", cash=100.0)
+        bob = svc.create_agent("bob", cash=100.0)
+        for _ in range(3):
+            svc.execute_lmsr_trade(mkt["id"], alice["id"], 1.0)
+        svc.execute_lmsr_trade(mkt["id"], bob["id"], -1.0)
+        return mkt, alice, bob
+
+    def test_requires_configured_archive_and_resolved_market(self, svc, asvc):
+        mkt, _, _ = self._traded_market(asvc)
+        with pytest.raises(ValueError, match="not resolved"):
+            asvc.archive_market(mkt["id"])
+        with pytest.raises(ValueError, match="not configured"):
+            svc.archive_market(1)
+
+    def test_round_trip_keeps_history_readable(self, asvc: MarketService):
+        mkt, alice, bob = self._traded_market(asvc)
+        before = asvc.get_trades(market_id=mkt["id"])
+        summary_before = asvc.list_markets_with_summary()["markets"][0]
+        asvc.resolve_market(mkt["id"], "yes")
+
+        out = asvc.archive_resolved_markets()
+        assert [(r["market_id"], r["trades_archived"]) for r in out] == [(mkt["id"], 4)]
+        hot = asvc._get_store().conn.execute(
+            "SELECT COUNT(*) FROM trades WHERE market_id = ?", (mkt["id"],)
+        ).fetchone()[0]
+        assert hot == 0
+        assert asvc.archive_resolved_markets() == []
+
+        assert asvc.get_trades(market_id=mkt["id"]) == before
+        assert asvc.get_trades(agent_id=alice["id"]) == [
+            t for t in before if t["agent_id"] == alice["id"]
+        ]
+        assert asvc.get_trades(before_trade_id=before[1]["id"], limit=1) == [before[2]]
+        assert asvc.count_trades(mkt["id"]) == 4
+        summary = asvc.list_markets_with_summary()["markets"][0]
+        assert summary["trade_count"] == summary_before["trade_count"]
+        assert summary["active_agents"] == summary_before["active_agents"]
+        rows = asvc.list_markets_for_agent(bob["id"])
+        assert rows[0]["trade_count"] == 1
+        assert rows[0]["last_trade_at"] == before[0]["created_at"]
+
+    def test_delete_market_removes_archive_file(self, asvc: MarketService, tmp_path):
+        mkt, _, _ = self._traded_market(asvc)
+        asvc.resolve_market(mkt["id"], "no")
+        asvc.archive_market(mkt["id"])
+        path = tmp_path / "archive" / f"market_{mkt['id']}.npz"
+        assert path.exists()
+        asvc.delete_market(mkt["id"])
+        assert not path.exists()
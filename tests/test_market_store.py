@@ -6,6 +6,7 @@ Every test uses an in-memory database, no SimulationEngine involvement.
 
 from __future__ import annotations
 
+import sqlite3
 import sys
 from pathlib import Path
 
@@ -15,7 +16,8 @@ _APP = Path(__file__).resolve().parent.parent / "app"
 if str(_APP) not in sys.path:
     sys.path.insert(0, str(_APP))
 
-from market_store import MarketStore
+import market_store
+from market_store import MarketStore, _SCHEMA, encode_cursor
 
 
 @pytest.fixture
@@ -217,6 +219,35 @@ class TestAgentCRUD:
         with pytest.raises(ValueError, match="not found"):
             store.get_agent(999)
 
+    def test_create_agents_bulk_with_positions(self, store: MarketStore):
+        mkt = store.create_market(slug="t", title="T", mechanism="lmsr", b=100.0, ground_truth=0.7)
+        store.create_agent(name="existing", cash=1.0)
+        created = store.create_agents_bulk(
+            [{"name": f"bulk-{i}", "cash": 50.0, "belief": 0.4, "rho": 1.0} for i in range(3)],
+            market_id=mkt["id"],
+        )
+        assert [a["name"] for a in created] == ["bulk-0", "bulk-1", "bulk-2"]
+        assert [a["id"] for a in created] == [2, 3, 4]
+        for a in created:
+            pos = store.get_position(a["id"], mkt["id"])
+            assert pos["yes_shares"] == 0.0
+            # Same deterministic belief as the single-row lazy path.
+            assert pos["belief"] == pytest.approx(
+                store._initial_position_belief(
+                    {"id": a["id"], "belief": 0.4}, {"id": mkt["id"], "ground_truth": 0.7},
+                )
+            )
+
+    def test_create_agents_bulk_is_all_or_nothing(self, store: MarketStore):
+        store.create_agent(name="taken", cash=1.0)
+        with pytest.raises(ValueError, match="already exists"):
+            store.create_agents_bulk([{"name": "fresh", "cash": 1.0}, {"name": "taken", "cash": 1.0}])
+        with pytest.raises(ValueError, match="Duplicate"):
+            store.create_agents_bulk([{"name": "x", "cash": 1.0}, {"name": "x", "cash": 1.0}])
+        with pytest.raises(ValueError, match="not found"):
+            store.create_agents_bulk([{"name": "y", "cash": 1.0}], market_id=99)
+        assert store.list_agents()["total"] == 1
+
 
 # ── Agent belief ───────────────────────────────────────────────────────
 
@@ -383,6 +414,22 @@ class TestCDATrading:
         assert result["filled_quantity"] == pytest.approx(5.0)
         assert len(result["trades"]) == 1
 
+    def test_fills_credit_both_sides_in_agent_stats(self, store: MarketStore):
+        mkt = _make_open_cda(store)
+        alice = store.create_agent(name="alice", cash=1000.0)
+        bob = store.create_agent(name="bob", cash=1000.0)
+        store.submit_limit_order(alice["id"], mkt["id"], "buy", quantity=2.0, price=0.40)
+        store.submit_market_order(bob["id"], mkt["id"], "sell", quantity=2.0)
+        rows = store.conn.execute(
+            "SELECT agent_id, trade_count, volume, cash_flow FROM agent_market_stats "
+            "WHERE market_id = ? ORDER BY agent_id",
+            (mkt["id"],),
+        ).fetchall()
+        assert [tuple(r) for r in rows] == [
+            (alice["id"], 1, pytest.approx(2.0), pytest.approx(-0.8)),
+            (bob["id"], 1, pytest.approx(2.0), pytest.approx(0.8)),
+        ]
+
     def test_cda_order_on_lmsr_market_rejected(self, store: MarketStore):
         mkt = _make_open_lmsr(store)
         agent = store.create_agent(name="alice", cash=1000.0)
@@ -399,6 +446,42 @@ class TestCDATrading:
         result = store.submit_market_order(charlie["id"], mkt["id"], "buy", quantity=3.0)
         assert result["trades"][0]["seller_id"] == alice["id"]
 
+    def test_sweep_is_set_based(self, store: MarketStore):
+        """A marketable order sweeping 200 resting asks costs O(1) statements."""
+        mkt = _make_open_cda(store)
+        buyer = store.create_agent(name="buyer", cash=10_000.0)
+        sellers = [store.create_agent(name=f"s{i}", cash=10.0)["id"] for i in range(200)]
+        for i, sid in enumerate(sellers):
+            store.submit_limit_order(sid, mkt["id"], "sell", quantity=1.0, price=0.40 + 0.001 * (i % 50))
+        seen: list = []
+        store.conn.set_trace_callback(seen.append)
+        try:
+            result = store.submit_market_order(buyer["id"], mkt["id"], "buy", quantity=200.0)
+        finally:
+            store.conn.set_trace_callback(None)
+        assert result["filled_quantity"] == pytest.approx(200.0)
+        prices = [t["price"] for t in result["trades"]]
+        assert prices == sorted(prices)
+        ids = [t["trade_id"] for t in result["trades"]]
+        assert ids == [t["id"] for t in reversed(store.get_trades(mkt["id"], limit=200))]
+        assert store.get_agent(buyer["id"])["cash"] == pytest.approx(10_000.0 - sum(prices))
+        assert store.get_order_book(mkt["id"])["asks"] == []
+        # No per-fill reads: one cursor over the book plus a fixed set of lookups.
+        top_level = [sql.lstrip().upper() for sql in seen if not sql.startswith("--")]
+        assert sum(sql.startswith("SELECT") for sql in top_level) < 15
+
+    def test_unfunded_resting_bid_is_cancelled(self, store: MarketStore):
+        mkt = _make_open_cda(store)
+        poor = store.create_agent(name="poor", cash=1.0)
+        rich = store.create_agent(name="rich", cash=1000.0)
+        seller = store.create_agent(name="seller", cash=0.0)
+        store.submit_limit_order(poor["id"], mkt["id"], "buy", quantity=2.0, price=0.50)
+        store.submit_limit_order(rich["id"], mkt["id"], "buy", quantity=2.0, price=0.40)
+        store.conn.execute("UPDATE agents SET cash = 0.1 WHERE id = ?", (poor["id"],))
+        result = store.submit_market_order(seller["id"], mkt["id"], "sell", quantity=2.0)
+        assert [t["buyer_id"] for t in result["trades"]] == [rich["id"]]
+        assert store.get_order_book(mkt["id"])["bids"] == []
+
 
 # ── Trade history with since_trade_id ──────────────────────────────────
 
@@ -418,6 +501,206 @@ class TestTradeHistory:
         assert t2["trade_id"] in ids
         assert t3["trade_id"] in ids
 
+    def test_before_trade_id_pages_backwards(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        agent = store.create_agent(name="alice", cash=10000.0)
+        ids = [
+            store.submit_trade(agent["id"], mkt["id"], "buy_yes", shares=1.0)["trade_id"]
+            for _ in range(5)
+        ]
+        page = store.get_trades(market_id=mkt["id"], limit=2, before_trade_id=ids[3])
+        assert [t["id"] for t in page] == [ids[2], ids[1]]
+
+    def test_time_window_filters_and_stats(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        alice = store.create_agent(name="alice", cash=10000.0)
+        bob = store.create_agent(name="bob", cash=10000.0)
+        for agent in (alice, bob, alice):
+            store.submit_trade(agent["id"], mkt["id"], "buy_yes", shares=2.0)
+        # Pin timestamps to t = 10s, 20s, 30s after the epoch.
+        for i, t in enumerate(store.get_trades(market_id=mkt["id"])[::-1]):
+            store.conn.execute(
+                "UPDATE trades SET created_us = ? WHERE id = ?", ((i + 1) * 10_000_000, t["id"])
+            )
+
+        window = store.get_trades(market_id=mkt["id"], since_ts=15, until_ts=30)
+        assert [t["created_us"] for t in window] == [20_000_000]
+        assert window[0]["created_at"] == "1970-01-01T00:00:20+00:00"
+        since_iso = store.get_trades(market_id=mkt["id"], since_ts="1970-01-01T00:00:20Z")
+        assert len(since_iso) == 2
+
+        stats = store.trade_window_stats(mkt["id"], since_ts=0, until_ts=25)
+        assert stats["trade_count"] == 2
+        assert stats["traders"] == 2
+        assert stats["volume"] == pytest.approx(4.0)
+        assert stats["last_trade_at"] == "1970-01-01T00:00:20+00:00"
+        assert store.trade_window_stats(mkt["id"], since_ts=31)["trade_count"] == 0
+        with pytest.raises(ValueError, match="Invalid timestamp"):
+            store.get_trades(market_id=mkt["id"], since_ts="yesterday")
+
+    @pytest.mark.parametrize("drop_column", [True, False], ids=["drop-column", "rebuild"])
+    def test_migrates_iso_created_at_to_epoch_us(self, tmp_path, monkeypatch, drop_column):
+        # ``rebuild`` is the path for SQLite older than 3.35.
+        monkeypatch.setattr(market_store, "_HAS_DROP_COLUMN", drop_column)
+        db = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(db)
+        conn.executescript(
+            _SCHEMA.replace("created_us   INTEGER NOT NULL", "created_at   TEXT    NOT NULL")
+            .replace("created_us INTEGER NOT NULL", "created_at TEXT    NOT NULL")
+            .replace("created_us             INTEGER NOT NULL", "created_at             TEXT    NOT NULL")
+        )
+        conn.execute(
+            "INSERT INTO markets (slug, title, created_at) VALUES ('m', 'm', '2024-01-01T00:00:00+00:00')"
+        )
+        conn.execute("INSERT INTO agents (name, cash, created_at) VALUES ('a', 1.0, 'x')")
+        conn.execute(
+            "INSERT INTO trades (market_id, agent_id, side, shares, cost, price_before, "
+            "price_after, created_at) VALUES (1, 1, 'buy', 1, 1, 0.5, 0.5, "
+            "'2024-01-01T00:00:01.500000+00:00')"
+        )
+        conn.commit()
+        conn.close()
+
+        s = MarketStore(db)
+        try:
+            cols = {r["name"] for r in s.conn.execute("PRAGMA table_info(trades)")}
+            assert "created_at" not in cols
+            [trade] = s.get_trades()
+            assert trade["created_us"] == 1_704_067_201_500_000
+            assert trade["created_at"] == "2024-01-01T00:00:01.500000+00:00"
+            indexes = {r["name"] for r in s.conn.execute("PRAGMA index_list(trades)")}
+            assert {"idx_trades_market", "idx_trades_market_time"} <= indexes
+            # The rebuilt table keeps its AUTOINCREMENT sequence.
+            mkt = _make_open_lmsr(s, slug="after")
+            agent = s.create_agent(name="b", cash=10.0)
+            assert s.submit_trade(agent["id"], mkt["id"], "buy_yes", shares=0.1)["trade_id"] == 2
+        finally:
+            s.close()
+
+
+# ── Candles ────────────────────────────────────────────────────────────
+
+
+class TestCandles:
+    def test_trades_fold_into_ohlcv_buckets(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        agent = store.create_agent(name="alice", cash=10000.0)
+        prices = [
+            store.submit_trade(agent["id"], mkt["id"], side, shares=5.0)["price_after"]
+            for side in ("buy_yes", "buy_yes", "sell_yes")
+        ]
+        store.record_mean_belief(mkt["id"], 0.4)
+        store.record_mean_belief(mkt["id"], 0.6)
+
+        [bar] = store.get_candles(mkt["id"], "1h")
+        assert bar["open"] == pytest.approx(prices[0])
+        assert bar["high"] == pytest.approx(max(prices))
+        assert bar["low"] == pytest.approx(min(prices))
+        assert bar["close"] == pytest.approx(prices[-1])
+        assert bar["volume"] == pytest.approx(15.0)
+        assert bar["trade_count"] == 3
+        # One mean-belief sample per trade plus the two explicit ones.
+        belief = store.get_position(agent["id"], mkt["id"])["belief"]
+        assert bar["mean_belief"] == pytest.approx((3 * belief + 1.0) / 5)
+        assert bar["t_us"] % 3_600_000_000 == 0
+
+        fine = store.get_candles(mkt["id"], "1s")
+        assert sum(c["trade_count"] for c in fine) == 3
+        assert store.get_candles(mkt["id"], "1m", since_ts=bar["t_us"] / 1e6 + 3600) == []
+
+    def test_existing_trades_are_bucketed_when_candles_are_added(self, tmp_path):
+        db = str(tmp_path / "pre-candles.db")
+        s = MarketStore(db)
+        mkt = _make_open_lmsr(s)
+        agent = s.create_agent(name="alice", cash=10000.0)
+        for side in ("buy_yes", "buy_yes", "sell_yes"):
+            s.submit_trade(agent["id"], mkt["id"], side, shares=5.0)
+        trade_fields = ("t_us", "open", "high", "low", "close", "volume", "trade_count")
+        before = {
+            res: [{k: bar[k] for k in trade_fields} for bar in s.get_candles(mkt["id"], res)]
+            for res in market_store.CANDLE_RESOLUTIONS
+        }
+        # A database from before candles existed.
+        s.conn.execute("DROP TABLE candles")
+        s.conn.commit()
+        s.close()
+
+        s = MarketStore(db)
+        try:
+            for res, bars in before.items():
+                after = [{k: bar[k] for k in trade_fields} for bar in s.get_candles(mkt["id"], res)]
+                assert after == bars, res
+        finally:
+            s.close()
+
+    def test_belief_only_bucket_and_bad_resolution(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        store.record_mean_belief(mkt["id"], 0.7, at_ts=90)
+        [bar] = store.get_candles(mkt["id"], "1m")
+        assert bar["t"] == "1970-01-01T00:01:00+00:00"
+        assert bar["open"] is None and bar["close"] is None
+        assert bar["mean_belief"] == pytest.approx(0.7)
+        with pytest.raises(ValueError, match="resolution"):
+            store.get_candles(mkt["id"], "5m")
+
+
+# ── Keyset pagination ──────────────────────────────────────────────────
+
+
+class TestKeysetPagination:
+    def test_list_agents_cursor_walks_every_row_once(self, store: MarketStore):
+        for i in range(7):
+            store.create_agent(name=f"a{i}", cash=10.0)
+        seen = []
+        cursor = None
+        while True:
+            page = store.list_agents(limit=3, cursor=cursor)
+            assert page["total"] == 7
+            seen.extend(a["id"] for a in page["agents"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == list(range(1, 8))
+
+    def test_exact_last_page_has_no_cursor(self, store: MarketStore):
+        for i in range(4):
+            store.create_agent(name=f"a{i}", cash=10.0)
+        first = store.list_agents(limit=2)
+        second = store.list_agents(limit=2, cursor=first["next_cursor"])
+        assert [a["id"] for a in second["agents"]] == [3, 4]
+        assert second["next_cursor"] is None
+
+    def test_news_events_cursor_is_newest_first(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        for i in range(5):
+            store.create_news_event(
+                market_id=mkt["id"], headline=f"h{i}", mode="absolute",
+                requested_new_belief=0.5, requested_delta=None, affected_fraction=1.0,
+                min_signal_sensitivity=0.0, n_candidates=0, n_affected=0,
+                mean_belief_before=0.5, mean_belief_after=0.5,
+            )
+        first = store.list_news_events(mkt["id"], limit=3)
+        assert [e["headline"] for e in first["events"]] == ["h4", "h3", "h2"]
+        rest = store.list_news_events(mkt["id"], limit=3, cursor=first["next_cursor"])
+        assert [e["headline"] for e in rest["events"]] == ["h1", "h0"]
+        assert rest["next_cursor"] is None
+
+    def test_markets_page_filters_status(self, store: MarketStore):
+        for i in range(4):
+            _make_open_lmsr(store, slug=f"m{i}")
+        store.create_market(slug="draft", title="draft", mechanism="lmsr", b=100.0)
+        first = store.list_markets_page("open", limit=3)
+        assert first["total"] == 4
+        rest = store.list_markets_page("open", limit=3, cursor=first["next_cursor"])
+        assert [m["slug"] for m in rest["markets"]] == ["m3"]
+
+    def test_invalid_cursor_and_offset_combo_rejected(self, store: MarketStore):
+        store.create_agent(name="a", cash=10.0)
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            store.list_agents(cursor="not-a-cursor")
+        with pytest.raises(ValueError, match="offset"):
+            store.list_agents(offset=1, cursor=encode_cursor(1))
+
 
 # ── Multi-market ───────────────────────────────────────────────────────
 
@@ -456,13 +739,21 @@ class TestMultiMarket:
 
 
 class TestResolution:
-    def test_resolve_yes_pays_holders(self, store: MarketStore):
+    @pytest.mark.parametrize("update_from", [True, False], ids=["update-from", "correlated"])
+    def test_resolve_yes_pays_holders(self, store: MarketStore, monkeypatch, update_from):
+        # ``correlated`` is the path for SQLite older than 3.33.
+        monkeypatch.setattr(market_store, "_HAS_UPDATE_FROM", update_from)
         mkt = _make_open_lmsr(store)
+        other = _make_open_lmsr(store, slug="other")
         alice = store.create_agent(name="alice", cash=1000.0)
+        bob = store.create_agent(name="bob", cash=1000.0)
         store.submit_trade(alice["id"], mkt["id"], "buy_yes", shares=10.0)
+        store.submit_trade(bob["id"], other["id"], "buy_yes", shares=4.0)
         cash_after = store.get_agent(alice["id"])["cash"]
+        bob_cash = store.get_agent(bob["id"])["cash"]
         store.resolve_market(mkt["id"], "yes")
         assert store.get_agent(alice["id"])["cash"] == pytest.approx(cash_after + 10.0)
+        assert store.get_agent(bob["id"])["cash"] == pytest.approx(bob_cash)
 
     def test_resolve_no_pays_nothing(self, store: MarketStore):
         mkt = _make_open_lmsr(store)
@@ -486,6 +777,49 @@ class TestResolution:
         assert fetched["resolution"] == "no"
         assert fetched["resolved_at"] is not None
 
+    def test_settlement_is_persisted_with_top_k(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        agents = [store.create_agent(name=f"a{i}", cash=1000.0) for i in range(12)]
+        for i, a in enumerate(agents):
+            store.submit_trade(a["id"], mkt["id"], "buy_yes", shares=float(i + 1))
+        settlement = store.resolve_market(mkt["id"], "yes")
+        assert settlement["positions_settled"] == 12
+        assert settlement["total_payout"] == pytest.approx(sum(range(1, 13)))
+        assert [w["agent_id"] for w in settlement["winners"]] == [a["id"] for a in agents[::-1][:10]]
+        assert [w["agent_id"] for w in settlement["losers"]] == [a["id"] for a in agents[:10]]
+        top = settlement["winners"][0]
+        assert top["cash_after"] == pytest.approx(store.get_agent(top["agent_id"])["cash"])
+
+        # Later cash changes do not rewrite the persisted snapshot.
+        store.update_agent(top["agent_id"], cash=1.0)
+        assert store.get_settlement(mkt["id"]) == settlement
+
+    def test_settlement_lists_leave_out_deleted_agents(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        alice = store.create_agent(name="alice", cash=1000.0)
+        bob = store.create_agent(name="bob", cash=1000.0)
+        store.submit_trade(alice["id"], mkt["id"], "buy_yes", shares=2.0)
+        store.submit_trade(bob["id"], mkt["id"], "buy_yes", shares=5.0)
+        store.soft_delete_agent(bob["id"])
+        settlement = store.resolve_market(mkt["id"], "yes")
+        assert [w["agent_id"] for w in settlement["winners"]] == [alice["id"]]
+        assert [w["agent_id"] for w in settlement["losers"]] == [alice["id"]]
+
+    def test_settlement_rebuilt_for_legacy_rows(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        alice = store.create_agent(name="alice", cash=1000.0)
+        store.submit_trade(alice["id"], mkt["id"], "buy_yes", shares=4.0)
+        store.resolve_market(mkt["id"], "yes")
+        store.conn.execute("DELETE FROM settlements")
+        rebuilt = store.get_settlement(mkt["id"])
+        assert rebuilt["total_payout"] == pytest.approx(4.0)
+        assert rebuilt["winners"][0]["agent_id"] == alice["id"]
+
+    def test_settlement_requires_resolution(self, store: MarketStore):
+        mkt = _make_open_lmsr(store)
+        with pytest.raises(ValueError, match="not resolved"):
+            store.get_settlement(mkt["id"])
+
 
 # ── Full lifecycle ─────────────────────────────────────────────────────
 
@@ -0,0 +1,76 @@
+"""
+Tests for the in-process market push bus (``api/market_stream.py``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from api.market_stream import MarketEventBus
+
+
+def test_fan_out_serializes_once_per_event():
+    async def scenario():
+        bus = MarketEventBus(max_queue=8)
+        a, b = bus.subscribe(1), bus.subscribe(1)
+        other = bus.subscribe(2)
+        assert bus.publish(1, "trade", {"price": 0.6}) == 2
+        ea, eb = await a.get(0.1), await b.get(0.1)
+        assert ea is eb
+        assert json.loads(ea.text) == {
+            "seq": 1, "type": "trade", "market_id": 1, "data": {"price": 0.6},
+        }
+        assert ea.sse().startswith("id: 1\nevent: trade\ndata: {")
+        assert await other.get(0.01) is None
+        assert bus.publish(3, "trade", {}) == 0
+
+    asyncio.run(scenario())
+
+
+def test_publishers_on_other_threads_wake_the_consumer():
+    async def scenario():
+        bus = MarketEventBus()
+        sub = bus.subscribe(7)
+        threading.Timer(0.05, bus.publish, args=(7, "quote", {"price": 0.5})).start()
+        event = await sub.get(2.0)
+        assert event is not None and event.type == "quote"
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_dropped_not_buffered():
+    async def scenario():
+        bus = MarketEventBus(max_queue=3)
+        slow, fast = bus.subscribe(1), bus.subscribe(1)
+        for i in range(3):
+            bus.publish(1, "trade", {"i": i})
+            await fast.get(0.1)
+        assert bus.publish(1, "trade", {"i": 3}) == 1
+        assert slow.dropped and slow.closed
+        assert await slow.get(0.1) is None
+        assert json.loads(slow.dropped_event().text)["type"] == "dropped"
+        assert bus.subscriber_count(1) == 1
+        assert bus.dropped_total == 1
+        assert json.loads((await fast.get(0.1)).text)["data"] == {"i": 3}
+
+    asyncio.run(scenario())
+
+
+def test_close_market_ends_subscriptions():
+    async def scenario():
+        bus = MarketEventBus()
+        sub = bus.subscribe(4)
+        bus.close_market(4)
+        assert await sub.get(1.0) is None
+        assert sub.closed and not sub.dropped
+        assert not bus.has_subscribers(4)
+
+    asyncio.run(scenario())
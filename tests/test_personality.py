@@ -300,8 +300,9 @@ class TestPersonalityFieldsBehavior:
         )
         # Mock list_open_markets
         monkeypatch.setattr(agent, "list_open_markets", lambda: [{"id": 1, "price": 0.68}])
-        monkeypatch.setattr(agent, "get_price_snapshot", lambda mid: {"price": 0.68})
-        monkeypatch.setattr(agent, "get_agent_state", lambda mid: None)
+        monkeypatch.setattr(agent, "get_decision_context", lambda mid: {
+            "price": 0.68, "cash": 100.0, "shares": 0.0, "rho": 1.0, "belief": None,
+        })
         # |0.70 - 0.68| = 0.02 < threshold 0.20 => skip
         assert agent.run_cycle() == "edge_too_small"
 
@@ -315,8 +316,9 @@ class TestPersonalityFieldsBehavior:
             rng=random.Random(0),
         )
         monkeypatch.setattr(agent, "list_open_markets", lambda: [{"id": 1, "price": 0.50}])
-        monkeypatch.setattr(agent, "get_price_snapshot", lambda mid: {"price": 0.50})
-        monkeypatch.setattr(agent, "get_agent_state", lambda mid: None)
+        monkeypatch.setattr(agent, "get_decision_context", lambda mid: {
+            "price": 0.50, "cash": 100.0, "shares": 0.0, "rho": 1.0, "belief": None,
+        })
         monkeypatch.setattr(agent, "submit_trade", lambda mid, qty, mechanism="lmsr", limit_price=None: {"agent_cash_after": 95.0, "agent_shares_after": 3.0})
         result = agent.run_cycle()
         assert result == "traded"
@@ -331,8 +333,9 @@ class TestPersonalityFieldsBehavior:
             rng=random.Random(0),
         )
         monkeypatch.setattr(agent, "list_open_markets", lambda: [{"id": 1, "price": 0.50}])
-        monkeypatch.setattr(agent, "get_price_snapshot", lambda mid: {"price": 0.50})
-        monkeypatch.setattr(agent, "get_agent_state", lambda mid: None)
+        monkeypatch.setattr(agent, "get_decision_context", lambda mid: {
+            "price": 0.50, "cash": 100.0, "shares": 0.0, "rho": 1.0, "belief": None,
+        })
         assert agent.run_cycle() == "skipped_participation"
 
     def test_trade_size_noise_affects_quantity(self, monkeypatch):
@@ -353,8 +356,9 @@ class TestPersonalityFieldsBehavior:
                 rng=random.Random(7),
             )
             monkeypatch.setattr(agent, "list_open_markets", lambda: [{"id": 1, "price": 0.50}])
-            monkeypatch.setattr(agent, "get_price_snapshot", lambda mid: {"price": 0.50})
-            monkeypatch.setattr(agent, "get_agent_state", lambda mid: None)
+            monkeypatch.setattr(agent, "get_decision_context", lambda mid: {
+                "price": 0.50, "cash": 100.0, "shares": 0.0, "rho": 1.0, "belief": None,
+            })
             monkeypatch.setattr(agent, "submit_trade", capture_trade)
             agent.run_cycle()
 
@@ -399,8 +403,7 @@ class TestPersonalityFieldsBehavior:
         }
         for agent in (agent_high, agent_low):
             monkeypatch.setattr(agent, "list_open_markets", lambda: [{"id": 1, "price": 0.50}])
-            monkeypatch.setattr(agent, "get_price_snapshot", lambda mid: {"price": 0.50})
-            monkeypatch.setattr(agent, "get_agent_state", lambda mid: market_state)
+            monkeypatch.setattr(agent, "get_decision_context", lambda mid: {"price": 0.50, **market_state})
             monkeypatch.setattr(agent, "submit_trade", lambda mid, qty, mechanism="lmsr", limit_price=None: {"agent_cash_after": 90.0, "agent_shares_after": qty})
             agent.run_cycle()
 
@@ -428,8 +431,7 @@ class TestPersonalityFieldsBehavior:
             "cash": 100.0, "shares": 0.0, "rho": 1.0,
         }
         monkeypatch.setattr(agent, "list_open_markets", lambda: [{"id": 1, "price": 0.50}])
-        monkeypatch.setattr(agent, "get_price_snapshot", lambda mid: {"price": 0.50})
-        monkeypatch.setattr(agent, "get_agent_state", lambda mid: market_state)
+        monkeypatch.setattr(agent, "get_decision_context", lambda mid: {"price": 0.50, **market_state})
         monkeypatch.setattr(agent, "submit_trade", lambda mid, qty, mechanism="lmsr", limit_price=None: {"agent_cash_after": 90.0, "agent_shares_after": qty})
         agent.run_cycle()
 
@@ -454,8 +456,7 @@ class TestPersonalityFieldsBehavior:
         # Market state reports a completely different belief
         market_state = {"belief": 0.20, "cash": 100.0, "shares": 0.0, "rho": 1.0}
         monkeypatch.setattr(agent, "list_open_markets", lambda: [{"id": 1, "price": 0.50}])
-        monkeypatch.setattr(agent, "get_price_snapshot", lambda mid: {"price": 0.50})
-        monkeypatch.setattr(agent, "get_agent_state", lambda mid: market_state)
+        monkeypatch.setattr(agent, "get_decision_context", lambda mid: {"price": 0.50, **market_state})
         monkeypatch.setattr(agent, "submit_trade", lambda mid, qty, mechanism="lmsr", limit_price=None: {"agent_cash_after": 90.0, "agent_shares_after": qty})
         agent.run_cycle()
 
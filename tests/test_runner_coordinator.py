@@ -0,0 +1,130 @@
+"""
+Tests for the single-owner runner (``src/runner_coordinator.py``).
+
+Each "worker" is a coordinator with its own :class:`AgentRunner` and
+:class:`MarketService`, all on one market file and one runtime-state file.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (ROOT, os.path.join(ROOT, "app"), os.path.join(ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from agent_runner import AgentRunner  # noqa: E402
+from market_service import MarketService  # noqa: E402
+from runner_coordinator import RunnerCoordinator  # noqa: E402
+from runtime_state import RuntimeState  # noqa: E402
+
+
+class IdleAgent:
+    def __init__(self, agent_id, api_base_url, personality, belief, rho, cash, **kwargs):
+        self._stop = threading.Event()
+
+    def run(self):
+        self._stop.wait()
+
+    def stop(self):
+        self._stop.set()
+
+
+class Worker:
+    def __init__(self, base, name):
+        self.svc = MarketService(str(base / "markets.db"))
+        self.state = RuntimeState(str(base / "runtime.db"))
+        self.runner = AgentRunner(
+            api_base_url="http://unused", market_service=self.svc, agent_factory=IdleAgent,
+        )
+        self.coord = RunnerCoordinator(
+            self.runner, self.state, self.svc,
+            owner_id=name, lease_s=0.5, poll_s=0.05, handoff_timeout_s=5.0,
+        )
+
+    def close(self):
+        self.coord.shutdown()
+        self.state.close()
+        self.svc.close()
+
+
+@pytest.fixture
+def workers(tmp_path):
+    ws = [Worker(tmp_path, "w1"), Worker(tmp_path, "w2")]
+    yield ws
+    for w in ws:
+        w.close()
+
+
+def _market_with_agents(svc, n_agents=3):
+    for i in range(n_agents):
+        svc.create_agent(name=f"a{i}", cash=100.0, belief=0.6, rho=1.0, personality="{}")
+    mkt = svc.create_market(slug="m", title="m", mechanism="lmsr", b=100.0)
+    svc.set_market_status(mkt["id"], "open")
+    return int(mkt["id"])
+
+
+def _eventually(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.02)
+
+
+def test_requests_from_any_worker_run_in_the_owner(workers):
+    w1, w2 = workers
+    mid = _market_with_agents(w1.svc)
+    w1.coord.start()
+    w2.coord.start()
+
+    assert w1.coord.start_market(mid) == 3
+    assert w1.coord.is_owner and w1.runner.is_running(mid)
+    assert w2.coord.is_running(mid) and not w2.runner.is_running(mid)
+    with pytest.raises(ValueError):
+        w2.coord.start_market(mid)
+
+    # An agent created in the other worker joins the running market in the owner.
+    agent = w2.svc.create_agent(name="late", cash=100.0, belief=0.5, rho=1.0, personality="{}")
+    w2.coord.register_agents([agent])
+    _eventually(lambda: w1.runner.agent_count_active(mid) == 4)
+
+    info = w2.coord.stop_market(mid)
+    assert info["market_id"] == mid and info["zombie_threads"] == 0
+    assert not w1.runner.is_running(mid)
+    assert not w1.coord.is_running(mid)
+    assert w1.svc.get_market(mid)["status"] == "stopped"
+
+
+def test_markets_move_to_a_new_owner_when_the_lease_lapses(workers):
+    w1, w2 = workers
+    mid = _market_with_agents(w1.svc)
+    w1.coord.start_market(mid)
+
+    # w1 stalls: nothing renews its lease.
+    time.sleep(0.6)
+    w2.coord.reconcile()
+    assert w2.coord.is_owner and w2.runner.is_running(mid)
+
+    # w1 notices on its next pass and lets go without stopping the market.
+    w1.coord.reconcile()
+    assert not w1.coord.is_owner and not w1.runner.is_running(mid)
+    assert w1.svc.get_market(mid)["status"] == "running"
+    assert w1.coord.is_running(mid)
+
+
+def test_owner_detaches_deleted_markets(workers):
+    w1, w2 = workers
+    mid = _market_with_agents(w1.svc)
+    w1.coord.start_market(mid)
+    w2.state.clear_runner_market(mid)
+    w1.coord.reconcile()
+    assert not w1.runner.is_running(mid)
+    # Nothing left to run: the next pass releases the lease.
+    w1.coord.reconcile()
+    assert w1.state.lease_owner() is None
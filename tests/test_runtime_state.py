@@ -0,0 +1,120 @@
+"""
+Tests for the shared runtime state (``app/runtime_state.py``).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for p in (ROOT, os.path.join(ROOT, "app")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from runtime_state import RUNNER_RUNNING, RUNNER_STOPPING, RuntimeState  # noqa: E402
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "runtime.sqlite")
+
+
+def _comment(state, market_id, cursor, trade_id, **kw):
+    kw.setdefault("agent_id", 7)
+    kw.setdefault("belief", 0.6)
+    return state.append_comment(
+        market_id, expect_cursor=cursor, trade_id=trade_id, text=f"t{trade_id}",
+        source="template", llm_budget_initial=3, **kw,
+    )
+
+
+def test_two_handles_on_one_file_share_state(db_file):
+    # Two worker processes open the same file.
+    a, b = RuntimeState(db_file), RuntimeState(db_file)
+    try:
+        a.set_initial_cash(1, 250.0)
+        assert b.initial_cash(1) == 250.0
+        assert b.initial_cash(2) == 100.0
+
+        row = _comment(a, 1, 0, 11, llm_used=1)
+        assert row["id"] == 1 and row["trade_id"] == 11
+        assert b.comment_cursor(1) == 11
+        assert b.llm_budget(1, 3) == 2
+        assert [c["text"] for c in b.comments(1)] == ["t11"]
+    finally:
+        a.close()
+        b.close()
+
+
+def test_comment_for_a_seen_trade_is_rejected():
+    state = RuntimeState(":memory:")
+    assert _comment(state, 1, 0, 11) is not None
+    # A second worker read cursor 0 before the first one committed.
+    assert _comment(state, 1, 0, 11) is None
+    assert _comment(state, 1, 11, 12, agent_id=8)["id"] == 2
+
+    assert state.comment_seq(1) == 2
+    assert [c["id"] for c in state.comments(1, since=1)] == [2]
+    assert [(mid, c["trade_id"]) for mid, c in state.comments_by_agent(8)] == [(1, 12)]
+    assert [b for b, _ in state.comment_beliefs_since(1, 0)] == [0.6, 0.6]
+
+    version = state.comment_version(1)
+    state.drop_market(1)
+    assert state.comments(1) == [] and state.comment_cursor(1) == 0
+    assert state.comment_version(1) > version
+    state.close()
+
+
+def test_crowd_window_reads_only_recent_comments():
+    state = RuntimeState(":memory:")
+    for i in range(5):
+        _comment(state, 1, i, i + 1, belief=i / 10, at_us=1_000 * (i + 1))
+    assert state.comment_beliefs_since(1, 3_000) == [(0.2, 3_000), (0.3, 4_000), (0.4, 5_000)]
+
+    plan = " ".join(
+        r[-1] for r in state._conn().execute(
+            "EXPLAIN QUERY PLAN SELECT belief, at_us FROM market_comments"
+            " WHERE market_id = ? AND at_us >= ? AND belief IS NOT NULL ORDER BY at_us",
+            (1, 3_000),
+        )
+    )
+    assert "idx_market_comments_time" in plan and "at_us>?" in plan
+    state.close()
+
+
+def test_belief_samples_keep_the_newest():
+    state = RuntimeState(":memory:")
+    for i in range(5):
+        state.append_belief_sample(1, f"t{i}", i / 10, max_samples=3)
+    rows, total = state.belief_samples(1, limit=2)
+    assert total == 3
+    assert [r["t"] for r in rows] == ["t3", "t4"]
+    assert state.belief_samples(2, limit=10) == ([], 0)
+    state.close()
+
+
+def test_runner_lease_and_requests():
+    state = RuntimeState(":memory:")
+    assert state.acquire_lease("w1", ttl_s=30)
+    assert not state.acquire_lease("w2", ttl_s=30)
+    assert state.acquire_lease("w1", ttl_s=30)
+    state.release_lease("w1")
+    assert state.lease_owner() is None
+    assert state.acquire_lease("w2", ttl_s=30)
+
+    assert state.request_runner_start(5)
+    assert not state.request_runner_start(5)
+    state.set_runner_state(5, RUNNER_RUNNING, n_agents=4)
+    assert state.any_runner_active()
+    assert state.request_runner_stop(5)
+    assert not state.request_runner_stop(5)
+    assert state.runner_market(5)["state"] == RUNNER_STOPPING
+    assert state.runner_market(5)["n_agents"] == 4
+
+    state.queue_runner_agents([{"id": 3, "belief": 0.5}])
+    assert state.take_runner_agents() == [{"id": 3, "belief": 0.5}]
+    assert state.take_runner_agents() == []
+    state.close()
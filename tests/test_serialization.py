@@ -0,0 +1,85 @@
+"""
+Tests for API response encoding (``api/serialization.py``).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from api import serialization
+from api.serialization import StreamCompressor, negotiate_encoding, render_json
+
+
+def test_numpy_values_encode_as_plain_json():
+    payload = {
+        "series": np.array([0.25, 0.5]),
+        "n": np.int64(3),
+        "ok": np.bool_(True),
+        "price": np.float32(0.5),
+        1: "int keys become strings",
+    }
+    assert json.loads(render_json(payload)) == {
+        "series": [0.25, 0.5], "n": 3, "ok": True, "price": 0.5, "1": "int keys become strings",
+    }
+
+
+def test_stdlib_fallback_matches(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    body = render_json({"a": np.arange(3), "b": [np.float64(1.5)], "c": None})
+    assert body == b'{"a":[0,1,2],"b":[1.5],"c":null}'
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0, identity", None),
+        ("*", "gzip"),
+        ("*, gzip;q=0", None),
+    ],
+)
+def test_negotiate_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(serialization, "brotli", None)
+    assert negotiate_encoding(header) == expected
+
+
+def test_large_simulation_responses_are_gzipped(monkeypatch):
+    monkeypatch.setattr(serialization, "brotli", None)
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    body = {"n_agents": 20, "n_rounds": 60, "seed": 3}
+    with TestClient(app) as client:
+        r = client.post("/api/simulate", json=body, headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200, r.text
+        assert r.headers["content-encoding"] == "gzip"
+        assert len(r.json()["metrics"]["price_series"]) == 60
+
+        raw = client.post(
+            "/api/simulate", json=body, headers={"Accept-Encoding": "identity"},
+        )
+        assert "content-encoding" not in raw.headers
+        assert raw.json() == r.json()
+        assert int(r.headers["content-length"]) < len(raw.content) // 2
+
+
+def test_stream_compressor_chunks_decode_as_they_arrive():
+    enc = StreamCompressor("gzip")
+    dec = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    lines = [render_json({"i": i, "x": list(range(i))}) + b"\n" for i in range(5)]
+    for line in lines:
+        # Each flushed chunk yields its whole line without waiting for the rest.
+        assert dec.decompress(enc.compress(line)) == line
+    assert dec.decompress(enc.finish()) == b""
+    assert dec.eof
@@ -0,0 +1,152 @@
+"""
+Tests for the interactive session endpoints (``/api/session/*``).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    with TestClient(app) as tc:
+        yield tc
+
+
+def _start(client, **overrides):
+    body = {"n_agents": 30, "n_rounds": 50, "seed": 5, "mechanism": "cda", **overrides}
+    r = client.post("/api/session/start", json=body)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_step_without_since_round_returns_full_snapshot(client):
+    snap = _start(client)
+    assert snap["mode"] == "full"
+    r = client.post("/api/session/step", json={"session_id": snap["session_id"], "rounds": 3}).json()
+    assert r["mode"] == "full"
+    assert len(r["metrics"]["price_series"]) == 3
+    assert len(r["agents"]) == 30
+
+
+def test_delta_steps_rebuild_the_full_history(client):
+    sid = _start(client)["session_id"]
+    have = client.post("/api/session/step", json={"session_id": sid, "rounds": 10}).json()
+    series = {k: list(have["metrics"][k]) for k in ("price_series", "best_bid_series")}
+    comments = list(have["comments"])
+
+    for _ in range(4):
+        d = client.post(
+            "/api/session/step",
+            json={
+                "session_id": sid, "rounds": 2,
+                "since_round": have["round"], "since_comment": len(comments),
+            },
+        ).json()
+        assert d["mode"] == "delta"
+        assert len(d["metrics"]["price_series"]) == 2
+        for k in series:
+            series[k] += d["metrics"][k]
+        comments += d["comments"]
+        have = d
+
+    full = client.post("/api/session/step", json={"session_id": sid, "rounds": 1}).json()
+    assert series["price_series"] == full["metrics"]["price_series"][:-1]
+    assert series["best_bid_series"] == full["metrics"]["best_bid_series"][:-1]
+    assert comments == [c for c in full["comments"] if c["round"] <= have["round"]]
+
+
+def test_delta_sends_only_agents_that_moved(client):
+    sid = _start(client, mechanism="lmsr")["session_id"]
+    at = client.post("/api/session/step", json={"session_id": sid, "rounds": 1}).json()["round"]
+
+    shift = client.post(
+        "/api/session/shift",
+        json={"session_id": sid, "agent_ids": [0, 1], "delta": 0.05, "since_round": at},
+    ).json()
+    assert shift["mode"] == "delta"
+    assert shift["metrics"]["price_series"] == []
+    assert sorted(a["agent_id"] for a in shift["agents"]) == [0, 1]
+
+    # Nothing moves without a round or shift.
+    idle = client.post(
+        "/api/session/shift",
+        json={"session_id": sid, "agent_ids": [], "delta": 0.0, "since_round": at},
+    ).json()
+    assert idle["agents"] == []
+
+    # A client that missed a response (stale since_round) gets every agent again.
+    client.post("/api/session/step", json={"session_id": sid, "rounds": 1})
+    stale = client.post(
+        "/api/session/step", json={"session_id": sid, "rounds": 1, "since_round": at},
+    ).json()
+    assert stale["mode"] == "delta"
+    assert len(stale["agents"]) == 30
+    assert len(stale["metrics"]["price_series"]) == 2
+
+
+def test_since_round_ahead_of_the_session_falls_back_to_full(client):
+    sid = _start(client)["session_id"]
+    r = client.post(
+        "/api/session/step", json={"session_id": sid, "rounds": 1, "since_round": 40},
+    ).json()
+    assert r["mode"] == "full"
+    assert len(r["metrics"]["price_series"]) == 1
+
+
+def test_spilled_sessions_resume_where_they_left_off(client, monkeypatch, tmp_path):
+    import api.main as main
+    from api.session_store import SessionStore
+
+    ref = _start(client)["session_id"]
+    expected = client.post("/api/session/step", json={"session_id": ref, "rounds": 6}).json()
+
+    # A one-byte budget spills every session as soon as its request ends.
+    store = SessionStore(main._session_bytes, max_bytes=1, spill_dir=str(tmp_path))
+    monkeypatch.setattr(main, "_session_store", store)
+    sid = _start(client)["session_id"]
+    for _ in range(3):
+        got = client.post("/api/session/step", json={"session_id": sid, "rounds": 2}).json()
+        assert (tmp_path / f"{sid}.pkl").exists()
+    assert store.stats()["restored"] == 3
+    assert got["metrics"]["price_series"] == expected["metrics"]["price_series"]
+
+    client.delete(f"/api/session/{sid}")
+    assert not (tmp_path / f"{sid}.pkl").exists()
+    r = client.post("/api/session/step", json={"session_id": sid, "rounds": 1})
+    assert r.status_code == 404
+
+
+def test_sessions_are_shared_between_workers(client, monkeypatch, tmp_path):
+    import api.main as main
+
+    monkeypatch.setenv("API_WORKERS", "2")
+    monkeypatch.setenv("SESSION_SPILL_DIR", str(tmp_path))
+    main.reset_session_store()
+    try:
+        sid = _start(client)["session_id"]
+        first = main.get_session_store()
+        # Requests alternate between two workers' stores.
+        main.reset_session_store()
+        second = main.get_session_store()
+        client.post("/api/session/step", json={"session_id": sid, "rounds": 2})
+        main._session_store = first
+        got = client.post("/api/session/step", json={"session_id": sid, "rounds": 2}).json()
+        assert len(got["metrics"]["price_series"]) == 4
+
+        main._session_store = second
+        assert client.delete(f"/api/session/{sid}").status_code == 200
+        main._session_store = first
+        assert client.post("/api/session/step", json={"session_id": sid, "rounds": 1}).status_code == 404
+    finally:
+        main.reset_session_store()
@@ -0,0 +1,169 @@
+"""
+Tests for the bounded interactive-session store (``api/session_store.py``).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from api import session_store  # noqa: E402
+from api.session_store import SessionNotFound, SessionStore  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", c)
+    return c
+
+
+def _store(**kw):
+    # Sessions in these tests are lists; one element costs 10 bytes.
+    kw.setdefault("max_bytes", 100)
+    return SessionStore(lambda data: 10 * len(data), **kw)
+
+
+def _ids(n):
+    return [f"{i:08x}-0000-0000-0000-000000000000" for i in range(n)]
+
+
+def test_least_recently_used_sessions_are_evicted_over_budget(clock):
+    store = _store()
+    a, b, c = _ids(3)
+    store.put(a, [0] * 4)
+    store.put(b, [0] * 4)
+    with store.use(a):
+        pass
+    store.put(c, [0] * 4)
+
+    assert a in store and c in store and b not in store
+    assert store.stats()["bytes"] == 80
+    with pytest.raises(SessionNotFound):
+        with store.use(b):
+            pass
+
+
+def test_growth_is_measured_after_use_and_in_use_sessions_stay(clock):
+    store = _store()
+    a, b = _ids(2)
+    store.put(a, [0] * 2)
+    store.put(b, [0] * 2)
+    with store.use(a) as data:
+        data.extend([0] * 7)
+        store.put(b, [0] * 2)
+        # a is pinned: over budget, but not evicted mid-request.
+        assert a in store
+    # a is now the most recently used; b goes to bring the total back under 100.
+    assert store.stats()["bytes"] == 90
+    assert b not in store
+
+
+def test_idle_sessions_expire(clock):
+    store = _store(ttl_s=60)
+    a, b = _ids(2)
+    store.put(a, [0])
+    clock.now += 45
+    store.put(b, [0])
+    clock.now += 30
+    with store.use(b):
+        pass
+    assert a not in store
+    assert store.stats()["evicted"] == 1
+
+
+def test_evicted_sessions_spill_to_disk_and_come_back(clock, tmp_path):
+    store = _store(spill_dir=str(tmp_path), ttl_s=60)
+    a, b = _ids(2)
+    store.put(a, [1, 2, 3])
+    clock.now += 120
+    store.put(b, [0])
+    assert os.path.exists(tmp_path / f"{a}.pkl")
+    assert store.stats()["sessions"] == 1
+
+    with store.use(a) as data:
+        assert data == [1, 2, 3]
+    assert not os.path.exists(tmp_path / f"{a}.pkl")
+    assert store.stats()["restored"] == 1
+
+    # A fresh store over the same directory finds spilled sessions too.
+    clock.now += 120
+    store.put(b, [0])
+    assert _store(spill_dir=str(tmp_path)).discard(a)
+    assert a not in store
+
+
+def test_a_slow_spill_does_not_block_other_sessions(tmp_path):
+    pickling, release = threading.Event(), threading.Event()
+
+    class SlowToPickle(list):
+        def __reduce__(self):
+            pickling.set()
+            release.wait(5)
+            return list, (list(self),)
+
+    store = _store(spill_dir=str(tmp_path))
+    a, b, c = _ids(3)
+    store.put(a, SlowToPickle([1] * 5))
+    store.put(b, [0] * 4)
+    spiller = threading.Thread(target=store.put, args=(c, [0] * 5))
+    spiller.start()
+    assert pickling.wait(5)
+
+    # a is being written out; b is served meanwhile and a is still found.
+    with store.use(b) as data:
+        assert data == [0] * 4
+    assert spiller.is_alive()
+    assert a in store
+
+    release.set()
+    spiller.join(5)
+    assert os.path.exists(tmp_path / f"{a}.pkl")
+    with store.use(a) as data:
+        assert data == [1] * 5
+    assert store.stats()["restored"] == 1
+
+
+def test_spill_paths_only_for_session_ids(tmp_path):
+    store = _store(spill_dir=str(tmp_path))
+    with pytest.raises(SessionNotFound):
+        with store.use("../../etc/passwd"):
+            pass
+
+
+def test_shared_stores_see_each_others_writes(clock, tmp_path):
+    # Two workers' stores on one spill directory.
+    one = _store(spill_dir=str(tmp_path), shared=True)
+    two = _store(spill_dir=str(tmp_path), shared=True)
+    (sid,) = _ids(1)
+    one.put(sid, [1])
+
+    with two.use(sid) as data:
+        data.append(2)
+    with one.use(sid) as data:
+        assert data == [1, 2]
+        data.append(3)
+    with two.use(sid) as data:
+        assert data == [1, 2, 3]
+
+    assert one.discard(sid)
+    with pytest.raises(SessionNotFound):
+        with two.use(sid):
+            pass
+    with pytest.raises(ValueError):
+        _store(shared=True)
@@ -0,0 +1,318 @@
+"""
+Tests for ShardedMarketService — catalog DB + one SQLite file per market.
+
+Proves:
+- each market lives in its own shard file and trades stay inside it
+- a write lock held on one shard does not block trades in another
+- wallet <-> sub-account transfers are journaled and replay idempotently
+- resolution sweeps sub-accounts back into wallets
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+_APP = Path(__file__).resolve().parent.parent / "app"
+if str(_APP) not in sys.path:
+    sys.path.insert(0, str(_APP))
+
+from sharded_market_service import ShardedMarketService
+
+
+@pytest.fixture
+def svc(tmp_path):
+    s = ShardedMarketService(
+        str(tmp_path / "catalog.db"), str(tmp_path / "shards"), market_allocation=50.0,
+    )
+    yield s
+    s.close()
+
+
+def _make_running_lmsr(svc, slug, b=100.0):
+    mkt = svc.create_market(slug=slug, title=slug, mechanism="lmsr", b=b)
+    svc.set_market_status(mkt["id"], "running")
+    return svc.get_market(mkt["id"])
+
+
+class TestLayout:
+    def test_one_file_per_market(self, svc: ShardedMarketService, tmp_path):
+        m1 = _make_running_lmsr(svc, "a")
+        m2 = _make_running_lmsr(svc, "b")
+        assert os.path.exists(svc.shard_path(m1["id"]))
+        assert os.path.exists(svc.shard_path(m2["id"]))
+        assert svc.shard_path(m1["id"]) != svc.shard_path(m2["id"])
+        assert [m["id"] for m in svc.list_markets(status="running")] == [m1["id"], m2["id"]]
+
+    def test_trades_stay_in_their_shard_with_unique_ids(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        m2 = _make_running_lmsr(svc, "b")
+        alice = svc.create_agent("alice", cash=100.0)
+        t1 = svc.execute_lmsr_trade(m1["id"], alice["id"], 5.0)
+        t2 = svc.execute_lmsr_trade(m2["id"], alice["id"], 5.0)
+        assert t1["trade_id"] != t2["trade_id"]
+        assert svc.count_trades(m1["id"]) == 1
+        assert svc.count_trades(m2["id"]) == 1
+        history = svc.get_trades(agent_id=alice["id"])
+        assert {t["market_id"] for t in history} == {m1["id"], m2["id"]}
+        assert len(svc.list_markets_for_agent(alice["id"])) == 2
+
+    def test_leaderboard_sums_across_shards(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        m2 = _make_running_lmsr(svc, "b")
+        alice = svc.create_agent("alice", cash=100.0)
+        bob = svc.create_agent("bob", cash=100.0)
+        svc.execute_lmsr_trade(m1["id"], alice["id"], 2.0)
+        svc.execute_lmsr_trade(m2["id"], alice["id"], 2.0)
+        svc.execute_lmsr_trade(m1["id"], bob["id"], 3.0)
+        board = svc.agent_leaderboard(by="volume")
+        assert [(r["name"], r["volume"], r["markets"]) for r in board] == [
+            ("alice", pytest.approx(4.0), 2), ("bob", pytest.approx(3.0), 1),
+        ]
+        assert [r["name"] for r in svc.agent_leaderboard(m1["id"], by="volume")] == ["bob", "alice"]
+
+    def test_summary_reads_live_price_from_shard(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0)
+        svc.execute_lmsr_trade(m1["id"], alice["id"], 10.0)
+        summary = svc.list_markets_with_summary(status="running")
+        assert summary["total"] == 1
+        row = summary["markets"][0]
+        assert row["price"] == pytest.approx(svc.get_price(m1["id"]))
+        assert row["price"] > 0.5
+        assert row["trade_count"] == 1
+
+    def test_versions_never_move_back_when_a_shard_is_deleted(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0)
+        for _ in range(3):
+            svc.execute_lmsr_trade(m1["id"], alice["id"], 1.0)
+        catalog, listing = svc.catalog_version(), svc.listing_version()
+        svc.delete_market(m1["id"])
+        assert svc.catalog_version() > catalog
+        assert svc.listing_version() > listing
+
+    def test_concurrent_first_opens_build_one_shard(
+        self, svc: ShardedMarketService, tmp_path, monkeypatch,
+    ):
+        import sharded_market_service
+
+        m1 = _make_running_lmsr(svc, "a")
+        fresh = ShardedMarketService(str(tmp_path / "catalog.db"), str(tmp_path / "shards"))
+        built: list = []
+
+        class SlowService(sharded_market_service.MarketService):
+            def __init__(self, *args, **kwargs):
+                time.sleep(0.05)
+                super().__init__(*args, **kwargs)
+                built.append(self)
+
+        monkeypatch.setattr(sharded_market_service, "MarketService", SlowService)
+        opened: list = []
+        threads = [threading.Thread(target=lambda: opened.append(fresh._shard(m1["id"]))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(opened) == 8 and len({id(s) for s in opened}) == 1
+        # No second instance was built and dropped with its connections open.
+        assert len(built) == 1
+        fresh.close()
+
+    def test_shard_deleted_while_opening_is_not_left_behind(
+        self, svc: ShardedMarketService, tmp_path, monkeypatch,
+    ):
+        m1 = _make_running_lmsr(svc, "a")
+        other = ShardedMarketService(str(tmp_path / "catalog.db"), str(tmp_path / "shards"))
+
+        def init_then_delete(shard, row):
+            ShardedMarketService._init_shard(shard, row)
+            svc.delete_market(m1["id"])
+
+        monkeypatch.setattr(other, "_init_shard", init_then_delete)
+        with pytest.raises(ValueError):
+            other._shard(m1["id"])
+        assert not os.path.exists(svc.shard_path(m1["id"]))
+        other.close()
+
+    def test_decision_context_before_and_after_joining(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0, rho=2.0)
+        ctx = svc.decision_context(m1["id"], alice["id"])
+        # Not joined yet: the cash that joining would move into the market.
+        assert ctx["cash"] == pytest.approx(svc.get_agent(alice["id"], m1["id"])["cash"])
+        assert (ctx["shares"], ctx["rho"]) == (0.0, 2.0)
+        svc.execute_lmsr_trade(m1["id"], alice["id"], 5.0)
+        ctx = svc.decision_context(m1["id"], alice["id"])
+        assert ctx["shares"] == pytest.approx(5.0)
+        assert ctx["cash"] == pytest.approx(svc.get_agent(alice["id"], m1["id"])["cash"])
+        assert ctx["price"] == pytest.approx(svc.get_price(m1["id"]))
+
+    def test_writer_in_one_shard_does_not_block_another(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        m2 = _make_running_lmsr(svc, "b")
+        alice = svc.create_agent("alice", cash=100.0)
+        bob = svc.create_agent("bob", cash=100.0)
+        svc.ensure_position(alice["id"], m1["id"])
+        svc.ensure_position(bob["id"], m2["id"])
+
+        locker = sqlite3.connect(svc.shard_path(m1["id"]), isolation_level=None)
+        locker.execute("BEGIN IMMEDIATE")
+        try:
+            started = time.monotonic()
+            trade = svc.execute_lmsr_trade(m2["id"], bob["id"], 2.0)
+            elapsed = time.monotonic() - started
+        finally:
+            locker.execute("ROLLBACK")
+            locker.close()
+        assert trade["trade_id"] is not None
+        assert elapsed < 1.0
+
+    def test_parallel_writers_across_markets(self, svc: ShardedMarketService):
+        markets = [_make_running_lmsr(svc, f"m{i}") for i in range(4)]
+        agents = [svc.create_agent(f"agent-{i}", cash=100.0) for i in range(4)]
+        errors: list = []
+
+        def worker(market_id: int, agent_id: int):
+            try:
+                for _ in range(20):
+                    svc.execute_lmsr_trade(market_id, agent_id, 0.5)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [
+            threading.Thread(target=worker, args=(m["id"], a["id"]))
+            for m, a in zip(markets, agents)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        for m, a in zip(markets, agents):
+            assert svc.count_trades(m["id"]) == 20
+            assert svc.get_position(a["id"], m["id"])["yes_shares"] == pytest.approx(10.0)
+
+
+class TestCashSubAccounts:
+    def test_first_touch_funds_sub_account(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        m2 = _make_running_lmsr(svc, "b")
+        alice = svc.create_agent("alice", cash=80.0)
+        assert svc.get_agent(alice["id"], market_id=m1["id"])["cash"] == pytest.approx(50.0)
+
+        svc.ensure_position(alice["id"], m1["id"])
+        svc.ensure_position(alice["id"], m2["id"])
+        assert svc.get_agent(alice["id"])["cash"] == pytest.approx(0.0)
+        assert svc.get_agent(alice["id"], market_id=m1["id"])["cash"] == pytest.approx(50.0)
+        assert svc.get_agent(alice["id"], market_id=m2["id"])["cash"] == pytest.approx(30.0)
+
+    def test_trade_cash_stays_in_market(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0)
+        trade = svc.execute_lmsr_trade(m1["id"], alice["id"], 10.0)
+        assert svc.get_agent(alice["id"])["cash"] == pytest.approx(50.0)
+        assert svc.get_agent(alice["id"], market_id=m1["id"])["cash"] == pytest.approx(
+            50.0 - trade["cost"]
+        )
+
+    def test_explicit_transfers(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0)
+        out = svc.transfer_cash(alice["id"], m1["id"], 20.0)
+        assert out["market_cash"] == pytest.approx(70.0)
+        assert out["wallet_cash"] == pytest.approx(30.0)
+
+        out = svc.transfer_cash(alice["id"], m1["id"], -10.0)
+        assert out["market_cash"] == pytest.approx(60.0)
+        assert out["wallet_cash"] == pytest.approx(40.0)
+
+        with pytest.raises(ValueError, match="Insufficient funds"):
+            svc.transfer_cash(alice["id"], m1["id"], -1000.0)
+        with pytest.raises(ValueError, match="Insufficient funds"):
+            svc.transfer_cash(alice["id"], m1["id"], 1000.0)
+        assert svc.get_agent(alice["id"])["cash"] == pytest.approx(40.0)
+        assert svc.get_agent(alice["id"], market_id=m1["id"])["cash"] == pytest.approx(60.0)
+
+    def test_pending_transfer_is_replayed_once(self, svc: ShardedMarketService, tmp_path):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0)
+        svc.ensure_position(alice["id"], m1["id"])
+        # Simulate a crash after step 1 of a deposit: wallet debited, shard untouched.
+        svc._journal_transfers(m1["id"], [(alice["id"], 25.0)])
+        assert svc.get_agent(alice["id"])["cash"] == pytest.approx(25.0)
+        svc.close()
+
+        reopened = ShardedMarketService(
+            str(tmp_path / "catalog.db"), str(tmp_path / "shards"), market_allocation=50.0,
+        )
+        try:
+            assert reopened.recover_transfers() == 0
+            assert reopened.get_agent(alice["id"], market_id=m1["id"])["cash"] == pytest.approx(75.0)
+            assert reopened.get_agent(alice["id"])["cash"] == pytest.approx(25.0)
+        finally:
+            reopened.close()
+
+    def test_resolution_sweeps_sub_accounts_to_wallets(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0)
+        trade = svc.execute_lmsr_trade(m1["id"], alice["id"], 10.0)
+        settlement = svc.resolve_market(m1["id"], "yes")
+        assert settlement["total_payout"] == pytest.approx(10.0)
+        expected = 100.0 - trade["cost"] + 10.0
+        assert svc.get_agent(alice["id"])["cash"] == pytest.approx(expected)
+        assert svc.get_agent(alice["id"], market_id=m1["id"])["cash"] == pytest.approx(0.0)
+        assert svc.list_markets(status="resolved")[0]["resolution"] == "yes"
+
+    def test_delete_market_refunds_and_removes_shard(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0)
+        svc.ensure_position(alice["id"], m1["id"])
+        path = svc.shard_path(m1["id"])
+        svc.delete_market(m1["id"])
+        assert not os.path.exists(path)
+        assert svc.get_agent(alice["id"])["cash"] == pytest.approx(100.0)
+        with pytest.raises(ValueError, match="not found"):
+            svc.get_market(m1["id"])
+
+    def test_profile_updates_reach_shards(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        alice = svc.create_agent("alice", cash=100.0, rho=1.0)
+        svc.ensure_position(alice["id"], m1["id"])
+        svc.update_agent(alice["id"], rho=2.5)
+        assert svc.get_position(alice["id"], m1["id"])["rho"] == pytest.approx(2.5)
+
+    def test_bulk_join_opens_sub_accounts(self, svc: ShardedMarketService):
+        m1 = _make_running_lmsr(svc, "a")
+        created = svc.create_agents_bulk(
+            [{"name": f"bulk-{i}", "cash": 80.0} for i in range(5)], market_id=m1["id"],
+        )
+        assert len(svc.list_agents_for_market(m1["id"])) == 5
+        for a in created:
+            assert svc.get_agent(a["id"])["cash"] == pytest.approx(30.0)
+            assert svc.get_agent(a["id"], market_id=m1["id"])["cash"] == pytest.approx(50.0)
+
+    def test_archive_resolved_shard(self, tmp_path):
+        svc = ShardedMarketService(
+            str(tmp_path / "catalog.db"), str(tmp_path / "shards"),
+            archive_dir=str(tmp_path / "archive"),
+        )
+        try:
+            m1 = _make_running_lmsr(svc, "a")
+            alice = svc.create_agent("alice", cash=100.0)
+            svc.execute_lmsr_trade(m1["id"], alice["id"], 5.0)
+            before = svc.get_trades(agent_id=alice["id"])
+            svc.resolve_market(m1["id"], "yes")
+            assert [r["market_id"] for r in svc.archive_resolved_markets()] == [m1["id"]]
+            assert svc.get_trades(agent_id=alice["id"]) == before
+            assert svc.count_trades(m1["id"]) == 1
+            svc.delete_market(m1["id"])
+            assert not (tmp_path / "archive" / f"market_{m1['id']}.npz").exists()
+        finally:
+            svc.close()
@@ -0,0 +1,78 @@
+"""
+Tests for the NDJSON simulation stream (``POST /api/simulate/stream``).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BODY = {"n_agents": 20, "n_rounds": 101, "seed": 3, "mechanism": "cda"}
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    with TestClient(app) as tc:
+        yield tc
+
+
+def _lines(client, query="", **kwargs):
+    r = client.post(f"/api/simulate/stream{query}", json=BODY, **kwargs)
+    assert r.status_code == 200, r.text
+    return r, [json.loads(x) for x in r.text.splitlines()]
+
+
+def test_default_stream_is_one_tick_per_round(client):
+    _, lines = _lines(client)
+    assert [x["type"] for x in lines] == ["tick"] * 101 + ["done"]
+    assert lines[0]["state"]["round"] == 1
+
+
+def test_max_points_folds_rounds_and_keeps_totals(client):
+    _, ticks = _lines(client)
+    _, batches = _lines(client, "?max_points=10")
+    done = batches.pop()
+    assert done == ticks.pop()
+
+    rounds = [r for b in batches for r in b["columns"]["round"]]
+    assert len(rounds) <= 10
+    assert rounds[-1] == 101
+    assert rounds[:3] == [11, 22, 33]
+    # A point closes its bucket: last price of the bucket, summed volume.
+    by_round = {t["state"]["round"]: t for t in ticks}
+    prices = [p for b in batches for p in b["columns"]["price"]]
+    assert prices == [by_round[r]["append"]["price"] for r in rounds]
+    volume = sum(v for b in batches for v in b["columns"]["trade_volume"])
+    assert volume == pytest.approx(sum(t["append"]["trade_volume"] for t in ticks))
+    assert len(batches[0]["columns"]["best_bid"]) == len(batches[0]["columns"]["round"])
+    assert sum(len(b["new_comments"]) for b in batches) == len(done["comments"])
+
+
+def test_every_k_rounds_batches_points(client):
+    _, lines = _lines(client, "?every=25")
+    batches = lines[:-1]
+    assert [b["state"]["round"] for b in batches] == [25, 50, 75, 100, 101]
+    assert [len(b["columns"]["price"]) for b in batches] == [25, 25, 25, 25, 1]
+
+
+def test_compressed_stream(client):
+    r, lines = _lines(client, "?max_points=20&compress=true", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert lines[-1]["type"] == "done"
+    _, plain = _lines(client, "?max_points=20")
+    assert lines == plain
+
+
+def test_tick_format_cannot_be_batched(client):
+    r = client.post("/api/simulate/stream?every=5&format=tick", json=BODY)
+    assert r.status_code == 400
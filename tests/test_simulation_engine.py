@@ -155,3 +155,26 @@ def test_get_agents_pnl_matches_mark_definition():
         pnl = row["pnl"]
         expected = row["cash"] + row["shares"] * price - eng.initial_cash
         assert math.isclose(pnl, expected, rel_tol=0, abs_tol=1e-6)
+
+
+def test_lmsr_buys_are_clipped_to_cash():
+    """
+    Cash-constrained buys are pre-clipped with ``max_affordable_quantity``.
+
+    With a thin market (small ``b``) the price moves along each trade, so a
+    buy sized at the quoted price can cost more than the agent holds; the
+    engine shrinks it to the exact affordable size and cash never goes negative.
+    """
+    eng = SimulationEngine(
+        mechanism="lmsr",
+        phase=1,
+        seed=3,
+        ground_truth=0.9,
+        n_agents=10,
+        initial_cash=5.0,
+        b=5.0,
+        belief_spec=BeliefSpec(mode="fixed", fixed_value=0.95),
+        shuffle_agents=False,
+    )
+    eng.run(20)
+    assert all(row["cash"] >= -1e-9 for row in eng.get_agents())
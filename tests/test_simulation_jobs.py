@@ -0,0 +1,130 @@
+"""
+Tests for background simulation jobs (``api/simulation_jobs.py``, ``/api/simulate/jobs``).
+
+One worker pool is shared by the module: starting ``spawn`` workers costs
+seconds, the jobs themselves milliseconds.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from api.simulation_jobs import JobQueueFull, SimulationJobQueue  # noqa: E402
+
+SMALL = {"n_agents": 20, "n_rounds": 30, "seed": 3, "mechanism": "cda"}
+# Runs for minutes; only ever cancelled.
+HEAVY = {"n_agents": 500, "n_rounds": 2000, "seed": 3}
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+    import api.main as main
+
+    saved = {k: os.environ.get(k) for k in ("SIMULATE_JOB_WORKERS", "SIMULATE_JOB_QUEUE", "SIMULATE_JOB_RESULTS")}
+    os.environ.update(SIMULATE_JOB_WORKERS="1", SIMULATE_JOB_QUEUE="1", SIMULATE_JOB_RESULTS="2")
+    main.reset_simulation_jobs()
+    try:
+        with TestClient(main.app) as tc:
+            yield tc
+    finally:
+        main.reset_simulation_jobs()
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def _wait_finished(client, job_id, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/api/simulate/jobs/{job_id}").json()
+        if status["status"] in ("done", "failed", "cancelled"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_result_matches_synchronous_simulate(client):
+    r = client.post("/api/simulate/jobs", json=SMALL)
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    assert r.json()["status"] in ("queued", "running")
+
+    status = _wait_finished(client, job_id)
+    assert status["status"] == "done"
+    assert status["rounds_done"] == status["n_rounds"] == 30
+
+    result = client.get(f"/api/simulate/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.json() == client.post("/api/simulate", json=SMALL).json()
+
+
+def test_job_stream_reports_progress_then_done(client):
+    job_id = client.post("/api/simulate/jobs", json=SMALL).json()["job_id"]
+    lines = [json.loads(x) for x in client.get(f"/api/simulate/jobs/{job_id}/stream").text.splitlines()]
+    assert all(x["type"] == "progress" for x in lines[:-1])
+    assert lines[-2]["status"] == "done"
+    done = lines[-1]
+    assert done["type"] == "done"
+    assert len(done["metrics"]["price_series"]) == 30
+    assert done["config"]["seed"] == 3
+
+
+def test_admission_control_and_cancellation(client):
+    running = client.post("/api/simulate/jobs", json=HEAVY).json()["job_id"]
+    waiting = client.post("/api/simulate/jobs", json=HEAVY).json()["job_id"]
+
+    full = client.post("/api/simulate/jobs", json=SMALL)
+    assert full.status_code == 429
+    assert "Retry-After" in full.headers
+
+    for job_id in (waiting, running):
+        assert client.delete(f"/api/simulate/jobs/{job_id}").json()["cancel_requested"] is True
+    for job_id in (waiting, running):
+        assert _wait_finished(client, job_id)["status"] == "cancelled"
+        assert client.get(f"/api/simulate/jobs/{job_id}/result").status_code == 409
+
+    # Capacity is released once the cancelled jobs are finished.
+    again = client.post("/api/simulate/jobs", json=SMALL)
+    assert again.status_code == 202
+    assert _wait_finished(client, again.json()["job_id"])["status"] == "done"
+
+
+def test_least_recently_read_results_are_evicted(client):
+    ids = []
+    for seed in (1, 2, 3):
+        job_id = client.post("/api/simulate/jobs", json={**SMALL, "seed": seed}).json()["job_id"]
+        _wait_finished(client, job_id)
+        ids.append(job_id)
+        if seed == 2:
+            # Reading the first result keeps it; the second becomes the oldest.
+            assert client.get(f"/api/simulate/jobs/{ids[0]}/result").status_code == 200
+
+    assert client.get(f"/api/simulate/jobs/{ids[1]}").status_code == 404
+    assert client.get(f"/api/simulate/jobs/{ids[0]}/result").status_code == 200
+    assert client.get(f"/api/simulate/jobs/{ids[2]}/result").status_code == 200
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/simulate/jobs/nope").status_code == 404
+    assert client.get("/api/simulate/jobs/nope/result").status_code == 404
+    assert client.delete("/api/simulate/jobs/nope").status_code == 404
+
+
+def test_queue_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        SimulationJobQueue(max_workers=0)
+    with pytest.raises(ValueError):
+        SimulationJobQueue(max_results=0)
+    assert issubclass(JobQueueFull, RuntimeError)